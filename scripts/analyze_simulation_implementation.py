@@ -3,7 +3,6 @@ import sys
 from pathlib import Path
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
-import json
 from src.simulation.trade_simulator import TradeSimulator
 from src.simulation.market_state_tracker import MarketStateTracker
 from src.simulation.slippage_calculator import SlippageCalculator
@@ -54,50 +53,45 @@ else:
     print(f"  ✅ Basic implementation")
 print()
 
-# Check 4: Analyze existing simulation files
-print("4. Existing Simulation Files Analysis")
+# Check 4: Analyze stored simulations
+print("4. Stored Simulations Analysis")
 print("-"*80)
-sim_dir = Path('data/simulations')
-if sim_dir.exists():
-    sim_files = list(sim_dir.glob('*.json'))
-    print(f"Found: {len(sim_files)} simulation files")
+latest_sims = sim.store.latest(1)
+print(f"Found: {sim.store.count()} simulations")
+
+if latest_sims:
+    # Latest simulation
+    sim_data = latest_sims[0]
+    print(f"\nLatest simulation: {sim_data['simulation_id']}")
+    print(f"  Whale: {sim_data['whale_address'][:16]}...")
+    print(f"  Market: {sim_data['market_slug']}")
+    print(f"  Detection time: {sim_data.get('detection_time') or sim_data['detection']['timestamp']}")
+    print(f"  Delays tested: {len(sim_data['results'])}")
+    
+    # Check if prices are different at delays
+    prices = [r['market_state_at_entry']['price'] for r in sim_data['results']]
+    timestamps = [r['market_state_at_entry']['timestamp'] for r in sim_data['results']]
+    
+    print(f"\n  Price at detection: {prices[0]}")
+    print(f"  Prices at delays: {prices}")
+    print(f"  Timestamps: {timestamps}")
+    
+    # CRITICAL CHECK: Are prices different?
+    if len(set(prices)) == 1:
+        print(f"\n  ⚠️ CRITICAL: All delays show SAME price!")
+        print(f"     This means delay price checking is NOT working")
+        print(f"     All delays using detection price (fallback)")
+    else:
+        print(f"\n  ✅ Prices differ at delays (delay checking working)")
     
-    if sim_files:
-        # Load latest simulation
-        latest = max(sim_files, key=lambda p: p.stat().st_mtime)
-        with open(latest) as f:
-            sim_data = json.load(f)
-        
-        print(f"\nLatest simulation: {latest.name}")
-        print(f"  Whale: {sim_data['whale_address'][:16]}...")
-        print(f"  Market: {sim_data['market_slug']}")
-        print(f"  Detection time: {sim_data['detection_time']}")
-        print(f"  Delays tested: {len(sim_data['results'])}")
-        
-        # Check if prices are different at delays
-        prices = [r['market_state_at_entry']['price'] for r in sim_data['results']]
-        timestamps = [r['market_state_at_entry']['timestamp'] for r in sim_data['results']]
-        
-        print(f"\n  Price at detection: {prices[0]}")
-        print(f"  Prices at delays: {prices}")
-        print(f"  Timestamps: {timestamps}")
-        
-        # CRITICAL CHECK: Are prices different?
-        if len(set(prices)) == 1:
-            print(f"\n  ⚠️ CRITICAL: All delays show SAME price!")
-            print(f"     This means delay price checking is NOT working")
-            print(f"     All delays using detection price (fallback)")
-        else:
-            print(f"\n  ✅ Prices differ at delays (delay checking working)")
-        
-        # Check if resolved
-        resolved = [r['resolved'] for r in sim_data['results']]
-        if any(resolved):
-            print(f"\n  ✅ Some results resolved (P&L calculated)")
-        else:
-            print(f"\n  ⚠️ No results resolved yet (markets not closed)")
+    # Check if resolved
+    resolved = [r['resolved'] for r in sim_data['results']]
+    if any(resolved):
+        print(f"\n  ✅ Some results resolved (P&L calculated)")
+    else:
+        print(f"\n  ⚠️ No results resolved yet (markets not closed)")
 else:
-    print("No simulation directory found")
+    print("No simulations stored yet")
 
 print()
 print("="*80)
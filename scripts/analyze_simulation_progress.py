@@ -1,8 +1,11 @@
-import json
+import sys
 from pathlib import Path
 from datetime import datetime
 from collections import defaultdict
 
+sys.path.insert(0, str(Path(__file__).parent.parent))
+from src.simulation.simulation_store import SimulationStore
+
 def analyze_simulation_progress():
     """Analyze Phase 2 simulation progress"""
     
@@ -12,19 +15,15 @@ def analyze_simulation_progress():
     print(f"Generated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
     print()
     
-    # Load all simulation files
-    sim_dir = Path('data/simulations')
-    if not sim_dir.exists():
-        print("❌ Simulations directory not found")
-        return
-    
-    sim_files = list(sim_dir.glob('sim_*.json'))
+    # Load simulation store
+    store = SimulationStore()
+    total_sims = store.count()
     
-    print(f"TOTAL SIMULATIONS: {len(sim_files)}")
+    print(f"TOTAL SIMULATIONS: {total_sims}")
     print()
     
-    if len(sim_files) == 0:
-        print("❌ No simulation files found")
+    if total_sims == 0:
+        print("❌ No simulations found (run scripts/migrate_simulations.py to import sim_*.json files)")
         return
     
     # Analyze simulations
@@ -41,11 +40,8 @@ def analyze_simulation_progress():
     
     price_changes = []
     
-    for sim_file in sim_files:
+    for sim in store.iter_simulations():
         try:
-            with open(sim_file, 'r') as f:
-                sim = json.load(f)
-            
             # Status
             status = sim.get('status', 'unknown')
             if status == 'completed':
@@ -105,7 +101,7 @@ def analyze_simulation_progress():
                             price_changes.append(abs(change_pct))
         
         except Exception as e:
-            print(f"⚠️ Error reading {sim_file.name}: {e}")
+            print(f"⚠️ Error reading {sim.get('simulation_id')}: {e}")
     
     # Print summary
     print("STATUS BREAKDOWN:")
@@ -137,7 +133,7 @@ def analyze_simulation_progress():
         max_change = max(price_changes)
         min_change = min(price_changes)
         print("PRICE MOVEMENT CAPTURED:")
-        print(f"  Simulations with price movement: {len(price_changes)}/{len(sim_files)} ({len(price_changes)/len(sim_files)*100:.1f}%)")
+        print(f"  Simulations with price movement: {len(price_changes)}/{total_sims} ({len(price_changes)/total_sims*100:.1f}%)")
         print(f"  Average price change: {avg_change:.1f}%")
         print(f"  Maximum price change: {max_change:.1f}%")
         print(f"  Minimum price change: {min_change:.1f}%")
@@ -145,13 +141,9 @@ def analyze_simulation_progress():
     
     # Recent simulations
     print("RECENT SIMULATIONS (Last 5):")
-    recent = sorted(sim_files, key=lambda x: x.stat().st_mtime, reverse=True)[:5]
-    for sim_file in recent:
+    for sim in store.latest(5):
         try:
-            with open(sim_file, 'r') as f:
-                sim = json.load(f)
-            
-            sim_id = sim.get('simulation_id', sim_file.stem)
+            sim_id = sim['simulation_id']
             status = sim.get('status', 'unknown')
             is_elite = '⭐' if sim.get('is_elite', False) else '  '
             
@@ -167,26 +159,25 @@ def analyze_simulation_progress():
                 if prices:
                     prices_str = f"Prices: {', '.join([f'{p:.3f}' for p in prices])}"
             
-            modified = datetime.fromtimestamp(sim_file.stat().st_mtime)
+            modified = datetime.fromisoformat(sim['updated_at'])
             print(f"  {is_elite} {sim_id[:40]}... | {status}")
             print(f"     Modified: {modified.strftime('%Y-%m-%d %H:%M:%S')} | {prices_str}")
         except Exception as e:
-            print(f"  ⚠️ Error reading {sim_file.name}: {e}")
+            print(f"  ⚠️ Error reading {sim.get('simulation_id')}: {e}")
     
     print()
     
     # Collection rate
-    if len(sim_files) > 1:
-        oldest = min(sim_files, key=lambda x: x.stat().st_mtime)
-        newest = max(sim_files, key=lambda x: x.stat().st_mtime)
+    if total_sims > 1:
+        oldest, newest = store.time_span()
         
-        oldest_time = datetime.fromtimestamp(oldest.stat().st_mtime)
-        newest_time = datetime.fromtimestamp(newest.stat().st_mtime)
+        oldest_time = datetime.fromisoformat(oldest)
+        newest_time = datetime.fromisoformat(newest)
         
         time_diff = (newest_time - oldest_time).total_seconds() / 3600  # hours
         
         if time_diff > 0:
-            rate = len(sim_files) / time_diff
+            rate = total_sims / time_diff
             print("COLLECTION RATE:")
             print(f"  Time span: {time_diff:.1f} hours")
             print(f"  Rate: {rate:.1f} simulations/hour")
@@ -195,9 +186,9 @@ def analyze_simulation_progress():
             # Projection
             hours_remaining = 48 - time_diff
             if hours_remaining > 0:
-                projected = len(sim_files) + (rate * hours_remaining)
+                projected = total_sims + (rate * hours_remaining)
                 print("HOUR 48 PROJECTION:")
-                print(f"  Current: {len(sim_files)} simulations")
+                print(f"  Current: {total_sims} simulations")
                 print(f"  Hours remaining: {hours_remaining:.1f}")
                 print(f"  Projected total: {projected:.0f} simulations")
                 print()
@@ -1,8 +1,12 @@
 """Check current system stats and progress"""
-import json
+import sys
 from pathlib import Path
 from datetime import datetime
 from dynamic_whale_manager import DynamicWhaleManager
+from whale_trade_store import load_trades
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+from src.simulation.simulation_store import SimulationStore
 
 print("="*80)
 print("📊 SYSTEM STATS & PROGRESS REPORT")
@@ -20,19 +24,13 @@ print(f"Active Whales: {stats['active_whales']}")
 print(f"Avg Confidence: {stats['avg_confidence']:.1%}")
 print()
 
-# Check if growing
-state_file = Path("data/dynamic_whale_state.json")
-if state_file.exists():
-    with open(state_file) as f:
-        file_data = json.load(f)
-    file_count = len(file_data.get("whales", {}))
-    memory_count = len(m.whales)
-    print(f"Whales in Memory: {memory_count}")
-    print(f"Whales in File: {file_count}")
-    if memory_count == file_count:
-        print("✅ Data Persisting (Memory = File)")
-    else:
-        print(f"⚠️ Mismatch: Memory={memory_count}, File={file_count}")
+# Check if persisting (m was loaded from the snapshot + WAL replay)
+persisted = m.persistence_stats()
+print(f"Whales Persisted: {len(m.whales)}")
+print(f"Whales in Snapshot: {persisted['snapshot_whales']}")
+print(f"WAL Records Pending Compaction: {persisted['wal_records']}")
+if m.whales:
+    print("✅ Data Persisting (snapshot + WAL)")
 print()
 
 # Top whales
@@ -61,10 +59,8 @@ if recent:
 # 2. Trade Data Collection
 print("📈 TRADE DATA COLLECTION")
 print("-"*80)
-trade_file = Path("data/realtime_whale_trades.json")
-if trade_file.exists():
-    with open(trade_file) as f:
-        trades = json.load(f)
+trades = load_trades()
+if trades:
     print(f"Total Trades Saved: {len(trades):,}")
     
     if trades:
@@ -94,24 +90,22 @@ print()
 # 3. Simulation Data
 print("🎯 SIMULATION DATA COLLECTION")
 print("-"*80)
-sim_dir = Path("data/simulations")
-if sim_dir.exists():
-    sims = list(sim_dir.glob("*.json"))
-    print(f"Simulation Files: {len(sims)}")
-    if sims:
-        latest = max(sims, key=lambda p: p.stat().st_mtime)
-        latest_time = datetime.fromtimestamp(latest.stat().st_mtime)
-        age_min = (datetime.now() - latest_time).total_seconds() / 60
-        print(f"Latest Simulation: {latest.name}")
-        print(f"Created: {latest_time.strftime('%Y-%m-%d %H:%M:%S')} ({age_min:.1f} min ago)")
-        if age_min < 60:
-            print("✅ Simulations Active")
-        else:
-            print(f"⚠️ No recent simulations ({age_min:.0f} min ago)")
+sim_store = SimulationStore()
+latest_sims = sim_store.latest(1)
+print(f"Simulations: {sim_store.count()}")
+if latest_sims:
+    latest = latest_sims[0]
+    latest_time = datetime.fromisoformat(latest['updated_at'])
+    age_min = (datetime.now() - latest_time).total_seconds() / 60
+    print(f"Latest Simulation: {latest['simulation_id']}")
+    print(f"Updated: {latest_time.strftime('%Y-%m-%d %H:%M:%S')} ({age_min:.1f} min ago)")
+    if age_min < 60:
+        print("✅ Simulations Active")
     else:
-        print("⚠️ No simulation files yet")
+        print(f"⚠️ No recent simulations ({age_min:.0f} min ago)")
 else:
-    print("⚠️ Simulation directory not found")
+    print("⚠️ No simulations yet")
+sim_store.close()
 print()
 
 # 4. Watcher Status
@@ -1,9 +1,11 @@
 #!/usr/bin/env python3
 """Check if elite whales are trading"""
 import json
-from pathlib import Path
 from datetime import datetime, timedelta
 
+from dynamic_whale_manager import DynamicWhaleManager
+from whale_trade_store import load_trades
+
 # Load elite addresses
 with open('data/api_validation_results.json', 'r') as f:
     elite_data = json.load(f)
@@ -18,8 +20,7 @@ print(f"✅ Elite addresses loaded: {len(elite_addrs)}")
 print()
 
 # Load recent trades
-with open('data/realtime_whale_trades.json', 'r') as f:
-    trades = json.load(f)
+trades = load_trades()
 
 # Check last 50 trades
 recent_trades = trades[-50:] if len(trades) > 50 else trades
@@ -44,11 +45,9 @@ print("=" * 70)
 print("DYNAMIC WHALE POOL CHECK")
 print("=" * 70)
 
-whale_file = Path('data/dynamic_whale_state.json')
-if whale_file.exists():
-    with open(whale_file, 'r') as f:
-        whales = json.load(f)
-    
+# Snapshot + WAL replay (read-only, never compacts)
+whales = DynamicWhaleManager().whales
+if whales:
     # Check for elite whales
     elite_in_pool = {addr: data for addr, data in whales.items() 
                      if addr.lower() in elite_addrs}
@@ -89,4 +88,4 @@ if whale_file.exists():
         print("❌ NO elite whales in dynamic pool yet")
         print("Watcher just restarted - pool is rebuilding")
 else:
-    print("❌ Dynamic whale state file not found")
+    print("❌ No dynamic whale state found")
@@ -1,14 +1,20 @@
 #!/usr/bin/env python3
 """Quick check of latest simulation"""
 import json
+import sys
 from pathlib import Path
 
+sys.path.insert(0, str(Path(__file__).parent.parent))
+from src.simulation.simulation_store import SimulationStore
+
 # Get latest simulation
-sim_dir = Path("data/simulations")
-latest = sorted(sim_dir.glob("sim_*.json"), key=lambda x: x.stat().st_mtime, reverse=True)[0]
-sim = json.loads(latest.read_text())
+latest = SimulationStore().latest(1)
+if not latest:
+    print("No simulations found yet")
+    sys.exit(0)
+sim = latest[0]
 
-print(f"Latest Simulation: {latest.name}")
+print(f"Latest Simulation: {sim['simulation_id']}")
 print(f"Whale Address: {sim.get('whale_address', 'N/A')}")
 print(f"Is Elite: {sim.get('is_elite', False)}")
 print(f"Confidence: {sim.get('confidence', 0)}")
@@ -1,5 +1,4 @@
 """Check notification status and why no recent notifications"""
-import json
 import sys
 from pathlib import Path
 from datetime import datetime
@@ -19,8 +18,8 @@ except Exception as e:
 
 # Load trade data
 try:
-    with open('data/realtime_whale_trades.json', 'r') as f:
-        trades = json.load(f)
+    from whale_trade_store import load_trades
+    trades = load_trades()
 except Exception as e:
     print(f"❌ Could not load trade data: {e}")
     trades = []
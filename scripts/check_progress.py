@@ -1,8 +1,7 @@
 """Check current progress since Phase 2 start"""
 from datetime import datetime
 from dynamic_whale_manager import DynamicWhaleManager
-import json
-from pathlib import Path
+from whale_trade_store import load_trades
 
 print("="*80)
 print("📊 PROGRESS REPORT - Since Last Check")
@@ -45,10 +44,8 @@ print(f"Avg Confidence: {stats['avg_confidence']:.1%}")
 print()
 
 # Trade Collection
-trade_file = Path("data/realtime_whale_trades.json")
-if trade_file.exists():
-    with open(trade_file) as f:
-        trades = json.load(f)
+trades = load_trades()
+if trades:
     
     print("📈 TRADE COLLECTION")
     print("-"*80)
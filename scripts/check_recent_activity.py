@@ -1,15 +1,12 @@
 """Check recent trade activity"""
-import json
 from datetime import datetime
-from pathlib import Path
 
-trades_file = Path("data/realtime_whale_trades.json")
-if not trades_file.exists():
-    print("❌ No trades file found")
-    exit()
+from whale_trade_store import load_trades
 
-with open(trades_file, 'r') as f:
-    trades = json.load(f)
+trades = load_trades()
+if not trades:
+    print("❌ No trades found")
+    exit()
 
 print("="*80)
 print("📊 RECENT ACTIVITY CHECK")
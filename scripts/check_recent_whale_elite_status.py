@@ -1,7 +1,11 @@
 """Check if recent simulation whales should be elite"""
 import json
+import sys
 from pathlib import Path
 
+sys.path.insert(0, str(Path(__file__).parent.parent))
+from src.simulation.simulation_store import SimulationStore
+
 # Load elite whales
 with open('data/api_validation_results.json', 'r') as f:
     data = json.load(f)
@@ -15,24 +19,20 @@ print(f"Total elite whales: {len(elite_addrs)}")
 print()
 
 # Get recent simulations
-sim_dir = Path('data/simulations')
-sim_files = sorted(sim_dir.glob('sim_*.json'), key=lambda x: x.stat().st_mtime, reverse=True)[:10]
+sims = SimulationStore().latest(10)
 
-if not sim_files:
-    print("No simulation files found")
+if not sims:
+    print("No simulations found")
     exit()
 
-print(f"Checking last {len(sim_files)} simulations:")
+print(f"Checking last {len(sims)} simulations:")
 print("-" * 70)
 
 mismatches = []
 elite_found = []
 
-for sim_file in sim_files:
+for sim in sims:
     try:
-        with open(sim_file, 'r') as f:
-            sim = json.load(f)
-        
         whale_addr = sim.get('whale_address', '')
         is_elite_in_sim = sim.get('is_elite', False)
         status = sim.get('status', 'unknown')
@@ -49,7 +49,7 @@ for sim_file in sim_files:
             indicator = "❌ MISMATCH (SHOULD BE ELITE)"
             mismatches.append({
                 'whale': whale_addr,
-                'file': sim_file.name,
+                'simulation': sim['simulation_id'],
                 'should_be': True,
                 'is': False
             })
@@ -62,7 +62,7 @@ for sim_file in sim_files:
             indicator = "⚠️  MISMATCH (SHOULD NOT BE ELITE)"
             mismatches.append({
                 'whale': whale_addr,
-                'file': sim_file.name,
+                'simulation': sim['simulation_id'],
                 'should_be': False,
                 'is': True
             })
@@ -73,12 +73,12 @@ for sim_file in sim_files:
         print()
         
     except Exception as e:
-        print(f"Error reading {sim_file.name}: {e}")
+        print(f"Error reading {sim.get('simulation_id')}: {e}")
         print()
 
 print("-" * 70)
 print("SUMMARY:")
-print(f"  Total checked: {len(sim_files)}")
+print(f"  Total checked: {len(sims)}")
 print(f"  Elite whales found: {len(elite_found)}")
 print(f"  Mismatches: {len(mismatches)}")
 
@@ -87,7 +87,7 @@ if mismatches:
     print("⚠️  MISMATCHES FOUND:")
     for m in mismatches:
         print(f"  Whale: {m['whale'][:42]}...")
-        print(f"    File: {m['file']}")
+        print(f"    Simulation: {m['simulation']}")
         print(f"    Should be elite: {m['should_be']}")
         print(f"    Actually flagged: {m['is']}")
         print()
@@ -36,10 +36,9 @@ except ImportError:
 print()
 
 # Check trade data
-trades_file = project_root / "data" / "realtime_whale_trades.json"
-if trades_file.exists():
-    with open(trades_file, 'r') as f:
-        trades = json.load(f)
+from whale_trade_store import load_trades
+trades = load_trades()
+if trades:
     
     total_trades = len(trades)
     now = datetime.now()
@@ -65,11 +64,11 @@ print()
 
 # Check dynamic whales
 whales_file = project_root / "data" / "dynamic_whale_state.json"
-if whales_file.exists():
-    with open(whales_file, 'r') as f:
-        whale_data = json.load(f)
+if whales_file.exists() or whales_file.with_suffix('.wal').exists():
+    from dynamic_whale_manager import DynamicWhaleManager
     
-    whales = whale_data.get('whales', {})
+    # Snapshot + WAL replay (read-only, never compacts)
+    whales = DynamicWhaleManager(state_file=str(whales_file)).whales
     total = len(whales)
     high_conf = sum(1 for w in whales.values() if w.get('confidence', 0) >= 0.70)
     
@@ -1,13 +1,11 @@
 """Check if trades are being counted correctly"""
-import json
 from datetime import datetime
-from pathlib import Path
 
-# Check trade file
-trades_file = Path("data/realtime_whale_trades.json")
-if trades_file.exists():
-    with open(trades_file, 'r') as f:
-        trades = json.load(f)
+from whale_trade_store import load_trades
+
+# Check trade store
+trades = load_trades()
+if trades:
     
     print("="*80)
     print("TRADE COUNTING ANALYSIS")
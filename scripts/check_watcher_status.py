@@ -3,6 +3,8 @@ import json
 from datetime import datetime, timedelta
 from pathlib import Path
 
+from whale_trade_store import load_trades
+
 print("="*80)
 print("🔍 WATCHER STATUS CHECK")
 print("="*80)
@@ -27,10 +29,8 @@ if not watcher_running:
     print()
 
 # Check recent trades
-trades_file = Path("data/realtime_whale_trades.json")
-if trades_file.exists():
-    with open(trades_file, 'r') as f:
-        trades = json.load(f)
+trades = load_trades()
+if trades:
     
     print(f"📊 Total trades detected: {len(trades)}")
     
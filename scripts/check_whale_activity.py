@@ -3,6 +3,8 @@ import json
 from pathlib import Path
 from collections import defaultdict
 
+from whale_trade_store import load_trades
+
 # Load monitored whales
 config_file = Path("config/whale_list.json")
 with open(config_file, 'r') as f:
@@ -12,14 +14,11 @@ monitored_whales = {w.get('address', '').lower() for w in config.get('whales', [
 whale_names = {w.get('address', '').lower(): w.get('name', 'Unknown') for w in config.get('whales', [])}
 
 # Load trades
-trades_file = Path("data/realtime_whale_trades.json")
-if not trades_file.exists():
-    print("No trades file yet")
+trades = load_trades()
+if not trades:
+    print("No trades yet")
     exit(0)
 
-with open(trades_file, 'r') as f:
-    trades = json.load(f)
-
 # Check for whale trades
 whale_trades = [t for t in trades if t.get('wallet', '').lower() in monitored_whales]
 
@@ -4,6 +4,8 @@ from pathlib import Path
 from datetime import datetime, timedelta
 from collections import defaultdict
 
+from whale_trade_store import DEFAULT_STORE_DIR, load_trades
+
 print("\n" + "="*80)
 print("🐋 WHALE DATA SUMMARY REPORT")
 print("="*80)
@@ -26,17 +28,10 @@ print(f"📊 Monitoring: {len(monitored_whales)} whale addresses")
 print()
 
 # Load trades
-trades_file = Path("data/realtime_whale_trades.json")
-if not trades_file.exists():
-    print("❌ No trades data file found")
-    print("   Watcher may not have detected any trades yet")
-    exit(1)
-
-with open(trades_file, 'r') as f:
-    trades = json.load(f)
+trades = load_trades()
 
 if not trades:
-    print("⚠️ Trades file exists but is empty")
+    print("⚠️ No trades in the trade store")
     print("   Watcher is running but no trades detected yet")
     exit(0)
 
@@ -181,5 +176,5 @@ print("="*80)
 print("✅ SUMMARY SAVED")
 print("="*80)
 print(f"📁 Full summary: {summary_file}")
-print(f"📁 Raw data: {trades_file}")
+print(f"📁 Raw data: {DEFAULT_STORE_DIR}/")
 print()
@@ -1,8 +1,7 @@
 """Debug watcher status - check if it's processing trades"""
-import json
 import sys
 from pathlib import Path
-from datetime import datetime
+from datetime import datetime, timedelta
 
 # Add project root to path
 project_root = Path(__file__).parent.parent
@@ -15,8 +14,8 @@ print()
 
 # Check trade data file
 try:
-    with open('data/realtime_whale_trades.json', 'r') as f:
-        trades = json.load(f)
+    from whale_trade_store import load_trades
+    trades = load_trades()
     
     if not trades:
         print("❌ No trades in data file")
@@ -85,8 +84,6 @@ try:
             print(f"  Wallet: {latest_monitored.get('wallet', '')[:16]}...")
             print(f"  Value: ${latest_monitored.get('value', 0):,.2f}")
         
-except FileNotFoundError:
-    print("❌ Trade data file not found: data/realtime_whale_trades.json")
 except Exception as e:
     print(f"❌ Error reading trade data: {e}")
     import traceback
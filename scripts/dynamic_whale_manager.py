@@ -14,9 +14,23 @@ Rules:
 • active if traded within 48-72 hours
 • confidence decays over time
 • auto-remove inactive whales
+
+Persistence:
+• only changed wallets are written, as full records appended to a
+  write-ahead log (data/dynamic_whale_state.wal, JSON lines)
+• WAL writes are debounced (flush_interval_sec); changes held back by the
+  debounce are written by a trailing flush on the running event loop, or at
+  the next change / close() when there is no loop
+• the WAL is periodically compacted into data/dynamic_whale_state.json,
+  which stays a plain {address: whale} snapshot for the report scripts
+• markets_traded is bounded to the most recent max_markets_per_whale
 """
 
+import asyncio
+import atexit
 import json
+import os
+import time
 from datetime import datetime, timedelta
 from pathlib import Path
 from typing import Dict, List, Set
@@ -31,32 +45,139 @@ class DynamicWhaleManager:
     • Tracks last activity timestamp
     • Calculates confidence score
     • Auto-removes inactive whales
-    • Saves state to disk
+    • Saves changed wallets to disk (WAL + periodic compaction)
     """
     
     def __init__(self, activity_threshold_hours: int = 72, 
                  min_confidence: float = 0.3,
-                 state_file: str = "data/dynamic_whale_state.json"):
+                 state_file: str = "data/dynamic_whale_state.json",
+                 flush_interval_sec: float = 2.0,
+                 compact_interval_sec: float = 600.0,
+                 compact_max_wal_records: int = 20000,
+                 max_markets_per_whale: int = 200):
         
         self.activity_threshold = timedelta(hours=activity_threshold_hours)
         self.min_confidence = min_confidence
         self.state_file = Path(state_file)
+        self.wal_file = self.state_file.with_suffix('.wal')
+        self.flush_interval_sec = flush_interval_sec
+        self.compact_interval_sec = compact_interval_sec
+        self.compact_max_wal_records = compact_max_wal_records
+        self.max_markets_per_whale = max_markets_per_whale
+        
+        # Wallets changed/removed since the last WAL flush
+        self._dirty: Set[str] = set()
+        self._deleted: Set[str] = set()
+        self._wal_records = 0
+        # Only a process that wrote WAL records itself compacts: a read-only instance
+        # (status scripts) would overwrite the snapshot with its load-time view and
+        # truncate records the running watcher appended since
+        self._wrote_wal = False
+        self._last_flush = time.monotonic()
+        self._last_compact = time.monotonic()
+        self._trailing_flush = None  # asyncio.TimerHandle while a debounced flush is pending
         
-        # Load existing state or start fresh
+        # Load existing state (snapshot + WAL replay) or start fresh
         self.whales = self.load_state()
+        atexit.register(self.close)
     
     def load_state(self) -> Dict:
-        """Load whale state from disk"""
+        """Load whale state from disk: last snapshot, then replay the WAL on top"""
+        whales = self._load_snapshot()
+        
+        if self.wal_file.exists():
+            with open(self.wal_file, 'r', encoding='utf-8') as f:
+                for line in f:
+                    line = line.strip()
+                    if not line:
+                        continue
+                    try:
+                        record = json.loads(line)
+                    except json.JSONDecodeError:
+                        continue  # torn last line after a crash
+                    self._wal_records += 1
+                    address = record.get('address')
+                    if record.get('deleted'):
+                        whales.pop(address, None)
+                    elif address:
+                        whales[address] = record
+        
+        for whale in whales.values():
+            markets = whale.get('markets_traded')
+            if isinstance(markets, list) and len(markets) > self.max_markets_per_whale:
+                whale['markets_traded'] = markets[-self.max_markets_per_whale:]
+        return whales
+    
+    def _load_snapshot(self) -> Dict:
+        """Load the compacted snapshot file"""
         if self.state_file.exists():
             with open(self.state_file, 'r') as f:
                 return json.load(f)
         return {}
     
-    def save_state(self):
-        """Save whale state to disk"""
+    def save_state(self, force: bool = False):
+        """
+        Persist changed wallets (debounced: at most once per flush_interval_sec
+        unless force=True). Compacts the WAL into the snapshot when due.
+        """
+        now = time.monotonic()
+        if not force and now - self._last_flush < self.flush_interval_sec:
+            self._schedule_trailing_flush(self.flush_interval_sec - (now - self._last_flush))
+            return
+        self._last_flush = now
+        if self._trailing_flush is not None:
+            self._trailing_flush.cancel()
+            self._trailing_flush = None
+        
+        if self._dirty or self._deleted:
+            self.wal_file.parent.mkdir(parents=True, exist_ok=True)
+            lines = [json.dumps(self.whales[w], separators=(',', ':')) for w in self._dirty if w in self.whales]
+            lines += [json.dumps({'address': w, 'deleted': True}) for w in self._deleted]
+            with open(self.wal_file, 'a', encoding='utf-8') as f:
+                f.write('\n'.join(lines) + '\n')
+            self._wal_records += len(lines)
+            self._wrote_wal = True
+            self._dirty.clear()
+            self._deleted.clear()
+        
+        if self._wrote_wal and self._wal_records and (force or self._wal_records >= self.compact_max_wal_records
+                                  or now - self._last_compact >= self.compact_interval_sec):
+            self.compact()
+    
+    def _schedule_trailing_flush(self, delay: float):
+        """Write debounced changes once the interval ends, even if no further change arrives"""
+        if self._trailing_flush is not None or not (self._dirty or self._deleted):
+            return
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return  # No event loop: written at the next change or by close()
+        self._trailing_flush = loop.call_later(delay, self._run_trailing_flush)
+    
+    def _run_trailing_flush(self):
+        self._trailing_flush = None
+        self.save_state()
+    
+    def compact(self):
+        """Write a full snapshot (atomic replace) and truncate the WAL"""
         self.state_file.parent.mkdir(parents=True, exist_ok=True)
-        with open(self.state_file, 'w') as f:
-            json.dump(self.whales, f, indent=2)
+        tmp_file = self.state_file.with_suffix('.json.tmp')
+        with open(tmp_file, 'w', encoding='utf-8') as f:
+            json.dump(self.whales, f, separators=(',', ':'))
+        os.replace(tmp_file, self.state_file)
+        # Replaying WAL records over the new snapshot is harmless, so a crash here loses nothing
+        open(self.wal_file, 'w').close()
+        self._wal_records = 0
+        self._last_compact = time.monotonic()
+    
+    def close(self):
+        """Flush pending changes and compact (called at exit; no-op for read-only instances)"""
+        if self._dirty or self._deleted or self._wrote_wal:
+            self.save_state(force=True)
+    
+    def _mark_dirty(self, wallet: str):
+        self._dirty.add(wallet)
+        self._deleted.discard(wallet)
     
     def add_or_update_whale(self, wallet: str, market: str, trade_value: float, 
                             win_rate: float = None, source: str = "anomaly"):
@@ -95,8 +216,13 @@ class DynamicWhaleManager:
             whale = self.whales[wallet]
             whale['last_activity'] = now
             
-            if market not in whale['markets_traded']:
-                whale['markets_traded'].append(market)
+            markets = whale['markets_traded']
+            if market in markets:
+                # Keep most recently traded markets at the end
+                markets.remove(market)
+            markets.append(market)
+            if len(markets) > self.max_markets_per_whale:
+                del markets[:-self.max_markets_per_whale]
             
             whale['trade_count'] += 1
             whale['total_value'] += trade_value
@@ -105,6 +231,7 @@ class DynamicWhaleManager:
             # Boost confidence for continued activity
             whale['confidence'] = min(1.0, whale['confidence'] + 0.05)
         
+        self._mark_dirty(wallet)
         self.save_state()
     
     def update_confidence_scores(self):
@@ -130,16 +257,21 @@ class DynamicWhaleManager:
                 if whale['active']:
                     whale['active'] = False
                     deactivated_count += 1
+                    self._mark_dirty(wallet)
                 
                 # Decay confidence
                 decay_rate = 0.01 * (time_since_activity.days - 3)
-                whale['confidence'] = max(0.0, whale['confidence'] - decay_rate)
+                new_confidence = max(0.0, whale['confidence'] - decay_rate)
+                if new_confidence != whale['confidence']:
+                    whale['confidence'] = new_confidence
+                    self._mark_dirty(wallet)
             
             else:
                 # Recently active - maintain or boost confidence
                 if not whale['active']:
                     whale['active'] = True
                     updated_count += 1
+                    self._mark_dirty(wallet)
             
         self.save_state()
         
@@ -164,6 +296,13 @@ class DynamicWhaleManager:
         
         return active
     
+    def persistence_stats(self) -> Dict:
+        """On-disk state: whales in the snapshot file and WAL records not yet compacted into it"""
+        return {
+            'snapshot_whales': len(self._load_snapshot()),
+            'wal_records': self._wal_records,
+        }
+    
     def get_whale_stats(self) -> Dict:
         """Get overall whale statistics"""
         
@@ -191,6 +330,8 @@ class DynamicWhaleManager:
         
         for wallet in to_remove:
             del self.whales[wallet]
+            self._dirty.discard(wallet)
+            self._deleted.add(wallet)
         
         if to_remove:
             print(f"🗑️ Removed {len(to_remove)} low-confidence whales")
@@ -3,18 +3,16 @@ import json
 from pathlib import Path
 from datetime import datetime, timedelta
 from collections import defaultdict
+from whale_trade_store import load_trades
 
-trades_file = Path("data/realtime_whale_trades.json")
 config_file = Path("config/whale_list.json")
 
-if not trades_file.exists():
+# Load data
+trades = load_trades()
+if not trades:
     print("No trades data yet")
     exit(0)
 
-# Load data
-with open(trades_file, 'r') as f:
-    trades = json.load(f)
-
 with open(config_file, 'r') as f:
     config = json.load(f)
 
@@ -5,6 +5,9 @@ from dynamic_whale_manager import DynamicWhaleManager
 from pathlib import Path
 import sys
 
+sys.path.insert(0, str(Path(__file__).parent.parent))
+from src.simulation.simulation_store import SimulationStore
+
 def generate_status_report():
     """Generate comprehensive data status report"""
     
@@ -113,29 +116,9 @@ def generate_status_report():
     print("3. TRADE DATA (Accumulating)")
     print("-" * 80)
     try:
-        trade_file = Path('data/realtime_whale_trades.json')
-        if trade_file.exists():
-            try:
-                with open(trade_file, 'r') as f:
-                    trades = json.load(f)
-            except json.JSONDecodeError as e:
-                print(f"⚠️ Trade file corrupted at line {e.lineno if hasattr(e, 'lineno') else 'unknown'}")
-                print(f"   Attempting to load partial data...")
-                # Try to load what we can
-                trades = []
-                try:
-                    with open(trade_file, 'r', encoding='utf-8') as f:
-                        content = f.read()
-                        # Try to extract valid JSON chunks
-                        import re
-                        # Simple approach: count file size
-                        file_size = trade_file.stat().st_size
-                        print(f"   File size: {file_size / (1024*1024):.2f} MB")
-                        print(f"   ⚠️ Cannot parse corrupted JSON - file needs repair")
-                        trades = None
-                except:
-                    trades = None
-            
+        from whale_trade_store import load_trades
+        trades = load_trades()
+        if trades:
             print(f"✅ Total trades preserved: {len(trades):,}")
             
             if len(trades) > 0:
@@ -170,7 +153,7 @@ def generate_status_report():
                     age_min = (datetime.now(last_dt.tzinfo) - last_dt).total_seconds() / 60
                     print(f"✅ Latest trade: {age_min:.1f} minutes ago")
         else:
-            print("❌ Trade file not found")
+            print("❌ No trades in the trade store")
     except Exception as e:
         print(f"❌ Error loading trades: {e}")
         import traceback
@@ -182,39 +165,23 @@ def generate_status_report():
     print("4. SIMULATION DATA (Phase 2)")
     print("-" * 80)
     try:
-        sim_dir = Path('data/simulations')
-        if sim_dir.exists():
-            sim_files = list(sim_dir.glob('*.json'))
-            print(f"✅ Simulation files: {len(sim_files)}")
+        store = SimulationStore()
+        total_sims = store.count()
+        print(f"✅ Simulations: {total_sims}")
+        
+        if total_sims:
+            # Latest simulation
+            latest = store.latest(1)[0]
+            latest_time = datetime.fromisoformat(latest['updated_at'])
+            print(f"✅ Latest simulation: {latest['simulation_id']}")
+            print(f"✅ Updated: {latest_time.strftime('%Y-%m-%d %H:%M:%S')}")
             
-            if sim_files:
-                # Get latest simulation
-                latest = max(sim_files, key=lambda p: p.stat().st_mtime)
-                latest_time = datetime.fromtimestamp(latest.stat().st_mtime)
-                print(f"✅ Latest simulation: {latest.name}")
-                print(f"✅ Created: {latest_time.strftime('%Y-%m-%d %H:%M:%S')}")
-                
-                # Try to load and count elite simulations
-                elite_count = 0
-                total_sims = 0
-                for sim_file in sim_files[:10]:  # Check first 10 files
-                    try:
-                        with open(sim_file, 'r') as f:
-                            sim_data = json.load(f)
-                            if isinstance(sim_data, list):
-                                total_sims += len(sim_data)
-                                elite_count += sum(1 for s in sim_data if s.get('is_elite', False))
-                            elif isinstance(sim_data, dict) and sim_data.get('is_elite', False):
-                                total_sims += 1
-                                elite_count += 1
-                    except:
-                        pass
-                
-                if total_sims > 0:
-                    print(f"✅ Total simulations (sample): {total_sims}")
-                    print(f"✅ Elite simulations (sample): {elite_count}")
+            elite_count = sum(1 for _ in store.iter_simulations(is_elite=True))
+            print(f"✅ Total simulations: {total_sims}")
+            print(f"✅ Elite simulations: {elite_count}")
         else:
-            print("⚠️ Simulation directory not found (may not have started yet)")
+            print("⚠️ No simulations stored yet (may not have started yet)")
+        store.close()
     except Exception as e:
         print(f"⚠️ Error checking simulations: {e}")
     
@@ -249,10 +216,12 @@ def generate_status_report():
     
     # File Status
     print("File Status:")
+    from whale_trade_store import WhaleTradeStore
+    segments = WhaleTradeStore().segments()
     files = {
         'Elite whales': 'data/api_validation_results.json',
         'Dynamic whales': 'data/dynamic_whale_state.json',
-        'Trade history': 'data/realtime_whale_trades.json',
+        'Trade history (latest segment)': str(segments[-1]) if segments else 'data/whale_trades/',
     }
     
     total_size = 0
@@ -3,16 +3,17 @@ import json
 from pathlib import Path
 from datetime import datetime
 
+from dynamic_whale_manager import DynamicWhaleManager
+from whale_trade_store import load_trades
+
 print("="*80)
 print("📊 SYSTEM STATUS REPORT")
 print("="*80)
 print()
 
 # Trade statistics
-trades_file = Path("data/realtime_whale_trades.json")
-if trades_file.exists():
-    with open(trades_file, 'r') as f:
-        trades = json.load(f)
+trades = load_trades()
+if trades:
     
     total = len(trades)
     whale_trades = [t for t in trades if t.get('is_monitored_whale')]
@@ -34,12 +35,9 @@ if elite_file.exists():
     print(f"   Integration: ✅ Active")
     print()
 
-# Dynamic whales
-whales_file = Path("data/dynamic_whale_state.json")
-if whales_file.exists():
-    with open(whales_file, 'r') as f:
-        whale_data = json.load(f)
-    whales = whale_data.get('whales', {})
+# Dynamic whales (snapshot + WAL replay; read-only, never compacts)
+whales = DynamicWhaleManager().whales
+if whales:
     total_whales = len(whales)
     high_conf = sum(1 for w in whales.values() if w.get('confidence', 0) >= 0.70)
     print("🐋 DYNAMIC WHALES:")
@@ -5,6 +5,8 @@ from pathlib import Path
 from collections import Counter
 import sys
 sys.path.insert(0, str(Path(__file__).parent))
+sys.path.insert(0, str(Path(__file__).parent.parent))
+from src.simulation.simulation_store import SimulationStore
 
 def investigate_whale_diversity():
     """Investigate which whales are being simulated and why"""
@@ -30,17 +32,11 @@ def investigate_whale_diversity():
     print()
     
     # Analyze simulations
-    sim_dir = Path('data/simulations')
-    sim_files = list(sim_dir.glob('sim_*.json'))
-    
     whale_sims = Counter()
     whale_details = {}
     
-    for sim_file in sim_files:
+    for sim in SimulationStore().iter_simulations():
         try:
-            with open(sim_file, 'r') as f:
-                sim = json.load(f)
-            
             whale = sim.get('whale_address', '').lower()
             if whale:
                 whale_sims[whale] += 1
@@ -54,7 +50,7 @@ def investigate_whale_diversity():
                     }
                 whale_details[whale]['simulations'] += 1
         except Exception as e:
-            print(f"⚠️ Error reading {sim_file.name}: {e}")
+            print(f"⚠️ Error reading {sim.get('simulation_id')}: {e}")
     
     # Report
     print("WHALES BEING SIMULATED:")
@@ -189,8 +185,8 @@ def analyze_trade_distribution():
     
     # Load trade history
     try:
-        with open('data/realtime_whale_trades.json', 'r') as f:
-            trades = json.load(f)
+        from whale_trade_store import load_trades
+        trades = load_trades()
     except Exception as e:
         print(f"⚠️ Error loading trades: {e}")
         return
@@ -18,12 +18,131 @@ This REPLACES whale-polling with market-watching.
 import asyncio
 import json
 import time
-from collections import defaultdict, deque
-from datetime import datetime, timedelta
+from collections import OrderedDict, deque
+from datetime import datetime, timezone
 from pathlib import Path
 import aiohttp
 
 
+class MarketWindow:
+    """
+    Rolling statistics for one market, updated in O(1) amortised per trade
+    
+    Keeps a deque of compact (ts, price, size, value, wallet) tuples for the
+    last window_sec seconds plus running sums, so windowed volume, VWAP and
+    price change never rescan or re-parse the window.
+    """
+    
+    __slots__ = ('window_sec', 'ewma_alpha', 'trades', 'window_value', 'window_size',
+                 'current_price', 'initial_price', 'trade_count', 'baseline_value',
+                 'up_run', 'down_run', 'first_seen', 'last_update', 'last_seen_mono', 'latched')
+    
+    def __init__(self, window_sec: float, ewma_alpha: float):
+        self.window_sec = window_sec
+        self.ewma_alpha = ewma_alpha
+        self.trades = deque()  # (ts, price, size, value, wallet), oldest first
+        self.window_value = 0.0  # sum(price * size) in window
+        self.window_size = 0.0  # sum(size) in window
+        self.current_price = None
+        self.initial_price = None
+        self.trade_count = 0
+        self.baseline_value = None  # EWMA of trade value (excludes the current trade until add() returns)
+        self.up_run = 0  # consecutive trades with price >= previous (including this one)
+        self.down_run = 0  # consecutive trades with price <= previous
+        self.first_seen = None
+        self.last_update = None  # newest trade timestamp (epoch seconds)
+        self.last_seen_mono = 0.0
+        self.latched = set()  # anomaly types currently firing (re-armed once the condition clears)
+    
+    def add(self, ts: float, price: float, size: float, wallet):
+        """Push one trade, evict anything older than the window, advance runs"""
+        value = price * size
+        prev = self.current_price
+        if prev is None:
+            self.initial_price = price
+            self.first_seen = ts
+            self.up_run = self.down_run = 1
+        else:
+            self.up_run = self.up_run + 1 if price >= prev else 1
+            self.down_run = self.down_run + 1 if price <= prev else 1
+        self.current_price = price
+        self.trade_count += 1
+        self.last_update = ts if self.last_update is None else max(self.last_update, ts)
+        self.last_seen_mono = time.monotonic()
+        
+        self.trades.append((ts, price, size, value, wallet))
+        self.window_value += value
+        self.window_size += size
+        
+        cutoff = self.last_update - self.window_sec
+        trades = self.trades
+        while trades and trades[0][0] < cutoff:
+            _, _, old_size, old_value, _ = trades.popleft()
+            self.window_value -= old_value
+            self.window_size -= old_size
+        if len(trades) == 1:
+            # Reset float drift from repeated add/subtract
+            self.window_value, self.window_size = value, size
+    
+    def update_baseline(self, value: float):
+        if self.baseline_value is None:
+            self.baseline_value = value
+        else:
+            self.baseline_value += self.ewma_alpha * (value - self.baseline_value)
+    
+    @property
+    def vwap(self):
+        return self.window_value / self.window_size if self.window_size > 0 else self.current_price
+    
+    def price_change(self):
+        """(start_price, fractional change) from the oldest trade in the window to now"""
+        start = self.trades[0][1]
+        return start, ((self.current_price - start) / start if start > 0 else 0.0)
+    
+    def recent(self, n: int = 10):
+        """Last n trades as small dicts (for anomaly details / wallet extraction)"""
+        count = len(self.trades)
+        return [
+            {'price': p, 'size': s, 'timestamp': datetime.utcfromtimestamp(ts).isoformat() + 'Z', 'wallet': w}
+            for ts, p, s, _, w in (self.trades[i] for i in range(max(0, count - n), count))
+        ]
+    
+    def summary(self) -> dict:
+        return {
+            'initial_price': self.initial_price,
+            'current_price': self.current_price,
+            'trade_count': self.trade_count,
+            'window_trades': len(self.trades),
+            'recent_volume': self.window_value,
+            'vwap': self.vwap,
+            'baseline_trade_value': self.baseline_value,
+            'up_run': self.up_run,
+            'down_run': self.down_run,
+            'first_seen': self.first_seen,
+            'last_update': self.last_update,
+        }
+
+
+def _to_epoch(timestamp) -> float:
+    """Trade timestamp (unix seconds/ms, numeric string or ISO string) -> epoch seconds"""
+    if isinstance(timestamp, (int, float)):
+        return float(timestamp) / 1000.0 if timestamp > 1e12 else float(timestamp)
+    if isinstance(timestamp, str):
+        text = timestamp.strip()
+        try:
+            return _to_epoch(float(text))
+        except ValueError:
+            pass
+        try:
+            dt = datetime.fromisoformat(text.replace('Z', '+00:00'))
+        except ValueError:
+            return time.time()
+        if dt.tzinfo is None:
+            dt = dt.replace(tzinfo=timezone.utc)
+        return dt.timestamp()
+    return time.time()
+
+
 class MarketAnomalyDetector:
     """
     Detect market anomalies FIRST, then find traders
@@ -37,19 +156,27 @@ class MarketAnomalyDetector:
     • Query subgraph for recent trades
     • Extract wallet addresses
     • Match against known whales OR discover new ones
+    
+    Per-market state is a MarketWindow (rolling sums, runs, EWMA baseline), kept
+    in activity order so idle markets are evicted from the front in O(1).
     """
     
     def __init__(self):
-        self.market_states = {}  # market_id → {price, volume, timestamp}
-        self.recent_trades = defaultdict(deque)  # market_id → deque of trades
-        self.anomalies_detected = []
+        self.market_states = OrderedDict()  # market_slug → MarketWindow (least recently active first)
+        self.anomalies_detected = deque(maxlen=1000)  # Most recent anomalies (also what gets saved)
+        self.markets_evicted = 0
         
         # Thresholds (Tutte's recommendations)
         self.price_move_threshold = 0.03  # 3% move in short time
         self.price_move_window = 120  # 2 minutes
         self.volume_spike_multiplier = 3.0  # 3x normal volume
+        self.volume_ewma_alpha = 0.1  # Baseline trade value smoothing
+        self.volume_baseline_min_trades = 5  # Trades before the baseline is trusted
+        self.one_sided_min_trades = 5
+        self.one_sided_min_range = 0.02  # 2% directional move
+        self.idle_market_ttl = 1800  # Evict markets with no trades for 30 minutes
         
-    def update_market_state(self, trade: dict):
+    def update_market_state(self, trade: dict, telegram_callback=None):
         """Update market state from incoming trade"""
         
         market_slug = trade.get('slug')
@@ -58,117 +185,130 @@ class MarketAnomalyDetector:
         
         price = float(trade.get('price', 0))
         size = float(trade.get('size', 0))
-        timestamp = trade.get('timestamp')
         
-        if not market_slug in self.market_states:
-            self.market_states[market_slug] = {
-                'initial_price': price,
-                'current_price': price,
-                'last_update': timestamp,
-                'recent_volume': 0,
-                'trade_count': 0,
-                'first_seen': timestamp
-            }
-        
-        state = self.market_states[market_slug]
+        state = self.market_states.get(market_slug)
+        if state is None:
+            state = self.market_states[market_slug] = MarketWindow(self.price_move_window, self.volume_ewma_alpha)
+        else:
+            self.market_states.move_to_end(market_slug)
         
-        # Update state
-        old_price = state['current_price']
-        state['current_price'] = price
-        state['last_update'] = timestamp
-        state['recent_volume'] += size * price
-        state['trade_count'] += 1
+        old_price = state.current_price if state.current_price is not None else price
+        state.add(_to_epoch(trade.get('timestamp')), price, size, trade.get('proxyWallet'))
         
-        # Store recent trade
-        self.recent_trades[market_slug].append({
-            'price': price,
-            'size': size,
-            'timestamp': timestamp,
-            'wallet': trade.get('proxyWallet'),
-            'full_trade': trade
-        })
+        # Detect anomalies with telegram callback
+        self.detect_anomalies(market_slug, old_price, price, size, trade, telegram_callback=telegram_callback)
+        state.update_baseline(price * size)
         
-        # Keep only recent trades (2 minutes window)
-        cutoff = datetime.fromisoformat(timestamp.replace('Z', '+00:00')) - timedelta(seconds=120)
-        while self.recent_trades[market_slug]:
-            oldest = self.recent_trades[market_slug][0]
-            oldest_time = datetime.fromisoformat(oldest['timestamp'].replace('Z', '+00:00'))
-            if oldest_time < cutoff:
-                self.recent_trades[market_slug].popleft()
-            else:
+        self.evict_idle_markets()
+    
+    def evict_idle_markets(self, now: float = None) -> int:
+        """Drop markets with no trades for idle_market_ttl seconds (oldest activity first)"""
+        now = time.monotonic() if now is None else now
+        evicted = 0
+        states = self.market_states
+        while states:
+            slug, state = next(iter(states.items()))
+            if now - state.last_seen_mono < self.idle_market_ttl:
                 break
-        
-        # Detect anomalies
-        self.detect_anomalies(market_slug, old_price, price, size, trade)
+            del states[slug]
+            evicted += 1
+        self.markets_evicted += evicted
+        return evicted
+    
+    def _latch(self, state: MarketWindow, anomaly_type: str, active: bool) -> bool:
+        """True only on the trade where the condition becomes active"""
+        if not active:
+            state.latched.discard(anomaly_type)
+            return False
+        if anomaly_type in state.latched:
+            return False
+        state.latched.add(anomaly_type)
+        return True
     
     def detect_anomalies(self, market_slug: str, old_price: float, new_price: float, 
-                        trade_size: float, trade: dict):
+                        trade_size: float, trade: dict, telegram_callback=None):
         """Detect if this trade triggered an anomaly"""
         
         state = self.market_states[market_slug]
-        recent = list(self.recent_trades[market_slug])
         
-        if len(recent) < 2:
+        if len(state.trades) < 2:
             return  # Need history to detect anomalies
         
-        # ANOMALY 1: Rapid Price Move
-        price_change = abs(new_price - old_price) / old_price if old_price > 0 else 0
+        # ANOMALY 1: Rapid Price Move (over the rolling window)
+        start_price, change = state.price_change()
         
-        if price_change >= self.price_move_threshold:
+        if self._latch(state, 'rapid_price_move', abs(change) >= self.price_move_threshold):
             self.handle_anomaly(
                 anomaly_type='rapid_price_move',
                 market_slug=market_slug,
                 details={
-                    'old_price': old_price,
+                    'old_price': start_price,
                     'new_price': new_price,
-                    'change_pct': price_change * 100,
+                    'change_pct': abs(change) * 100,
+                    'window_sec': state.last_update - state.trades[0][0],
+                    'vwap': state.vwap,
                     'trigger_trade': trade,
-                    'recent_trades': recent[-10:]  # Last 10 trades
-                }
+                    'recent_trades': state.recent(10)  # Last 10 trades
+                },
+                telegram_callback=telegram_callback
             )
         
-        # ANOMALY 2: Volume Spike
-        avg_trade_size = state['recent_volume'] / max(state['trade_count'], 1)
-        if trade_size * new_price >= avg_trade_size * self.volume_spike_multiplier:
+        # ANOMALY 2: Volume Spike (vs EWMA of previous trade values)
+        trade_value = trade_size * new_price
+        baseline = state.baseline_value
+        if (baseline and state.trade_count > self.volume_baseline_min_trades
+                and trade_value >= baseline * self.volume_spike_multiplier):
             self.handle_anomaly(
                 anomaly_type='volume_spike',
                 market_slug=market_slug,
                 details={
-                    'trade_value': trade_size * new_price,
-                    'avg_trade_value': avg_trade_size,
-                    'multiplier': (trade_size * new_price) / max(avg_trade_size, 1),
+                    'trade_value': trade_value,
+                    'avg_trade_value': baseline,
+                    'multiplier': trade_value / max(baseline, 1),
+                    'window_volume': state.window_value,
                     'trigger_trade': trade,
-                    'recent_trades': recent[-10:]
-                }
+                    'recent_trades': state.recent(10)
+                },
+                telegram_callback=telegram_callback
             )
         
-        # ANOMALY 3: One-Sided Pressure (all trades same direction)
-        if len(recent) >= 5:
-            last_5 = recent[-5:]
-            prices = [t['price'] for t in last_5]
-            
-            # All increasing or all decreasing
-            all_up = all(prices[i] >= prices[i-1] for i in range(1, len(prices)))
-            all_down = all(prices[i] <= prices[i-1] for i in range(1, len(prices)))
-            
-            if all_up or all_down:
-                direction = 'UP' if all_up else 'DOWN'
-                price_range = (max(prices) - min(prices)) / min(prices) if min(prices) > 0 else 0
-                
-                if price_range >= 0.02:  # 2% directional move
-                    self.handle_anomaly(
-                        anomaly_type='one_sided_pressure',
-                        market_slug=market_slug,
-                        details={
-                            'direction': direction,
-                            'price_range_pct': price_range * 100,
-                            'trade_count': len(last_5),
-                            'trigger_trade': trade,
-                            'recent_trades': recent[-10:]
-                        }
-                    )
+        # ANOMALY 3: One-Sided Pressure (monotonic run of trades in the window)
+        n = self.one_sided_min_trades
+        run = max(state.up_run, state.down_run)
+        price_range = 0.0
+        if run >= n and len(state.trades) >= n:
+            ref_price = state.trades[-n][1]
+            low = min(ref_price, new_price)
+            price_range = abs(new_price - ref_price) / low if low > 0 else 0
+        
+        if self._latch(state, 'one_sided_pressure', price_range >= self.one_sided_min_range):
+            self.handle_anomaly(
+                anomaly_type='one_sided_pressure',
+                market_slug=market_slug,
+                details={
+                    'direction': 'UP' if state.up_run >= state.down_run else 'DOWN',
+                    'price_range_pct': price_range * 100,
+                    'trade_count': run,
+                    'trigger_trade': trade,
+                    'recent_trades': state.recent(10)
+                },
+                telegram_callback=telegram_callback
+            )
+    
+    def market_summary(self, market_slug: str):
+        """Rolling aggregates for one market (None if not tracked)"""
+        state = self.market_states.get(market_slug)
+        return state.summary() if state else None
     
-    def handle_anomaly(self, anomaly_type: str, market_slug: str, details: dict):
+    def stats(self) -> dict:
+        return {
+            'markets_tracked': len(self.market_states),
+            'window_trades': sum(len(s.trades) for s in self.market_states.values()),
+            'markets_evicted': self.markets_evicted,
+            'anomalies_kept': len(self.anomalies_detected),
+        }
+    
+    def handle_anomaly(self, anomaly_type: str, market_slug: str, details: dict, telegram_callback=None):
         """Handle detected anomaly"""
         
         print("\n" + "="*80)
@@ -206,6 +346,54 @@ class MarketAnomalyDetector:
         print("="*80)
         print()
         
+        # Send Telegram notification if callback provided
+        if telegram_callback and wallets:
+            try:
+                wallet_list = '\n'.join([f"  • <code>{w[:16]}...</code>" for w in list(wallets)[:5]])
+                telegram_msg = (
+                    f"🚨 <b>MARKET ANOMALY DETECTED!</b>\n\n"
+                    f"<b>Type:</b> {anomaly_type.replace('_', ' ').title()}\n"
+                    f"<b>Market:</b> {market_slug[:60]}\n"
+                )
+                
+                if anomaly_type == 'rapid_price_move':
+                    telegram_msg += (
+                        f"<b>Price:</b> {details['old_price']:.4f} → {details['new_price']:.4f}\n"
+                        f"<b>Change:</b> {details['change_pct']:.2f}%\n"
+                    )
+                elif anomaly_type == 'volume_spike':
+                    telegram_msg += (
+                        f"<b>Trade Value:</b> ${details['trade_value']:,.2f}\n"
+                        f"<b>Multiplier:</b> {details['multiplier']:.1f}x\n"
+                    )
+                
+                telegram_msg += (
+                    f"\n<b>Wallets Involved:</b> {len(wallets)}\n{wallet_list}\n\n"
+                    f"<i>[Market-First Detection]</i>"
+                )
+                
+                # Call telegram callback (async function)
+                if callable(telegram_callback):
+                    # Create task if in async context, otherwise call directly
+                    try:
+                        loop = asyncio.get_event_loop()
+                        if loop.is_running():
+                            asyncio.create_task(telegram_callback(telegram_msg))
+                        else:
+                            loop.run_until_complete(telegram_callback(telegram_msg))
+                    except:
+                        # Fallback: try calling directly
+                        try:
+                            if asyncio.iscoroutinefunction(telegram_callback):
+                                asyncio.create_task(telegram_callback(telegram_msg))
+                            else:
+                                telegram_callback(telegram_msg)
+                        except:
+                            pass
+            except Exception as e:
+                # Don't let telegram errors break anomaly detection
+                pass
+        
         # Save anomaly
         anomaly_record = {
             'timestamp': datetime.now().isoformat(),
@@ -223,7 +411,7 @@ class MarketAnomalyDetector:
         output_file.parent.mkdir(parents=True, exist_ok=True)
         
         with open(output_file, 'w') as f:
-            json.dump(self.anomalies_detected, f, indent=2)
+            json.dump(list(self.anomalies_detected), f, indent=2, default=str)
 
 
 # Integration with existing WebSocket watcher
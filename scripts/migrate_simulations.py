@@ -0,0 +1,31 @@
+#!/usr/bin/env python3
+"""
+Migration script to import data/simulations/sim_*.json into the simulation store.
+Run once: python scripts/migrate_simulations.py
+Safe to re-run: simulations already in the store are skipped. The JSON files are left in place.
+"""
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+from src.simulation.simulation_store import SimulationStore, migrate_json_files
+
+SIM_DIR = Path("data") / "simulations"
+
+def main():
+    if not SIM_DIR.exists():
+        print(f"❌ Simulations directory not found: {SIM_DIR}")
+        return
+    
+    store = SimulationStore()
+    imported, skipped, failed = migrate_json_files(SIM_DIR, store)
+    
+    print(f"✅ Imported: {imported}")
+    print(f"ℹ️  Already in store: {skipped}")
+    if failed:
+        print(f"⚠️  Failed: {failed}")
+    print(f"✅ Migration complete: {store.db_path} ({store.count()} simulations)")
+    store.close()
+
+if __name__ == "__main__":
+    main()
@@ -1,5 +1,4 @@
 """Generate comprehensive overnight stats report"""
-import json
 import sys
 from pathlib import Path
 from datetime import datetime, timedelta
@@ -17,18 +16,18 @@ except Exception as e:
     whale_manager = None
     stats = {}
 
-# Load trade data
+# Restart time: 2025-12-18 22:57:31
+restart_time = datetime(2025, 12, 18, 22, 57, 31)
+restart_iso = restart_time.isoformat() + 'Z'
+
+# Load trade data (only segments since restart are read)
 try:
-    with open('data/realtime_whale_trades.json', 'r') as f:
-        all_trades = json.load(f)
+    from whale_trade_store import load_trades
+    all_trades = load_trades(since=restart_iso)
 except Exception as e:
     print(f"❌ Could not load trade data: {e}")
     all_trades = []
 
-# Restart time: 2025-12-18 22:57:31
-restart_time = datetime(2025, 12, 18, 22, 57, 31)
-restart_iso = restart_time.isoformat() + 'Z'
-
 # Filter trades since restart
 trades_since_restart = [t for t in all_trades if t.get('timestamp', '') >= restart_iso]
 monitored_trades = [t for t in trades_since_restart if t.get('is_monitored_whale')]
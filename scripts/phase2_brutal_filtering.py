@@ -1,10 +1,14 @@
 #!/usr/bin/env python3
 """Phase 2: Brutal filtering to find 3-5 proven profitable elite whales"""
 import json
+import sys
 from pathlib import Path
 from collections import defaultdict
 from datetime import datetime
 
+sys.path.insert(0, str(Path(__file__).parent.parent))
+from src.simulation.simulation_store import SimulationStore
+
 def phase2_brutal_filtering():
     """Brutal filtering to find 3-5 proven profitable elite whales"""
     
@@ -14,10 +18,10 @@ def phase2_brutal_filtering():
     print()
     
     # Load simulations
-    sim_dir = Path('data/simulations')
-    sim_files = list(sim_dir.glob('sim_*.json'))
+    store = SimulationStore()
+    total_simulations = store.count()
     
-    print(f"Total simulations: {len(sim_files):,}")
+    print(f"Total simulations: {total_simulations:,}")
     print()
     
     # Load elite whale info
@@ -41,17 +45,7 @@ def phase2_brutal_filtering():
         'api_volume': 0
     })
     
-    for sim_file in sim_files:
-        try:
-            with open(sim_file) as f:
-                sim = json.load(f)
-        except Exception as e:
-            print(f"⚠️ Error reading {sim_file.name}: {e}")
-            continue
-        
-        if sim.get('status') != 'completed':
-            continue
-        
+    for sim in store.iter_simulations(status='completed'):
         whale = sim.get('whale_address', '').lower()
         if not whale:
             continue
@@ -239,7 +233,7 @@ def phase2_brutal_filtering():
     # Save results
     output = {
         'analysis_date': datetime.now().isoformat(),
-        'total_simulations': len(sim_files),
+        'total_simulations': total_simulations,
         'total_whales': len(whale_performance),
         'elite_whales': len(elite_whales),
         'significant_whales': len(significant_whales),
@@ -1,21 +1,19 @@
 """Quick status check"""
-import json
-from pathlib import Path
 from datetime import datetime
+from whale_trade_store import WhaleTradeStore
 
-trades_file = Path("data/realtime_whale_trades.json")
+store = WhaleTradeStore()
+segments = store.segments()
 
 print("Current Status:")
 print(f"  Time: {datetime.now().strftime('%H:%M:%S')}")
-print(f"  Trades file exists: {trades_file.exists()}")
+print(f"  Trade segments: {len(segments)}")
 
-if trades_file.exists():
-    with open(trades_file, 'r') as f:
-        trades = json.load(f)
-    print(f"  Total trades: {len(trades)}")
-    print(f"  File size: {trades_file.stat().st_size:,} bytes")
+if segments:
+    print(f"  Total trades: {store.count()}")
+    print(f"  Store size: {sum(p.stat().st_size for p in segments):,} bytes")
 else:
-    print("  No trades file yet")
+    print("  No trades stored yet")
 
 print()
 print("When you return at 19:00, run:")
@@ -1,7 +1,5 @@
 """Quick 5-minute status check"""
-import json
 from datetime import datetime, timedelta
-from pathlib import Path
 
 print("="*80)
 print("⚡ QUICK STATUS CHECK (5 min)")
@@ -27,8 +25,8 @@ except:
 
 # Check recent activity
 try:
-    with open('data/realtime_whale_trades.json', 'r') as f:
-        trades = json.load(f)
+    from whale_trade_store import load_trades
+    trades = load_trades()
     
     latest = max(trades, key=lambda x: x.get('timestamp', ''))
     latest_time = latest.get('timestamp', '')
@@ -9,6 +9,7 @@ Based on: https://github.com/Polymarket/real-time-data-client
 
 import asyncio
 import json
+import sys
 import websockets
 import os
 import httpx
@@ -18,6 +19,11 @@ from typing import Optional
 from dotenv import load_dotenv
 from market_anomaly_detector import MarketAnomalyDetector
 from dynamic_whale_manager import DynamicWhaleManager
+from whale_trade_store import WhaleTradeStore, LEGACY_TRADES_FILE, migrate_legacy_json
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+from src.polymarket.dedup import TimeBucketedDedup, event_time
+from src.simulation.price_history import PriceHistoryStore, to_epoch
 
 # Load environment variables
 load_dotenv()
@@ -30,8 +36,8 @@ class RealtimeWhaleWatcher:
         self.whale_addresses = {addr.lower() for addr in whale_addresses}
         self.min_trade_size = min_trade_size
         self.ws_url = "wss://ws-live-data.polymarket.com"
-        # Load existing trades to preserve history across restarts
-        self.detected_trades = self.load_existing_trades()
+        # Append-only trade store (history is preserved across restarts on disk, not in memory)
+        self.trade_store = self.open_trade_store()
         self.enable_telegram = enable_telegram
         self.telegram_bot_token = os.getenv('TELEGRAM_BOT_TOKEN')
         self.telegram_chat_id = os.getenv('TELEGRAM_CHAT_ID')
@@ -48,6 +54,12 @@ class RealtimeWhaleWatcher:
         self.startup_notification_sent = False  # Track if startup notification was sent
         self.hourly_summary_task_started = False  # Track if hourly summary task was started
         
+        # Real-time price tracking for simulations (shared with the simulator's MarketStateTracker)
+        self.MAX_PRICE_HISTORY = 1000  # Keep last 1000 prices per market
+        self.MAX_PRICE_HISTORY_AGE_SEC = 24 * 3600
+        self.market_price_history = PriceHistoryStore(max_points=self.MAX_PRICE_HISTORY,
+                                                      max_age_sec=self.MAX_PRICE_HISTORY_AGE_SEC)
+        
         # Initialize simulation for Phase 2 data collection
         try:
             import sys
@@ -91,7 +103,8 @@ class RealtimeWhaleWatcher:
             # Pass price lookup function to simulator for real-time price tracking
             self.trade_simulator = TradeSimulator(
                 elite_whales=elite_whales,
-                price_lookup_func=self.get_price_at_time
+                price_lookup_func=self.get_price_at_time,
+                price_history=self.market_price_history
             )
             self.simulation_enabled = True
             print("✅ Simulation module loaded - Phase 2 data collection ENABLED")
@@ -107,6 +120,9 @@ class RealtimeWhaleWatcher:
             self.simulation_enabled = False
             print(f"⚠️ Simulation module not available - data collection disabled: {e}")
         
+        # Duplicate filtering (websocket replays after reconnects); oldest 10 minutes forgotten first
+        self.trade_dedup = TimeBucketedDedup(ttl_sec=6 * 3600, bucket_sec=600, max_keys=200000)
+        
         # Track stats for hourly summary
         self.trades_processed = 0
         self.whale_trades_detected = 0
@@ -118,11 +134,6 @@ class RealtimeWhaleWatcher:
         self.health_check_interval = 300  # Check every 5 minutes
         self.max_idle_time = 3600  # Alert if no trades for 1 hour
         
-        # Real-time price tracking for simulations
-        # {market_slug: [{'timestamp': str, 'price': float}, ...]}
-        self.market_price_history = {}
-        self.MAX_PRICE_HISTORY = 1000  # Keep last 1000 prices per market
-        
         # Debug counter initialization
         print(f"🔢 Counters initialized: trades_processed={self.trades_processed}")
         
@@ -226,19 +237,10 @@ class RealtimeWhaleWatcher:
                 progress_bar = "█" * filled_segments + "░" * (progress_bar_length - filled_segments)
                 
                 # Get cumulative totals from files (for clarity)
-                sim_dir = Path("data/simulations")
-                total_sims = len(list(sim_dir.glob("sim_*.json"))) if sim_dir.exists() else 0
+                total_sims = self.trade_simulator.store.count() if self.trade_simulator else 0
+                pending_checks = self.trade_simulator.pending_checks() if self.trade_simulator else 0
                 
-                trades_file = Path("data/realtime_whale_trades.json")
-                total_trades = 0
-                if trades_file.exists():
-                    try:
-                        with open(trades_file, 'r') as f:
-                            trades_data = json.load(f)
-                            if isinstance(trades_data, list):
-                                total_trades = len(trades_data)
-                    except:
-                        pass
+                total_trades = self.trade_store.count()
                 
                 summary = (
                     f"📊 <b>Hourly Summary</b> ({summary_time})\n\n"
@@ -253,13 +255,16 @@ class RealtimeWhaleWatcher:
                     f"   • Simulations: {sim_text}\n\n"
                     f"💾 <b>Total (cumulative):</b>\n"
                     f"   • Total trades: {total_trades:,}\n"
-                    f"   • Total simulations: {total_sims}\n\n"
+                    f"   • Total simulations: {total_sims}\n"
+                    f"   • Pending delay checks: {pending_checks}\n\n"
                     f"🔥 <b>System:</b> Operational\n"
                     f"   • Avg confidence: {whale_stats['avg_confidence']:.1%}"
                 )
                 
                 await self.send_telegram(summary)
                 print(f"✅ Hourly summary sent: {current_trades:,} trades, {current_whale_trades} whale trades, {current_simulations} simulations")
+                dedup = self.trade_dedup.stats()
+                print(f"🔁 Dedup: {dedup['duplicates']:,} duplicates, {dedup['stale_suppressed']:,} stale skipped, {dedup['size']:,} keys tracked")
                 
                 # Reset counters for next hour (AFTER sending summary)
                 self.trades_processed = 0
@@ -341,6 +346,10 @@ class RealtimeWhaleWatcher:
                         asyncio.create_task(self.send_hourly_summary())
                         self.hourly_summary_task_started = True
                     
+                    # Start delay check scheduler (resumes checks pending from before a restart)
+                    if self.trade_simulator:
+                        await self.trade_simulator.start()
+                    
                     # Start health monitoring task (only once)
                     if not hasattr(self, '_health_monitor_started'):
                         asyncio.create_task(self._health_monitor())
@@ -434,9 +443,19 @@ class RealtimeWhaleWatcher:
                 if self._error_count == 3:
                     print("   (Suppressing further error messages)")
     
+    @staticmethod
+    def trade_key(trade: dict) -> str:
+        """Identity of one fill (a transaction can carry several)"""
+        return "|".join(str(trade.get(k) or '') for k in
+                        ('transactionHash', 'asset', 'side', 'proxyWallet', 'size', 'price', 'timestamp'))
+    
     async def process_trade(self, trade: dict):
         """Process a single trade"""
         
+        # Skip trades already seen (same fill delivered twice)
+        if self.trade_dedup.seen(self.trade_key(trade), event_time(trade.get('timestamp'))):
+            return
+        
         # Extract trade details first (needed for anomaly detector)
         wallet = trade.get('proxyWallet', '').lower()
         size = float(trade.get('size', 0))
@@ -668,10 +687,8 @@ class RealtimeWhaleWatcher:
                 'whale_confidence': whale_confidence if is_whale else None,  # Save confidence for analysis
                 'tx_hash': tx_hash
             }
-            self.detected_trades.append(trade_record)
-            
-            # Save to file
-            self.save_trades()
+            # Append to store (one line, no full-file rewrite)
+            self.trade_store.append(trade_record)
     
     def _load_phase2_start_time(self) -> datetime:
         """Load Phase 2 start time from file, or use first simulation file timestamp"""
@@ -690,19 +707,23 @@ class RealtimeWhaleWatcher:
             except Exception as e:
                 print(f"⚠️ Could not load Phase 2 start time: {e}")
         
-        # Fallback: Use first simulation file timestamp
-        sim_dir = Path("data/simulations")
-        if sim_dir.exists():
-            sim_files = list(sim_dir.glob("sim_*.json"))
-            if sim_files:
-                # Get oldest simulation file
-                oldest_sim = min(sim_files, key=lambda x: x.stat().st_mtime)
-                start_time = datetime.fromtimestamp(oldest_sim.stat().st_mtime)
+        # Fallback: Use first simulation timestamp from the simulation store
+        try:
+            from src.simulation.simulation_store import SimulationStore
+            store = SimulationStore()
+            try:
+                first_created = store.first_created_at()
+            finally:
+                store.close()
+            if first_created:
+                start_time = datetime.fromisoformat(first_created)
                 print(f"✅ Using first simulation timestamp as Phase 2 start: {start_time.strftime('%Y-%m-%d %H:%M:%S')}")
                 # Save it for future use (defer until after __init__ completes)
                 # Store for saving later
                 self._pending_phase2_save = start_time
                 return start_time
+        except Exception as e:
+            print(f"⚠️ Could not read first simulation time: {e}")
         
         # First time: Use current time
         start_time = datetime.now()
@@ -759,35 +780,24 @@ class RealtimeWhaleWatcher:
                 print(f"⚠️ Health monitor error: {e}")
                 await asyncio.sleep(60)  # Wait 1 min before retrying
     
-    def load_existing_trades(self):
-        """Load existing trades from file to preserve history"""
-        output_file = Path("data/realtime_whale_trades.json")
-        if output_file.exists():
+    def open_trade_store(self) -> WhaleTradeStore:
+        """Open the trade store, migrating the legacy JSON file on first run"""
+        store = WhaleTradeStore()
+        if LEGACY_TRADES_FILE.exists() and not store.segments():
             try:
-                with open(output_file, 'r') as f:
-                    existing = json.load(f)
-                    if isinstance(existing, list):
-                        print(f"✅ Loaded {len(existing)} existing trades from file")
-                        return existing
+                migrated = migrate_legacy_json(LEGACY_TRADES_FILE, store.store_dir)
+                print(f"✅ Migrated {migrated} existing trades from {LEGACY_TRADES_FILE} to {store.store_dir}/")
             except Exception as e:
-                print(f"⚠️ Could not load existing trades: {e}")
-        return []
+                print(f"⚠️ Could not migrate existing trades: {e}")
+        print(f"✅ {store.count()} existing trades in {store.store_dir}/")
+        return store
     
     def _record_market_price(self, market_slug: str, price: float, timestamp: str):
         """Record market price for historical lookup (used by simulations)"""
-        if market_slug not in self.market_price_history:
-            self.market_price_history[market_slug] = []
-        
-        # Add price point
-        self.market_price_history[market_slug].append({
-            'timestamp': timestamp,
-            'price': price
-        })
-        
-        # Trim if too long (keep most recent)
-        if len(self.market_price_history[market_slug]) > self.MAX_PRICE_HISTORY:
-            self.market_price_history[market_slug] = \
-                self.market_price_history[market_slug][-self.MAX_PRICE_HISTORY:]
+        try:
+            self.market_price_history.record(market_slug, timestamp, price)
+        except (TypeError, ValueError):
+            pass  # Unparseable timestamp
     
     def get_price_at_time(self, market_slug: str, target_time: str) -> Optional[float]:
         """
@@ -805,71 +815,39 @@ class RealtimeWhaleWatcher:
         if market_slug not in self.market_price_history:
             return None
         
-        history = self.market_price_history[market_slug]
-        if not history:
-            return None
-        
-        # Parse target time
         try:
-            if isinstance(target_time, str):
-                if 'T' in target_time:
-                    target_dt = datetime.fromisoformat(target_time.replace('Z', '+00:00'))
-                else:
-                    target_dt = datetime.fromisoformat(target_time)
-            elif isinstance(target_time, datetime):
-                target_dt = target_time
-            else:
-                return None
-        except:
+            point = self.market_price_history.nearest(market_slug, target_time)
+        except (TypeError, ValueError):
+            return None
+        if point is None:
             return None
-        
-        # Find closest price to target time
-        closest = None
-        min_diff = None
-        
-        for price_point in history:
-            try:
-                point_time = datetime.fromisoformat(
-                    price_point['timestamp'].replace('Z', '+00:00')
-                )
-                diff = abs((target_dt - point_time).total_seconds())
-                
-                if min_diff is None or diff < min_diff:
-                    min_diff = diff
-                    closest = price_point
-            except:
-                continue
         
         # Return price if within 2 minutes (120 seconds)
-        if closest and min_diff is not None and min_diff <= 120:
+        try:
+            min_diff = abs(point[0] - to_epoch(target_time))
+        except (TypeError, ValueError):
+            return None
+        if min_diff <= 120:
             # Debug: Log first few lookups
             if not hasattr(self, '_lookup_debug_count'):
                 self._lookup_debug_count = 0
             if self._lookup_debug_count < 3:
-                print(f"🔍 Price lookup: {market_slug[:30]}... at {target_time} → found price {closest['price']:.6f} (diff: {min_diff:.0f}s)")
+                print(f"🔍 Price lookup: {market_slug[:30]}... at {target_time} → found price {point[1]:.6f} (diff: {min_diff:.0f}s)")
                 self._lookup_debug_count += 1
-            return closest['price']
+            return point[1]
         
         # Debug: Log when price not found
         if not hasattr(self, '_lookup_miss_count'):
             self._lookup_miss_count = 0
         if self._lookup_miss_count < 3:
-            if closest:
-                print(f"⚠️ Price lookup: {market_slug[:30]}... at {target_time} → closest too far (diff: {min_diff:.0f}s > 120s)")
-            else:
-                print(f"⚠️ Price lookup: {market_slug[:30]}... at {target_time} → no history found")
+            print(f"⚠️ Price lookup: {market_slug[:30]}... at {target_time} → closest too far (diff: {min_diff:.0f}s > 120s)")
             self._lookup_miss_count += 1
         
         return None
     
     def save_trades(self):
-        """Save detected trades to file (preserves all trades, not just current session)"""
-        output_file = Path("data/realtime_whale_trades.json")
-        output_file.parent.mkdir(parents=True, exist_ok=True)
-        
-        # Save all trades (including previously loaded ones)
-        with open(output_file, 'w') as f:
-            json.dump(self.detected_trades, f, indent=2)
+        """Flush and close the trade store (each trade is already on disk when appended)"""
+        self.trade_store.close()
 
 
 async def load_whale_addresses():
@@ -945,8 +923,9 @@ async def main():
         print("⏹️ STOPPED")
         print("="*80)
         print()
-        print(f"Total trades detected: {len(watcher.detected_trades)}")
-        print(f"Saved to: data/realtime_whale_trades.json")
+        watcher.save_trades()
+        print(f"Total trades detected: {watcher.trade_store.count()}")
+        print(f"Saved to: {watcher.trade_store.store_dir}/")
 
 
 if __name__ == "__main__":
@@ -1,7 +1,11 @@
 """Quick test to check if a whale address is in elite list"""
 import json
+import sys
 from pathlib import Path
 
+sys.path.insert(0, str(Path(__file__).parent.parent))
+from src.simulation.simulation_store import SimulationStore
+
 # Load elite whales
 with open('data/api_validation_results.json', 'r') as f:
     data = json.load(f)
@@ -36,19 +40,12 @@ else:
 
 print()
 print("Recent simulation whales:")
-sim_dir = Path('data/simulations')
-sims = list(sim_dir.glob('sim_*.json'))
-recent = sorted(sims, key=lambda x: x.stat().st_mtime, reverse=True)[:5]
-for s in recent:
-    whale_short = s.stem.split('_')[-1]
-    print(f"  {whale_short}")
+for sim in SimulationStore().latest(5):
+    whale_addr = (sim.get('whale_address') or '').lower()
+    print(f"  {whale_addr[:10]}")
     
     # Check if this whale is elite
-    whale_full = None
-    for addr in elite_addrs:
-        if addr.startswith(whale_short.lower()):
-            whale_full = addr
-            break
+    whale_full = whale_addr if whale_addr in elite_addrs else None
     
     if whale_full:
         print(f"    → IS ELITE: {whale_full}")
@@ -1,8 +1,8 @@
 """Verify data collection is working and not resetting"""
-import json
 from pathlib import Path
 from datetime import datetime
 from dynamic_whale_manager import DynamicWhaleManager
+from whale_trade_store import load_trades
 
 print("="*80)
 print("✅ DATA COLLECTION VERIFICATION")
@@ -20,26 +20,12 @@ print(f"   High Confidence (≥70%): {sum(1 for w in m.whales.values() if w['con
 print(f"   Still Growing: {'✅ YES' if len(m.whales) > 0 else '❌ NO'}")
 print()
 
-# Check if state is being saved
-if state_file.exists():
-    with open(state_file) as f:
-        file_data = json.load(f)
-    
-    # Check structure
-    if isinstance(file_data, dict):
-        if "whales" in file_data:
-            file_count = len(file_data["whales"])
-            print(f"   File Structure: ✅ Correct (has 'whales' key)")
-        else:
-            # Old format - whales are top-level
-            file_count = len(file_data)
-            print(f"   File Structure: ⚠️ Old format (whales are top-level)")
-    else:
-        file_count = 0
-        print(f"   File Structure: ❌ Invalid")
-    
-    print(f"   File: {file_count} whales")
-    print(f"   Match: {'✅ YES' if len(m.whales) == file_count else f'⚠️ NO (Memory={len(m.whales)}, File={file_count})'}")
+# Check if state is being saved (m was loaded from the snapshot + WAL replay)
+persisted = m.persistence_stats()
+if state_file.exists() or persisted['wal_records']:
+    print(f"   Snapshot: {persisted['snapshot_whales']} whales")
+    print(f"   WAL: {persisted['wal_records']} records pending compaction")
+    print(f"   Persisted: ✅ {len(m.whales)} whales (snapshot + WAL)")
 else:
     print(f"   File: ⚠️ Not found (will be created on save)")
     print(f"   Status: ⚠️ State not persisted yet")
@@ -48,38 +34,32 @@ print()
 # Check trade collection
 print("2. TRADE DATA COLLECTION")
 print("-"*80)
-trade_file = Path("data/realtime_whale_trades.json")
-if trade_file.exists():
-    with open(trade_file) as f:
-        trades = json.load(f)
-    
+trades = load_trades()
+trade_age_min = float("inf")
+if trades:
     print(f"   Total Trades: {len(trades):,}")
     
-    if trades:
-        latest = datetime.fromisoformat(trades[-1]['timestamp'].replace('Z', '+00:00'))
-        now = datetime.now(latest.tzinfo)
-        age_sec = (now - latest).total_seconds()
-        age_min = age_sec / 60
-        
-        print(f"   Latest Trade: {latest.strftime('%Y-%m-%d %H:%M:%S')}")
-        print(f"   Age: {age_min:.1f} minutes ago")
-        
-        if age_min < 5:
-            print(f"   Status: ✅ ACTIVELY COLLECTING (very recent)")
-        elif age_min < 30:
-            print(f"   Status: ✅ Collecting (recent)")
-        else:
-            print(f"   Status: ⚠️ Stale ({age_min:.0f} min old)")
-        
-        # Check growth
-        if len(trades) > 400:
-            print(f"   Growth: ✅ Growing ({len(trades)} trades collected)")
-        else:
-            print(f"   Growth: ⚠️ Limited ({len(trades)} trades)")
+    latest = datetime.fromisoformat(trades[-1]['timestamp'].replace('Z', '+00:00'))
+    now = datetime.now(latest.tzinfo)
+    trade_age_min = (now - latest).total_seconds() / 60
+    
+    print(f"   Latest Trade: {latest.strftime('%Y-%m-%d %H:%M:%S')}")
+    print(f"   Age: {trade_age_min:.1f} minutes ago")
+    
+    if trade_age_min < 5:
+        print(f"   Status: ✅ ACTIVELY COLLECTING (very recent)")
+    elif trade_age_min < 30:
+        print(f"   Status: ✅ Collecting (recent)")
+    else:
+        print(f"   Status: ⚠️ Stale ({trade_age_min:.0f} min old)")
+    
+    # Check growth
+    if len(trades) > 400:
+        print(f"   Growth: ✅ Growing ({len(trades)} trades collected)")
     else:
-        print(f"   Status: ⚠️ File empty")
+        print(f"   Growth: ⚠️ Limited ({len(trades)} trades)")
 else:
-    print(f"   Status: ⚠️ File not found")
+    print(f"   Status: ⚠️ No trades stored yet")
 print()
 
 # Check recent whale activity
@@ -107,6 +87,6 @@ print("📊 SUMMARY")
 print("="*80)
 print(f"✅ Whales Discovered: {len(m.whales)}")
 print(f"✅ High Confidence: {sum(1 for w in m.whales.values() if w['confidence'] >= 0.7)}")
-print(f"✅ Trades Collected: {len(trades) if trade_file.exists() and trades else 0}")
-print(f"✅ Data Collection: {'ACTIVE' if trade_file.exists() and trades and age_min < 30 else 'CHECK STATUS'}")
+print(f"✅ Trades Collected: {len(trades)}")
+print(f"✅ Data Collection: {'ACTIVE' if trades and trade_age_min < 30 else 'CHECK STATUS'}")
 print("="*80)
@@ -1,10 +1,10 @@
 """Verify Telegram notifications are working"""
-import json
 from datetime import datetime
 
+from whale_trade_store import load_trades
+
 # Load trade data
-with open('data/realtime_whale_trades.json', 'r') as f:
-    all_trades = json.load(f)
+all_trades = load_trades()
 
 # Filter high-confidence monitored whale trades (≥65%)
 high_conf_trades = [
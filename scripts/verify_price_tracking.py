@@ -1,22 +1,22 @@
 """
 Verify Price Tracking Implementation
 ====================================
-Checks simulation files to verify that real-time price tracking is working.
+Checks stored simulations to verify that real-time price tracking is working.
 """
 
-import json
+import sys
 from pathlib import Path
 from datetime import datetime
 from typing import List, Dict, Any
 
-def analyze_simulation_file(filepath: Path) -> Dict[str, Any]:
-    """Analyze a single simulation file"""
-    with open(filepath, 'r') as f:
-        data = json.load(f)
-    
+sys.path.insert(0, str(Path(__file__).parent.parent))
+from src.simulation.simulation_store import SimulationStore
+
+def analyze_simulation(data: Dict) -> Dict[str, Any]:
+    """Analyze a single simulation (as returned by SimulationStore)"""
     results = {
-        'file': filepath.name,
-        'detection_time': data.get('detection_time'),
+        'simulation_id': data.get('simulation_id'),
+        'detection_time': data.get('detection_time') or (data.get('detection') or {}).get('timestamp'),
         'market_slug': data.get('market_slug'),
         'whale_address': data.get('whale_address'),
         'delays': []
@@ -42,31 +42,27 @@ def analyze_simulation_file(filepath: Path) -> Dict[str, Any]:
 
 def verify_price_tracking():
     """Verify price tracking is working correctly"""
-    sim_dir = Path("data/simulations")
-    
-    if not sim_dir.exists():
-        print("❌ Simulations directory not found")
-        return
-    
-    sim_files = list(sim_dir.glob("sim_*.json"))
+    store = SimulationStore()
+    total = store.count()
     
-    if not sim_files:
-        print("⏰ No simulation files found yet")
+    if not total:
+        print("⏰ No simulations found yet")
         print("   Waiting for next high-confidence whale trade...")
         return
     
     print("=" * 70)
     print("PRICE TRACKING VERIFICATION")
     print("=" * 70)
-    print(f"\nFound {len(sim_files)} simulation file(s)")
+    print(f"\nFound {total} simulation(s)")
     
-    # Analyze latest file
-    latest_file = max(sim_files, key=lambda p: p.stat().st_mtime)
-    print(f"\n📄 Analyzing latest file: {latest_file.name}")
-    print(f"   Created: {datetime.fromtimestamp(latest_file.stat().st_mtime).strftime('%Y-%m-%d %H:%M:%S')}")
+    # Analyze latest simulation
+    latest = store.latest(1)[0]
+    updated = datetime.fromisoformat(latest['updated_at'])
+    print(f"\n📄 Analyzing latest simulation: {latest['simulation_id']}")
+    print(f"   Updated: {updated.strftime('%Y-%m-%d %H:%M:%S')}")
     
     try:
-        analysis = analyze_simulation_file(latest_file)
+        analysis = analyze_simulation(latest)
         
         print(f"\n📊 Simulation Details:")
         print(f"   Detection Time: {analysis['detection_time']}")
@@ -74,7 +70,7 @@ def verify_price_tracking():
         print(f"   Whale: {analysis['whale_address'][:16]}...")
         
         if not analysis['delays']:
-            print("\n⚠️ No delay results found in file")
+            print("\n⚠️ No delay results found for this simulation")
             return
         
         print(f"\n🔍 Delay Price Analysis:")
@@ -138,12 +134,12 @@ def verify_price_tracking():
         else:
             print(f"   ⚠️  No timestamps found in delay results")
         
-        # Check 3: File age (to determine if created before/after fix)
-        file_age_hours = (datetime.now().timestamp() - latest_file.stat().st_mtime) / 3600
-        if file_age_hours < 1:
-            print(f"\n📅 File created {file_age_hours*60:.0f} minutes ago (likely after fix)")
+        # Check 3: Simulation age (to determine if created before/after fix)
+        sim_age_hours = (datetime.now() - updated).total_seconds() / 3600
+        if sim_age_hours < 1:
+            print(f"\n📅 Simulation updated {sim_age_hours*60:.0f} minutes ago (likely after fix)")
         else:
-            print(f"\n📅 File created {file_age_hours:.1f} hours ago")
+            print(f"\n📅 Simulation updated {sim_age_hours:.1f} hours ago")
         
         print("\n" + "=" * 70)
         
@@ -152,14 +148,14 @@ def verify_price_tracking():
             print("\n🎉 SUCCESS: Price tracking appears to be working!")
             print("   Different prices at each delay indicate real-time tracking is active.")
         elif unique_prices == 1:
-            print("\n⏳ INCONCLUSIVE: Need more recent simulation files")
+            print("\n⏳ INCONCLUSIVE: Need more recent simulations")
             print("   Wait for next high-confidence whale trade to verify fix.")
         else:
             print("\n❌ ERROR: No price data found")
             print("   Check watcher logs for errors.")
         
     except Exception as e:
-        print(f"\n❌ Error analyzing file: {e}")
+        print(f"\n❌ Error analyzing simulation: {e}")
         import traceback
         traceback.print_exc()
 
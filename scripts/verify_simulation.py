@@ -5,40 +5,49 @@ Checks if scheduled delay price checks are working correctly
 """
 
 import json
+import sys
 from pathlib import Path
 from datetime import datetime
 from typing import List, Dict
 
-def verify_simulation(sim_file: Path = None):
-    """Verify a simulation file shows scheduled delays working"""
-    
-    if sim_file is None:
-        # Find latest simulation file
-        sim_dir = Path("data/simulations")
-        if not sim_dir.exists():
-            print("❌ Simulations directory not found")
-            return
-        
-        sim_files = list(sim_dir.glob("sim_*.json"))
-        if not sim_files:
-            print("⏰ No simulation files found yet")
-            print("   Waiting for next high-confidence whale trade...")
+sys.path.insert(0, str(Path(__file__).parent.parent))
+from src.simulation.simulation_store import SimulationStore
+
+def verify_simulation(sim_id: str = None):
+    """Verify a simulation (latest in the store, a sim_id, or a legacy sim_*.json path) shows scheduled delays working"""
+    
+    if sim_id and sim_id.endswith('.json'):
+        # Legacy simulation file
+        sim_file = Path(sim_id)
+        try:
+            with open(sim_file, 'r') as f:
+                sim = json.load(f)
+        except Exception as e:
+            print(f"\n❌ Error reading file: {e}")
             return
-        
-        sim_file = max(sim_files, key=lambda p: p.stat().st_mtime)
+        sim['updated_at'] = datetime.fromtimestamp(sim_file.stat().st_mtime).isoformat()
+        sim.setdefault('simulation_id', sim_file.stem)
+    else:
+        store = SimulationStore()
+        if sim_id:
+            sim = store.get_simulation(sim_id)
+            if sim is None:
+                print(f"❌ Simulation not found: {sim_id}")
+                return
+        else:
+            # Find latest simulation
+            latest = store.latest(1)
+            if not latest:
+                print("⏰ No simulations found yet")
+                print("   Waiting for next high-confidence whale trade...")
+                return
+            sim = latest[0]
     
     print("=" * 70)
     print("SIMULATION VERIFICATION")
     print("=" * 70)
-    print(f"\n📄 File: {sim_file.name}")
-    print(f"   Last modified: {datetime.fromtimestamp(sim_file.stat().st_mtime).strftime('%Y-%m-%d %H:%M:%S')}")
-    
-    try:
-        with open(sim_file, 'r') as f:
-            sim = json.load(f)
-    except Exception as e:
-        print(f"\n❌ Error reading file: {e}")
-        return
+    print(f"\n📄 Simulation: {sim['simulation_id']}")
+    print(f"   Last modified: {datetime.fromisoformat(sim['updated_at']).strftime('%Y-%m-%d %H:%M:%S')}")
     
     # Check status (handle old format)
     status = sim.get('status', 'unknown')
@@ -147,8 +156,8 @@ if __name__ == "__main__":
     import sys
     
     if len(sys.argv) > 1:
-        # Verify specific file
-        verify_simulation(Path(sys.argv[1]))
+        # Verify specific simulation (sim_id or legacy .json file)
+        verify_simulation(sys.argv[1])
     else:
-        # Verify latest file
+        # Verify latest simulation
         verify_simulation()
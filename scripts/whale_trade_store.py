@@ -0,0 +1,204 @@
+"""
+WHALE TRADE STORE
+=================
+Append-only storage for trades detected by realtime_whale_watcher.py
+
+Trades are written as JSON lines into daily segment files:
+    data/whale_trades/trades_YYYY-MM-DD.jsonl
+so each write costs O(new trade) and time-range reads only open the segments
+they need. Replaces rewriting data/realtime_whale_trades.json on every trade.
+
+Reader API (for hourly summary / report scripts):
+    store = WhaleTradeStore()
+    store.count()                       # total trades (all segments)
+    store.iter_trades(since=..., until=...)
+    store.load_trades(since=...)        # list
+
+Migrate the legacy JSON file once with (the watcher also does this on first
+start; the legacy file is left in place unless --archive is given):
+    python scripts/whale_trade_store.py --migrate [--archive]
+"""
+
+import json
+import re
+import sys
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Union
+
+DEFAULT_STORE_DIR = Path("data/whale_trades")
+LEGACY_TRADES_FILE = Path("data/realtime_whale_trades.json")
+
+_SEGMENT_RE = re.compile(r"^trades_(\d{4}-\d{2}-\d{2})\.jsonl$")
+
+TimeLike = Union[str, datetime, None]
+
+
+def _to_iso(value: TimeLike) -> Optional[str]:
+    """Normalize a bound to the watcher's timestamp format (ISO string, compared lexicographically)."""
+    if value is None:
+        return None
+    if isinstance(value, datetime):
+        return value.replace(tzinfo=None).isoformat()
+    return str(value)
+
+
+def _segment_day(trade: Dict) -> str:
+    """Segment key for a trade: the date part of its ISO timestamp, else today (UTC)."""
+    ts = str(trade.get('timestamp') or '')
+    if len(ts) >= 10 and ts[4] == '-' and ts[7] == '-':
+        return ts[:10]
+    return datetime.utcnow().strftime('%Y-%m-%d')
+
+
+class WhaleTradeStore:
+    """Segmented JSONL store with an in-memory trade count"""
+
+    def __init__(self, store_dir: Union[str, Path] = DEFAULT_STORE_DIR):
+        self.store_dir = Path(store_dir)
+        self._handles: Dict[str, object] = {}
+        self._count: Optional[int] = None
+
+    # ---- writing ----
+    def append(self, trade: Dict) -> None:
+        """Append ONE trade (one line, flushed immediately)"""
+        self.append_many([trade])
+
+    def append_many(self, trades: List[Dict]) -> None:
+        """Append trades in order; each segment file is opened once and kept open"""
+        if not trades:
+            return
+        self.store_dir.mkdir(parents=True, exist_ok=True)
+        for trade in trades:
+            day = _segment_day(trade)
+            handle = self._handles.get(day)
+            if handle is None:
+                # Only the current day(s) stay open; close older handles
+                for old_day in [d for d in self._handles if d < day]:
+                    self._handles.pop(old_day).close()
+                handle = open(self.store_dir / f"trades_{day}.jsonl", 'a', encoding='utf-8')
+                self._handles[day] = handle
+            handle.write(json.dumps(trade, separators=(',', ':'), default=str) + '\n')
+        for handle in self._handles.values():
+            handle.flush()
+        if self._count is not None:
+            self._count += len(trades)
+
+    def close(self) -> None:
+        for handle in self._handles.values():
+            handle.close()
+        self._handles.clear()
+
+    # ---- reading ----
+    def segments(self, since: TimeLike = None, until: TimeLike = None) -> List[Path]:
+        """Segment files (oldest first) that can contain trades in [since, until]"""
+        if not self.store_dir.exists():
+            return []
+        since_iso, until_iso = _to_iso(since), _to_iso(until)
+        # One day of slack: timestamps from different sources aren't all in the same timezone
+        since_day = (datetime.fromisoformat(since_iso[:10]) - timedelta(days=1)).strftime('%Y-%m-%d') if since_iso else None
+        until_day = (datetime.fromisoformat(until_iso[:10]) + timedelta(days=1)).strftime('%Y-%m-%d') if until_iso else None
+        out = []
+        for path in sorted(self.store_dir.glob('trades_*.jsonl')):
+            m = _SEGMENT_RE.match(path.name)
+            if not m:
+                continue
+            day = m.group(1)
+            if since_day and day < since_day:
+                continue
+            if until_day and day > until_day:
+                continue
+            out.append(path)
+        return out
+
+    def iter_trades(self, since: TimeLike = None, until: TimeLike = None) -> Iterator[Dict]:
+        """Yield trades with since <= timestamp <= until (bounds optional)"""
+        since_iso, until_iso = _to_iso(since), _to_iso(until)
+        for handle in self._handles.values():
+            handle.flush()
+        for path in self.segments(since, until):
+            with open(path, 'r', encoding='utf-8') as f:
+                for line in f:
+                    line = line.strip()
+                    if not line:
+                        continue
+                    try:
+                        trade = json.loads(line)
+                    except json.JSONDecodeError:
+                        continue  # torn last line after a crash
+                    ts = str(trade.get('timestamp') or '')
+                    if since_iso and ts < since_iso:
+                        continue
+                    if until_iso and ts > until_iso:
+                        continue
+                    yield trade
+
+    def load_trades(self, since: TimeLike = None, until: TimeLike = None) -> List[Dict]:
+        return list(self.iter_trades(since, until))
+
+    def count(self) -> int:
+        """Total stored trades (newline count per segment, cached after the first call)"""
+        if self._count is None:
+            for handle in self._handles.values():
+                handle.flush()
+            total = 0
+            for path in self.segments():
+                with open(path, 'rb') as f:
+                    for chunk in iter(lambda: f.read(1 << 20), b''):
+                        total += chunk.count(b'\n')
+            self._count = total
+        return self._count
+
+
+def load_trades(since: TimeLike = None, until: TimeLike = None,
+                store_dir: Union[str, Path] = DEFAULT_STORE_DIR) -> List[Dict]:
+    """
+    Reader for report scripts: trades from the segmented store, falling back to the
+    legacy JSON file when the store has not been created yet.
+    """
+    store = WhaleTradeStore(store_dir)
+    if store.segments() or not LEGACY_TRADES_FILE.exists():
+        return store.load_trades(since, until)
+    with open(LEGACY_TRADES_FILE, 'r') as f:
+        trades = json.load(f)
+    since_iso, until_iso = _to_iso(since), _to_iso(until)
+    return [t for t in trades if isinstance(t, dict)
+            and (not since_iso or str(t.get('timestamp') or '') >= since_iso)
+            and (not until_iso or str(t.get('timestamp') or '') <= until_iso)]
+
+
+def migrate_legacy_json(legacy_file: Union[str, Path] = LEGACY_TRADES_FILE,
+                        store_dir: Union[str, Path] = DEFAULT_STORE_DIR, archive: bool = False) -> int:
+    """
+    One-shot import of data/realtime_whale_trades.json into the segmented store.
+    Refuses to run if the store already has data (to avoid duplicating trades).
+    The legacy file is kept; with archive=True it is renamed to *.migrated afterwards.
+    Returns trades migrated.
+    """
+    legacy_file = Path(legacy_file)
+    store = WhaleTradeStore(store_dir)
+    if store.segments():
+        raise RuntimeError(f"{store.store_dir} already contains trades; not migrating twice")
+    if not legacy_file.exists():
+        return 0
+    with open(legacy_file, 'r') as f:
+        trades = json.load(f)
+    if not isinstance(trades, list):
+        raise ValueError(f"{legacy_file} does not contain a list of trades")
+    trades = [t for t in trades if isinstance(t, dict)]
+    trades.sort(key=lambda t: str(t.get('timestamp') or ''))
+    store.append_many(trades)
+    store.close()
+    if archive:
+        legacy_file.rename(legacy_file.with_suffix(legacy_file.suffix + '.migrated'))
+    return len(trades)
+
+
+if __name__ == "__main__":
+    if '--migrate' in sys.argv:
+        migrated = migrate_legacy_json(archive='--archive' in sys.argv)
+        print(f"✅ Migrated {migrated:,} trades from {LEGACY_TRADES_FILE} to {DEFAULT_STORE_DIR}/")
+    else:
+        store = WhaleTradeStore()
+        print(f"📦 {store.count():,} trades in {len(store.segments())} segment(s) under {store.store_dir}/")
+        print("   Run with --migrate to import data/realtime_whale_trades.json")
@@ -0,0 +1,379 @@
+# src/polymarket/activity_sink.py
+"""
+Buffered, typed sinks for the engine's per-trade / per-signal logs.
+
+Rows are appended to an in-memory buffer (cheap, thread-safe) and a background
+thread flushes every SINK_FLUSH_INTERVAL_SEC (or when SINK_FLUSH_MAX_ROWS is
+reached) instead of opening and closing a CSV per row. Each flush writes:
+  - one Arrow record batch to logs/<name>_<day>_<run>_<segment>.arrows (IPC
+    stream, fixed schema) when pyarrow is installed; a stream that was closed
+    is never appended to again, later rows start a new segment file, and
+  - the same rows appended to the legacy logs/<name>_<day>.csv when
+    SINK_CSV_EXPORT is on (default, existing scripts read the CSVs).
+
+load_frame() reads a day's Arrow files back into a DataFrame without any
+string parsing, plus any same-day CSV rows the Arrow files do not have (rows
+from before the sink existed, or from a failed Arrow write); analysis tools
+fall back to the CSV alone when it returns None.
+"""
+import atexit
+import csv
+import glob
+import json
+import os
+import threading
+from collections import Counter
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+try:
+    import pyarrow as pa
+except ImportError:
+    pa = None  # Columnar output disabled; CSV export still works
+
+SINK_FLUSH_INTERVAL_SEC = float(os.getenv("SINK_FLUSH_INTERVAL_SEC", "5"))  # Max delay before rows hit disk
+SINK_FLUSH_MAX_ROWS = int(os.getenv("SINK_FLUSH_MAX_ROWS", "500"))  # Flush early when this many rows are buffered
+SINK_CSV_EXPORT = os.getenv("SINK_CSV_EXPORT", "1").lower() in ("1", "true", "yes")  # Keep writing daily CSVs
+
+LOG_DIR = os.path.join(os.path.dirname(__file__), "..", "..", "logs")
+
+# (column, type) with type in {"timestamp", "string", "float", "int"}
+ACTIVITY_SCHEMA: List[Tuple[str, str]] = [
+    ("timestamp", "timestamp"),
+    ("market_id", "string"),
+    ("wallet", "string"),
+    ("score", "float"),
+    ("discount_pct", "float"),
+    ("size_usd", "float"),
+]
+
+SIGNAL_SCHEMA: List[Tuple[str, str]] = [
+    ("timestamp", "timestamp"),
+    ("wallet", "string"),
+    ("whale_score", "float"),
+    ("category", "string"),
+    ("market", "string"),
+    ("slug", "string"),
+    ("condition_id", "string"),
+    ("market_id", "string"),
+    ("side", "string"),
+    ("phase", "string"),
+    ("whale_entry_price", "float"),
+    ("current_price", "float"),
+    ("discount_pct", "float"),
+    ("size", "float"),
+    ("trade_value_usd", "float"),
+    ("orderbook_depth_ratio", "float"),
+    ("transaction_hash", "string"),
+    ("cluster_trades_count", "int"),
+    ("cluster_window_minutes", "float"),
+]
+
+
+def _csv_clean(v: Any) -> str:
+    """Clean a value for CSV writing: convert to string, remove newlines, handle dicts/lists."""
+    if v is None:
+        return ""
+    if isinstance(v, datetime):
+        return v.isoformat()
+    if isinstance(v, (dict, list)):
+        v = json.dumps(v, ensure_ascii=False)
+    else:
+        v = str(v)
+    # Replace newlines and carriage returns with spaces to prevent CSV corruption
+    return v.replace("\r", " ").replace("\n", " ")
+
+
+def _coerce(value: Any, kind: str) -> Any:
+    """Convert a row value to the column type (None when missing/unparseable)."""
+    if value is None or value == "":
+        return None
+    try:
+        if kind == "float":
+            return float(value)
+        if kind == "int":
+            return int(float(value))
+        if kind == "timestamp":
+            if isinstance(value, datetime):
+                return value.replace(tzinfo=None)
+            return datetime.fromisoformat(str(value).replace("Z", "+00:00")).replace(tzinfo=None)
+    except (TypeError, ValueError):
+        return None
+    if isinstance(value, (dict, list)):
+        return json.dumps(value, ensure_ascii=False)
+    return str(value)
+
+
+def _arrow_schema(schema: List[Tuple[str, str]]):
+    types = {"timestamp": pa.timestamp("us"), "string": pa.string(), "float": pa.float64(), "int": pa.int64()}
+    return pa.schema([(col, types[kind]) for col, kind in schema])
+
+
+class ColumnarSink:
+    """Daily buffered sink for one log stream (activity, signals, ...)."""
+
+    def __init__(self, name: str, schema: List[Tuple[str, str]], log_dir: str = LOG_DIR,
+                 csv_export: bool = SINK_CSV_EXPORT):
+        self.name = name
+        self.schema = schema
+        self.columns = [col for col, _ in schema]
+        self.log_dir = log_dir
+        self.csv_export = csv_export or pa is None
+        self.run_id = f"{datetime.now().strftime('%H%M%S')}-{os.getpid()}"
+        self._arrow_schema = _arrow_schema(schema) if pa is not None else None
+        self._buffer: Dict[str, List[Dict[str, Any]]] = {}  # day -> rows
+        self._buffered = 0
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._writers: Dict[str, Tuple[Any, Any]] = {}  # day -> (file, RecordBatchStreamWriter)
+        self._segments = 0  # Arrow files opened so far (each holds exactly one IPC stream)
+        self.rows_written = 0
+        self.flushes = 0
+        self.errors = 0
+
+    def add(self, row: Dict[str, Any]) -> None:
+        """Buffer one row (keys outside the schema are ignored). Never does I/O."""
+        day = datetime.now().strftime("%Y-%m-%d")
+        # Snapshot now: callers keep mutating their dict (e.g. signal["confidence"]) after
+        # logging, and the flush happens later on the background thread
+        row = {col: row.get(col) for col in self.columns}
+        with self._lock:
+            self._buffer.setdefault(day, []).append(row)
+            self._buffered += 1
+            full = self._buffered >= SINK_FLUSH_MAX_ROWS
+        if full:
+            _wake_flusher()
+
+    def pending(self) -> int:
+        return self._buffered
+
+    def flush(self) -> int:
+        """Write all buffered rows. Returns number of rows written."""
+        with self._flush_lock:
+            with self._lock:
+                buffered, self._buffer, self._buffered = self._buffer, {}, 0
+            written = 0
+            for day, rows in sorted(buffered.items()):
+                ok = False
+                # Each format separately, so one failing does not lose the rows in the other
+                for enabled, write in ((self.csv_export, self._write_csv),
+                                       (self._arrow_schema is not None, self._write_arrow)):
+                    if not enabled:
+                        continue
+                    try:
+                        write(day, rows)
+                        ok = True
+                    except Exception:
+                        self.errors += 1
+                if ok:
+                    written += len(rows)
+            # Keep only today's Arrow stream open
+            for day in [d for d in self._writers if buffered and d < max(buffered)]:
+                self._close_writer(day)
+            if written:
+                self.rows_written += written
+                self.flushes += 1
+            return written
+
+    def _write_arrow(self, day: str, rows: List[Dict[str, Any]]) -> None:
+        data = {col: [_coerce(r.get(col), kind) for r in rows] for col, kind in self.schema}
+        batch = pa.RecordBatch.from_pydict(data, schema=self._arrow_schema)
+        entry = self._writers.get(day)
+        if entry is None:
+            os.makedirs(self.log_dir, exist_ok=True)
+            # Never reopen a closed stream: a second header after its end-of-stream
+            # marker would be unreadable, so every open gets a fresh segment file
+            self._segments += 1
+            path = os.path.join(self.log_dir, f"{self.name}_{day}_{self.run_id}_{self._segments:03d}.arrows")
+            sink = open(path, "wb")
+            entry = (sink, pa.ipc.new_stream(sink, self._arrow_schema))
+            self._writers[day] = entry
+        sink, writer = entry
+        writer.write_batch(batch)
+        sink.flush()
+
+    def _write_csv(self, day: str, rows: List[Dict[str, Any]]) -> None:
+        os.makedirs(self.log_dir, exist_ok=True)
+        path = os.path.join(self.log_dir, f"{self.name}_{day}.csv")
+        file_exists = os.path.exists(path)
+        with open(path, "a", newline="", encoding="utf-8") as f:
+            writer = csv.writer(f, quoting=csv.QUOTE_MINIMAL)
+            if not file_exists:
+                writer.writerow(self.columns)
+            for r in rows:
+                writer.writerow([_csv_clean(r.get(col)) for col in self.columns])
+
+    def _close_writer(self, day: str) -> None:
+        sink, writer = self._writers.pop(day)
+        try:
+            writer.close()
+        finally:
+            sink.close()
+
+    def close(self) -> None:
+        self.flush()
+        with self._flush_lock:
+            for day in list(self._writers):
+                self._close_writer(day)
+
+    def stats(self) -> Dict[str, Any]:
+        return {"pending": self._buffered, "rows_written": self.rows_written,
+                "flushes": self.flushes, "errors": self.errors}
+
+
+class LineSink:
+    """Buffered daily text log (one line per entry), flushed with the other sinks."""
+
+    def __init__(self, name: str, log_dir: str = "logs", suffix: str = ".log"):
+        self.name = name
+        self.log_dir = log_dir
+        self.suffix = suffix
+        self._lines: List[Tuple[str, str]] = []
+        self._lock = threading.Lock()
+
+    def add(self, line: str) -> None:
+        day = datetime.utcnow().strftime("%Y-%m-%d")
+        with self._lock:
+            self._lines.append((day, line.rstrip()))
+
+    def pending(self) -> int:
+        return len(self._lines)
+
+    def flush(self) -> int:
+        with self._lock:
+            lines, self._lines = self._lines, []
+        by_day: Dict[str, List[str]] = {}
+        for day, line in lines:
+            by_day.setdefault(day, []).append(line)
+        for day, day_lines in by_day.items():
+            os.makedirs(self.log_dir, exist_ok=True)
+            with open(os.path.join(self.log_dir, f"{self.name}_{day}{self.suffix}"), "a", encoding="utf-8") as f:
+                f.write("\n".join(day_lines) + "\n")
+        return len(lines)
+
+    def close(self) -> None:
+        self.flush()
+
+    def stats(self) -> Dict[str, Any]:
+        return {"pending": len(self._lines)}
+
+
+# ---- background flusher shared by every sink ----
+_SINKS: Dict[str, Any] = {}
+_FLUSHER: Optional[threading.Thread] = None
+_FLUSHER_WAKE = threading.Event()
+_FLUSHER_STOP = threading.Event()
+
+
+def _wake_flusher() -> None:
+    _FLUSHER_WAKE.set()
+
+
+def _run_flusher() -> None:
+    while not _FLUSHER_STOP.is_set():
+        _FLUSHER_WAKE.wait(SINK_FLUSH_INTERVAL_SEC)
+        _FLUSHER_WAKE.clear()
+        flush_all_sinks()
+
+
+def register_sink(sink):
+    """Register a sink for periodic background flushing (starts the flusher thread once)."""
+    global _FLUSHER
+    _SINKS[sink.name] = sink
+    if _FLUSHER is None:
+        _FLUSHER = threading.Thread(target=_run_flusher, name="activity-sink-flusher", daemon=True)
+        _FLUSHER.start()
+        atexit.register(close_all_sinks)
+    return sink
+
+
+def flush_all_sinks() -> int:
+    total = 0
+    for sink in list(_SINKS.values()):
+        try:
+            total += sink.flush()
+        except Exception:
+            pass
+    return total
+
+
+def close_all_sinks() -> None:
+    _FLUSHER_STOP.set()
+    _FLUSHER_WAKE.set()
+    for sink in list(_SINKS.values()):
+        try:
+            sink.close()
+        except Exception:
+            pass
+
+
+def sink_stats() -> Dict[str, Dict[str, Any]]:
+    return {name: sink.stats() for name, sink in _SINKS.items()}
+
+
+_KINDS = {"timestamp": "timestamp", "string": "string", "double": "float", "int64": "int"}
+
+
+def _row_key(values: List[Any], kinds: List[str]) -> Tuple:
+    """Comparable identity of a row as both formats store it (strings CSV-cleaned)."""
+    return tuple(_csv_clean(v) if kind == "string" else v for v, kind in zip(values, kinds))
+
+
+def _csv_only_rows(csv_path: str, schema, arrow_rows: List[Tuple]) -> Dict[str, List[Any]]:
+    """Columns of the CSV rows that are not also in the Arrow files (multiset difference)."""
+    columns = schema.names
+    kinds = [_KINDS.get(str(t).split("[")[0], "string") for t in schema.types]
+    remaining = Counter(_row_key(list(r), kinds) for r in arrow_rows)
+    out: Dict[str, List[Any]] = {col: [] for col in columns}
+    with open(csv_path, "r", newline="", encoding="utf-8", errors="replace") as f:
+        for row in csv.DictReader(f):
+            values = [_coerce(row.get(col), kind) for col, kind in zip(columns, kinds)]
+            key = _row_key(values, kinds)
+            if remaining[key] > 0:
+                remaining[key] -= 1  # already loaded from Arrow
+                continue
+            for col, v in zip(columns, values):
+                out[col].append(v)
+    return out
+
+
+def load_frame(name: str, date_str: str, log_dir: str = LOG_DIR):
+    """
+    Load one day of a sink's Arrow files as a DataFrame (typed columns, no parsing),
+    merged with the same-day CSV rows that are missing from them.
+    Returns None when pyarrow is missing or no Arrow files exist for that day,
+    so callers can fall back to the CSV.
+    """
+    if pa is None:
+        return None
+    paths = sorted(glob.glob(os.path.join(log_dir, f"{name}_{date_str}_*.arrows")))
+    if not paths:
+        return None
+    batches = []
+    schema = None
+    for path in paths:
+        with pa.OSFile(path, "rb") as f:
+            try:
+                reader = pa.ipc.open_stream(f)
+            except pa.ArrowInvalid:
+                continue  # empty file (writer never flushed)
+            schema = schema or reader.schema
+            while True:
+                try:
+                    batches.append(reader.read_next_batch())
+                except StopIteration:
+                    break
+                except (pa.ArrowInvalid, OSError):
+                    break  # torn last batch from a crash; keep what was complete
+    if schema is None:
+        return None
+    table = pa.Table.from_batches(batches, schema=schema)
+    csv_path = os.path.join(log_dir, f"{name}_{date_str}.csv")
+    if os.path.exists(csv_path):
+        arrow_rows = zip(*(table.column(c).to_pylist() for c in schema.names)) if table.num_rows else []
+        extra = _csv_only_rows(csv_path, schema, list(arrow_rows))
+        if extra[schema.names[0]]:
+            table = pa.concat_tables([pa.Table.from_pydict(extra, schema=schema), table])
+    if table.num_rows == 0:
+        return None
+    return table.to_pandas()
@@ -16,13 +16,18 @@ project_root = os.path.dirname(parent_dir)
 if project_root not in sys.path:
     sys.path.insert(0, project_root)
 
+from src.polymarket.activity_sink import load_frame
+
 
 def load_signals(date_str: str = None) -> pd.DataFrame:
-    """Load signals CSV file with encoding handling."""
+    """Load signals (Arrow sink files if present, else CSV with encoding handling)."""
     if date_str is None:
         date_str = datetime.now().strftime("%Y-%m-%d")
     
     log_dir = os.path.join(project_root, "logs")
+    df = load_frame("signals", date_str, log_dir)
+    if df is not None:
+        return df
     signals_file = os.path.join(log_dir, f"signals_{date_str}.csv")
     
     if not os.path.exists(signals_file):
@@ -2,12 +2,13 @@
 Polymarket API Client - Handles all API interactions
 """
 
-import aiohttp
 import asyncio
 from typing import Dict, List, Optional
 from datetime import datetime
 import structlog
 
+from ..http_client import HttpSession, create_session
+
 log = structlog.get_logger()
 
 
@@ -20,14 +21,15 @@ class PolymarketClient:
         self.clob_endpoint = config.get('clob_endpoint', 'https://clob.polymarket.com')
         self.gamma_endpoint = config.get('gamma_endpoint', 'https://gamma-api.polymarket.com')
         self.chain_id = config.get('chain_id', 137)
-        self.session: Optional[aiohttp.ClientSession] = None
+        self.session: Optional[HttpSession] = None
         
         log.info("polymarket_client_initialized",
                 clob=self.clob_endpoint,
                 gamma=self.gamma_endpoint)
     
     async def __aenter__(self):
-        self.session = aiohttp.ClientSession()
+        # Shared HTTP client: per-host rate limits and 429/5xx retries (http_client.py)
+        self.session = create_session()
         return self
     
     async def __aexit__(self, exc_type, exc_val, exc_tb):
@@ -17,10 +17,15 @@ project_root = os.path.dirname(parent_dir)
 if project_root not in sys.path:
     sys.path.insert(0, project_root)
 
+from src.polymarket.activity_sink import load_frame
+
 
 def load_signals(date_str: str = "2025-12-15") -> pd.DataFrame:
-    """Load signals CSV file with encoding handling."""
+    """Load signals (Arrow sink files if present, else CSV with encoding handling)."""
     log_dir = os.path.join(project_root, "logs")
+    df = load_frame("signals", date_str, log_dir)
+    if df is not None:
+        return df
     signals_file = os.path.join(log_dir, f"signals_{date_str}.csv")
     
     if not os.path.exists(signals_file):
@@ -56,8 +61,11 @@ def load_signals(date_str: str = "2025-12-15") -> pd.DataFrame:
 
 
 def load_activity(date_str: str = "2025-12-15") -> pd.DataFrame:
-    """Load activity CSV file with encoding handling."""
+    """Load activity (Arrow sink files if present, else CSV with encoding handling)."""
     log_dir = os.path.join(project_root, "logs")
+    df = load_frame("activity", date_str, log_dir)
+    if df is not None:
+        return df
     activity_file = os.path.join(log_dir, f"activity_{date_str}.csv")
     
     if not os.path.exists(activity_file):
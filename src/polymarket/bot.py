@@ -23,14 +23,48 @@ from .storage.trade_database import TradeDatabase
 
 # Risk management (Kimi's requirements)
 import sys
-from pathlib import Path
 project_root = Path(__file__).parent.parent.parent
 if str(project_root) not in sys.path:
     sys.path.insert(0, str(project_root))
 from src.risk import RiskManager
+from src.polymarket.http_client import create_session
+from src.polymarket.wallet_watch import WALLET_WATCH_CONCURRENCY, WalletWatcher
 
 log = structlog.get_logger()
 
+WHALE_TRADE_MIN_USD = 1000  # Only track significant trades
+
+
+def is_whale_buy(trade: Dict) -> bool:
+    """
+    Only buys are copied (the old position diff only saw position increases).
+    Maker fills are kept: a whale filling resting limit orders is building the
+    same position as one taking liquidity.
+    """
+    return str(trade.get('side') or '').upper() == 'BUY'
+
+
+def whale_trade_from_activity(trade: Dict) -> Dict:
+    """data-api /trades BUY row -> the trade dict process_whale_trade() expects"""
+    size = float(trade.get('size') or 0)
+    price = float(trade.get('price') or 0)
+    market_id = trade.get('conditionId') or trade.get('slug') or 'unknown'
+    return {
+        'whale_address': (trade.get('proxyWallet') or '').lower(),
+        'market_id': market_id,
+        'direction': trade.get('outcome'),
+        'size': size * price,
+        'quantity': size,
+        'price': price,
+        'timestamp': trade.get('timestamp'),
+        'market_data': {
+            'market_id': market_id,
+            'question': trade.get('title', 'Unknown'),
+            'end_date': None,  # Not in the trade row; process_whale_trade defaults it
+            'liquidity': 0
+        }
+    }
+
 
 class WhaleBot:
     """
@@ -185,8 +219,8 @@ class WhaleBot:
             url = "https://api.polymarket.com/leaderboard"
             params = {'period': '7d', 'limit': 20}
             
-            # Create a temporary session for discovery
-            async with aiohttp.ClientSession() as session:
+            # Temporary session for discovery (shared per-host rate limits, retries, metrics)
+            async with create_session() as session:
                 async with session.get(url, params=params) as response:
                     if response.status == 200:
                         data = await response.json()
@@ -296,7 +330,7 @@ class WhaleBot:
             }
             """
             
-            async with aiohttp.ClientSession() as session:
+            async with create_session() as session:
                 async with session.post(subgraph_url, json={'query': query}) as response:
                     if response.status == 200:
                         data = await response.json()
@@ -705,81 +739,70 @@ class WhaleBot:
     async def monitoring_loop(self):
         """
         Main monitoring loop - checks for REAL whale activity
+        
+        All watched wallets are polled in one batch per interval (data-api
+        /trades?user=, bounded concurrency, per-wallet cursor), so the cost
+        is about one request per whale per poll.
         """
         log.info("monitoring_loop_started", whales=len(self.whale_watchlist))
         
-        # Track previous positions for each whale
-        previous_positions = {whale: {'positions_dict': {}} 
-                            for whale in self.whale_watchlist}
-        
         poll_interval = self.config['api']['poll_interval']
+        watcher = WalletWatcher(
+            self.whale_watchlist,
+            min_size_usd=WHALE_TRADE_MIN_USD,
+            concurrency=self.config['api'].get('wallet_watch_concurrency', WALLET_WATCH_CONCURRENCY)
+        )
         
         last_daily_summary = datetime.now().date()
         last_command_check = datetime.now()
         
-        while self.is_running:
-            try:
-                # Check for Telegram commands every 3 seconds
-                if (datetime.now() - last_command_check).total_seconds() >= 3:
-                    await self.command_handler.process_updates()
-                    last_command_check = datetime.now()
-                
-                # Check if new day - send daily summary
-                current_date = datetime.now().date()
-                if current_date > last_daily_summary:
-                    self.db.log_daily_summary()
-                    await self.send_daily_summary()
-                    last_daily_summary = current_date
-                
-                async with self.api_client as client:
-                    # Check each whale
-                    for whale_address in self.whale_watchlist:
-                        # Get current positions
-                        current = await client.get_wallet_positions(whale_address)
+        async with create_session(timeout=aiohttp.ClientTimeout(total=15)) as session:
+            while self.is_running:
+                try:
+                    # Check for Telegram commands every 3 seconds
+                    if (datetime.now() - last_command_check).total_seconds() >= 3:
+                        await self.command_handler.process_updates()
+                        last_command_check = datetime.now()
+                    
+                    # Check if new day - send daily summary
+                    current_date = datetime.now().date()
+                    if current_date > last_daily_summary:
+                        self.db.log_daily_summary()
+                        await self.send_daily_summary()
+                        last_daily_summary = current_date
+                    
+                    # New trades of every watched whale since the last poll
+                    watcher.set_wallets(self.whale_watchlist)
+                    for activity in await watcher.poll(session):
+                        if not is_whale_buy(activity):
+                            continue  # SELL: direction would read as a buy of the same outcome
+                        trade = whale_trade_from_activity(activity)
+                        log.info("whale_trade_detected",
+                                whale=trade['whale_address'][:10],
+                                market=trade['market_id'][:10],
+                                size=trade['size'])
                         
-                        # Detect new trades
-                        new_trades = await client.detect_whale_trades(
-                            whale_address,
-                            previous_positions[whale_address]
+                        # Notify via Telegram
+                        whale_meta = self.whale_metadata.get(trade['whale_address'], {})
+                        await self.telegram.notify_whale_detected(
+                            whale_data={'whale_id': trade['whale_address'], **whale_meta},
+                            market_data=trade['market_data'],
+                            bet_data=trade
                         )
                         
-                        # Process new trades
-                        for trade in new_trades:
-                            log.info("whale_trade_detected",
-                                    whale=whale_address[:10],
-                                    market=trade['market_id'][:10],
-                                    size=trade['size'])
-                            
-                            # Notify via Telegram
-                            whale_meta = self.whale_metadata.get(whale_address, {})
-                            await self.telegram.notify_whale_detected(
-                                whale_data={'whale_id': whale_address, **whale_meta},
-                                market_data=trade['market_data'],
-                                bet_data=trade
-                            )
-                            
-                            # Evaluate the trade
-                            await self.process_whale_trade(trade)
-                        
-                        # Update previous positions
-                        # Subgraph returns positions with nested market structure
-                        previous_positions[whale_address] = {
-                            'positions_dict': {
-                                pos['market']['id']: pos 
-                                for pos in current['positions']
-                            }
-                        }
-                
-                # Check active positions
-                await self.check_active_positions()
+                        # Evaluate the trade
+                        await self.process_whale_trade(trade)
+                    
+                    # Check active positions
+                    await self.check_active_positions()
+                    
+                    # Wait before next poll
+                    await asyncio.sleep(poll_interval)
                 
-                # Wait before next poll
-                await asyncio.sleep(poll_interval)
-            
-            except Exception as e:
-                log.error("monitoring_loop_error", error=str(e))
-                await self.telegram.notify_error("monitoring_loop", str(e))
-                await asyncio.sleep(poll_interval)
+                except Exception as e:
+                    log.error("monitoring_loop_error", error=str(e))
+                    await self.telegram.notify_error("monitoring_loop", str(e))
+                    await asyncio.sleep(poll_interval)
     
     async def process_whale_trade(self, trade: Dict):
         """
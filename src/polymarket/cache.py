@@ -0,0 +1,238 @@
+"""
+Shared in-memory cache for API lookups (TTL + LRU bound + negative caching).
+
+Every module-level lookup cache (midpoints, Gamma quotes/metadata, token ids,
+wallet stats, whale whitelist) is a named TTLCache so memory stays bounded on
+multi-day runs and hit rates can be reported in one place via cache_stats().
+
+save_cache_snapshot()/load_cache_snapshot() persist selected caches (with each
+entry's absolute expiry) to a JSON file so a restarted engine starts warm;
+entries that expired while the process was down are dropped on load.
+"""
+import json
+import os
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Iterable, Iterator, Optional, Tuple
+
+
+class _Missing:
+    """Sentinel returned by TTLCache.get() on a miss (a cached None is a valid value)."""
+
+    def __repr__(self) -> str:
+        return "MISSING"
+
+    def __bool__(self) -> bool:
+        return False
+
+
+MISSING = _Missing()
+
+# name -> cache, so stats/snapshots can enumerate every cache in the process
+_REGISTRY: Dict[str, "TTLCache"] = {}
+
+
+class TTLCache:
+    """
+    Dict-like cache with per-namespace TTL, an LRU max-entry bound and a separate,
+    usually shorter TTL for negative results (failed/empty lookups).
+
+    Entries are stored as key -> (expires_at, value, negative). Expired entries are
+    dropped lazily on access and when the bound forces an eviction.
+    """
+
+    def __init__(self, name: str, ttl: float, max_entries: int = 10000, negative_ttl: Optional[float] = None):
+        self.name = name
+        self.ttl = float(ttl)
+        self.negative_ttl = float(negative_ttl if negative_ttl is not None else ttl)
+        self.max_entries = max(1, int(max_entries))
+        self._data: "OrderedDict[Hashable, Tuple[float, Any, bool]]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.negative_hits = 0
+        self.evictions = 0
+        self.expirations = 0
+        _REGISTRY[name] = self
+
+    # ---- core API ----
+    def get(self, key: Hashable, default: Any = MISSING) -> Any:
+        """Return cached value (refreshing its LRU position) or `default` if absent/expired."""
+        entry = self._data.get(key)
+        if entry is None:
+            self.misses += 1
+            return default
+        expires_at, value, negative = entry
+        if expires_at <= time.time():
+            del self._data[key]
+            self.expirations += 1
+            self.misses += 1
+            return default
+        self._data.move_to_end(key)
+        self.hits += 1
+        if negative:
+            self.negative_hits += 1
+        return value
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None, negative: bool = False) -> None:
+        """Store value; negative=True uses negative_ttl unless an explicit ttl is given."""
+        if ttl is None:
+            ttl = self.negative_ttl if negative else self.ttl
+        self._data[key] = (time.time() + ttl, value, negative)
+        self._data.move_to_end(key)
+        while len(self._data) > self.max_entries:
+            self._data.popitem(last=False)
+            self.evictions += 1
+
+    def set_negative(self, key: Hashable, value: Any = None) -> None:
+        """Cache a failed/empty lookup for negative_ttl so it is not retried on every call."""
+        self.set(key, value, negative=True)
+
+    def pop(self, key: Hashable, default: Any = None) -> Any:
+        entry = self._data.pop(key, None)
+        return default if entry is None else entry[1]
+
+    def clear(self) -> None:
+        self._data.clear()
+
+    def purge_expired(self) -> int:
+        """Drop all expired entries now. Returns number removed."""
+        now = time.time()
+        stale = [k for k, (exp, _, _) in self._data.items() if exp <= now]
+        for k in stale:
+            del self._data[k]
+        self.expirations += len(stale)
+        return len(stale)
+
+    def items_with_expiry(self) -> Iterator[Tuple[Hashable, float, Any, bool]]:
+        """Yield (key, expires_at, value, negative) for live entries, oldest first."""
+        now = time.time()
+        for k, (exp, value, negative) in list(self._data.items()):
+            if exp > now:
+                yield k, exp, value, negative
+
+    def restore(self, key: Hashable, expires_at: float, value: Any, negative: bool = False) -> bool:
+        """Insert an entry with an absolute expiry (snapshot reload). Expired entries are skipped."""
+        if expires_at <= time.time():
+            return False
+        self._data[key] = (float(expires_at), value, bool(negative))
+        self._data.move_to_end(key)
+        while len(self._data) > self.max_entries:
+            self._data.popitem(last=False)
+            self.evictions += 1
+        return True
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._data),
+            "max_entries": self.max_entries,
+            "hits": self.hits,
+            "misses": self.misses,
+            "negative_hits": self.negative_hits,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+            "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+        }
+
+    # ---- dict-style access (keeps old call sites readable) ----
+    def __contains__(self, key: Hashable) -> bool:
+        """A failed membership test counts as a miss (`if k in c: c[k]` counts the hit)."""
+        entry = self._data.get(key)
+        if entry is not None and entry[0] > time.time():
+            return True
+        self.misses += 1
+        return False
+
+    def __getitem__(self, key: Hashable) -> Any:
+        value = self.get(key)
+        if value is MISSING:
+            raise KeyError(key)
+        return value
+
+    def __setitem__(self, key: Hashable, value: Any) -> None:
+        self.set(key, value)
+
+    def __delitem__(self, key: Hashable) -> None:
+        del self._data[key]
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def __repr__(self) -> str:
+        return f"TTLCache(name={self.name!r}, size={len(self._data)}, ttl={self.ttl}, max_entries={self.max_entries})"
+
+
+def get_cache(name: str) -> Optional[TTLCache]:
+    return _REGISTRY.get(name)
+
+
+def all_caches() -> Dict[str, TTLCache]:
+    return dict(_REGISTRY)
+
+
+def cache_stats() -> Dict[str, Dict[str, Any]]:
+    """Stats for every registered cache, keyed by cache name."""
+    return {name: c.stats() for name, c in _REGISTRY.items()}
+
+
+# ---- warm-start snapshots ----
+SNAPSHOT_VERSION = 1
+
+
+def save_cache_snapshot(path: str, names: Optional[Iterable[str]] = None) -> Dict[str, int]:
+    """
+    Write live entries of the named caches (all registered caches if None) to `path`
+    as JSON, atomically. Only string keys and JSON-serializable values are kept.
+    Returns {cache_name: entries_written}.
+    """
+    caches = {n: _REGISTRY[n] for n in (names if names is not None else _REGISTRY) if n in _REGISTRY}
+    payload: Dict[str, Any] = {"version": SNAPSHOT_VERSION, "saved_at": time.time(), "caches": {}}
+    written: Dict[str, int] = {}
+    for name, cache in caches.items():
+        entries = []
+        for key, expires_at, value, negative in cache.items_with_expiry():
+            if not isinstance(key, str):
+                continue
+            try:
+                json.dumps(value)
+            except (TypeError, ValueError):
+                continue
+            entries.append([key, expires_at, value, negative])
+        payload["caches"][name] = {"ttl": cache.ttl, "negative_ttl": cache.negative_ttl, "entries": entries}
+        written[name] = len(entries)
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    tmp = f"{path}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(payload, f, separators=(",", ":"))
+    os.replace(tmp, path)
+    return written
+
+
+def load_cache_snapshot(path: str, names: Optional[Iterable[str]] = None) -> Dict[str, int]:
+    """
+    Reload entries saved by save_cache_snapshot() into the registered caches (only
+    `names` if given). Expired entries and caches not registered in this process are
+    skipped; entries never outlive the cache's current ttl. Returns {cache_name: entries_loaded}.
+    """
+    if not os.path.exists(path):
+        return {}
+    with open(path, "r", encoding="utf-8") as f:
+        payload = json.load(f)
+    if payload.get("version") != SNAPSHOT_VERSION:
+        return {}
+    wanted = set(names) if names is not None else None
+    now = time.time()
+    loaded: Dict[str, int] = {}
+    for name, section in (payload.get("caches") or {}).items():
+        cache = _REGISTRY.get(name)
+        if cache is None or (wanted is not None and name not in wanted):
+            continue
+        count = 0
+        for key, expires_at, value, negative in section.get("entries", []):
+            # A shorter TTL configured since the snapshot caps the restored expiry
+            ttl_now = cache.negative_ttl if negative else cache.ttl
+            if cache.restore(key, min(float(expires_at), now + ttl_now), value, negative):
+                count += 1
+        loaded[name] = count
+    return loaded
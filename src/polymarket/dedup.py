@@ -0,0 +1,113 @@
+"""
+Time-bucketed dedup set for trade keys.
+
+Keys go into the current generation (one set per bucket_sec of wall time, or
+sooner once it holds max_keys/8 keys); generations older than ttl_sec are
+dropped whole, and when max_keys is exceeded the oldest generation goes first.
+Memory stays bounded without the old clear-everything cliff: at most one
+generation's worth of keys is forgotten at a time.
+
+Forgotten keys could still be reprocessed if the API returns the same old trade
+again, so callers can pass the trade's own timestamp: an unknown key whose event
+time is older than the last evicted generation is treated as already seen
+(counted in stats as stale_suppressed; the only way a new trade can be wrongly
+dropped, so it doubles as the false-positive counter).
+"""
+import time
+from collections import deque
+from datetime import datetime, timezone
+from typing import Any, Callable, Deque, Dict, Hashable, Optional, Set, Tuple
+
+
+def event_time(value: Any) -> Optional[float]:
+    """Epoch seconds from a trade timestamp (unix s/ms, numeric string or ISO), None if unknown."""
+    if value is None or value == "":
+        return None
+    if isinstance(value, (int, float)):
+        return float(value) / 1000.0 if value > 1e12 else float(value)
+    text = str(value).strip()
+    try:
+        return event_time(float(text))
+    except ValueError:
+        pass
+    try:
+        dt = datetime.fromisoformat(text.replace("Z", "+00:00"))
+    except ValueError:
+        return None
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=timezone.utc)
+    return dt.timestamp()
+
+
+class TimeBucketedDedup:
+    """Exact recent-key set with rotating generations (check-and-add via seen())."""
+
+    def __init__(self, ttl_sec: float = 86400, bucket_sec: float = 3600, max_keys: int = 250000,
+                 stale_grace_sec: Optional[float] = None, clock: Callable[[], float] = time.time):
+        self.ttl_sec = float(ttl_sec)
+        self.bucket_sec = max(1.0, float(bucket_sec))
+        self.max_keys = max(1, int(max_keys))
+        self._generation_cap = max(1, self.max_keys // 8)
+        # Late-arrival allowance before an unknown old trade counts as stale
+        self.stale_grace_sec = self.bucket_sec if stale_grace_sec is None else float(stale_grace_sec)
+        self._clock = clock
+        self._generations: Deque[Tuple[float, Set[Hashable]]] = deque()  # (start, keys), oldest first
+        self._size = 0
+        self._horizon: Optional[float] = None  # wall time up to which keys have been forgotten
+        self.checks = 0
+        self.duplicates = 0
+        self.stale_suppressed = 0
+        self.expired_evictions = 0
+        self.capacity_evictions = 0
+
+    def _rotate(self, now: float) -> Set[Hashable]:
+        bucket_start = now - (now % self.bucket_sec)
+        if not self._generations or self._generations[-1][0] < bucket_start:
+            self._generations.append((bucket_start, set()))
+        elif len(self._generations[-1][1]) >= self._generation_cap:
+            self._generations.append((now, set()))  # Busy bucket: split so eviction stays gradual
+        # A generation ends where the next one starts
+        while len(self._generations) > 1 and self._generations[1][0] <= now - self.ttl_sec:
+            self.expired_evictions += self._drop_oldest()
+        return self._generations[-1][1]
+
+    def _drop_oldest(self) -> int:
+        _, keys = self._generations.popleft()
+        self._size -= len(keys)
+        self._horizon = self._generations[0][0] if self._generations else self._clock()
+        return len(keys)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return any(key in keys for _, keys in reversed(self._generations))
+
+    def __len__(self) -> int:
+        return self._size
+
+    def seen(self, key: Hashable, event_ts: Optional[float] = None) -> bool:
+        """True if key is a duplicate (or a forgotten, stale trade); otherwise records it and returns False."""
+        self.checks += 1
+        current = self._rotate(self._clock())
+        if key in self:
+            self.duplicates += 1
+            return True
+        if (event_ts is not None and self._horizon is not None
+                and event_ts < self._horizon - self.stale_grace_sec):
+            self.stale_suppressed += 1
+            return True
+        current.add(key)
+        self._size += 1
+        while self._size > self.max_keys and len(self._generations) > 1:
+            self.capacity_evictions += self._drop_oldest()
+        return False
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "size": self._size,
+            "generations": len(self._generations),
+            "checks": self.checks,
+            "duplicates": self.duplicates,
+            "stale_suppressed": self.stale_suppressed,
+            "expired_evictions": self.expired_evictions,
+            "capacity_evictions": self.capacity_evictions,
+            "horizon_age_sec": round(self._clock() - self._horizon, 1) if self._horizon is not None else None,
+        }
@@ -17,12 +17,11 @@ except Exception:
 import asyncio
 import aiohttp
 import structlog
-import csv
 import os
 import logging
 from logging.handlers import RotatingFileHandler
 from datetime import datetime, timedelta, timezone
-from typing import Dict, List, Optional, Set
+from typing import Dict, List, Optional, Tuple
 from collections import defaultdict
 import json
 import math
@@ -71,7 +70,19 @@ project_root = os.path.dirname(parent_dir)
 if project_root not in sys.path:
     sys.path.insert(0, project_root)
 
-from src.polymarket.scraper import fetch_recent_trades, fetch_top_markets, fetch_trades, fetch_trades_scanned, get_midpoint_price_cached, get_token_id_for_condition, get_market_midpoint_cached, fetch_market_metadata_by_condition, BASE, HEADERS
+from src.polymarket.activity_sink import ACTIVITY_SCHEMA, SIGNAL_SCHEMA, ColumnarSink, LineSink, close_all_sinks, register_sink, sink_stats
+from src.polymarket.cache import MISSING, TTLCache, cache_stats, load_cache_snapshot, save_cache_snapshot
+from src.polymarket.dedup import TimeBucketedDedup, event_time
+from src.polymarket.http_client import close_shared_session, create_session, stats as http_client_stats
+from src.polymarket.market_scheduler import MarketScheduler
+from src.polymarket.log_pipeline import RecentLinesHandler, install_log_pipeline, log_pipeline_stats
+from src.polymarket.metrics import METRICS_HOST, METRICS_PORT, dashboard_summary, end_cycle, stage, stage_summary, start_metrics_server, stop_metrics_server, timed
+from src.polymarket.replay import ENGINE_REPLAY, engine_session, open_session
+from src.polymarket.singleflight import single_flight_stats
+from src.polymarket.telegram_outbox import start_outbox, stop_outbox, outbox_stats
+from src.polymarket.trade_stream import TradeStream
+from src.polymarket.wallet_watch import WALLET_WATCH_CURSOR_PATH, WalletWatcher, parse_wallets
+from src.polymarket.scraper import fetch_recent_trades, fetch_top_markets, fetch_trades, fetch_trades_scanned, get_midpoint_price_cached, get_token_id_for_condition, get_market_midpoint_cached, fetch_market_metadata_by_condition, prefetch_market_metadata, get_cached_market_quote, get_cached_market_tokens, trade_cursor, TRADE_CURSORS, BASE, HEADERS
 from src.polymarket.profiler import get_user_stats, whale_score_from_stats
 from src.polymarket.score import whale_score, whitelist_whales
 from src.polymarket.telegram import notify_engine_start, notify_engine_stop, notify_signal
@@ -109,40 +120,9 @@ def _setup_logging_from_env():
 # Call immediately to set up logging before any other logging happens
 _setup_logging_from_env()
 
-# Recent log handler that maintains only last 50 lines
-class RecentLogHandler(logging.Handler):
-    """Handler that maintains only the last 50 log lines in a separate file."""
-    def __init__(self, filename, max_lines=50):
-        super().__init__()
-        self.filename = Path(filename)
-        self.max_lines = max_lines
-        self.lines = []
-        # Load existing lines if file exists
-        if self.filename.exists():
-            try:
-                self.lines = self.filename.read_text(encoding="utf-8").strip().split("\n")
-                # Keep only last max_lines
-                if len(self.lines) > self.max_lines:
-                    self.lines = self.lines[-self.max_lines:]
-            except Exception:
-                self.lines = []
-    
-    def emit(self, record):
-        """Write log record and maintain only last max_lines."""
-        try:
-            msg = self.format(record)
-            self.lines.append(msg)
-            # Keep only last max_lines
-            if len(self.lines) > self.max_lines:
-                self.lines = self.lines[-self.max_lines:]
-            # Write to file
-            self.filename.write_text("\n".join(self.lines) + "\n", encoding="utf-8")
-        except Exception:
-            pass  # Don't break logging if recent log fails
-
 # Setup file logging for console output
 def setup_file_logging():
-    """Configure logging to write to both console and daily log file."""
+    """Create the daily log file handler and the recent-lines buffer (installed behind the log queue below)."""
     # Ensure logs directory exists
     Path("logs").mkdir(exist_ok=True)
     
@@ -174,24 +154,17 @@ def setup_file_logging():
     )
     file_handler.setFormatter(file_formatter)
     
-    # Recent log handler (last 50 lines)
-    recent_handler = RecentLogHandler(recent_log_file, max_lines=50)
+    # Recent log buffer (last RECENT_LOG_LINES lines, written on an interval)
+    recent_handler = RecentLinesHandler(recent_log_file)
     recent_handler.setLevel(logging.DEBUG)
     recent_handler.setFormatter(file_formatter)
     
-    # Get root logger and add file handlers
-    # NOTE: Don't clear handlers here - console handler was already added by _setup_logging_from_env()
-    # File handlers are added in addition to console handler
-    root_logger = logging.getLogger()
     # File logs always DEBUG (for auditing), console level controlled separately
     # Don't change root level here - it's already set by _setup_logging_from_env()
-    root_logger.addHandler(file_handler)
-    root_logger.addHandler(recent_handler)
-    
-    return log_file
+    return log_file, [file_handler, recent_handler]
 
 # Setup file logging
-_log_file = setup_file_logging()
+_log_file, _file_log_handlers = setup_file_logging()
 
 # Configure structlog to use standard library logging
 structlog.configure(
@@ -233,7 +206,9 @@ structlog_console_formatter = structlog.stdlib.ProcessorFormatter(
     ],
 )
 structlog_console_handler.setFormatter(structlog_console_formatter)
-root_logger.addHandler(structlog_console_handler)
+
+# All handlers run on a listener thread; the event loop only enqueues records
+install_log_pipeline(_file_log_handlers + [structlog_console_handler], root_logger)
 
 # Ensure structlog loggers respect the level
 structlog_logger = logging.getLogger("structlog")
@@ -244,6 +219,8 @@ logger = structlog.get_logger()
 # Configuration
 POLL_INTERVAL_SECONDS = 30  # Legacy - kept for backward compatibility
 SCAN_INTERVAL_SECONDS = int(os.getenv("SCAN_INTERVAL_SECONDS", "60"))  # Main scan interval (default 60 seconds)
+SCAN_CONCURRENCY = int(os.getenv("SCAN_CONCURRENCY", "8"))  # Markets scanned in parallel per cycle (1 = serial scan)
+SCAN_BUDGET_FRACTION = float(os.getenv("SCAN_BUDGET_FRACTION", "0.85"))  # Stop starting new market scans after this fraction of SCAN_INTERVAL_SECONDS
 MIN_WHALE_SCORE = float(os.getenv("MIN_WHALE_SCORE", "0.70"))  # Env-configurable
 MIN_ORDERBOOK_DEPTH_MULTIPLIER = 3.0
 CONFLICT_WINDOW_MINUTES = 5
@@ -404,13 +381,46 @@ MIN_CLUSTER_USD = float(os.getenv("MIN_CLUSTER_USD", "100.0"))
 API_MIN_SIZE_USD = float(os.getenv("API_MIN_SIZE_USD", "150"))  # API filter (raised from 1000 to reduce noise)
 SIGNAL_MIN_SIZE_USD = float(os.getenv("SIGNAL_MIN_SIZE_USD", "10000"))  # Signal gate (production threshold)
 MIN_SIZE_USD = SIGNAL_MIN_SIZE_USD  # Backward compatibility
+# Linear backoff step between midpoint retries; 0 under ENGINE_REPLAY (and in
+# replay.run_benchmark), where a miss is final and sleeping only skews the timings
+MIDPOINT_RETRY_BACKOFF_SEC = 0.0 if ENGINE_REPLAY else float(os.getenv("MIDPOINT_RETRY_BACKOFF_SEC", "0.5"))
 
 # State tracking
-whitelist_cache: Dict[str, Dict] = {}  # {wallet: {stats, score, category}}
+WHITELIST_CACHE_TTL_SEC = int(os.getenv("WHITELIST_CACHE_TTL_SEC", "1800"))  # Re-score a whale after this long
+WHITELIST_CACHE_MAX = int(os.getenv("WHITELIST_CACHE_MAX_ENTRIES", "50000"))  # LRU bound on scored wallets
+whitelist_cache = TTLCache("whale_whitelist", ttl=WHITELIST_CACHE_TTL_SEC, max_entries=WHITELIST_CACHE_MAX,
+                           negative_ttl=300)  # {wallet: {stats, score, category}}; fallback scores expire sooner
+
+# Trade ingestion: "poll" = fetch_recent_trades every SCAN_INTERVAL_SECONDS, "stream" = activity
+# websocket through trade_stream.TradeStream, "wallets" = /trades?user= per tracked wallet
+# through wallet_watch.WalletWatcher (paper trading path only; see start_trade_stream / start_wallet_watch)
+ENGINE_INGEST_MODE = os.getenv("ENGINE_INGEST_MODE", "poll").strip().lower()
+
+# Target whales for paper trading (comma-separated addresses)
+TRACKED_WALLETS = parse_wallets(os.getenv(
+    "TRACKED_WALLETS",
+    "0x507e52ef684ca2dd91f90a9d26d149dd3288beae,"
+    "0x9a6e69c9b012030c668397d8346b4d55dd8335b4,"
+    "0xfc25f141ed27bb1787338d2c4e7f51e3a15e1f7f"))
+TRACKED_WALLET_SET = set(TRACKED_WALLETS)
+WALLET_WATCH_INTERVAL_SEC = int(os.getenv("WALLET_WATCH_INTERVAL_SEC", "5"))  # Poll interval in wallets mode
+
+# Warm-start snapshot of lookup caches (whale scores, wallet stats, token ids, market metadata)
+CACHE_SNAPSHOT_PATH = os.getenv("CACHE_SNAPSHOT_PATH", "data/engine_cache_snapshot.json")
+CACHE_SNAPSHOT_INTERVAL_SEC = int(os.getenv("CACHE_SNAPSHOT_INTERVAL_SEC", "300"))  # 0 = disabled
+CACHE_SNAPSHOT_CACHES = [c.strip() for c in os.getenv(
+    "CACHE_SNAPSHOT_CACHES", "whale_whitelist,user_stats,market_tokens,condition_tokens,market_meta").split(",") if c.strip()]
+TRADE_CURSOR_PATH = os.getenv("TRADE_CURSOR_PATH", "data/trade_cursors.json")  # Per-market /trades high-water marks (saved with the snapshot)
+
 recent_signals: List[Dict] = []  # Track signals sent today
 daily_loss_usd = 0.0
 conflicting_whales: Dict[str, datetime] = {}  # {wallet: timestamp} for opposite side trades
 
+# Buffered daily logs (flushed by a background thread, see activity_sink)
+activity_sink = register_sink(ColumnarSink("activity", ACTIVITY_SCHEMA))
+signal_sink = register_sink(ColumnarSink("signals", SIGNAL_SCHEMA))
+status_sink = register_sink(LineSink("status"))
+
 # Whale clustering: group multiple trades from same wallet+market within time window
 CLUSTER_WINDOW_MINUTES = 5  # Reduced from 10 to 5 minutes
 CLUSTER_MIN_TRADES = int(os.getenv("CLUSTER_MIN_TRADES", "1"))  # Minimum trades required per cluster (env-configurable)
@@ -466,41 +476,55 @@ CALIBRATION_CYCLE_COUNT = 0  # Track cycles for periodic reporting
 whale_score_samples: List[Dict] = []  # Store {wallet, condition_id, trade_usd, whale_score} for all considered trades
 WHALE_SCORE_SAMPLES_MAX = 10000  # Limit memory usage
 
-# Trade deduplication cache (prevent re-processing same trades)
-SEEN_TRADE_KEYS: Set[str] = set()
-SEEN_TRADE_KEYS_MAX = 250000  # prevent unbounded memory
+# Trade deduplication (prevent re-processing same trades); oldest hour is forgotten first, never the whole set
+SEEN_TRADE_KEYS_MAX = int(os.getenv("SEEN_TRADE_KEYS_MAX", "250000"))  # prevent unbounded memory
+SEEN_TRADE_TTL_SEC = int(os.getenv("SEEN_TRADE_TTL_SEC", "86400"))  # Forget keys after this long
+SEEN_TRADE_BUCKET_SEC = int(os.getenv("SEEN_TRADE_BUCKET_SEC", "3600"))  # Generation size
+SEEN_TRADE_KEYS = TimeBucketedDedup(ttl_sec=SEEN_TRADE_TTL_SEC, bucket_sec=SEEN_TRADE_BUCKET_SEC,
+                                    max_keys=SEEN_TRADE_KEYS_MAX)
+
+_trade_stream: Optional[TradeStream] = None  # Set by start_trade_stream() in stream mode
+_wallet_watcher: Optional[WalletWatcher] = None  # Set by start_wallet_watch() in wallets mode
+
+# Tiered market polling (market_scheduler.py); MARKET_SCHEDULER=0 rescans the whole universe every cycle
+MARKET_SCHEDULER = env_bool("MARKET_SCHEDULER", True)
+market_scheduler: Optional[MarketScheduler] = MarketScheduler() if MARKET_SCHEDULER else None
 
 
 async def fetch_gamma_midpoint(condition_id: str) -> Optional[float]:
     """Last-ditch Gamma fetch by condition_id; returns None on any fail."""
+    cached = get_cached_market_quote(condition_id)
+    if cached and (cached.get("bestBid") or 0) > 0 and (cached.get("bestAsk") or 0) > 0:
+        return round((cached["bestBid"] + cached["bestAsk"]) / 2, 3)
     try:
-        async with aiohttp.ClientSession() as s:
-            url = f"https://gamma-api.polymarket.com/markets?conditionId={condition_id}"
-            async with s.get(url, headers=HEADERS, timeout=aiohttp.ClientTimeout(total=5)) as r:
-                if r.status != 200:
-                    return None
-                data = await r.json()
-                # Handle list or dict response
-                market = None
-                if isinstance(data, list) and len(data) > 0:
-                    market = data[0]
-                elif isinstance(data, dict) and "markets" in data and isinstance(data["markets"], list) and data["markets"]:
-                    market = data["markets"][0]
-                elif isinstance(data, dict) and "id" in data:
-                    market = data
-                
-                if not isinstance(market, dict):
-                    return None
-                
-                bid = float(market.get("bestBid", 0) or 0)
-                ask = float(market.get("bestAsk", 0) or 0)
-                if bid > 0 and ask > 0:
-                    return round((bid + ask) / 2, 3)
+        s = engine_session()
+        url = f"https://gamma-api.polymarket.com/markets?conditionId={condition_id}"
+        async with s.get(url, headers=HEADERS, timeout=aiohttp.ClientTimeout(total=5)) as r:
+            if r.status != 200:
+                return None
+            data = await r.json()
+            # Handle list or dict response
+            market = None
+            if isinstance(data, list) and len(data) > 0:
+                market = data[0]
+            elif isinstance(data, dict) and "markets" in data and isinstance(data["markets"], list) and data["markets"]:
+                market = data["markets"][0]
+            elif isinstance(data, dict) and "id" in data:
+                market = data
+            
+            if not isinstance(market, dict):
+                return None
+            
+            bid = float(market.get("bestBid", 0) or 0)
+            ask = float(market.get("bestAsk", 0) or 0)
+            if bid > 0 and ask > 0:
+                return round((bid + ask) / 2, 3)
     except Exception:
         pass
     return None
 
 
+@timed("orderbook_depth")
 async def get_orderbook_depth(session: aiohttp.ClientSession, condition_id: str, size: float) -> float:
     """
     Fetch orderbook depth for a condition.
@@ -524,12 +548,8 @@ async def get_orderbook_depth(session: aiohttp.ClientSession, condition_id: str,
 
 
 def append_status_line(status: str) -> None:
-    """Append a status line to the daily status log file."""
-    Path("logs").mkdir(exist_ok=True)
-    day = datetime.utcnow().strftime("%Y-%m-%d")
-    path = Path("logs") / f"status_{day}.log"
-    with path.open("a", encoding="utf-8") as f:
-        f.write(status.rstrip() + "\n")
+    """Append a status line to the daily status log file (buffered, flushed in the background)."""
+    status_sink.add(status)
 
 
 def infer_category_from_title_slug(title: str, slug: str) -> str | None:
@@ -633,14 +653,15 @@ def get_category_from_trade(trade: Dict) -> str:
         return "unknown"  # Default (never lie)
 
 
+@timed("whale_score")
 async def get_whale_with_score(session: aiohttp.ClientSession, wallet: str, category: str, trade_usd: float = 0.0) -> Optional[Dict]:
     """
     Fetch whale stats and compute score. Does NOT enforce whitelist gate.
     Returns whale dict with score, or None if stats cannot be fetched.
     """
     # Check cache first
-    if wallet in whitelist_cache:
-        whale = whitelist_cache[wallet]
+    whale = whitelist_cache.get(wallet)
+    if whale is not MISSING:
         return whale
     
     # Fetch stats
@@ -705,11 +726,12 @@ async def get_whale_with_score(session: aiohttp.ClientSession, wallet: str, cate
         "category": category
     }
     
-    whitelist_cache[wallet] = whale
+    whitelist_cache.set(wallet, whale, negative=bool(stats.get("stats_missing")))
     logger.debug("whale_score_computed", wallet=wallet[:20], score=score, category=category)
     return whale
 
 
+@timed("whale_score")
 async def ensure_whale_whitelisted(session: aiohttp.ClientSession, wallet: str, category: str, trade_usd: float = 0.0) -> Optional[Dict]:
     """
     Ensure whale is in whitelist cache. Fetch stats if needed.
@@ -722,8 +744,8 @@ async def ensure_whale_whitelisted(session: aiohttp.ClientSession, wallet: str,
         # This allows data collection while maintaining score accuracy
         pass  # Continue to fetch stats below
     
-    if wallet in whitelist_cache:
-        whale = whitelist_cache[wallet]
+    whale = whitelist_cache.get(wallet)
+    if whale is not MISSING:
         if WHITELIST_ONLY and whale["score"] < MIN_WHALE_SCORE:
             return None
         return whale
@@ -790,7 +812,7 @@ async def ensure_whale_whitelisted(session: aiohttp.ClientSession, wallet: str,
         "category": category
     }
     
-    whitelist_cache[wallet] = whale
+    whitelist_cache.set(wallet, whale, negative=bool(stats.get("stats_missing")))
     
     # Check score threshold
     if WHITELIST_ONLY and score < MIN_WHALE_SCORE:
@@ -985,18 +1007,28 @@ def calculate_discount(whale_entry_price: float, current_price: float, side: str
     return discount
 
 
-# Cache for market token IDs: condition_id -> list of clobTokenIds
-_market_token_cache: Dict[str, List[str]] = {}
+# Cache for market token IDs: condition_id -> list of clobTokenIds (and "{condition_id}_outcomes" -> outcomes)
+_market_token_cache = TTLCache("market_tokens", ttl=3600, max_entries=20000)
 
 
+@timed("token_id")
 async def get_token_id(condition_id: str, trade: Dict, session: aiohttp.ClientSession) -> Optional[str]:
     """
     Resolve token_id from condition_id and trade outcome using Gamma API.
     Uses clobTokenIds field from market data and matches trade outcome to outcomes list.
     """
+    # Seed from the scraper's batch market cache (filled by prefetch_market_metadata / fetch_top_markets)
+    token_ids = _market_token_cache.get(condition_id)
+    if token_ids is MISSING:
+        batched = get_cached_market_tokens(condition_id)
+        if batched and batched["token_ids"]:
+            token_ids = batched["token_ids"]
+            _market_token_cache[condition_id] = token_ids
+            if batched["outcomes"]:
+                _market_token_cache[f"{condition_id}_outcomes"] = batched["outcomes"]
+
     # Check cache first
-    if condition_id in _market_token_cache:
-        token_ids = _market_token_cache[condition_id]
+    if token_ids is not MISSING:
         # Get outcomes from cache if available, otherwise need to fetch
         outcomes = _market_token_cache.get(f"{condition_id}_outcomes", [])
         
@@ -1142,6 +1174,7 @@ def trade_key(trade: Dict) -> str:
     ])
 
 
+@timed("process_trade")
 async def process_trade(session: aiohttp.ClientSession, trade: Dict, market_category: Optional[str] = None, category_inferred: bool = False, market_obj: Optional[Dict] = None) -> Optional[Dict]:
     """
     Process a trade and generate signal if conditions are met.
@@ -1161,12 +1194,7 @@ async def process_trade(session: aiohttp.ClientSession, trade: Dict, market_cate
     if trade_wallet and trade_wallet != "unknown":
         trade_wallet_lower = trade_wallet.lower()
         # Check if this is one of the target whale addresses
-        target_whales = [
-            "0x507e52ef684ca2dd91f90a9d26d149dd3288beae",
-            "0x9a6e69c9b012030c668397d8346b4d55dd8335b4",
-            "0xfc25f141ed27bb1787338d2c4e7f51e3a15e1f7f"
-        ]
-        if trade_wallet_lower in [w.lower() for w in target_whales]:
+        if trade_wallet_lower in TRACKED_WALLET_SET:
             market_slug = trade.get("slug", "")[:60] if trade.get("slug") else "unknown"
             condition_id = trade.get("conditionId", "")[:20] if trade.get("conditionId") else "unknown"
             trade_value = (trade.get("size", 0) * trade.get("price", 0)) if trade.get("size") and trade.get("price") else 0
@@ -1411,31 +1439,32 @@ async def process_trade(session: aiohttp.ClientSession, trade: Dict, market_cate
     # Fetch midpoint price with retry logic (max 3 attempts)
     current_price = None
     max_retries = 3
-    for attempt in range(max_retries):
-        # Try CLOB midpoint endpoint first (most accurate)
-        current_price = await get_midpoint_price_cached(session, str(token_id))
-        if current_price is not None:
-            logger.debug("midpoint_fetched_clob",
-                        wallet=trade_wallet[:8],
-                        token_id=str(token_id)[:20],
-                        attempt=attempt + 1,
-                        midpoint=current_price)
-            break
-        
-        # Fallback to Gamma market midpoint if CLOB fails
-        if attempt < max_retries - 1 and condition_id:
-            current_price = await get_market_midpoint_cached(session, condition_id)
+    with stage("midpoint"):
+        for attempt in range(max_retries):
+            # Try CLOB midpoint endpoint first (most accurate)
+            current_price = await get_midpoint_price_cached(session, str(token_id))
             if current_price is not None:
-                logger.debug("midpoint_fetched_gamma",
+                logger.debug("midpoint_fetched_clob",
                             wallet=trade_wallet[:8],
-                            condition_id=condition_id[:20],
+                            token_id=str(token_id)[:20],
                             attempt=attempt + 1,
                             midpoint=current_price)
                 break
-        
-        # Wait before retry (exponential backoff)
-        if attempt < max_retries - 1:
-            await asyncio.sleep(0.5 * (attempt + 1))
+            
+            # Fallback to Gamma market midpoint if CLOB fails
+            if attempt < max_retries - 1 and condition_id:
+                current_price = await get_market_midpoint_cached(session, condition_id)
+                if current_price is not None:
+                    logger.debug("midpoint_fetched_gamma",
+                                wallet=trade_wallet[:8],
+                                condition_id=condition_id[:20],
+                                attempt=attempt + 1,
+                                midpoint=current_price)
+                    break
+            
+            # Wait before retry (exponential backoff)
+            if attempt < max_retries - 1 and MIDPOINT_RETRY_BACKOFF_SEC > 0:
+                await asyncio.sleep(MIDPOINT_RETRY_BACKOFF_SEC * (attempt + 1))
     
     if current_price is None:
         rejected_discount_missing += 1
@@ -1932,6 +1961,7 @@ async def add_trade_to_cluster(session: aiohttp.ClientSession, trade: Dict, whal
     return None
 
 
+@timed("generate_cluster_signal")
 async def generate_cluster_signal(session: aiohttp.ClientSession, cluster: Dict) -> Optional[Dict]:
     """Generate signal from a completed whale cluster. Returns None if filters fail."""
     
@@ -1983,11 +2013,12 @@ async def generate_cluster_signal(session: aiohttp.ClientSession, cluster: Dict)
         return None
     
     # Fetch midpoint price: try CLOB first, fallback to Gamma market bestBid/bestAsk
-    current_price = await get_midpoint_price_cached(session, str(token_id))
-    
-    # Fallback to Gamma market midpoint if CLOB fails
-    if current_price is None and condition_id:
-        current_price = await get_market_midpoint_cached(session, condition_id)
+    with stage("midpoint"):
+        current_price = await get_midpoint_price_cached(session, str(token_id))
+        
+        # Fallback to Gamma market midpoint if CLOB fails
+        if current_price is None and condition_id:
+            current_price = await get_market_midpoint_cached(session, condition_id)
     
     if current_price is None:
         logger.debug("cluster_rejected", reason="rejected_discount_missing", 
@@ -2069,7 +2100,8 @@ async def generate_cluster_signal(session: aiohttp.ClientSession, cluster: Dict)
     market_meta = None
     if condition_id:
         try:
-            market_meta = await fetch_market_metadata_by_condition(session, condition_id)
+            with stage("market_metadata"):
+                market_meta = await fetch_market_metadata_by_condition(session, condition_id)
         except Exception as e:
             logger.debug("market_metadata_fetch_failed", condition_id=condition_id[:20], error=str(e))
     
@@ -2309,67 +2341,20 @@ def log_calibration_histogram():
 
 
 def log_all_activity(market_id: str, whale_wallet: str, score: float, discount: Optional[float], size_usd: float):
-    """Log ALL whale activity for analysis, not just signals."""
-    log_dir = os.path.join(os.path.dirname(__file__), "..", "..", "logs")
-    os.makedirs(log_dir, exist_ok=True)
-    
-    today = datetime.now().strftime("%Y-%m-%d")
-    path = os.path.join(log_dir, f"activity_{today}.csv")
-    
-    file_exists = os.path.exists(path)
-    
-    with open(path, "a", newline="") as f:
-        writer = csv.writer(f)
-        if not file_exists:  # Write header if new file
-            writer.writerow(["timestamp", "market_id", "wallet", "score", "discount_pct", "size_usd"])
-        # Handle None discount (log as empty string or 0.0 for CSV compatibility)
-        discount_value = discount if discount is not None else ""
-        writer.writerow([datetime.now().isoformat(), market_id, whale_wallet, score, discount_value, size_usd])
-
-
-def _csv_clean(v):
-    """Clean a value for CSV writing: convert to string, remove newlines, handle dicts/lists."""
-    if v is None:
-        return ""
-    if isinstance(v, (dict, list)):
-        v = json.dumps(v, ensure_ascii=False)
-    else:
-        v = str(v)
-    # Replace newlines and carriage returns with spaces to prevent CSV corruption
-    return v.replace("\r", " ").replace("\n", " ")
+    """Log ALL whale activity for analysis, not just signals (buffered, see activity_sink)."""
+    activity_sink.add({
+        "timestamp": datetime.now(),
+        "market_id": market_id,
+        "wallet": whale_wallet,
+        "score": score,
+        "discount_pct": discount,  # None stays empty in CSV / null in Arrow
+        "size_usd": size_usd,
+    })
 
 
 def log_signal_to_csv(signal: Dict):
-    """Log signal to CSV file with bulletproof CSV writing."""
-    log_dir = os.path.join(os.path.dirname(__file__), "..", "..", "logs")
-    os.makedirs(log_dir, exist_ok=True)
-    
-    date_str = datetime.now().strftime("%Y-%m-%d")
-    log_file = os.path.join(log_dir, f"signals_{date_str}.csv")
-    
-    file_exists = os.path.exists(log_file)
-    
-    with open(log_file, "a", newline="", encoding="utf-8") as f:
-        fieldnames = [
-            "timestamp", "wallet", "whale_score", "category", "market", "slug",
-            "condition_id", "market_id", "side", "phase",
-            "whale_entry_price", "current_price", "discount_pct",
-            "size", "trade_value_usd", "orderbook_depth_ratio", "transaction_hash",
-            "cluster_trades_count", "cluster_window_minutes"
-        ]
-        # Use QUOTE_MINIMAL for proper quoting and extrasaction="ignore" to ignore extra fields
-        writer = csv.DictWriter(f, fieldnames=fieldnames, extrasaction="ignore", quoting=csv.QUOTE_MINIMAL)
-        
-        if not file_exists:
-            writer.writeheader()
-        
-        logger.debug("CSV_WRITE_ATTEMPT", row=signal)
-        # Clean all values: convert to strings, remove newlines, handle dicts/lists
-        safe_row = {k: _csv_clean(signal.get(k, "")) for k in fieldnames}
-        writer.writerow(safe_row)
-        f.flush()
-        os.fsync(f.fileno())
-        logger.debug("CSV_WRITE_DONE", file=log_file)
+    """Log signal to the daily signals sink (CSV export + Arrow, flushed in the background)."""
+    signal_sink.add(signal)
 
 
 def audit_data_quality():
@@ -2382,6 +2367,7 @@ def audit_data_quality():
     
     date_str = datetime.now().strftime("%Y-%m-%d")
     signals_file = os.path.join(log_dir, f"signals_{date_str}.csv")
+    signal_sink.flush()  # include rows still buffered
     
     if not os.path.exists(signals_file):
         logger.debug("audit_skipped", reason="no_signals_file", file=signals_file)
@@ -2533,6 +2519,681 @@ log_dir = os.path.join(os.path.dirname(__file__), "..", "..", "logs")
 os.makedirs(log_dir, exist_ok=True)
 signal_store = SignalStore()
 
+@timed("scan_market")
+async def scan_market(session: aiohttp.ClientSession, m: Dict) -> int:
+    """
+    Scan ONE market: expiry/metadata gate, fetch its trades and run them through process_trade.
+    Safe to run concurrently for many markets on the shared session (counters are plain
+    module globals mutated without awaits in between, so the asyncio scheduler keeps them exact).
+    Returns number of trades passed to process_trade.
+    """
+    global rejected_below_cluster_min, rejected_low_discount, rejected_score_missing
+    global rejected_discount_missing, signals_generated, trades_considered
+    
+    processed = 0
+
+    # Initialize safe_vars BEFORE try block - always exists for exception handler
+    safe_vars = {"wallet": "unknown", "condition_id": "unknown"}
+    # Update condition_id from market
+    safe_vars["condition_id"] = m.get("conditionId") or m.get("condition_id") or "unknown"
+    try:
+        event_id = m.get("conditionId") or m.get("condition_id")  # conditionId (0x...) used as 'market' param in Data-API
+        if not event_id:
+            market_info = m.get("title") or m.get("slug") or m.get("market") or "unknown"
+            logger.debug("market_missing_conditionId", market_title=market_info[:50])
+            return processed
+
+        # Extract category from market object (once, before processing trades)
+        market_title = (m.get("title") or m.get("question") or m.get("name") or "").strip()
+        market_slug = (m.get("slug") or "").strip()
+        market_category = (m.get("category") or m.get("marketCategory") or "").strip().lower()
+
+        # Nested event / events fallback
+        ev = m.get("event") if isinstance(m.get("event"), dict) else {}
+        if not market_category:
+            market_category = str(ev.get("category") or "").strip().lower()
+
+        evs = m.get("events") or []
+        if not market_category and evs and isinstance(evs, list) and len(evs) > 0:
+            ev0 = evs[0] if isinstance(evs[0], dict) else {}
+            market_category = str(ev0.get("category") or "").strip().lower()
+
+        if not market_category:
+            market_category = "unknown"
+
+        # Infer category from title/slug if API didn't provide one
+        category_inferred = False
+        if market_category == "unknown":
+            inferred = infer_category_from_title_slug(market_title, market_slug)
+            if inferred:
+                market_category = inferred
+                category_inferred = True
+
+        # Debug log for unknown categories to discover available fields
+        if market_category == "unknown":
+            candidate_keys = ["tags", "groupSlug", "eventSlug", "marketType", "category", "raw_category", "marketCategory"]
+            available_fields = {}
+            for key in candidate_keys:
+                val = m.get(key)
+                if val:
+                    available_fields[key] = str(val)[:50]  # Truncate long values
+            # Also check nested event fields
+            evs = m.get("events") or []
+            if evs and isinstance(evs, list) and len(evs) > 0:
+                ev0 = evs[0] if isinstance(evs[0], dict) else {}
+                for key in candidate_keys:
+                    val = ev0.get(key)
+                    if val:
+                        available_fields[f"event.{key}"] = str(val)[:50]
+
+            logger.debug("market_category_debug",
+                       category="unknown",
+                       title=market_title[:100] if market_title else "",
+                       slug=market_slug[:50] if market_slug else "",
+                       available_fields=available_fields if available_fields else "none",
+                       market_keys=list(m.keys())[:20])
+
+        # Check if we already have expiry from market object (best-effort parsing)
+        dte_from_market = _days_to_expiry(m)
+
+        # Validate condition_id before fetching metadata (real Polymarket conditionIds are longer)
+        if len(event_id) < 20 or not event_id.startswith("0x"):
+            # Bad condition_id - only keep if we already determined expiry from market object
+            if dte_from_market is None:
+                logger.info("bad_condition_id_no_expiry",
+                            market_title=m.get("title", m.get("slug", "unknown"))[:50],
+                            condition_id=event_id[:30],
+                            strict_short_term=STRICT_SHORT_TERM)
+                if STRICT_SHORT_TERM:
+                    logger.debug("market_rejected_expiry",
+                                market_title=m.get("title", m.get("slug", "unknown"))[:50],
+                                condition_id=event_id[:30],
+                                reason="expiry_unknown_bad_condition_id")
+                    return processed
+                # Non-strict mode: keep market and continue processing
+            else:
+                # Expiry known from market object - apply window filter
+                if dte_from_market > MAX_DAYS_TO_EXPIRY:
+                    logger.debug("market_rejected_expiry",
+                                market_title=m.get("title", m.get("slug", "unknown"))[:50],
+                                condition_id=event_id[:30],
+                                days_to_expiry=dte_from_market,
+                                max_days=MAX_DAYS_TO_EXPIRY,
+                                reason="too_long")
+                    return processed
+                if dte_from_market * 24.0 < MIN_HOURS_TO_EXPIRY:
+                    logger.debug("market_rejected_expiry",
+                                market_title=m.get("title", m.get("slug", "unknown"))[:50],
+                                condition_id=event_id[:30],
+                                days_to_expiry=dte_from_market,
+                                min_hours=MIN_HOURS_TO_EXPIRY,
+                                reason="too_close")
+                    return processed
+                # Market passes expiry filter - continue processing trades
+        else:
+            # Fetch full market metadata to get expiry (only if not already determined from market object)
+            if dte_from_market is None:
+                market_meta = await fetch_market_metadata_by_condition(session, event_id)
+                if market_meta:
+                    # Try to get expiry from full metadata
+                    dte_from_meta = _days_to_expiry(market_meta)
+                    if dte_from_meta is not None:
+                        # Apply expiry filter using full metadata (only when expiry is reliably known)
+                        if dte_from_meta > MAX_DAYS_TO_EXPIRY:
+                            logger.debug("market_rejected_expiry_from_metadata",
+                                        market_title=market_meta.get("title", m.get("title", "unknown"))[:50],
+                                        condition_id=event_id[:30],
+                                        days_to_expiry=dte_from_meta,
+                                        max_days=MAX_DAYS_TO_EXPIRY,
+                                        reason="too_long")
+                            return processed
+                        if dte_from_meta * 24.0 < MIN_HOURS_TO_EXPIRY:
+                            logger.debug("market_rejected_expiry_from_metadata",
+                                        market_title=market_meta.get("title", m.get("title", "unknown"))[:50],
+                                        condition_id=event_id[:30],
+                                        days_to_expiry=dte_from_meta,
+                                        min_hours=MIN_HOURS_TO_EXPIRY,
+                                        reason="too_close")
+                            return processed
+                        # Expiry found and within limits - keep market
+                    else:
+                        # Expiry missing after full fetch - check STRICT_SHORT_TERM
+                        logger.info("market_expiry_unknown",
+                                    market_title=market_meta.get("title", m.get("title", "unknown"))[:50],
+                                    condition_id=event_id[:30],
+                                    strict_short_term=STRICT_SHORT_TERM)
+                        if STRICT_SHORT_TERM:
+                            logger.debug("market_rejected_expiry",
+                                        market_title=market_meta.get("title", m.get("title", "unknown"))[:50],
+                                        condition_id=event_id[:30],
+                                        reason="expiry_unknown")
+                            return processed
+                        # Non-strict mode: continue processing
+                else:
+                    # Metadata fetch failed - check STRICT_SHORT_TERM
+                    logger.info("market_expiry_unknown",
+                                condition_id=event_id[:30],
+                                market_title=m.get("title", m.get("slug", "unknown"))[:50],
+                                strict_short_term=STRICT_SHORT_TERM,
+                                note="metadata_fetch_failed")
+                    if STRICT_SHORT_TERM:
+                        logger.debug("market_rejected_expiry",
+                                    condition_id=event_id[:30],
+                                    market_title=m.get("title", m.get("slug", "unknown"))[:50],
+                                    reason="expiry_unknown_metadata_fetch_failed")
+                        return processed
+                    # Non-strict mode: continue processing
+            else:
+                # Expiry already determined from market object - apply window filter if needed
+                if dte_from_market > MAX_DAYS_TO_EXPIRY:
+                    logger.debug("market_rejected_expiry",
+                                market_title=m.get("title", m.get("slug", "unknown"))[:50],
+                                condition_id=event_id[:30],
+                                days_to_expiry=dte_from_market,
+                                max_days=MAX_DAYS_TO_EXPIRY,
+                                reason="too_long")
+                    return processed
+                if dte_from_market * 24.0 < MIN_HOURS_TO_EXPIRY:
+                    logger.debug("market_rejected_expiry",
+                                market_title=m.get("title", m.get("slug", "unknown"))[:50],
+                                condition_id=event_id[:30],
+                                days_to_expiry=dte_from_market,
+                                min_hours=MIN_HOURS_TO_EXPIRY,
+                                reason="too_close")
+                    return processed
+                # Market passes expiry filter - continue processing
+
+        # Fetch trades for this market (probe API params to find correct scoping)
+        # Extract market_id from market object (trades may identify by market_id, not just condition_id)
+        market_id = m.get("id") or m.get("marketId") or m.get("market_id")
+
+        # condition_id MUST be full 66-char hex (0x + 64 chars)
+        requested_condition_id = event_id  # This must be the full one logged in scan_summary
+        if not isinstance(requested_condition_id, str) or len(requested_condition_id) < 60:
+            logger.error("bad_requested_condition_id",
+                       condition_id=requested_condition_id,
+                       condition_id_len=len(str(requested_condition_id)),
+                       market_title=m.get("title", "unknown")[:50])
+            return processed
+
+        # Probe API params to find correct scoping (verifies trades match requested condition_id)
+        trades = await fetch_trades_scanned(
+            session,
+            market_id=str(market_id) if market_id is not None else None,
+            condition_id=str(requested_condition_id) if requested_condition_id is not None else None,
+            api_min_size_usd=API_MIN_SIZE_USD,
+            pages=3,
+            limit=100,
+        )
+
+        # IMPORTANT: Convert to list immediately to prevent iterator consumption
+        # (logging/debugging can consume generators, leaving empty list for processing)
+        trades = list(trades) if trades else []
+
+        # Process each trade (use API_MIN_SIZE_USD filter, clustering happens inside process_trade)
+        for trade in trades:
+            # Update wallet in safe_vars dict for exception handling
+            safe_vars["wallet"] = trade.get("proxyWallet") or trade.get("wallet") or trade.get("makerAddress") or "unknown"
+            # DEDUPE: skip duplicate trades (prevent re-processing same trades)
+            if SEEN_TRADE_KEYS.seen(trade_key(trade), event_time(trade.get("timestamp") or trade.get("createdAt"))):
+                continue  # Skip already processed trades
+
+            # DO NOT reject here — clustering happens inside process_trade()
+            # Only apply the cheap API_MIN_SIZE_USD filter before calling process_trade.
+            size = trade.get("size", 0.0)
+            price = trade.get("price", 0.0)
+            size_usd = size * price
+
+            if size_usd < API_MIN_SIZE_USD:
+                continue  # Skip trades below API filter threshold
+
+            trades_considered += 1
+            # Category already extracted from market object above (with inference fallback)
+            # Pass it to process_trade along with inferred flag and market object for expiry check
+            signal = await process_trade(session, trade, market_category=market_category, category_inferred=category_inferred, market_obj=m)
+            processed += 1
+
+            if signal:
+                # Final validation: reject if score or discount is None
+                if signal.get("whale_score") is None:
+                    rejected_score_missing += 1
+                    logger.debug("signal_rejected", reason="rejected_score_missing", wallet=signal.get("wallet", "unknown")[:8])
+                    continue
+
+                if signal.get("discount_pct") is None:
+                    rejected_discount_missing += 1
+                    logger.debug("signal_rejected", reason="rejected_discount_missing", wallet=signal.get("wallet", "unknown")[:8])
+                    continue
+
+                # Check cluster minimum trades (bypass if enabled)
+                bypass_cluster = os.getenv("BYPASS_CLUSTER_MIN", "False") == "True"
+                trade_count = signal.get("cluster_trades_count", 0)
+                min_trades = int(os.getenv("CLUSTER_MIN_TRADES", "1"))
+
+                logger.debug("signal_cluster_bypass_check",
+                            bypass_enabled=bypass_cluster,
+                            trade_count=trade_count,
+                            required=min_trades)
+
+                if not bypass_cluster and trade_count < min_trades:
+                    rejected_below_cluster_min += 1
+                    logger.debug("signal_rejected", reason="below_cluster_min", 
+                               trade_count=trade_count,
+                               required=min_trades,
+                               wallet=signal.get("wallet", "unknown")[:8])
+                    continue
+
+                # Hard de-dupe cooldown: prevent repeated alerts on same market/outcome
+                # Include wallet in dedupe key to allow multiple distinct whales on same market/side
+                event_id_for_dedup = signal.get("condition_id") or signal.get("market_id") or event_id
+                outcome_index_for_dedup = signal.get("outcome_index") or (trade.get("outcomeIndex") if 'trade' in locals() else None)
+                side_for_dedup = signal.get("side", "BUY")
+                wallet_for_dedup = signal.get("wallet", "unknown")[:10] if signal.get("wallet") else "unknown"
+                dedup_key = (event_id_for_dedup, outcome_index_for_dedup, side_for_dedup, wallet_for_dedup)
+                now_ts = time()
+                last_signal_time = _recent_signal_keys.get(dedup_key)
+
+                if last_signal_time and (now_ts - last_signal_time) < SIGNAL_COOLDOWN_SECONDS:
+                    rejected_other_reasons["signal_deduped"] = rejected_other_reasons.get("signal_deduped", 0) + 1
+                    logger.debug("signal_deduped", 
+                               key=str(dedup_key), 
+                               age_sec=int(now_ts - last_signal_time),
+                               event_id=event_id_for_dedup[:20] if event_id_for_dedup else None)
+                    continue
+
+                # Record this signal timestamp
+                _recent_signal_keys[dedup_key] = now_ts
+
+                signals_generated += 1
+
+                # Compute confidence from whale_score
+                whale_score = signal.get("whale_score")
+                if whale_score is not None:
+                    try:
+                        confidence = int(round(float(whale_score) * 100))
+                    except Exception:
+                        confidence = 0
+                else:
+                    confidence = signal.get("confidence", 0)
+
+                # Add confidence to signal dict
+                signal["confidence"] = confidence
+
+                # Log signal to CSV
+                log_signal_to_csv(signal)
+
+                # Store signal in SQLite database
+                signal_id = await signal_store.insert_signal_async(signal)
+                recent_signals.append(signal)
+
+                # Paper trading: create paper trade if enabled and all filters pass
+                if PAPER_TRADING and signal_id and should_paper_trade(confidence):
+                    # Apply paper trading filters for fast feedback
+                    skip_reasons = []
+
+                    # Filter 1: days_to_expiry must be present and <= PAPER_MAX_DTE_DAYS
+                    days_to_expiry = signal.get("days_to_expiry")
+                    if days_to_expiry is None:
+                        skip_reasons.append("days_to_expiry_missing")
+                    elif days_to_expiry > PAPER_MAX_DTE_DAYS:
+                        skip_reasons.append(f"days_to_expiry_too_long_{days_to_expiry:.1f}d")
+                        logger.warning("paper_trade_rejected_days_to_expiry",
+                                    wallet=signal.get("wallet", "")[:16] if signal.get("wallet") else "unknown",
+                                    market=signal.get("market", "")[:60],
+                                    days_to_expiry=days_to_expiry,
+                                    max_dte_days=PAPER_MAX_DTE_DAYS,
+                                    reason="days_to_expiry_exceeds_paper_max",
+                                    filter_type="PAPER_MAX_DTE_DAYS",
+                                    config_value=PAPER_MAX_DTE_DAYS)
+
+                    # Filter 2: discount_pct must be present and >= PAPER_MIN_DISCOUNT_PCT
+                    discount_pct = signal.get("discount_pct")
+                    if discount_pct is None:
+                        skip_reasons.append("discount_pct_missing")
+                        logger.warning("paper_trade_rejected_discount_missing",
+                                    wallet=signal.get("wallet", "")[:16] if signal.get("wallet") else "unknown",
+                                    market=signal.get("market", "")[:60],
+                                    reason="discount_pct_missing",
+                                    filter_type="PAPER_MIN_DISCOUNT_PCT")
+                    elif discount_pct < PAPER_MIN_DISCOUNT_PCT:
+                        skip_reasons.append(f"discount_too_low_{discount_pct:.6f}")
+                        logger.warning("paper_trade_rejected_discount_too_low",
+                                    wallet=signal.get("wallet", "")[:16] if signal.get("wallet") else "unknown",
+                                    market=signal.get("market", "")[:60],
+                                    discount_pct=discount_pct,
+                                    min_discount_pct=PAPER_MIN_DISCOUNT_PCT,
+                                    reason="discount_below_minimum",
+                                    filter_type="PAPER_MIN_DISCOUNT_PCT",
+                                    config_value=PAPER_MIN_DISCOUNT_PCT)
+
+                    # Filter 3: trade_value_usd must be >= PAPER_MIN_TRADE_USD
+                    trade_value_usd = signal.get("trade_value_usd")
+                    if trade_value_usd is None:
+                        skip_reasons.append("trade_value_usd_missing")
+                        logger.warning("paper_trade_rejected_trade_value_missing",
+                                    wallet=signal.get("wallet", "")[:16] if signal.get("wallet") else "unknown",
+                                    market=signal.get("market", "")[:60],
+                                    reason="trade_value_usd_missing",
+                                    filter_type="PAPER_MIN_TRADE_USD")
+                    elif trade_value_usd < PAPER_MIN_TRADE_USD:
+                        skip_reasons.append(f"trade_value_too_low_{trade_value_usd:.2f}")
+                        logger.warning("paper_trade_rejected_trade_value_too_low",
+                                    wallet=signal.get("wallet", "")[:16] if signal.get("wallet") else "unknown",
+                                    market=signal.get("market", "")[:60],
+                                    trade_value_usd=trade_value_usd,
+                                    min_trade_usd=PAPER_MIN_TRADE_USD,
+                                    reason="trade_value_below_minimum",
+                                    filter_type="PAPER_MIN_TRADE_USD",
+                                    config_value=PAPER_MIN_TRADE_USD)
+
+                    # If any filter fails, skip paper trade creation
+                    if skip_reasons:
+                        logger.warning(  # Changed from debug to warning for visibility
+                            "paper_trade_rejected",
+                            signal_id=signal_id,
+                            wallet=signal.get("wallet", "")[:16] if signal.get("wallet") else "unknown",
+                            market=signal.get("market", "")[:60],
+                            confidence=confidence,
+                            reasons=", ".join(skip_reasons),  # Join for readability
+                            days_to_expiry=days_to_expiry,
+                            discount_pct=discount_pct,
+                            trade_value_usd=trade_value_usd,
+                            max_dte_days=PAPER_MAX_DTE_DAYS,
+                            min_discount_pct=PAPER_MIN_DISCOUNT_PCT,
+                            min_trade_usd=PAPER_MIN_TRADE_USD,
+                            min_confidence=PAPER_MIN_CONFIDENCE,
+                        )
+                    else:
+                        # All filters passed - create paper trade
+                        # Calculate stake from confidence (stake_eur_from_confidence handles threshold)
+                        from src.polymarket.paper_trading import stake_eur_from_confidence
+                        stake_eur = round(stake_eur_from_confidence(confidence), 2)
+
+                        # Skip if stake is 0 (confidence too low)
+                        if stake_eur <= 0:
+                            logger.debug(
+                                "paper_trade_skipped",
+                                signal_id=signal_id,
+                                confidence=confidence,
+                                reason="stake_zero_below_threshold",
+                            )
+                        else:
+                            # Check if there's already an open paper trade for this market
+                            condition_id_for_check = signal.get("condition_id") or signal.get("event_id") or event_id
+                            if condition_id_for_check and signal_store.has_open_paper_trade(condition_id_for_check):
+                                logger.warning(
+                                    "paper_trade_rejected_open_trade_exists",
+                                    signal_id=signal_id,
+                                    wallet=signal.get("wallet", "")[:16] if signal.get("wallet") else "unknown",
+                                    market=signal.get("market", "")[:60],
+                                    condition_id=condition_id_for_check[:20],
+                                    reason="open_trade_exists_for_market",
+                                )
+                            else:
+                                # Create paper trade with confidence-based stake
+                                trade_dict = open_paper_trade(signal, confidence=confidence)
+                                trade_dict["signal_id"] = signal_id
+                                trade_dict["days_to_expiry"] = days_to_expiry
+
+                                # Insert paper trade (pass computed stake_eur)
+                                trade_id = await signal_store.insert_paper_trade_async(
+                                    signal_id, signal, stake_eur, FX_EUR_USD
+                                )
+
+                                if trade_id:
+                                    # Notify paper trade opened
+                                    try:
+                                        from src.polymarket.telegram import send_telegram
+                                        telegram_msg = format_paper_trade_telegram(trade_dict=trade_dict)
+                                        send_telegram(telegram_msg)
+                                    except Exception as e:
+                                        logger.warning("paper_trade_telegram_failed",
+                                                     wallet=trade_dict.get("wallet", "unknown")[:16] if trade_dict else "unknown",
+                                                     condition_id=trade_dict.get("condition_id", "unknown")[:20] if trade_dict else "unknown",
+                                                     trade_id=trade_id,
+                                                     error=str(e)[:100])
+
+                # Market/outcome dedupe check: prevent duplicate alerts for same market+outcome
+                market_id = signal.get("market_id") or signal.get("condition_id") or event_id
+                outcome_index = signal.get("outcome_index")
+                dedupe_key = (market_id, outcome_index)
+                now_ts = time()
+
+                # Check if we've alerted on this market/outcome recently
+                if dedupe_key in _market_outcome_alerts:
+                    last_alert = _market_outcome_alerts[dedupe_key]
+                    if now_ts - last_alert < SIGNAL_COOLDOWN_SECONDS:
+                        # Skip - still in cooldown
+                        logger.debug("signal_deduped", 
+                                   market_id=market_id[:20] if market_id else "unknown",
+                                   outcome_index=outcome_index,
+                                   time_since_last=now_ts - last_alert,
+                                   cooldown=SIGNAL_COOLDOWN_SECONDS)
+                        continue
+
+                # --- HARD DISCOUNT GATE (normalize keys) - BEFORE ROLLUP ---
+                try:
+                    min_low_discount = float(os.getenv("MIN_LOW_DISCOUNT", "0.02"))
+                except Exception:
+                    min_low_discount = 0.02
+
+                # Your signal objects might use `discount` or `discount_pct` key
+                signal_discount = signal.get("discount_pct", None)
+                if signal_discount is None:
+                    signal_discount = signal.get("discount", None)
+
+                # If still missing, treat as 0 (reject)
+                try:
+                    signal_discount = float(signal_discount) if signal_discount is not None else 0.0
+                except Exception:
+                    signal_discount = 0.0
+
+                if signal_discount < min_low_discount:
+                    # Track rejection (rejected_low_discount is already declared as global at top of main_loop)
+                    rejected_low_discount += 1
+                    logger.info("rejected_low_discount",
+                               discount=signal_discount,
+                               min_low_discount=min_low_discount,
+                               market=(signal.get("market") or "")[:80],
+                               wallet=signal.get("wallet"))
+                    continue
+                # --- END GATE ---
+
+                # Rollup whale signals instead of sending immediately
+                # (Only signals that passed the discount gate above reach here)
+                condition_id_for_rollup = signal.get("condition_id") or signal.get("event_id") or event_id
+                if condition_id_for_rollup:
+                    r = _whale_rollup[condition_id_for_rollup]
+                    r["market"] = signal.get("market", r["market"])
+                    r["outcome_name"] = signal.get("outcome_name", r["outcome_name"])
+                    r["wallets"].add(signal.get("wallet", "unknown"))
+                    r["trades"] += 1
+                    trade_usd = float(signal.get("trade_value_usd") or signal.get("total_usd") or 0.0)
+                    r["total_usd"] += trade_usd
+                    r["max_trade_usd"] = max(r["max_trade_usd"], trade_usd)
+                    # Store dedupe key for this rollup
+                    r["dedupe_key"] = dedupe_key
+                    # Track minimum discount in rollup (for filtering when flushing)
+                    # Ensure signal_discount is a float (already computed above)
+                    d = float(signal_discount) if signal_discount is not None else 0.0
+                    cur = r.get("min_discount")
+                    r["min_discount"] = d if cur is None else min(cur, d)
+                else:
+                    # No condition_id - send immediately (shouldn't happen)
+                    notify_signal(signal)
+                    # Mark as alerted
+                    _market_outcome_alerts[dedupe_key] = now_ts
+
+                # Periodic stats update (every 10 signals or 15 min)
+                stats.bump(extra_line="signal recorded")
+
+                # Console log with debug info for discount diagnosis
+                signal_wallet = signal.get('wallet', 'unknown')
+                # Add debug fields to help diagnose negative discount issue
+                logger.info("signal_generated", 
+                           wallet=signal_wallet[:20] if signal_wallet else "unknown",
+                           discount=signal['discount_pct'],
+                           market=signal['market'][:50],
+                           event_id=event_id,
+                           side=signal.get('side', 'unknown'),
+                           trade_price=signal.get('whale_entry_price'),
+                           midpoint=signal.get('current_price'),
+                           cluster_trades_count=signal.get('cluster_trades_count', 1),
+                           outcome_index=trade.get('outcomeIndex') if 'trade' in locals() else None,
+                           outcome_name=trade.get('outcome') if 'trade' in locals() else None,
+                           token_id=signal.get('token_id'))  # Use token_id from signal dict (the one we actually used)
+
+                # Signal notification already sent via notify_signal() above
+    except Exception as e:
+        # NEVER let the error logger crash the engine
+        # Use direct dict access, never reference 'wallet' as a variable name
+        try:
+            # Access safe_vars directly - it's always initialized before try block
+            wallet_val = safe_vars.get("wallet", "unknown")
+            condition_val = safe_vars.get("condition_id", "unknown")
+        except Exception:
+            # If safe_vars doesn't exist somehow, use defaults
+            wallet_val = "unknown"
+            condition_val = "unknown"
+
+        try:
+            logger.error(
+                "market_processing_error",
+                extra={
+                    "event": "market_processing_error",
+                    "wallet": wallet_val,
+                    "condition_id": condition_val,
+                    "error": str(e),
+                }
+            )
+        except Exception:
+            # last resort: swallow logging failures
+            pass
+
+        return processed
+    return processed
+
+
+async def fetch_market_universe(session: aiohttp.ClientSession) -> Tuple[List[Dict], List[Dict]]:
+    """Top markets from Gamma and the subset passing the expiry window: (markets, filtered_markets)."""
+    # Fetch many markets to increase chance of finding short-term ones
+    # Use reasonable page size (200) and fetch multiple pages if needed
+    # Note: "closingSoon" order causes 422 error, so we use "volume" (default)
+    markets = await fetch_top_markets(session, limit=200, offset=0, order="volume", pages=2 if PRODUCTION_MODE else 3)
+    
+    if not markets:
+        return [], []
+    
+    logger.info("fetched_markets", count=len(markets))
+    
+    # Filter markets by expiry time (same-day / 1-2 day markets only)
+    # Try expiry from market object first (best-effort parsing)
+    filtered_markets = []
+    for m in markets:
+        # Try to get expiry directly from market object (many endpoints include endDate/closeTime)
+        dte = _days_to_expiry(m)
+        
+        if dte is None:
+            # Expiry missing from market object - log and check STRICT_SHORT_TERM
+            logger.info("market_expiry_unknown",
+                        market_title=m.get("title", m.get("slug", "unknown"))[:50],
+                        condition_id=m.get("conditionId", "unknown")[:20],
+                        strict_short_term=STRICT_SHORT_TERM)
+            if STRICT_SHORT_TERM:
+                # Reject markets with unknown expiry in strict mode
+                logger.debug("market_rejected_expiry",
+                            market_title=m.get("title", m.get("slug", "unknown"))[:50],
+                            condition_id=m.get("conditionId", "unknown")[:20],
+                            reason="expiry_unknown")
+                continue
+            # Non-strict mode: keep market for now, will try metadata fetch later
+            filtered_markets.append(m)
+            continue
+        
+        # Expiry found - apply window filter
+        if dte > MAX_DAYS_TO_EXPIRY:
+            # Too long - skip this market
+            logger.debug("market_rejected_expiry",
+                        market_title=m.get("title", m.get("slug", "unknown"))[:50],
+                        condition_id=m.get("conditionId", "unknown")[:20],
+                        days_to_expiry=dte,
+                        max_days=MAX_DAYS_TO_EXPIRY,
+                        reason="too_long")
+            continue
+        if dte * 24.0 < MIN_HOURS_TO_EXPIRY:
+            # Too close / already ending - skip this market
+            logger.debug("market_rejected_expiry",
+                        market_title=m.get("title", m.get("slug", "unknown"))[:50],
+                        condition_id=m.get("conditionId", "unknown")[:20],
+                        days_to_expiry=dte,
+                        min_hours=MIN_HOURS_TO_EXPIRY,
+                        reason="too_close")
+            continue
+        # Market passes expiry filter
+        filtered_markets.append(m)
+    
+    logger.info("markets_after_expiry_filter",
+               fetched=len(markets),
+               filtered=len(filtered_markets),
+               max_days=MAX_DAYS_TO_EXPIRY,
+               min_hours=MIN_HOURS_TO_EXPIRY,
+               strict_short_term=STRICT_SHORT_TERM)
+    return markets, filtered_markets
+
+
+async def scan_scheduled_market(session: aiohttp.ClientSession, m: Dict) -> int:
+    """scan_market() for the market scheduler: reports the market's activity back so it is re-tiered."""
+    condition_id = m.get("conditionId") or m.get("condition_id") or ""
+    try:
+        processed = await scan_market(session, m)
+    except Exception as e:
+        logger.warning("market_scan_failed", condition_id=condition_id[:20], error=str(e))
+        return 0
+    cursor = trade_cursor(condition_id)
+    suffix = f":{condition_id}"
+    market_scheduler.record(
+        condition_id,
+        rate=cursor.rate if cursor else None,
+        last_trade_ts=cursor.last_ts if cursor else None,
+        whale=any(key.endswith(suffix) for key in whale_clusters),
+    )
+    return processed
+
+
+async def scan_markets_concurrently(session: aiohttp.ClientSession, markets: List[Dict], deadline: float) -> Tuple[int, int]:
+    """
+    Scan markets with a bounded pool of SCAN_CONCURRENCY workers sharing one session.
+    Workers stop picking up new markets once `deadline` (epoch seconds) has passed so a slow
+    API cannot push the cycle past its interval. Returns (trades_processed, markets_skipped).
+    """
+    pending = iter(markets)
+    totals = {"processed": 0, "scanned": 0}
+
+    async def _worker() -> None:
+        for m in pending:
+            if time() >= deadline:
+                return
+            totals["scanned"] += 1
+            try:
+                totals["processed"] += await scan_market(session, m)
+            except Exception as e:
+                logger.warning("market_scan_failed",
+                               condition_id=(m.get("conditionId") or "unknown")[:20],
+                               error=str(e))
+
+    workers = max(1, min(SCAN_CONCURRENCY, len(markets)))
+    await asyncio.gather(*(_worker() for _ in range(workers)))
+
+    skipped = len(markets) - totals["scanned"]
+    if skipped:
+        logger.warning("market_scan_budget_exhausted",
+                       scanned=totals["scanned"],
+                       skipped=skipped,
+                       concurrency=workers,
+                       overrun_seconds=round(time() - deadline, 1))
+    return totals["processed"], skipped
+
+
 async def main_loop():
     """Main polling loop - polls top markets by volume (gamma-api → conditionId bridge)."""
     # Declare global counters at function start (required for all scopes in this function)
@@ -2573,10 +3234,23 @@ async def main_loop():
     # Track last heartbeat time
     last_heartbeat = time()
     
+    # Track last cache snapshot time
+    last_cache_snapshot = time()
+    
     # Track last dashboard time
     last_dashboard = time()
     
-    async with aiohttp.ClientSession() as session:
+    # Scan session: the shared HTTP client (per-host rate limits, retries, per-endpoint
+    # metrics; http_client.py); ENGINE_CAPTURE / ENGINE_REPLAY record its responses or
+    # serve them offline (replay.py)
+    async with open_session() as session:
+        # ENGINE_INGEST_MODE=stream: websocket trades replace the fetch_recent_trades poll below
+        trade_stream = await start_trade_stream(session)
+        last_stream_stats = time()
+        # ENGINE_INGEST_MODE=wallets: only the tracked wallets' own trades are fetched
+        wallet_watcher = start_wallet_watch()
+        poll_interval = WALLET_WATCH_INTERVAL_SEC if wallet_watcher is not None else SCAN_INTERVAL_SECONDS
+        
         while True:
             cycle_started = time()
             try:
@@ -2601,19 +3275,42 @@ async def main_loop():
                 if PAPER_TRADING:
                     # Initialize total_trades_processed for paper trading mode (same as regular mode)
                     total_trades_processed = 0
+                    # Stream mode runs one cycle per ~linger-window batch; its per-cycle lines go to
+                    # DEBUG and trade_stream_stats carries the batch counts every heartbeat interval
+                    cycle_log = logger.debug if trade_stream is not None else logger.info
                     
-                    # Fetch recent trades without market filtering (like Phase 2 WebSocket approach)
-                    # Lower min_size_usd to catch more trades (API filter, not our filter)
-                    recent_trades = await fetch_recent_trades(session, min_size_usd=API_MIN_SIZE_USD, limit=500)
+                    if trade_stream is not None:
+                        # Streamed trades: returns as soon as trades arrive (waits at most one scan interval)
+                        recent_trades = await trade_stream.next_batch(max_wait=SCAN_INTERVAL_SECONDS)
+                        if (time() - last_stream_stats) >= HEARTBEAT_INTERVAL_SECONDS:
+                            logger.info("trade_stream_stats", **trade_stream.stats())
+                            last_stream_stats = time()
+                    elif wallet_watcher is not None:
+                        # One /trades?user= request per tracked wallet (more only if it traded a lot)
+                        recent_trades = await wallet_watcher.poll(session)
+                        if (time() - last_stream_stats) >= HEARTBEAT_INTERVAL_SECONDS:
+                            logger.info("wallet_watch_stats", **wallet_watcher.stats())
+                            last_stream_stats = time()
+                    else:
+                        # Fetch recent trades without market filtering (like Phase 2 WebSocket approach)
+                        # Lower min_size_usd to catch more trades (API filter, not our filter)
+                        recent_trades = await fetch_recent_trades(session, min_size_usd=API_MIN_SIZE_USD, limit=500)
                     
                     if not recent_trades:
-                        logger.info("no_recent_trades_found", api_min_size_usd=API_MIN_SIZE_USD)
-                        elapsed = time() - cycle_started
-                        sleep_for = max(0, SCAN_INTERVAL_SECONDS - elapsed)
-                        await asyncio.sleep(sleep_for)
+                        logger.info("no_recent_trades_found", api_min_size_usd=API_MIN_SIZE_USD, ingest_mode=ENGINE_INGEST_MODE)
+                        last_cache_snapshot = await persist_cache_snapshot_if_due(last_cache_snapshot)
+                        await finish_paper_cycle(cycle_started, poll_interval, streaming=trade_stream is not None)
                         continue
                     
-                    logger.info("fetched_recent_trades", count=len(recent_trades), api_min_size_usd=API_MIN_SIZE_USD)
+                    cycle_log("fetched_recent_trades", count=len(recent_trades), api_min_size_usd=API_MIN_SIZE_USD,
+                                ingest_mode=ENGINE_INGEST_MODE)
+                    
+                    # Resolve metadata for every market in this batch with multi-ID Gamma requests
+                    # (instead of one round trip per trade inside the loop below)
+                    await prefetch_market_metadata(
+                        session,
+                        (t.get("conditionId") or t.get("condition_id") or "" for t in recent_trades),
+                    )
                     
                     # Process trades directly (no market filtering needed)
                     safe_vars = {"wallet": "unknown", "condition_id": "unknown"}  # Initialize safe_vars
@@ -2622,14 +3319,8 @@ async def main_loop():
                         safe_vars["wallet"] = trade.get("proxyWallet") or trade.get("wallet") or trade.get("makerAddress") or "unknown"
                         
                         # DEDUPE: skip duplicate trades
-                        k = trade_key(trade)
-                        if k in SEEN_TRADE_KEYS:
+                        if SEEN_TRADE_KEYS.seen(trade_key(trade), event_time(trade.get("timestamp") or trade.get("createdAt"))):
                             continue
-                        SEEN_TRADE_KEYS.add(k)
-                        
-                        # Prevent unbounded memory growth
-                        if len(SEEN_TRADE_KEYS) > SEEN_TRADE_KEYS_MAX:
-                            SEEN_TRADE_KEYS.clear()
                         
                         # Extract wallet and condition_id early (needed for error handling)
                         trade_wallet = trade.get("proxyWallet") or trade.get("wallet") or trade.get("makerAddress", "")
@@ -2672,13 +3363,8 @@ async def main_loop():
                         # (trade_wallet already extracted above)
                         if trade_wallet:
                             trade_wallet_lower = trade_wallet.lower()
-                            target_whales = [
-                                "0x507e52ef684ca2dd91f90a9d26d149dd3288beae",
-                                "0x9a6e69c9b012030c668397d8346b4d55dd8335b4",
-                                "0xfc25f141ed27bb1787338d2c4e7f51e3a15e1f7f"
-                            ]
                             # Skip processing if not a target whale (saves API calls)
-                            if trade_wallet_lower not in [w.lower() for w in target_whales]:
+                            if trade_wallet_lower not in TRACKED_WALLET_SET:
                                 continue  # Skip non-target whales in paper trading mode
                         
                         # Process trade (will filter by target whales inside process_trade)
@@ -2779,7 +3465,7 @@ async def main_loop():
                             log_signal_to_csv(signal)
                             
                             # Store signal in SQLite database
-                            signal_id = signal_store.insert_signal(signal)
+                            signal_id = await signal_store.insert_signal_async(signal)
                             
                             # Compute paper trading filter inputs BEFORE decision gate
                             days_to_expiry = signal.get("days_to_expiry")
@@ -2925,7 +3611,7 @@ async def main_loop():
                                 reason = ""
                                 if trade_dict:
                                     from src.polymarket.paper_trading import FX_EUR_USD
-                                    trade_id = signal_store.insert_paper_trade(
+                                    trade_id = await signal_store.insert_paper_trade_async(
                                         signal_id=signal_id,
                                         signal_dict=signal,
                                         stake_eur=trade_dict["stake_eur"],
@@ -2979,636 +3665,58 @@ async def main_loop():
                                           signal_id=signal_id)
                     
                     # Log processing summary for paper trading mode (same format as regular mode)
-                    logger.info("processing_complete",
-                               markets=0,  # No markets scanned in paper trading mode
-                               trades_processed=total_trades_processed)
+                    cycle_log("processing_complete",
+                              markets=0,  # No markets scanned in paper trading mode
+                              trades_processed=total_trades_processed)
+                    
+                    # Paper/stream/wallets cycles never reach the tail below, so snapshot here too
+                    last_cache_snapshot = await persist_cache_snapshot_if_due(last_cache_snapshot)
                     
                     # Skip market-by-market scanning in paper trading mode
-                    elapsed = time() - cycle_started
-                    sleep_for = max(0, SCAN_INTERVAL_SECONDS - elapsed)
-                    await asyncio.sleep(sleep_for)
+                    # (stream mode goes straight back to waiting on the queue)
+                    await finish_paper_cycle(cycle_started, poll_interval, streaming=trade_stream is not None)
                     continue
                 
                 # REGULAR MODE: Fetch top markets by volume (gamma-api → conditionId bridge)
-                # Fetch many markets to increase chance of finding short-term ones
-                # Use reasonable page size (200) and fetch multiple pages if needed
-                # Note: "closingSoon" order causes 422 error, so we use "volume" (default)
-                markets = await fetch_top_markets(session, limit=200, offset=0, order="volume", pages=2 if PRODUCTION_MODE else 3)
-                
-                if not markets:
-                    logger.warning("no_markets_found")
-                    # Still sleep for full scan interval even if no markets found
-                    elapsed = time() - cycle_started
-                    sleep_for = max(0, SCAN_INTERVAL_SECONDS - elapsed)
-                    await asyncio.sleep(sleep_for)
-                    continue
-                
-                logger.info("fetched_markets", count=len(markets))
-                
-                # Filter markets by expiry time (same-day / 1-2 day markets only)
-                # Try expiry from market object first (best-effort parsing)
-                filtered_markets = []
-                for m in markets:
-                    # Try to get expiry directly from market object (many endpoints include endDate/closeTime)
-                    dte = _days_to_expiry(m)
+                # With the market scheduler the universe is only re-fetched every MARKET_UNIVERSE_REFRESH_SEC
+                if market_scheduler is None or market_scheduler.needs_refresh():
+                    markets, filtered_markets = await fetch_market_universe(session)
                     
-                    if dte is None:
-                        # Expiry missing from market object - log and check STRICT_SHORT_TERM
-                        logger.info("market_expiry_unknown",
-                                    market_title=m.get("title", m.get("slug", "unknown"))[:50],
-                                    condition_id=m.get("conditionId", "unknown")[:20],
-                                    strict_short_term=STRICT_SHORT_TERM)
-                        if STRICT_SHORT_TERM:
-                            # Reject markets with unknown expiry in strict mode
-                            logger.debug("market_rejected_expiry",
-                                        market_title=m.get("title", m.get("slug", "unknown"))[:50],
-                                        condition_id=m.get("conditionId", "unknown")[:20],
-                                        reason="expiry_unknown")
-                            continue
-                        # Non-strict mode: keep market for now, will try metadata fetch later
-                        filtered_markets.append(m)
+                    if not markets:
+                        logger.warning("no_markets_found")
+                        # Still sleep for full scan interval even if no markets found
+                        elapsed = time() - cycle_started
+                        sleep_for = max(0, SCAN_INTERVAL_SECONDS - elapsed)
+                        await asyncio.sleep(sleep_for)
                         continue
                     
-                    # Expiry found - apply window filter
-                    if dte > MAX_DAYS_TO_EXPIRY:
-                        # Too long - skip this market
-                        logger.debug("market_rejected_expiry",
-                                    market_title=m.get("title", m.get("slug", "unknown"))[:50],
-                                    condition_id=m.get("conditionId", "unknown")[:20],
-                                    days_to_expiry=dte,
-                                    max_days=MAX_DAYS_TO_EXPIRY,
-                                    reason="too_long")
-                        continue
-                    if dte * 24.0 < MIN_HOURS_TO_EXPIRY:
-                        # Too close / already ending - skip this market
-                        logger.debug("market_rejected_expiry",
-                                    market_title=m.get("title", m.get("slug", "unknown"))[:50],
-                                    condition_id=m.get("conditionId", "unknown")[:20],
-                                    days_to_expiry=dte,
-                                    min_hours=MIN_HOURS_TO_EXPIRY,
-                                    reason="too_close")
-                        continue
-                    # Market passes expiry filter
-                    filtered_markets.append(m)
+                    if market_scheduler is not None:
+                        logger.info("market_universe_refreshed",
+                                    **market_scheduler.refresh(filtered_markets, days_to_expiry=_days_to_expiry))
                 
-                logger.info("markets_after_expiry_filter",
-                           fetched=len(markets),
-                           filtered=len(filtered_markets),
-                           max_days=MAX_DAYS_TO_EXPIRY,
-                           min_hours=MIN_HOURS_TO_EXPIRY,
-                           strict_short_term=STRICT_SHORT_TERM)
                 
                 # 2. Poll trades for each market using conditionId
-                total_trades_processed = 0
-                for m in filtered_markets:
-                    # Initialize safe_vars BEFORE try block - always exists for exception handler
-                    safe_vars = {"wallet": "unknown", "condition_id": "unknown"}
-                    # Update condition_id from market
-                    safe_vars["condition_id"] = m.get("conditionId") or m.get("condition_id") or "unknown"
-                    try:
-                        event_id = m.get("conditionId") or m.get("condition_id")  # conditionId (0x...) used as 'market' param in Data-API
-                        if not event_id:
-                            market_info = m.get("title") or m.get("slug") or m.get("market") or "unknown"
-                            logger.debug("market_missing_conditionId", market_title=market_info[:50])
-                            continue
-                        
-                        # Extract category from market object (once, before processing trades)
-                        market_title = (m.get("title") or m.get("question") or m.get("name") or "").strip()
-                        market_slug = (m.get("slug") or "").strip()
-                        market_category = (m.get("category") or m.get("marketCategory") or "").strip().lower()
-                        
-                        # Nested event / events fallback
-                        ev = m.get("event") if isinstance(m.get("event"), dict) else {}
-                        if not market_category:
-                            market_category = str(ev.get("category") or "").strip().lower()
-                        
-                        evs = m.get("events") or []
-                        if not market_category and evs and isinstance(evs, list) and len(evs) > 0:
-                            ev0 = evs[0] if isinstance(evs[0], dict) else {}
-                            market_category = str(ev0.get("category") or "").strip().lower()
-                        
-                        if not market_category:
-                            market_category = "unknown"
-                        
-                        # Infer category from title/slug if API didn't provide one
-                        category_inferred = False
-                        if market_category == "unknown":
-                            inferred = infer_category_from_title_slug(market_title, market_slug)
-                            if inferred:
-                                market_category = inferred
-                                category_inferred = True
-                        
-                        # Debug log for unknown categories to discover available fields
-                        if market_category == "unknown":
-                            candidate_keys = ["tags", "groupSlug", "eventSlug", "marketType", "category", "raw_category", "marketCategory"]
-                            available_fields = {}
-                            for key in candidate_keys:
-                                val = m.get(key)
-                                if val:
-                                    available_fields[key] = str(val)[:50]  # Truncate long values
-                            # Also check nested event fields
-                            evs = m.get("events") or []
-                            if evs and isinstance(evs, list) and len(evs) > 0:
-                                ev0 = evs[0] if isinstance(evs[0], dict) else {}
-                                for key in candidate_keys:
-                                    val = ev0.get(key)
-                                    if val:
-                                        available_fields[f"event.{key}"] = str(val)[:50]
-                            
-                            logger.debug("market_category_debug",
-                                       category="unknown",
-                                       title=market_title[:100] if market_title else "",
-                                       slug=market_slug[:50] if market_slug else "",
-                                       available_fields=available_fields if available_fields else "none",
-                                       market_keys=list(m.keys())[:20])
-                        
-                        # Check if we already have expiry from market object (best-effort parsing)
-                        dte_from_market = _days_to_expiry(m)
-                        
-                        # Validate condition_id before fetching metadata (real Polymarket conditionIds are longer)
-                        if len(event_id) < 20 or not event_id.startswith("0x"):
-                            # Bad condition_id - only keep if we already determined expiry from market object
-                            if dte_from_market is None:
-                                logger.info("bad_condition_id_no_expiry",
-                                            market_title=m.get("title", m.get("slug", "unknown"))[:50],
-                                            condition_id=event_id[:30],
-                                            strict_short_term=STRICT_SHORT_TERM)
-                                if STRICT_SHORT_TERM:
-                                    logger.debug("market_rejected_expiry",
-                                                market_title=m.get("title", m.get("slug", "unknown"))[:50],
-                                                condition_id=event_id[:30],
-                                                reason="expiry_unknown_bad_condition_id")
-                                    continue
-                                # Non-strict mode: keep market and continue processing
-                            else:
-                                # Expiry known from market object - apply window filter
-                                if dte_from_market > MAX_DAYS_TO_EXPIRY:
-                                    logger.debug("market_rejected_expiry",
-                                                market_title=m.get("title", m.get("slug", "unknown"))[:50],
-                                                condition_id=event_id[:30],
-                                                days_to_expiry=dte_from_market,
-                                                max_days=MAX_DAYS_TO_EXPIRY,
-                                                reason="too_long")
-                                    continue
-                                if dte_from_market * 24.0 < MIN_HOURS_TO_EXPIRY:
-                                    logger.debug("market_rejected_expiry",
-                                                market_title=m.get("title", m.get("slug", "unknown"))[:50],
-                                                condition_id=event_id[:30],
-                                                days_to_expiry=dte_from_market,
-                                                min_hours=MIN_HOURS_TO_EXPIRY,
-                                                reason="too_close")
-                                    continue
-                                # Market passes expiry filter - continue processing trades
-                        else:
-                            # Fetch full market metadata to get expiry (only if not already determined from market object)
-                            if dte_from_market is None:
-                                market_meta = await fetch_market_metadata_by_condition(session, event_id)
-                                if market_meta:
-                                    # Try to get expiry from full metadata
-                                    dte_from_meta = _days_to_expiry(market_meta)
-                                    if dte_from_meta is not None:
-                                        # Apply expiry filter using full metadata (only when expiry is reliably known)
-                                        if dte_from_meta > MAX_DAYS_TO_EXPIRY:
-                                            logger.debug("market_rejected_expiry_from_metadata",
-                                                        market_title=market_meta.get("title", m.get("title", "unknown"))[:50],
-                                                        condition_id=event_id[:30],
-                                                        days_to_expiry=dte_from_meta,
-                                                        max_days=MAX_DAYS_TO_EXPIRY,
-                                                        reason="too_long")
-                                            continue
-                                        if dte_from_meta * 24.0 < MIN_HOURS_TO_EXPIRY:
-                                            logger.debug("market_rejected_expiry_from_metadata",
-                                                        market_title=market_meta.get("title", m.get("title", "unknown"))[:50],
-                                                        condition_id=event_id[:30],
-                                                        days_to_expiry=dte_from_meta,
-                                                        min_hours=MIN_HOURS_TO_EXPIRY,
-                                                        reason="too_close")
-                                            continue
-                                        # Expiry found and within limits - keep market
-                                    else:
-                                        # Expiry missing after full fetch - check STRICT_SHORT_TERM
-                                        logger.info("market_expiry_unknown",
-                                                    market_title=market_meta.get("title", m.get("title", "unknown"))[:50],
-                                                    condition_id=event_id[:30],
-                                                    strict_short_term=STRICT_SHORT_TERM)
-                                        if STRICT_SHORT_TERM:
-                                            logger.debug("market_rejected_expiry",
-                                                        market_title=market_meta.get("title", m.get("title", "unknown"))[:50],
-                                                        condition_id=event_id[:30],
-                                                        reason="expiry_unknown")
-                                            continue
-                                        # Non-strict mode: continue processing
-                                else:
-                                    # Metadata fetch failed - check STRICT_SHORT_TERM
-                                    logger.info("market_expiry_unknown",
-                                                condition_id=event_id[:30],
-                                                market_title=m.get("title", m.get("slug", "unknown"))[:50],
-                                                strict_short_term=STRICT_SHORT_TERM,
-                                                note="metadata_fetch_failed")
-                                    if STRICT_SHORT_TERM:
-                                        logger.debug("market_rejected_expiry",
-                                                    condition_id=event_id[:30],
-                                                    market_title=m.get("title", m.get("slug", "unknown"))[:50],
-                                                    reason="expiry_unknown_metadata_fetch_failed")
-                                        continue
-                                    # Non-strict mode: continue processing
-                            else:
-                                # Expiry already determined from market object - apply window filter if needed
-                                if dte_from_market > MAX_DAYS_TO_EXPIRY:
-                                    logger.debug("market_rejected_expiry",
-                                                market_title=m.get("title", m.get("slug", "unknown"))[:50],
-                                                condition_id=event_id[:30],
-                                                days_to_expiry=dte_from_market,
-                                                max_days=MAX_DAYS_TO_EXPIRY,
-                                                reason="too_long")
-                                    continue
-                                if dte_from_market * 24.0 < MIN_HOURS_TO_EXPIRY:
-                                    logger.debug("market_rejected_expiry",
-                                                market_title=m.get("title", m.get("slug", "unknown"))[:50],
-                                                condition_id=event_id[:30],
-                                                days_to_expiry=dte_from_market,
-                                                min_hours=MIN_HOURS_TO_EXPIRY,
-                                                reason="too_close")
-                                    continue
-                                # Market passes expiry filter - continue processing
-                        
-                        # Fetch trades for this market (probe API params to find correct scoping)
-                        # Extract market_id from market object (trades may identify by market_id, not just condition_id)
-                        market_id = m.get("id") or m.get("marketId") or m.get("market_id")
-                        
-                        # condition_id MUST be full 66-char hex (0x + 64 chars)
-                        requested_condition_id = event_id  # This must be the full one logged in scan_summary
-                        if not isinstance(requested_condition_id, str) or len(requested_condition_id) < 60:
-                            logger.error("bad_requested_condition_id",
-                                       condition_id=requested_condition_id,
-                                       condition_id_len=len(str(requested_condition_id)),
-                                       market_title=m.get("title", "unknown")[:50])
-                            continue
-                        
-                        # Probe API params to find correct scoping (verifies trades match requested condition_id)
-                        trades = await fetch_trades_scanned(
-                            session,
-                            market_id=str(market_id) if market_id is not None else None,
-                            condition_id=str(requested_condition_id) if requested_condition_id is not None else None,
-                            api_min_size_usd=API_MIN_SIZE_USD,
-                            pages=3,
-                            limit=100,
-                        )
-                        
-                        # IMPORTANT: Convert to list immediately to prevent iterator consumption
-                        # (logging/debugging can consume generators, leaving empty list for processing)
-                        trades = list(trades) if trades else []
-                        
-                        # Process each trade (use API_MIN_SIZE_USD filter, clustering happens inside process_trade)
-                        for trade in trades:
-                            # Update wallet in safe_vars dict for exception handling
-                            safe_vars["wallet"] = trade.get("proxyWallet") or trade.get("wallet") or trade.get("makerAddress") or "unknown"
-                            # DEDUPE: skip duplicate trades (prevent re-processing same trades)
-                            k = trade_key(trade)
-                            if k in SEEN_TRADE_KEYS:
-                                continue  # Skip already processed trades
-                            SEEN_TRADE_KEYS.add(k)
-                            
-                            # Prevent unbounded memory growth
-                            if len(SEEN_TRADE_KEYS) > SEEN_TRADE_KEYS_MAX:
-                                SEEN_TRADE_KEYS.clear()
-                            
-                            # DO NOT reject here — clustering happens inside process_trade()
-                            # Only apply the cheap API_MIN_SIZE_USD filter before calling process_trade.
-                            size = trade.get("size", 0.0)
-                            price = trade.get("price", 0.0)
-                            size_usd = size * price
-                            
-                            if size_usd < API_MIN_SIZE_USD:
-                                continue  # Skip trades below API filter threshold
-                            
-                            trades_considered += 1
-                            # Category already extracted from market object above (with inference fallback)
-                            # Pass it to process_trade along with inferred flag and market object for expiry check
-                            signal = await process_trade(session, trade, market_category=market_category, category_inferred=category_inferred, market_obj=m)
-                            total_trades_processed += 1
-                            
-                            if signal:
-                                # Final validation: reject if score or discount is None
-                                if signal.get("whale_score") is None:
-                                    rejected_score_missing += 1
-                                    logger.debug("signal_rejected", reason="rejected_score_missing", wallet=signal.get("wallet", "unknown")[:8])
-                                    continue
-                                
-                                if signal.get("discount_pct") is None:
-                                    rejected_discount_missing += 1
-                                    logger.debug("signal_rejected", reason="rejected_discount_missing", wallet=signal.get("wallet", "unknown")[:8])
-                                    continue
-                                
-                                # Check cluster minimum trades (bypass if enabled)
-                                bypass_cluster = os.getenv("BYPASS_CLUSTER_MIN", "False") == "True"
-                                trade_count = signal.get("cluster_trades_count", 0)
-                                min_trades = int(os.getenv("CLUSTER_MIN_TRADES", "1"))
-                                
-                                logger.debug("signal_cluster_bypass_check",
-                                            bypass_enabled=bypass_cluster,
-                                            trade_count=trade_count,
-                                            required=min_trades)
-                                
-                                if not bypass_cluster and trade_count < min_trades:
-                                    rejected_below_cluster_min += 1
-                                    logger.debug("signal_rejected", reason="below_cluster_min", 
-                                               trade_count=trade_count,
-                                               required=min_trades,
-                                               wallet=signal.get("wallet", "unknown")[:8])
-                                    continue
-                                
-                                # Hard de-dupe cooldown: prevent repeated alerts on same market/outcome
-                                # Include wallet in dedupe key to allow multiple distinct whales on same market/side
-                                event_id_for_dedup = signal.get("condition_id") or signal.get("market_id") or event_id
-                                outcome_index_for_dedup = signal.get("outcome_index") or (trade.get("outcomeIndex") if 'trade' in locals() else None)
-                                side_for_dedup = signal.get("side", "BUY")
-                                wallet_for_dedup = signal.get("wallet", "unknown")[:10] if signal.get("wallet") else "unknown"
-                                dedup_key = (event_id_for_dedup, outcome_index_for_dedup, side_for_dedup, wallet_for_dedup)
-                                now_ts = time()
-                                last_signal_time = _recent_signal_keys.get(dedup_key)
-                                
-                                if last_signal_time and (now_ts - last_signal_time) < SIGNAL_COOLDOWN_SECONDS:
-                                    rejected_other_reasons["signal_deduped"] = rejected_other_reasons.get("signal_deduped", 0) + 1
-                                    logger.debug("signal_deduped", 
-                                               key=str(dedup_key), 
-                                               age_sec=int(now_ts - last_signal_time),
-                                               event_id=event_id_for_dedup[:20] if event_id_for_dedup else None)
-                                    continue
-                                
-                                # Record this signal timestamp
-                                _recent_signal_keys[dedup_key] = now_ts
-                                
-                                signals_generated += 1
-                                
-                                # Compute confidence from whale_score
-                                whale_score = signal.get("whale_score")
-                                if whale_score is not None:
-                                    try:
-                                        confidence = int(round(float(whale_score) * 100))
-                                    except Exception:
-                                        confidence = 0
-                                else:
-                                    confidence = signal.get("confidence", 0)
-                                
-                                # Add confidence to signal dict
-                                signal["confidence"] = confidence
-                                
-                                # Log signal to CSV
-                                log_signal_to_csv(signal)
-                                
-                                # Store signal in SQLite database
-                                signal_id = signal_store.insert_signal(signal)
-                                recent_signals.append(signal)
-                                
-                                # Paper trading: create paper trade if enabled and all filters pass
-                                if PAPER_TRADING and signal_id and should_paper_trade(confidence):
-                                    # Apply paper trading filters for fast feedback
-                                    skip_reasons = []
-                                    
-                                    # Filter 1: days_to_expiry must be present and <= PAPER_MAX_DTE_DAYS
-                                    days_to_expiry = signal.get("days_to_expiry")
-                                    if days_to_expiry is None:
-                                        skip_reasons.append("days_to_expiry_missing")
-                                    elif days_to_expiry > PAPER_MAX_DTE_DAYS:
-                                        skip_reasons.append(f"days_to_expiry_too_long_{days_to_expiry:.1f}d")
-                                        logger.warning("paper_trade_rejected_days_to_expiry",
-                                                    wallet=signal.get("wallet", "")[:16] if signal.get("wallet") else "unknown",
-                                                    market=signal.get("market", "")[:60],
-                                                    days_to_expiry=days_to_expiry,
-                                                    max_dte_days=PAPER_MAX_DTE_DAYS,
-                                                    reason="days_to_expiry_exceeds_paper_max",
-                                                    filter_type="PAPER_MAX_DTE_DAYS",
-                                                    config_value=PAPER_MAX_DTE_DAYS)
-                                    
-                                    # Filter 2: discount_pct must be present and >= PAPER_MIN_DISCOUNT_PCT
-                                    discount_pct = signal.get("discount_pct")
-                                    if discount_pct is None:
-                                        skip_reasons.append("discount_pct_missing")
-                                        logger.warning("paper_trade_rejected_discount_missing",
-                                                    wallet=signal.get("wallet", "")[:16] if signal.get("wallet") else "unknown",
-                                                    market=signal.get("market", "")[:60],
-                                                    reason="discount_pct_missing",
-                                                    filter_type="PAPER_MIN_DISCOUNT_PCT")
-                                    elif discount_pct < PAPER_MIN_DISCOUNT_PCT:
-                                        skip_reasons.append(f"discount_too_low_{discount_pct:.6f}")
-                                        logger.warning("paper_trade_rejected_discount_too_low",
-                                                    wallet=signal.get("wallet", "")[:16] if signal.get("wallet") else "unknown",
-                                                    market=signal.get("market", "")[:60],
-                                                    discount_pct=discount_pct,
-                                                    min_discount_pct=PAPER_MIN_DISCOUNT_PCT,
-                                                    reason="discount_below_minimum",
-                                                    filter_type="PAPER_MIN_DISCOUNT_PCT",
-                                                    config_value=PAPER_MIN_DISCOUNT_PCT)
-                                    
-                                    # Filter 3: trade_value_usd must be >= PAPER_MIN_TRADE_USD
-                                    trade_value_usd = signal.get("trade_value_usd")
-                                    if trade_value_usd is None:
-                                        skip_reasons.append("trade_value_usd_missing")
-                                        logger.warning("paper_trade_rejected_trade_value_missing",
-                                                    wallet=signal.get("wallet", "")[:16] if signal.get("wallet") else "unknown",
-                                                    market=signal.get("market", "")[:60],
-                                                    reason="trade_value_usd_missing",
-                                                    filter_type="PAPER_MIN_TRADE_USD")
-                                    elif trade_value_usd < PAPER_MIN_TRADE_USD:
-                                        skip_reasons.append(f"trade_value_too_low_{trade_value_usd:.2f}")
-                                        logger.warning("paper_trade_rejected_trade_value_too_low",
-                                                    wallet=signal.get("wallet", "")[:16] if signal.get("wallet") else "unknown",
-                                                    market=signal.get("market", "")[:60],
-                                                    trade_value_usd=trade_value_usd,
-                                                    min_trade_usd=PAPER_MIN_TRADE_USD,
-                                                    reason="trade_value_below_minimum",
-                                                    filter_type="PAPER_MIN_TRADE_USD",
-                                                    config_value=PAPER_MIN_TRADE_USD)
-                                    
-                                    # If any filter fails, skip paper trade creation
-                                    if skip_reasons:
-                                        logger.warning(  # Changed from debug to warning for visibility
-                                            "paper_trade_rejected",
-                                            signal_id=signal_id,
-                                            wallet=signal.get("wallet", "")[:16] if signal.get("wallet") else "unknown",
-                                            market=signal.get("market", "")[:60],
-                                            confidence=confidence,
-                                            reasons=", ".join(skip_reasons),  # Join for readability
-                                            days_to_expiry=days_to_expiry,
-                                            discount_pct=discount_pct,
-                                            trade_value_usd=trade_value_usd,
-                                            max_dte_days=PAPER_MAX_DTE_DAYS,
-                                            min_discount_pct=PAPER_MIN_DISCOUNT_PCT,
-                                            min_trade_usd=PAPER_MIN_TRADE_USD,
-                                            min_confidence=PAPER_MIN_CONFIDENCE,
-                                        )
-                                    else:
-                                        # All filters passed - create paper trade
-                                        # Calculate stake from confidence (stake_eur_from_confidence handles threshold)
-                                        from src.polymarket.paper_trading import stake_eur_from_confidence
-                                        stake_eur = round(stake_eur_from_confidence(confidence), 2)
-                                        
-                                        # Skip if stake is 0 (confidence too low)
-                                        if stake_eur <= 0:
-                                            logger.debug(
-                                                "paper_trade_skipped",
-                                                signal_id=signal_id,
-                                                confidence=confidence,
-                                                reason="stake_zero_below_threshold",
-                                            )
-                                        else:
-                                            # Check if there's already an open paper trade for this market
-                                            condition_id_for_check = signal.get("condition_id") or signal.get("event_id") or event_id
-                                            if condition_id_for_check and signal_store.has_open_paper_trade(condition_id_for_check):
-                                                logger.warning(
-                                                    "paper_trade_rejected_open_trade_exists",
-                                                    signal_id=signal_id,
-                                                    wallet=signal.get("wallet", "")[:16] if signal.get("wallet") else "unknown",
-                                                    market=signal.get("market", "")[:60],
-                                                    condition_id=condition_id_for_check[:20],
-                                                    reason="open_trade_exists_for_market",
-                                                )
-                                            else:
-                                                # Create paper trade with confidence-based stake
-                                                trade_dict = open_paper_trade(signal, confidence=confidence)
-                                                trade_dict["signal_id"] = signal_id
-                                                trade_dict["days_to_expiry"] = days_to_expiry
-                                                
-                                                # Insert paper trade (pass computed stake_eur)
-                                                trade_id = signal_store.insert_paper_trade(
-                                                    signal_id, signal, stake_eur, FX_EUR_USD
-                                                )
-                                                
-                                                if trade_id:
-                                                    # Notify paper trade opened
-                                                    try:
-                                                        from src.polymarket.telegram import send_telegram
-                                                        telegram_msg = format_paper_trade_telegram(trade_dict=trade_dict)
-                                                        send_telegram(telegram_msg)
-                                                    except Exception as e:
-                                                        logger.warning("paper_trade_telegram_failed",
-                                                                     wallet=trade_dict.get("wallet", "unknown")[:16] if trade_dict else "unknown",
-                                                                     condition_id=trade_dict.get("condition_id", "unknown")[:20] if trade_dict else "unknown",
-                                                                     trade_id=trade_id,
-                                                                     error=str(e)[:100])
-                                
-                                # Market/outcome dedupe check: prevent duplicate alerts for same market+outcome
-                                market_id = signal.get("market_id") or signal.get("condition_id") or event_id
-                                outcome_index = signal.get("outcome_index")
-                                dedupe_key = (market_id, outcome_index)
-                                now_ts = time()
-                                
-                                # Check if we've alerted on this market/outcome recently
-                                if dedupe_key in _market_outcome_alerts:
-                                    last_alert = _market_outcome_alerts[dedupe_key]
-                                    if now_ts - last_alert < SIGNAL_COOLDOWN_SECONDS:
-                                        # Skip - still in cooldown
-                                        logger.debug("signal_deduped", 
-                                                   market_id=market_id[:20] if market_id else "unknown",
-                                                   outcome_index=outcome_index,
-                                                   time_since_last=now_ts - last_alert,
-                                                   cooldown=SIGNAL_COOLDOWN_SECONDS)
-                                        continue
-                                
-                                # --- HARD DISCOUNT GATE (normalize keys) - BEFORE ROLLUP ---
-                                try:
-                                    min_low_discount = float(os.getenv("MIN_LOW_DISCOUNT", "0.02"))
-                                except Exception:
-                                    min_low_discount = 0.02
-                                
-                                # Your signal objects might use `discount` or `discount_pct` key
-                                signal_discount = signal.get("discount_pct", None)
-                                if signal_discount is None:
-                                    signal_discount = signal.get("discount", None)
-                                
-                                # If still missing, treat as 0 (reject)
-                                try:
-                                    signal_discount = float(signal_discount) if signal_discount is not None else 0.0
-                                except Exception:
-                                    signal_discount = 0.0
-                                
-                                if signal_discount < min_low_discount:
-                                    # Track rejection (rejected_low_discount is already declared as global at top of main_loop)
-                                    rejected_low_discount += 1
-                                    logger.info("rejected_low_discount",
-                                               discount=signal_discount,
-                                               min_low_discount=min_low_discount,
-                                               market=(signal.get("market") or "")[:80],
-                                               wallet=signal.get("wallet"))
-                                    continue
-                                # --- END GATE ---
-                                
-                                # Rollup whale signals instead of sending immediately
-                                # (Only signals that passed the discount gate above reach here)
-                                condition_id_for_rollup = signal.get("condition_id") or signal.get("event_id") or event_id
-                                if condition_id_for_rollup:
-                                    r = _whale_rollup[condition_id_for_rollup]
-                                    r["market"] = signal.get("market", r["market"])
-                                    r["outcome_name"] = signal.get("outcome_name", r["outcome_name"])
-                                    r["wallets"].add(signal.get("wallet", "unknown"))
-                                    r["trades"] += 1
-                                    trade_usd = float(signal.get("trade_value_usd") or signal.get("total_usd") or 0.0)
-                                    r["total_usd"] += trade_usd
-                                    r["max_trade_usd"] = max(r["max_trade_usd"], trade_usd)
-                                    # Store dedupe key for this rollup
-                                    r["dedupe_key"] = dedupe_key
-                                    # Track minimum discount in rollup (for filtering when flushing)
-                                    # Ensure signal_discount is a float (already computed above)
-                                    d = float(signal_discount) if signal_discount is not None else 0.0
-                                    cur = r.get("min_discount")
-                                    r["min_discount"] = d if cur is None else min(cur, d)
-                                else:
-                                    # No condition_id - send immediately (shouldn't happen)
-                                    notify_signal(signal)
-                                    # Mark as alerted
-                                    _market_outcome_alerts[dedupe_key] = now_ts
-                                
-                                # Periodic stats update (every 10 signals or 15 min)
-                                stats.bump(extra_line="signal recorded")
-                                
-                                # Console log with debug info for discount diagnosis
-                                signal_wallet = signal.get('wallet', 'unknown')
-                                # Add debug fields to help diagnose negative discount issue
-                                logger.info("signal_generated", 
-                                           wallet=signal_wallet[:20] if signal_wallet else "unknown",
-                                           discount=signal['discount_pct'],
-                                           market=signal['market'][:50],
-                                           event_id=event_id,
-                                           side=signal.get('side', 'unknown'),
-                                           trade_price=signal.get('whale_entry_price'),
-                                           midpoint=signal.get('current_price'),
-                                           cluster_trades_count=signal.get('cluster_trades_count', 1),
-                                           outcome_index=trade.get('outcomeIndex') if 'trade' in locals() else None,
-                                           outcome_name=trade.get('outcome') if 'trade' in locals() else None,
-                                           token_id=signal.get('token_id'))  # Use token_id from signal dict (the one we actually used)
-                                
-                                # Signal notification already sent via notify_signal() above
-                    except Exception as e:
-                        # NEVER let the error logger crash the engine
-                        # Use direct dict access, never reference 'wallet' as a variable name
-                        try:
-                            # Access safe_vars directly - it's always initialized before try block
-                            wallet_val = safe_vars.get("wallet", "unknown")
-                            condition_val = safe_vars.get("condition_id", "unknown")
-                        except Exception:
-                            # If safe_vars doesn't exist somehow, use defaults
-                            wallet_val = "unknown"
-                            condition_val = "unknown"
-                        
-                        try:
-                            logger.error(
-                                "market_processing_error",
-                                extra={
-                                    "event": "market_processing_error",
-                                    "wallet": wallet_val,
-                                    "condition_id": condition_val,
-                                    "error": str(e),
-                                }
-                            )
-                        except Exception:
-                            # last resort: swallow logging failures
-                            pass
-                        
-                        continue
+                scan_deadline = cycle_started + SCAN_INTERVAL_SECONDS * SCAN_BUDGET_FRACTION
+                if market_scheduler is not None:
+                    # Only markets that are due for their tier, within MARKET_POLL_RPS, until the deadline
+                    total_trades_processed, markets_polled = await market_scheduler.run_until(
+                        scan_deadline,
+                        lambda m: scan_scheduled_market(session, m),
+                        concurrency=SCAN_CONCURRENCY,
+                    )
+                    markets_skipped = market_scheduler.stats()["overdue"]
+                else:
+                    total_trades_processed, markets_skipped = await scan_markets_concurrently(
+                        session,
+                        filtered_markets,
+                        deadline=scan_deadline,
+                    )
+                    markets_polled = len(filtered_markets) - markets_skipped
                 
                 logger.info("processing_complete", 
                            markets=len(markets), 
+                           markets_polled=markets_polled,
+                           markets_skipped=markets_skipped,
                            trades_processed=trades_considered)  # Use trades_considered which tracks all trades that passed initial filters
                 
                 # Log filter breakdown
@@ -3666,7 +3774,6 @@ async def main_loop():
                 audit_data_quality()
                 
                 # Clean up old conflicting whales
-                cutoff_time = datetime.now() - timedelta(minutes=CONFLICT_WINDOW_MINUTES)
                 conflicting_whales.clear()  # Simplified cleanup
                 
                 # Clean up expired clusters
@@ -3872,6 +3979,17 @@ async def main_loop():
                     
                     send_telegram(heartbeat_msg)
                     last_heartbeat = now
+                    logger.info("cache_stats", **cache_stats())
+                    logger.info("single_flight_stats", **single_flight_stats())
+                    logger.info("telegram_outbox_stats", **outbox_stats())
+                    logger.info("log_pipeline_stats", **log_pipeline_stats())
+                    logger.info("sink_stats", **sink_stats())
+                    logger.info("trade_dedup_stats", **SEEN_TRADE_KEYS.stats())
+                    logger.info("trade_cursor_stats", **TRADE_CURSORS.stats())
+                    logger.info("http_client_stats", **http_client_stats())
+                    if market_scheduler is not None:
+                        logger.info("market_scheduler_stats", **market_scheduler.stats())
+                    logger.info("stage_latency", **stage_summary())
                 except Exception as e:
                     logger.warning(
                         "heartbeat_failed",
@@ -3945,6 +4063,11 @@ async def main_loop():
                         f"• RESOLVED: {paper_resolved} (+{paper_resolved_delta})"
                     )
                     
+                    # Where the time went (stage latency, API calls since last dashboard, cache hit rates)
+                    metrics_text = dashboard_summary()
+                    if metrics_text:
+                        dashboard_msg += f"\n\n{metrics_text}"
+                    
                     send_telegram(dashboard_msg)
                     last_dashboard = dashboard_now
                     
@@ -3959,16 +4082,129 @@ async def main_loop():
                         }
                     )
             
+            # Persist warm-start cache snapshot
+            last_cache_snapshot = await persist_cache_snapshot_if_due(last_cache_snapshot)
+            
             # Calculate elapsed time and sleep until next cycle
             elapsed = time() - cycle_started
             sleep_for = max(0, SCAN_INTERVAL_SECONDS - elapsed)
-            logger.info("cycle_complete", elapsed_s=round(elapsed, 2), sleep_s=round(sleep_for, 2))
+            logger.info("cycle_complete", elapsed_s=round(elapsed, 2), sleep_s=round(sleep_for, 2),
+                        cache_hit_rates=end_cycle())
             await asyncio.sleep(sleep_for)
 
 
+def restore_cache_snapshot() -> None:
+    """Reload cached lookups and /trades cursors from the last run (expired entries are dropped)."""
+    if CACHE_SNAPSHOT_INTERVAL_SEC <= 0:
+        return
+    try:
+        loaded = load_cache_snapshot(CACHE_SNAPSHOT_PATH, CACHE_SNAPSHOT_CACHES)
+        logger.info("cache_snapshot_loaded", path=CACHE_SNAPSHOT_PATH, **loaded)
+    except Exception as e:
+        logger.warning("cache_snapshot_load_failed", path=CACHE_SNAPSHOT_PATH, error=str(e))
+    try:
+        logger.info("trade_cursors_loaded", path=TRADE_CURSOR_PATH, markets=TRADE_CURSORS.load(TRADE_CURSOR_PATH))
+    except Exception as e:
+        logger.warning("trade_cursors_load_failed", path=TRADE_CURSOR_PATH, error=str(e))
+
+
+async def persist_cache_snapshot() -> None:
+    """Write the warm-start snapshot and /trades cursors (per market and per wallet) off the event loop."""
+    if CACHE_SNAPSHOT_INTERVAL_SEC <= 0:
+        return
+    try:
+        written = await asyncio.to_thread(save_cache_snapshot, CACHE_SNAPSHOT_PATH, CACHE_SNAPSHOT_CACHES)
+        logger.debug("cache_snapshot_saved", path=CACHE_SNAPSHOT_PATH, **written)
+    except Exception as e:
+        logger.warning("cache_snapshot_save_failed", path=CACHE_SNAPSHOT_PATH, error=str(e))
+    try:
+        markets = await asyncio.to_thread(TRADE_CURSORS.save, TRADE_CURSOR_PATH)
+        logger.debug("trade_cursors_saved", path=TRADE_CURSOR_PATH, markets=markets)
+    except Exception as e:
+        logger.warning("trade_cursors_save_failed", path=TRADE_CURSOR_PATH, error=str(e))
+    if _wallet_watcher is not None:
+        try:
+            wallets = await asyncio.to_thread(_wallet_watcher.cursors.save, WALLET_WATCH_CURSOR_PATH)
+            logger.debug("wallet_cursors_saved", path=WALLET_WATCH_CURSOR_PATH, wallets=wallets)
+        except Exception as e:
+            logger.warning("wallet_cursors_save_failed", path=WALLET_WATCH_CURSOR_PATH, error=str(e))
+
+
+async def persist_cache_snapshot_if_due(last_snapshot: float) -> float:
+    """Persist the snapshot once CACHE_SNAPSHOT_INTERVAL_SEC has passed; returns the new last-snapshot time."""
+    if CACHE_SNAPSHOT_INTERVAL_SEC <= 0 or (time() - last_snapshot) < CACHE_SNAPSHOT_INTERVAL_SEC:
+        return last_snapshot
+    await persist_cache_snapshot()
+    return time()
+
+
+async def finish_paper_cycle(cycle_started: float, interval: float, streaming: bool) -> None:
+    """cycle_complete (with per-cycle cache hit rates) for the paper path, then sleep out the interval.
+
+    Stream cycles don't sleep (they go straight back to the queue) and log at DEBUG,
+    since they come every few hundred milliseconds.
+    """
+    elapsed = time() - cycle_started
+    sleep_for = 0 if streaming else max(0, interval - elapsed)
+    log = logger.debug if streaming else logger.info
+    log("cycle_complete", elapsed_s=round(elapsed, 2), sleep_s=round(sleep_for, 2),
+        cache_hit_rates=end_cycle())
+    if sleep_for:
+        await asyncio.sleep(sleep_for)
+
+
+async def start_trade_stream(session: aiohttp.ClientSession) -> Optional[TradeStream]:
+    """Start websocket ingestion when ENGINE_INGEST_MODE=stream (None = keep polling)."""
+    global _trade_stream
+    if ENGINE_INGEST_MODE != "stream":
+        return None
+    if not PAPER_TRADING:
+        # Market-by-market scanning handles its signals inside scan_market(); only the
+        # all-trades path (paper trading) can take trades from the stream
+        logger.warning("trade_stream_unsupported", reason="requires PAPER_TRADING", ingest_mode="poll")
+        return None
+    if _trade_stream is None:
+        # Gap-fill after a reconnect: one REST poll of the latest trades, same filter as poll mode
+        _trade_stream = TradeStream(
+            gap_fill=lambda: fetch_recent_trades(session, min_size_usd=API_MIN_SIZE_USD, limit=500),
+            min_size_usd=API_MIN_SIZE_USD,
+        )
+    await _trade_stream.start()
+    logger.info("trade_stream_started", url=_trade_stream.url, queue_max=_trade_stream.queue.maxsize,
+                overflow=_trade_stream.overflow, min_size_usd=API_MIN_SIZE_USD)
+    return _trade_stream
+
+
+def start_wallet_watch() -> Optional[WalletWatcher]:
+    """WalletWatcher over TRACKED_WALLETS when ENGINE_INGEST_MODE=wallets (None otherwise)."""
+    global _wallet_watcher
+    if ENGINE_INGEST_MODE != "wallets":
+        return None
+    if not PAPER_TRADING:
+        logger.warning("wallet_watch_unsupported", reason="requires PAPER_TRADING", ingest_mode="poll")
+        return None
+    if _wallet_watcher is None:
+        _wallet_watcher = WalletWatcher(TRACKED_WALLETS, min_size_usd=API_MIN_SIZE_USD)
+        try:
+            _wallet_watcher.cursors.load(WALLET_WATCH_CURSOR_PATH)
+        except Exception as e:
+            logger.warning("wallet_cursors_load_failed", path=WALLET_WATCH_CURSOR_PATH, error=str(e))
+    logger.info("wallet_watch_started", wallets=len(_wallet_watcher.wallets),
+                interval_seconds=WALLET_WATCH_INTERVAL_SEC, concurrency=_wallet_watcher.concurrency)
+    return _wallet_watcher
+
+
 async def shutdown():
     """Cleanup on shutdown."""
     logger.info("engine_shutdown")
+    if _trade_stream is not None:
+        await _trade_stream.stop()
+    await persist_cache_snapshot()
+    await stop_metrics_server()
+    await stop_outbox()
+    await close_shared_session()
+    await asyncio.to_thread(signal_store.close)  # commit queued DB writes
+    await asyncio.to_thread(close_all_sinks)  # flush buffered activity/signal/status rows
 
 
 async def dry_run_paper_trade(tx_hash: str):
@@ -3978,7 +4214,6 @@ async def dry_run_paper_trade(tx_hash: str):
     Args:
         tx_hash: Transaction hash to process
     """
-    import aiohttp
     from src.polymarket.scraper import fetch_recent_trades
     
     print(f"\n{'='*80}")
@@ -3992,7 +4227,7 @@ async def dry_run_paper_trade(tx_hash: str):
     print(f"PAPER_MIN_TRADE_USD: {PAPER_MIN_TRADE_USD}")
     print(f"{'='*80}\n")
     
-    async with aiohttp.ClientSession() as session:
+    async with create_session() as session:
         # Fetch recent trades and find matching transaction
         trades = await fetch_recent_trades(session, min_size_usd=0, limit=1000)
         matching_trade = None
@@ -4054,7 +4289,7 @@ async def dry_run_paper_trade(tx_hash: str):
         print(f"STEP 2: Paper trading decision gate...")
         print(f"{'='*80}")
         print(f"PAPER_TRADING: {PAPER_TRADING}")
-        signal_id = signal_store.insert_signal(signal)
+        signal_id = await signal_store.insert_signal_async(signal)
         print(f"signal_id: {signal_id}")
         print(f"confidence: {confidence}")
         print(f"should_paper_trade({confidence}): {should_paper_trade(confidence)}")
@@ -4156,7 +4391,7 @@ async def dry_run_paper_trade(tx_hash: str):
         print(f"{'='*80}")
         print(f"STEP 5: Database insertion...")
         print(f"{'='*80}")
-        trade_id = signal_store.insert_paper_trade(
+        trade_id = await signal_store.insert_paper_trade_async(
             wallet=trade_dict["wallet"],
             market=trade_dict["market"],
             condition_id=trade_dict["condition_id"],
@@ -4329,7 +4564,24 @@ async def main():
     resolver_task = None
     telegram_poll_task = None
     
+    # Start warm: whale scores, wallet stats and token ids from the previous run
+    restore_cache_snapshot()
+    
     try:
+        # Local Prometheus endpoint (METRICS_PORT=0 disables)
+        try:
+            if await start_metrics_server():
+                logger.info("metrics_server_started", host=METRICS_HOST, port=METRICS_PORT, path="/metrics")
+        except OSError as e:
+            logger.warning("metrics_server_failed_to_start", port=METRICS_PORT, error=str(e))
+        
+        # Start the async Telegram outbox so alerts never block the event loop
+        try:
+            from src.polymarket.telegram import TOKEN as TELEGRAM_TOKEN, CHAT_ID as TELEGRAM_CHAT_ID
+            await start_outbox(TELEGRAM_TOKEN, TELEGRAM_CHAT_ID)
+        except Exception as e:
+            logger.warning("telegram_outbox_failed_to_start", error=str(e))
+        
         # Start Telegram command polling in background
         try:
             from src.polymarket.telegram import poll_telegram_commands
@@ -0,0 +1,269 @@
+# src/polymarket/http_client.py
+"""
+Shared async HTTP client for the Polymarket and Telegram APIs.
+
+create_session() wraps an aiohttp.ClientSession that has a tuned TCPConnector
+(keep-alive, DNS cache, per-host connection cap) and asks for gzip. Its
+get()/post()/request() add:
+
+- A token bucket per host (HTTP_HOST_RPS). The buckets are module-level, so
+  every session in the process (engine scan, resolver, profiler, bot) shares
+  one budget per API.
+- Retries with jittered exponential backoff on 429, 5xx and connection
+  errors. Only GET/HEAD are retried on 5xx or a dropped connection; any
+  method is retried on 429, since the request was rejected before it ran.
+- Retry-After support, as seconds or an HTTP date. A 429 also pauses the
+  host's bucket, so concurrent requests wait with it instead of adding more
+  429s (for at most HTTP_RETRY_MAX_SEC). A longer Retry-After is not waited
+  out: the 429 is handed to the caller.
+- Per-endpoint request, latency and error counts via
+  metrics.api_trace_config(), which sees every attempt. Retries and 429s are
+  counted via metrics.record_api_retry().
+
+Call sites keep the aiohttp shape: `async with session.get(url, ...) as r:`.
+shared_session() returns the process-wide instance for code that has no
+session of its own.
+"""
+import asyncio
+import email.utils
+import os
+import random
+import time
+from typing import Any, Dict, Optional
+from urllib.parse import urlsplit
+
+import aiohttp
+import structlog
+
+from src.polymarket.metrics import api_trace_config, endpoint_label, record_api_retry
+
+logger = structlog.get_logger()
+
+HTTP_POOL_LIMIT = int(os.getenv("HTTP_POOL_LIMIT", "100"))  # Open connections per session
+HTTP_POOL_PER_HOST = int(os.getenv("HTTP_POOL_PER_HOST", "20"))  # Open connections per host
+HTTP_KEEPALIVE_SEC = float(os.getenv("HTTP_KEEPALIVE_SEC", "30"))  # Idle keep-alive before a connection is closed
+HTTP_DNS_TTL_SEC = int(os.getenv("HTTP_DNS_TTL_SEC", "300"))
+HTTP_TIMEOUT_SEC = float(os.getenv("HTTP_TIMEOUT_SEC", "30"))  # Default total timeout; per-request timeout= overrides
+HTTP_MAX_RETRIES = int(os.getenv("HTTP_MAX_RETRIES", "3"))
+HTTP_RETRY_BASE_SEC = float(os.getenv("HTTP_RETRY_BASE_SEC", "0.5"))
+HTTP_RETRY_MAX_SEC = float(os.getenv("HTTP_RETRY_MAX_SEC", "30"))  # Longest single backoff / Retry-After honoured
+HTTP_DEFAULT_RPS = float(os.getenv("HTTP_DEFAULT_RPS", "0"))  # Hosts not in HTTP_HOST_RPS; 0 = unlimited
+
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+IDEMPOTENT_METHODS = {"GET", "HEAD"}
+
+
+def _parse_host_rps(raw: str) -> Dict[str, float]:
+    rates: Dict[str, float] = {}
+    for part in raw.split(","):
+        host, _, value = part.strip().rpartition(":")
+        if host and value:
+            rates[host.lower()] = float(value)
+    return rates
+
+
+HTTP_HOST_RPS = _parse_host_rps(os.getenv(
+    "HTTP_HOST_RPS",
+    "gamma-api.polymarket.com:10,data-api.polymarket.com:10,clob.polymarket.com:15,api.telegram.org:20"))
+
+
+def retry_after_seconds(value: Optional[str]) -> Optional[float]:
+    """Retry-After header (delta-seconds or HTTP date) -> seconds from now."""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, email.utils.parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError, IndexError):
+        return None
+
+
+class HostLimiter:
+    """Token bucket for one host (rps <= 0: no rate limit, only 429 pauses)."""
+
+    def __init__(self, rps: float, burst: Optional[float] = None):
+        self.rps = rps
+        self.burst = burst or max(1.0, rps * 2)
+        self._tokens = self.burst
+        self._tokens_at = time.monotonic()
+        self._paused_until = 0.0
+        self.acquired = 0
+        self.waits = 0
+        self.wait_sec = 0.0
+        self.pauses = 0
+
+    async def acquire(self) -> None:
+        waited = 0.0
+        while True:
+            now = time.monotonic()
+            wait = self._paused_until - now
+            if wait <= 0:
+                if self.rps <= 0:
+                    break
+                self._tokens = min(self.burst, self._tokens + (now - self._tokens_at) * self.rps)
+                self._tokens_at = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    break
+                wait = (1 - self._tokens) / self.rps
+            waited += wait
+            await asyncio.sleep(wait)
+        self.acquired += 1
+        if waited:
+            self.waits += 1
+            self.wait_sec += waited
+
+    def pause(self, seconds: float) -> None:
+        """Hold every request to this host for `seconds` (server said 429)."""
+        self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+        self.pauses += 1
+
+    def stats(self) -> Dict[str, Any]:
+        return {"rps": self.rps, "requests": self.acquired, "waits": self.waits,
+                "wait_sec": round(self.wait_sec, 1), "pauses": self.pauses}
+
+
+_LIMITERS: Dict[str, HostLimiter] = {}
+_RETRIES = {"retries": 0, "throttled": 0, "gave_up": 0}
+
+
+def limiter_for(host: str) -> HostLimiter:
+    host = (host or "").lower()
+    limiter = _LIMITERS.get(host)
+    if limiter is None:
+        limiter = _LIMITERS[host] = HostLimiter(HTTP_HOST_RPS.get(host, HTTP_DEFAULT_RPS))
+    return limiter
+
+
+def _backoff(attempt: int) -> float:
+    return min(HTTP_RETRY_MAX_SEC, HTTP_RETRY_BASE_SEC * 2 ** attempt) * random.uniform(0.5, 1.5)
+
+
+class _Request:
+    """`async with` for one logical request: rate limit, send, retry."""
+
+    def __init__(self, client: "HttpSession", method: str, url: Any, kwargs: Dict[str, Any]):
+        self._client = client
+        self._method = method.upper()
+        self._url = url
+        self._kwargs = kwargs
+        self._cm = None
+
+    async def __aenter__(self) -> aiohttp.ClientResponse:
+        limiter = limiter_for(urlsplit(str(self._url)).hostname or "")
+        idempotent = self._method in IDEMPOTENT_METHODS
+        attempt = 0
+        while True:
+            await limiter.acquire()
+            cm = self._client.session.request(self._method, self._url, **self._kwargs)
+            try:
+                resp = await cm.__aenter__()
+            except asyncio.CancelledError:
+                raise
+            except (aiohttp.ClientConnectionError, asyncio.TimeoutError) as e:
+                if not idempotent or attempt >= self._client.max_retries:
+                    if attempt:
+                        _RETRIES["gave_up"] += 1
+                    raise
+                delay = _backoff(attempt)
+                reason = type(e).__name__
+                throttled = False
+            else:
+                throttled = resp.status == 429
+                retry_after = retry_after_seconds(resp.headers.get("Retry-After")) if throttled else None
+                if throttled:
+                    limiter.pause(min(HTTP_RETRY_MAX_SEC, retry_after if retry_after is not None else _backoff(attempt)))
+                retryable = resp.status in RETRY_STATUSES and (throttled or idempotent)
+                if (not retryable or attempt >= self._client.max_retries
+                        or (retry_after is not None and retry_after > HTTP_RETRY_MAX_SEC)):
+                    if retryable and attempt:
+                        _RETRIES["gave_up"] += 1
+                    self._cm = cm
+                    return resp
+                await cm.__aexit__(None, None, None)
+                delay = retry_after if retry_after is not None else _backoff(attempt)
+                reason = resp.status
+            attempt += 1
+            _RETRIES["retries"] += 1
+            if throttled:
+                _RETRIES["throttled"] += 1
+            endpoint = endpoint_label(self._url)
+            record_api_retry(endpoint, throttled=throttled)
+            logger.debug("http_retry", endpoint=endpoint, attempt=attempt, reason=reason,
+                         wait_seconds=round(delay, 2))
+            await asyncio.sleep(delay)
+
+    async def __aexit__(self, *exc):
+        if self._cm is not None:
+            return await self._cm.__aexit__(*exc)
+        return False
+
+
+class HttpSession:
+    """aiohttp.ClientSession with per-host rate limits and retries on get/post/request."""
+
+    def __init__(self, session: aiohttp.ClientSession, max_retries: int = HTTP_MAX_RETRIES):
+        self.session = session
+        self.max_retries = max(0, max_retries)
+
+    def request(self, method: str, url: Any, **kwargs) -> _Request:
+        return _Request(self, method, url, kwargs)
+
+    def get(self, url: Any, **kwargs) -> _Request:
+        return _Request(self, "GET", url, kwargs)
+
+    def post(self, url: Any, **kwargs) -> _Request:
+        return _Request(self, "POST", url, kwargs)
+
+    def __getattr__(self, name):
+        return getattr(self.session, name)
+
+    async def close(self) -> None:
+        global _SHARED
+        await self.session.close()
+        if _SHARED is self:
+            _SHARED = None
+
+    async def __aenter__(self) -> "HttpSession":
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.close()
+
+
+def create_session(max_retries: int = HTTP_MAX_RETRIES, **session_kwargs) -> HttpSession:
+    """New HttpSession; session_kwargs go to aiohttp.ClientSession (defaults below)."""
+    session_kwargs.setdefault("connector", aiohttp.TCPConnector(
+        limit=HTTP_POOL_LIMIT, limit_per_host=HTTP_POOL_PER_HOST,
+        ttl_dns_cache=HTTP_DNS_TTL_SEC, keepalive_timeout=HTTP_KEEPALIVE_SEC))
+    session_kwargs.setdefault("timeout", aiohttp.ClientTimeout(total=HTTP_TIMEOUT_SEC))
+    session_kwargs.setdefault("trace_configs", [api_trace_config()])
+    headers = {"Accept-Encoding": "gzip, deflate"}
+    headers.update(session_kwargs.pop("headers", None) or {})
+    return HttpSession(aiohttp.ClientSession(headers=headers, **session_kwargs), max_retries=max_retries)
+
+
+_SHARED: Optional[HttpSession] = None
+_SHARED_LOOP: Optional[asyncio.AbstractEventLoop] = None
+
+
+def shared_session() -> HttpSession:
+    """Process-wide HttpSession (one per event loop); closed by close_shared_session()."""
+    global _SHARED, _SHARED_LOOP
+    loop = asyncio.get_running_loop()
+    if _SHARED is None or _SHARED.closed or _SHARED_LOOP is not loop:
+        _SHARED = create_session()
+        _SHARED_LOOP = loop
+    return _SHARED
+
+
+async def close_shared_session() -> None:
+    if _SHARED is not None:
+        await _SHARED.close()
+
+
+def stats() -> Dict[str, Any]:
+    return {**_RETRIES, "hosts": {host: lim.stats() for host, lim in sorted(_LIMITERS.items()) if host}}
@@ -0,0 +1,238 @@
+# src/polymarket/log_pipeline.py
+"""
+Non-blocking logging pipeline.
+
+The root logger gets a single QueueHandler; formatting and all I/O (rotating
+file, console, the "recent lines" file) happen on a QueueListener thread, so
+the asyncio loop only pays for enqueueing a record. High-frequency debug events
+(market_id_debug, trades_request_params, ...) are rate limited per event
+before they are queued. logs/engine_recent.log is kept in a memory ring buffer
+and written on an interval or via flush_recent_log(), not on every record.
+"""
+import atexit
+import logging
+import os
+import queue
+import threading
+import time
+from collections import deque
+from logging.handlers import QueueHandler, QueueListener
+from pathlib import Path
+from typing import Deque, Dict, Iterable, List, Optional
+
+LOG_QUEUE_MAX = int(os.getenv("LOG_QUEUE_MAX", "20000"))  # Records beyond this are dropped (never block the loop)
+RECENT_LOG_LINES = int(os.getenv("RECENT_LOG_LINES", "50"))  # Lines kept in logs/engine_recent.log
+RECENT_LOG_FLUSH_SEC = float(os.getenv("RECENT_LOG_FLUSH_SEC", "2.0"))  # Recent-lines file rewrite interval
+LOG_SAMPLED_EVENTS = [e.strip() for e in os.getenv(
+    "LOG_SAMPLED_EVENTS", "market_id_debug,trades_request_params").split(",") if e.strip()]
+LOG_SAMPLE_MAX_PER_WINDOW = int(os.getenv("LOG_SAMPLE_MAX_PER_WINDOW", "20"))  # Per sampled event, per window
+LOG_SAMPLE_WINDOW_SEC = float(os.getenv("LOG_SAMPLE_WINDOW_SEC", "60"))
+
+
+def _event_name(record: logging.LogRecord) -> str:
+    """structlog (wrap_for_formatter) puts the event dict in record.msg; stdlib records carry a string."""
+    msg = record.msg
+    if isinstance(msg, dict):
+        return str(msg.get("event", ""))
+    return str(msg)
+
+
+class EventRateLimitFilter(logging.Filter):
+    """
+    Let at most max_per_window records of each listed event through per window.
+    Suppressed counts are kept for stats; the first record after a window with
+    suppressions carries a `sampled_out` count when it is a structlog record.
+    """
+
+    def __init__(self, events: Iterable[str], max_per_window: int, window_sec: float):
+        super().__init__()
+        self.events = set(events)
+        self.max_per_window = max(1, max_per_window)
+        self.window_sec = window_sec
+        # event -> [window_start, passed_in_window, suppressed_in_window]
+        self._windows: Dict[str, List[float]] = {}
+        self.suppressed: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if not self.events:
+            return True
+        event = _event_name(record)
+        if event not in self.events:
+            return True
+        now = time.monotonic()
+        with self._lock:
+            win = self._windows.get(event)
+            if win is None or now - win[0] >= self.window_sec:
+                carried = int(win[2]) if win else 0
+                self._windows[event] = [now, 1, 0]
+                if carried and isinstance(record.msg, dict):
+                    record.msg["sampled_out"] = carried
+                return True
+            if win[1] < self.max_per_window:
+                win[1] += 1
+                return True
+            win[2] += 1
+            self.suppressed[event] = self.suppressed.get(event, 0) + 1
+            return False
+
+
+class _NonBlockingQueueHandler(QueueHandler):
+    """
+    QueueHandler that drops (and counts) records when the queue is full and hands
+    records over unformatted: the listener is in-process, and structlog's
+    ProcessorFormatter needs the original event dict in record.msg.
+    """
+
+    def __init__(self, q: "queue.Queue"):
+        super().__init__(q)
+        self.enqueued = 0
+        self.dropped = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+            self.enqueued += 1
+        except queue.Full:
+            self.dropped += 1
+
+
+class RecentLinesHandler(logging.Handler):
+    """
+    Keeps the last max_lines formatted records in memory; flush() rewrites the file.
+    Runs on the listener thread; a background timer flushes every flush_interval_sec.
+    """
+
+    def __init__(self, filename, max_lines: int = RECENT_LOG_LINES, flush_interval_sec: float = RECENT_LOG_FLUSH_SEC):
+        super().__init__()
+        self.filename = Path(filename)
+        self.flush_interval_sec = flush_interval_sec
+        self.lines: Deque[str] = deque(maxlen=max_lines)
+        self._dirty = False
+        self._stop = threading.Event()
+        self._timer: Optional[threading.Thread] = None
+        # Load existing lines if file exists
+        if self.filename.exists():
+            try:
+                self.lines.extend(self.filename.read_text(encoding="utf-8").strip().split("\n"))
+            except Exception:
+                pass
+
+    def emit(self, record: logging.LogRecord) -> None:
+        try:
+            msg = self.format(record)
+            with self.lock:
+                self.lines.append(msg)
+                self._dirty = True
+        except Exception:
+            pass  # Don't break logging if recent log fails
+
+    def flush(self) -> None:
+        """Rewrite the recent-lines file if anything changed since the last write."""
+        with self.lock:
+            if not self._dirty:
+                return
+            text = "\n".join(self.lines) + "\n"
+            self._dirty = False
+        try:
+            self.filename.write_text(text, encoding="utf-8")
+        except Exception:
+            pass
+
+    def start_timer(self) -> None:
+        if self._timer is not None:
+            return
+        self._timer = threading.Thread(target=self._run_timer, name="recent-log-flusher", daemon=True)
+        self._timer.start()
+
+    def _run_timer(self) -> None:
+        while not self._stop.wait(self.flush_interval_sec):
+            self.flush()
+
+    def close(self) -> None:
+        self._stop.set()
+        self.flush()
+        super().close()
+
+
+class LogPipeline:
+    """Root QueueHandler + QueueListener owning the real (blocking) handlers."""
+
+    def __init__(self, handlers: List[logging.Handler], max_queue: int = LOG_QUEUE_MAX,
+                 sampled_events: Iterable[str] = LOG_SAMPLED_EVENTS,
+                 sample_max_per_window: int = LOG_SAMPLE_MAX_PER_WINDOW,
+                 sample_window_sec: float = LOG_SAMPLE_WINDOW_SEC):
+        self.handlers = handlers
+        self.queue: "queue.Queue" = queue.Queue(maxsize=max_queue)
+        self.queue_handler = _NonBlockingQueueHandler(self.queue)
+        self.rate_filter = EventRateLimitFilter(sampled_events, sample_max_per_window, sample_window_sec)
+        self.queue_handler.addFilter(self.rate_filter)
+        self.listener = QueueListener(self.queue, *handlers, respect_handler_level=True)
+        self._started = False
+
+    def install(self, root: Optional[logging.Logger] = None) -> "LogPipeline":
+        """Route the root logger through the queue and start the listener thread."""
+        root = root or logging.getLogger()
+        for handler in self.handlers:
+            if handler in root.handlers:
+                root.removeHandler(handler)
+        root.addHandler(self.queue_handler)
+        self.listener.start()
+        for handler in self.handlers:
+            if isinstance(handler, RecentLinesHandler):
+                handler.start_timer()
+        self._started = True
+        atexit.register(self.stop)
+        return self
+
+    def stop(self) -> None:
+        """Drain the queue, then flush/close every handler (idempotent)."""
+        if not self._started:
+            return
+        self._started = False
+        self.listener.stop()
+        for handler in self.handlers:
+            try:
+                handler.flush()
+                if isinstance(handler, RecentLinesHandler):
+                    handler.close()
+            except Exception:
+                pass
+
+    def flush_recent(self) -> None:
+        for handler in self.handlers:
+            if isinstance(handler, RecentLinesHandler):
+                handler.flush()
+
+    def stats(self) -> Dict[str, object]:
+        return {
+            "queue_depth": self.queue.qsize(),
+            "enqueued": self.queue_handler.enqueued,
+            "dropped_queue_full": self.queue_handler.dropped,
+            "sampled_out": dict(self.rate_filter.suppressed),
+        }
+
+
+# Process-wide pipeline (installed once by the engine)
+_PIPELINE: Optional[LogPipeline] = None
+
+
+def install_log_pipeline(handlers: List[logging.Handler], root: Optional[logging.Logger] = None) -> LogPipeline:
+    global _PIPELINE
+    if _PIPELINE is not None:
+        _PIPELINE.stop()
+    _PIPELINE = LogPipeline(handlers).install(root)
+    return _PIPELINE
+
+
+def flush_recent_log() -> None:
+    """Write the in-memory recent lines to disk now (e.g. before a health check reads the file)."""
+    if _PIPELINE is not None:
+        _PIPELINE.flush_recent()
+
+
+def log_pipeline_stats() -> Dict[str, object]:
+    return _PIPELINE.stats() if _PIPELINE is not None else {}
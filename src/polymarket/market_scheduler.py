@@ -0,0 +1,258 @@
+"""
+Activity-weighted polling of the market universe.
+
+Instead of rescanning every top market each cycle, MarketScheduler keeps the
+universe (refreshed from Gamma every MARKET_UNIVERSE_REFRESH_SEC) in a min-heap
+keyed by next due time. After each poll a market is placed in a tier and
+rescheduled at that tier's interval:
+
+- hot:     active whale cluster, expiry within MARKET_HOT_EXPIRY_HOURS, or
+           at least MARKET_HOT_TRADES_PER_MIN new trades per minute
+- warm:    traded within the last MARKET_WARM_IDLE_SEC
+- cold:    traded within the last MARKET_COLD_IDLE_SEC, or no activity known yet
+- dormant: everything else
+
+Polls are also limited by a global token bucket (MARKET_POLL_RPS market polls
+per second, bursts of a few seconds), so a large universe cannot exceed the
+API budget. When over budget, the most overdue market goes first (EDF). stats()
+reports per-tier market counts, polls, mean interval between polls and mean
+lateness.
+"""
+import asyncio
+import heapq
+import itertools
+import os
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+MARKET_POLL_RPS = float(os.getenv("MARKET_POLL_RPS", "4"))  # Global market polls per second
+MARKET_UNIVERSE_REFRESH_SEC = int(os.getenv("MARKET_UNIVERSE_REFRESH_SEC", "600"))  # Gamma top-markets refresh
+MARKET_HOT_TRADES_PER_MIN = float(os.getenv("MARKET_HOT_TRADES_PER_MIN", "2"))
+MARKET_HOT_EXPIRY_HOURS = float(os.getenv("MARKET_HOT_EXPIRY_HOURS", "6"))
+MARKET_WARM_IDLE_SEC = int(os.getenv("MARKET_WARM_IDLE_SEC", "3600"))
+MARKET_COLD_IDLE_SEC = int(os.getenv("MARKET_COLD_IDLE_SEC", "21600"))
+
+TIERS = ("hot", "warm", "cold", "dormant")
+
+
+def _parse_intervals(raw: str) -> Dict[str, float]:
+    intervals = {"hot": 15.0, "warm": 60.0, "cold": 300.0, "dormant": 900.0}
+    for part in raw.split(","):
+        name, _, value = part.partition(":")
+        if name.strip() in intervals and value.strip():
+            intervals[name.strip()] = float(value)
+    return intervals
+
+
+MARKET_TIER_INTERVALS = _parse_intervals(os.getenv("MARKET_TIER_INTERVALS", "hot:15,warm:60,cold:300,dormant:900"))
+
+
+class MarketEntry:
+    __slots__ = ("market", "expires_at", "tier", "next_due", "last_polled", "polls",
+                 "rate", "last_trade_ts", "whale")
+
+    def __init__(self, market: Dict[str, Any], expires_at: Optional[float], now: float):
+        self.market = market
+        self.expires_at = expires_at
+        self.tier = "cold"
+        self.next_due = now  # New markets are polled right away
+        self.last_polled: Optional[float] = None
+        self.polls = 0
+        self.rate: Optional[float] = None  # New trades per second
+        self.last_trade_ts: Optional[float] = None
+        self.whale = False
+
+
+class TierStats:
+    __slots__ = ("polls", "interval_sum", "intervals", "lag_sum")
+
+    def __init__(self):
+        self.polls = 0
+        self.interval_sum = 0.0
+        self.intervals = 0
+        self.lag_sum = 0.0
+
+
+class MarketScheduler:
+    """
+    Usage:
+        scheduler = MarketScheduler()
+        if scheduler.needs_refresh():
+            scheduler.refresh(markets, days_to_expiry=_days_to_expiry)
+        await scheduler.run_until(deadline, poll, concurrency=8)   # poll(market) -> trades processed
+        scheduler.record(condition_id, rate=..., last_trade_ts=..., whale=...)   # from poll()
+    """
+
+    def __init__(self, rps: float = MARKET_POLL_RPS, refresh_sec: float = MARKET_UNIVERSE_REFRESH_SEC,
+                 intervals: Optional[Dict[str, float]] = None, clock: Callable[[], float] = time.time):
+        self.rps = max(0.01, rps)
+        self.burst = max(1.0, self.rps * 5)
+        self.refresh_sec = refresh_sec
+        self.intervals = dict(intervals or MARKET_TIER_INTERVALS)
+        self._clock = clock
+        self._entries: Dict[str, MarketEntry] = {}
+        self._heap: List[Tuple[float, int, str]] = []  # (due, seq, condition_id); stale items skipped on pop
+        self._seq = itertools.count()
+        self._tokens = self.burst
+        self._tokens_at = clock()
+        self.refreshed_at: Optional[float] = None
+        self.refreshes = 0
+        self.budget_waits = 0
+        self._tier_stats = {t: TierStats() for t in TIERS}
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    # ---- universe ----
+    def needs_refresh(self, now: Optional[float] = None) -> bool:
+        now = self._clock() if now is None else now
+        return self.refreshed_at is None or now - self.refreshed_at >= self.refresh_sec
+
+    def refresh(self, markets: List[Dict[str, Any]],
+                days_to_expiry: Optional[Callable[[Dict[str, Any]], Optional[float]]] = None) -> Dict[str, int]:
+        """Replace the universe; markets already known keep their tier and schedule."""
+        now = self._clock()
+        seen = set()
+        added = 0
+        for m in markets:
+            cid = m.get("conditionId") or m.get("condition_id")
+            if not cid or cid in seen:
+                continue
+            seen.add(cid)
+            dte = days_to_expiry(m) if days_to_expiry else None
+            expires_at = now + dte * 86400 if dte is not None else None
+            entry = self._entries.get(cid)
+            if entry is None:
+                entry = self._entries[cid] = MarketEntry(m, expires_at, now)
+                heapq.heappush(self._heap, (entry.next_due, next(self._seq), cid))
+                added += 1
+            else:
+                entry.market = m
+                entry.expires_at = expires_at
+        removed = [cid for cid in self._entries if cid not in seen]
+        for cid in removed:
+            del self._entries[cid]  # Its heap items are dropped lazily
+        if len(self._heap) > 4 * max(1, len(self._entries)):
+            self._heap = [(e.next_due, next(self._seq), cid) for cid, e in self._entries.items()]
+            heapq.heapify(self._heap)
+        self.refreshed_at = now
+        self.refreshes += 1
+        return {"markets": len(self._entries), "added": added, "removed": len(removed)}
+
+    # ---- tiering ----
+    def _tier(self, entry: MarketEntry, now: float) -> str:
+        if entry.whale:
+            return "hot"
+        if entry.expires_at is not None and entry.expires_at - now <= MARKET_HOT_EXPIRY_HOURS * 3600:
+            return "hot"
+        if entry.rate is not None and entry.rate * 60 >= MARKET_HOT_TRADES_PER_MIN:
+            return "hot"
+        if entry.last_trade_ts is None:
+            return "cold"
+        idle = now - entry.last_trade_ts
+        if idle <= MARKET_WARM_IDLE_SEC:
+            return "warm"
+        if idle <= MARKET_COLD_IDLE_SEC:
+            return "cold"
+        return "dormant"
+
+    def record(self, condition_id: str, rate: Optional[float] = None, last_trade_ts: Optional[float] = None,
+               whale: bool = False) -> Optional[str]:
+        """Activity observed by a poll; re-tiers and reschedules the market. Returns its tier."""
+        entry = self._entries.get(condition_id)
+        if entry is None:
+            return None
+        now = self._clock()
+        if rate is not None:
+            entry.rate = rate
+        if last_trade_ts is not None:
+            entry.last_trade_ts = last_trade_ts
+        entry.whale = whale
+        entry.tier = self._tier(entry, now)
+        entry.next_due = now + self.intervals[entry.tier]
+        heapq.heappush(self._heap, (entry.next_due, next(self._seq), condition_id))
+        return entry.tier
+
+    # ---- budget ----
+    def _refill(self, now: float) -> None:
+        self._tokens = min(self.burst, self._tokens + (now - self._tokens_at) * self.rps)
+        self._tokens_at = now
+
+    def _next_due(self, now: float) -> Tuple[Optional[MarketEntry], float]:
+        """(entry, 0) if one can be polled now, else (None, seconds to wait)."""
+        while self._heap:
+            due, _, cid = self._heap[0]
+            entry = self._entries.get(cid)
+            if entry is None or entry.next_due != due:
+                heapq.heappop(self._heap)  # Removed market or superseded schedule
+                continue
+            if due > now:
+                return None, due - now
+            self._refill(now)
+            if self._tokens < 1:
+                self.budget_waits += 1
+                return None, (1 - self._tokens) / self.rps
+            heapq.heappop(self._heap)
+            self._tokens -= 1
+            stats = self._tier_stats[entry.tier]
+            stats.polls += 1
+            stats.lag_sum += now - due
+            if entry.last_polled is not None:
+                stats.interval_sum += now - entry.last_polled
+                stats.intervals += 1
+            entry.last_polled = now
+            entry.polls += 1
+            # Until record() reschedules it, retry a market whose poll fails at its tier interval
+            entry.next_due = now + self.intervals[entry.tier]
+            heapq.heappush(self._heap, (entry.next_due, next(self._seq), cid))
+            return entry, 0.0
+        return None, float("inf")
+
+    async def run_until(self, deadline: float, poll: Callable[[Dict[str, Any]], Awaitable[int]],
+                        concurrency: int = 8) -> Tuple[int, int]:
+        """Poll due markets with `concurrency` workers until `deadline`. Returns (processed, polls)."""
+        totals = {"processed": 0, "polls": 0}
+
+        async def _worker() -> None:
+            while True:
+                now = self._clock()
+                if now >= deadline:
+                    return
+                entry, wait = self._next_due(now)
+                if entry is None:
+                    await asyncio.sleep(min(wait, deadline - now, 1.0))
+                    continue
+                totals["polls"] += 1
+                try:
+                    totals["processed"] += await poll(entry.market)
+                except Exception:
+                    pass  # poll() logs its own failures; the market stays on its tier interval
+
+        await asyncio.gather(*(_worker() for _ in range(max(1, concurrency))))
+        return totals["processed"], totals["polls"]
+
+    def stats(self) -> Dict[str, Any]:
+        now = self._clock()
+        counts = {t: 0 for t in TIERS}
+        overdue = 0
+        for entry in self._entries.values():
+            counts[entry.tier] += 1
+            if now - entry.next_due > self.intervals[entry.tier]:
+                overdue += 1  # Missed at least one whole slot (budget or concurrency bound)
+        tiers = {}
+        for t in TIERS:
+            s = self._tier_stats[t]
+            tiers[t] = {
+                "markets": counts[t],
+                "interval_sec": self.intervals[t],
+                "polls": s.polls,
+                "avg_interval_sec": round(s.interval_sum / s.intervals, 1) if s.intervals else None,
+                "avg_lag_sec": round(s.lag_sum / s.polls, 1) if s.polls else None,
+            }
+        return {
+            "markets": len(self._entries),
+            "overdue": overdue,
+            "budget_waits": self.budget_waits,
+            "refreshes": self.refreshes,
+            "tiers": tiers,
+        }
@@ -0,0 +1,295 @@
+# src/polymarket/metrics.py
+"""
+Lightweight in-process instrumentation for the engine.
+
+- Stage latency: `with stage("midpoint"):` / `@timed("whale_score")` record wall
+  time per stage into a sliding window of the last METRICS_WINDOW_SAMPLES samples
+  (p50/p95/p99 computed on demand) plus lifetime count/sum.
+- API calls: api_trace_config() is an aiohttp TraceConfig counting requests,
+  errors and latency per endpoint (host + path with ids collapsed);
+  http_client.py adds retries and 429s via record_api_retry().
+- Cache hit rates: end_cycle() turns the cumulative TTLCache counters into
+  per-cycle hit rates.
+
+render_prometheus() produces Prometheus text format; start_metrics_server()
+serves it on http://METRICS_HOST:METRICS_PORT/metrics. dashboard_summary()
+returns a few lines for the hourly Telegram dashboard.
+"""
+import asyncio
+import functools
+import os
+import re
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import Any, Deque, Dict, Iterator, List, Optional, Tuple
+
+from src.polymarket.cache import cache_stats
+
+METRICS_HOST = os.getenv("METRICS_HOST", "127.0.0.1")
+METRICS_PORT = int(os.getenv("METRICS_PORT", "9108"))  # 0 = no /metrics endpoint
+METRICS_WINDOW_SAMPLES = int(os.getenv("METRICS_WINDOW_SAMPLES", "2048"))  # Samples per stage for quantiles
+
+QUANTILES = (0.5, 0.95, 0.99)
+
+
+class StageStats:
+    """Latency samples for one stage: bounded recent window + lifetime totals."""
+
+    __slots__ = ("samples", "count", "total")
+
+    def __init__(self, window: int = METRICS_WINDOW_SAMPLES):
+        self.samples: Deque[float] = deque(maxlen=window)
+        self.count = 0
+        self.total = 0.0
+
+    def observe(self, seconds: float) -> None:
+        self.samples.append(seconds)
+        self.count += 1
+        self.total += seconds
+
+    def quantiles(self, qs=QUANTILES) -> Dict[float, float]:
+        if not self.samples:
+            return {q: 0.0 for q in qs}
+        ordered = sorted(self.samples)
+        last = len(ordered) - 1
+        return {q: ordered[min(last, int(round(q * last)))] for q in qs}
+
+
+class EndpointStats:
+    __slots__ = ("calls", "errors", "total_sec", "retries", "throttled")
+
+    def __init__(self):
+        self.calls = 0
+        self.errors = 0
+        self.total_sec = 0.0
+        self.retries = 0
+        self.throttled = 0
+
+
+_STAGES: Dict[str, StageStats] = {}
+_ENDPOINTS: Dict[str, EndpointStats] = {}
+_CYCLE_CACHE_RATES: Dict[str, float] = {}
+_CACHE_BASELINE: Dict[str, Tuple[int, int]] = {}
+_DASHBOARD_BASELINE: Dict[str, int] = {}
+
+_ID_SEGMENT = re.compile(r"^(0x[0-9a-fA-F]+|\d+|[0-9a-fA-F-]{20,})$")
+
+
+def observe(stage_name: str, seconds: float) -> None:
+    stats = _STAGES.get(stage_name)
+    if stats is None:
+        stats = _STAGES[stage_name] = StageStats()
+    stats.observe(seconds)
+
+
+@contextmanager
+def stage(stage_name: str) -> Iterator[None]:
+    """Time the enclosed block (awaits included) as one sample of `stage_name`."""
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        observe(stage_name, time.perf_counter() - started)
+
+
+def timed(stage_name: str):
+    """Decorator form of stage() for async functions."""
+    def decorate(fn):
+        @functools.wraps(fn)
+        async def wrapper(*args, **kwargs):
+            with stage(stage_name):
+                return await fn(*args, **kwargs)
+        return wrapper
+    return decorate
+
+
+# ---- API calls ----
+def endpoint_label(url: Any) -> str:
+    """host + path with id-like segments collapsed, e.g. data-api.polymarket.com/trades"""
+    host = getattr(url, "host", None) or ""
+    path = getattr(url, "path", None)
+    if path is None:
+        text = str(url).split("://", 1)[-1].split("?", 1)[0]
+        host, _, path = text.partition("/")
+        path = "/" + path
+    parts = [":id" if _ID_SEGMENT.match(p) else p for p in path.split("/") if p]
+    return f"{host}/{'/'.join(parts)}"
+
+
+def _endpoint(endpoint: str) -> EndpointStats:
+    stats = _ENDPOINTS.get(endpoint)
+    if stats is None:
+        stats = _ENDPOINTS[endpoint] = EndpointStats()
+    return stats
+
+
+def record_api_call(endpoint: str, seconds: float, error: bool = False) -> None:
+    stats = _endpoint(endpoint)
+    stats.calls += 1
+    stats.total_sec += seconds
+    if error:
+        stats.errors += 1
+
+
+def record_api_retry(endpoint: str, throttled: bool = False) -> None:
+    """One request retried by http_client; throttled = the server answered 429."""
+    stats = _endpoint(endpoint)
+    stats.retries += 1
+    if throttled:
+        stats.throttled += 1
+
+
+def api_trace_config():
+    """aiohttp TraceConfig that records every request of a session via record_api_call()."""
+    import aiohttp
+
+    async def on_start(session, ctx, params):
+        ctx.started = time.perf_counter()
+
+    async def on_end(session, ctx, params):
+        error = params.response.status >= 400
+        record_api_call(endpoint_label(params.url), time.perf_counter() - ctx.started, error)
+
+    async def on_exception(session, ctx, params):
+        record_api_call(endpoint_label(params.url), time.perf_counter() - getattr(ctx, "started", time.perf_counter()), True)
+
+    trace = aiohttp.TraceConfig()
+    trace.on_request_start.append(on_start)
+    trace.on_request_end.append(on_end)
+    trace.on_request_exception.append(on_exception)
+    return trace
+
+
+# ---- per-cycle cache hit rates ----
+def end_cycle() -> Dict[str, float]:
+    """Hit rate of each cache over the cycle that just ended (caches with lookups only)."""
+    rates: Dict[str, float] = {}
+    for name, s in cache_stats().items():
+        hits0, misses0 = _CACHE_BASELINE.get(name, (0, 0))
+        hits, misses = s["hits"] - hits0, s["misses"] - misses0
+        _CACHE_BASELINE[name] = (s["hits"], s["misses"])
+        if hits + misses:
+            rates[name] = round(hits / (hits + misses), 3)
+    _CYCLE_CACHE_RATES.clear()
+    _CYCLE_CACHE_RATES.update(rates)
+    return rates
+
+
+def stage_summary() -> Dict[str, Dict[str, float]]:
+    """{stage: {count, p50_ms, p95_ms, p99_ms}} over the recent window."""
+    out = {}
+    for name, s in _STAGES.items():
+        q = s.quantiles()
+        out[name] = {"count": s.count, "p50_ms": round(q[0.5] * 1000, 1),
+                     "p95_ms": round(q[0.95] * 1000, 1), "p99_ms": round(q[0.99] * 1000, 1)}
+    return out
+
+
+def dashboard_summary(max_stages: int = 6, max_endpoints: int = 5) -> str:
+    """Short text block: slowest stages (p50/p95) and API calls since the previous call."""
+    lines: List[str] = []
+    stages = sorted(stage_summary().items(), key=lambda kv: kv[1]["p95_ms"], reverse=True)[:max_stages]
+    if stages:
+        lines.append("Stage latency p50/p95 (ms):")
+        lines.extend(f"• {name}: {s['p50_ms']:.0f}/{s['p95_ms']:.0f}" for name, s in stages)
+    deltas = []
+    for endpoint, s in _ENDPOINTS.items():
+        delta = s.calls - _DASHBOARD_BASELINE.get(endpoint, 0)
+        _DASHBOARD_BASELINE[endpoint] = s.calls
+        if delta:
+            deltas.append((delta, endpoint))
+    if deltas:
+        lines.append(f"API calls: {sum(d for d, _ in deltas)}")
+        lines.extend(f"• {endpoint}: {delta}" for delta, endpoint in sorted(deltas, reverse=True)[:max_endpoints])
+    if _CYCLE_CACHE_RATES:
+        lines.append("Cache hit rate (last cycle): " +
+                     ", ".join(f"{n} {r:.0%}" for n, r in sorted(_CYCLE_CACHE_RATES.items())))
+    return "\n".join(lines)
+
+
+# ---- Prometheus text format ----
+def _esc(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def render_prometheus() -> str:
+    out: List[str] = [
+        "# HELP engine_stage_latency_seconds Wall time per engine stage (recent window quantiles).",
+        "# TYPE engine_stage_latency_seconds summary",
+    ]
+    for name, s in sorted(_STAGES.items()):
+        label = _esc(name)
+        for q, v in s.quantiles().items():
+            out.append(f'engine_stage_latency_seconds{{stage="{label}",quantile="{q}"}} {v:.6f}')
+        out.append(f'engine_stage_latency_seconds_sum{{stage="{label}"}} {s.total:.6f}')
+        out.append(f'engine_stage_latency_seconds_count{{stage="{label}"}} {s.count}')
+
+    out += ["# HELP engine_api_calls_total HTTP requests per endpoint.", "# TYPE engine_api_calls_total counter"]
+    out += [f'engine_api_calls_total{{endpoint="{_esc(e)}"}} {s.calls}' for e, s in sorted(_ENDPOINTS.items())]
+    out += ["# HELP engine_api_errors_total HTTP errors (status >= 400 or exception) per endpoint.",
+            "# TYPE engine_api_errors_total counter"]
+    out += [f'engine_api_errors_total{{endpoint="{_esc(e)}"}} {s.errors}' for e, s in sorted(_ENDPOINTS.items())]
+    out += ["# HELP engine_api_latency_seconds_total Summed HTTP request time per endpoint.",
+            "# TYPE engine_api_latency_seconds_total counter"]
+    out += [f'engine_api_latency_seconds_total{{endpoint="{_esc(e)}"}} {s.total_sec:.6f}'
+            for e, s in sorted(_ENDPOINTS.items())]
+    out += ["# HELP engine_api_retries_total Requests retried per endpoint (429, 5xx, connection errors).",
+            "# TYPE engine_api_retries_total counter"]
+    out += [f'engine_api_retries_total{{endpoint="{_esc(e)}"}} {s.retries}' for e, s in sorted(_ENDPOINTS.items())]
+    out += ["# HELP engine_api_throttled_total HTTP 429 responses per endpoint.",
+            "# TYPE engine_api_throttled_total counter"]
+    out += [f'engine_api_throttled_total{{endpoint="{_esc(e)}"}} {s.throttled}' for e, s in sorted(_ENDPOINTS.items())]
+
+    caches = cache_stats()
+    out += ["# HELP engine_cache_hits_total Cache hits.", "# TYPE engine_cache_hits_total counter"]
+    out += [f'engine_cache_hits_total{{cache="{_esc(n)}"}} {s["hits"]}' for n, s in sorted(caches.items())]
+    out += ["# HELP engine_cache_misses_total Cache misses.", "# TYPE engine_cache_misses_total counter"]
+    out += [f'engine_cache_misses_total{{cache="{_esc(n)}"}} {s["misses"]}' for n, s in sorted(caches.items())]
+    out += ["# HELP engine_cache_entries Live entries per cache.", "# TYPE engine_cache_entries gauge"]
+    out += [f'engine_cache_entries{{cache="{_esc(n)}"}} {s["size"]}' for n, s in sorted(caches.items())]
+    out += ["# HELP engine_cache_cycle_hit_ratio Cache hit ratio over the last scan cycle.",
+            "# TYPE engine_cache_cycle_hit_ratio gauge"]
+    out += [f'engine_cache_cycle_hit_ratio{{cache="{_esc(n)}"}} {r}' for n, r in sorted(_CYCLE_CACHE_RATES.items())]
+    return "\n".join(out) + "\n"
+
+
+# ---- /metrics HTTP endpoint ----
+_SERVER: Optional[asyncio.AbstractServer] = None
+
+
+async def _handle(reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+    try:
+        request_line = await asyncio.wait_for(reader.readline(), timeout=5)
+        while (await asyncio.wait_for(reader.readline(), timeout=5)) not in (b"\r\n", b"\n", b""):
+            pass  # Skip headers
+        parts = request_line.decode("latin-1").split()
+        if len(parts) >= 2 and parts[0] == "GET" and parts[1].split("?", 1)[0] == "/metrics":
+            status, body = "200 OK", render_prometheus().encode()
+            content_type = "text/plain; version=0.0.4; charset=utf-8"
+        else:
+            status, body, content_type = "404 Not Found", b"not found\n", "text/plain"
+        writer.write(f"HTTP/1.1 {status}\r\nContent-Type: {content_type}\r\n"
+                     f"Content-Length: {len(body)}\r\nConnection: close\r\n\r\n".encode() + body)
+        await writer.drain()
+    except (asyncio.TimeoutError, ConnectionError):
+        pass
+    finally:
+        writer.close()
+
+
+async def start_metrics_server(host: str = METRICS_HOST, port: int = METRICS_PORT) -> Optional[asyncio.AbstractServer]:
+    """Serve /metrics on host:port (no-op when port is 0 or already started)."""
+    global _SERVER
+    if port <= 0 or _SERVER is not None:
+        return _SERVER
+    _SERVER = await asyncio.start_server(_handle, host, port)
+    return _SERVER
+
+
+async def stop_metrics_server() -> None:
+    global _SERVER
+    if _SERVER is not None:
+        _SERVER.close()
+        await _SERVER.wait_closed()
+        _SERVER = None
@@ -4,13 +4,18 @@ import math
 import aiohttp
 import structlog
 
+from src.polymarket.cache import MISSING, TTLCache
+from src.polymarket.singleflight import single_flight
+
 logger = structlog.get_logger()
 
 DATA_API_BASE = os.getenv("DATA_API_BASE", "https://data-api.polymarket.com").rstrip("/")
 
-# 30 min cache to avoid re-fetching same wallet constantly
-_STATS_CACHE = {}
+# 30 min cache to avoid re-fetching same wallet constantly; fetch errors retried sooner
 _STATS_TTL_SEC = int(os.getenv("STATS_CACHE_TTL_SEC", "1800"))
+_STATS_NEGATIVE_TTL_SEC = int(os.getenv("STATS_CACHE_NEGATIVE_TTL_SEC", "300"))
+_STATS_CACHE_MAX = int(os.getenv("STATS_CACHE_MAX_ENTRIES", "20000"))
+_STATS_CACHE = TTLCache("user_stats", ttl=_STATS_TTL_SEC, max_entries=_STATS_CACHE_MAX, negative_ttl=_STATS_NEGATIVE_TTL_SEC)
 
 def _now():
     return time.time()
@@ -35,9 +40,15 @@ async def get_user_stats(session: aiohttp.ClientSession, wallet: str, limit: int
     wallet = wallet.lower()
 
     cached = _STATS_CACHE.get(wallet)
-    if cached and (_now() - cached["ts"]) < _STATS_TTL_SEC:
-        return cached["data"]
+    if cached is not MISSING:
+        return cached
+
+    # Concurrent misses for the same wallet share one data-api request
+    return await single_flight("data_api_user_stats", (wallet, limit),
+                               lambda: _fetch_user_stats(session, wallet, limit))
 
+async def _fetch_user_stats(session: aiohttp.ClientSession, wallet: str, limit: int):
+    """Fetch + summarize the wallet's last `limit` trades and store the result in _STATS_CACHE."""
     url = f"{DATA_API_BASE}/trades?user={wallet}&limit={limit}&offset=0&takerOnly=true"
 
     try:
@@ -56,7 +67,7 @@ async def get_user_stats(session: aiohttp.ClientSession, wallet: str, limit: int
             "stats_missing": True,
             "reason": f"fetch_error:{type(e).__name__}",
         }
-        _STATS_CACHE[wallet] = {"ts": _now(), "data": out}
+        _STATS_CACHE.set_negative(wallet, out)
         return out
 
     # data-api /trades rows include: size, price. We'll treat size*price as USDC notionals.
@@ -101,7 +112,7 @@ async def get_user_stats(session: aiohttp.ClientSession, wallet: str, limit: int
         "reason": ("no_trades" if len(rows) == 0 else "ok"),
     }
 
-    _STATS_CACHE[wallet] = {"ts": _now(), "data": out}
+    _STATS_CACHE[wallet] = out
     return out
 
 def whale_score_from_stats(stats: dict) -> float:
@@ -0,0 +1,400 @@
+# src/polymarket/replay.py
+"""
+Record-and-replay of the engine's HTTP traffic (Gamma, data-api, CLOB).
+
+Capture: ENGINE_CAPTURE=data/captures/day.jsonl.gz wraps the scan session in a
+RecordingSession; every response (method, url, params, status, latency, body)
+is appended to a gzip JSON-lines archive.
+
+Replay: ENGINE_REPLAY=<archive> makes the engine scan with a ReplaySession that
+serves the recorded responses instead of the network (matched on method + url +
+params, in recorded order; url-only fallback; 404 when nothing matches).
+
+Both modes cover every engine request: the scan loop, the background resolver and
+Gamma fallbacks all use engine_session().
+
+Benchmark: drive process_trade over every trade in an archive at full speed:
+    python -m src.polymarket.replay bench data/captures/day.jsonl.gz
+reports trades/sec, API calls per signal and peak memory.
+"""
+import asyncio
+import gzip
+import json
+import os
+import time
+from collections import defaultdict
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+from urllib.parse import parse_qsl, urlsplit, urlunsplit
+
+import aiohttp
+from multidict import CIMultiDict, CIMultiDictProxy
+from yarl import URL
+
+from src.polymarket.http_client import create_session, shared_session
+from src.polymarket.metrics import endpoint_label, record_api_call
+
+ENGINE_CAPTURE = os.getenv("ENGINE_CAPTURE", "").strip()  # Archive path to record to ("" = off)
+ENGINE_REPLAY = os.getenv("ENGINE_REPLAY", "").strip()  # Archive path to serve from ("" = live APIs)
+CAPTURE_FLUSH_EVERY = 100  # Records between gzip flushes
+
+
+def request_key(method: str, url: str, params: Any = None) -> Tuple[str, str, Tuple[Tuple[str, str], ...]]:
+    """(METHOD, url without query, sorted query+params) so equivalent requests match."""
+    parts = urlsplit(str(url))
+    query = parse_qsl(parts.query, keep_blank_values=True)
+    if params:
+        items = params.items() if hasattr(params, "items") else params
+        query += [(str(k), str(v)) for k, v in items]
+    base = urlunsplit((parts.scheme, parts.netloc, parts.path, "", ""))
+    return method.upper(), base, tuple(sorted(query))
+
+
+def iter_archive(path: str) -> Iterator[Dict[str, Any]]:
+    """Records of one archive, in capture order (a torn last line is ignored)."""
+    with gzip.open(path, "rt", encoding="utf-8") as f:
+        try:
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
+        except (EOFError, json.JSONDecodeError):
+            return
+
+
+# ---- capture ----
+class CaptureWriter:
+    """Append-only gzip JSON-lines archive of responses."""
+
+    def __init__(self, path: str):
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self.path = path
+        self._file = gzip.open(path, "at", encoding="utf-8")
+        self.records = 0
+
+    def add(self, method: str, url: str, params: Any, status: int, latency_sec: float, body: bytes) -> None:
+        _, base, query = request_key(method, url, params)
+        self._file.write(json.dumps({
+            "ts": round(time.time(), 3),
+            "method": method.upper(),
+            "url": base,
+            "params": query,
+            "status": status,
+            "latency_ms": round(latency_sec * 1000, 1),
+            "body": body.decode("utf-8", errors="replace"),
+        }, separators=(",", ":")) + "\n")
+        self.records += 1
+        if self.records % CAPTURE_FLUSH_EVERY == 0:
+            self._file.flush()
+
+    def close(self) -> None:
+        self._file.close()
+
+
+class _RecordingRequest:
+    def __init__(self, session: "RecordingSession", method: str, url: str, kwargs: Dict[str, Any]):
+        self._session = session
+        self._method = method
+        self._url = url
+        self._params = kwargs.get("params")
+        self._cm = session.session.request(method, url, **kwargs)
+
+    async def __aenter__(self):
+        started = time.perf_counter()
+        resp = await self._cm.__aenter__()
+        body = await resp.read()  # Cached on the response; json()/text() reuse it
+        self._session.writer.add(self._method, self._url, self._params, resp.status,
+                                 time.perf_counter() - started, body)
+        return resp
+
+    async def __aexit__(self, *exc):
+        return await self._cm.__aexit__(*exc)
+
+
+class RecordingSession:
+    """Wraps a live aiohttp.ClientSession and records every get/post response."""
+
+    def __init__(self, session: aiohttp.ClientSession, archive_path: str):
+        self.session = session
+        self.writer = CaptureWriter(archive_path)
+
+    def get(self, url, **kwargs):
+        return _RecordingRequest(self, "GET", url, kwargs)
+
+    def post(self, url, **kwargs):
+        return _RecordingRequest(self, "POST", url, kwargs)
+
+    def request(self, method, url, **kwargs):
+        return _RecordingRequest(self, method, url, kwargs)
+
+    def __getattr__(self, name):
+        return getattr(self.session, name)
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        self.writer.close()
+        await self.session.close()
+
+    async def close(self):
+        self.writer.close()
+        await self.session.close()
+
+
+# ---- replay ----
+class ReplayResponse:
+    """The subset of aiohttp.ClientResponse the engine uses."""
+
+    def __init__(self, method: str, url: str, status: int, body: str):
+        self.method = method
+        self.url = url
+        self.status = status
+        self._body = body
+
+    async def read(self) -> bytes:
+        return self._body.encode("utf-8")
+
+    async def text(self, *args, **kwargs) -> str:
+        return self._body
+
+    async def json(self, *args, **kwargs) -> Any:
+        return json.loads(self._body) if self._body else None
+
+    def raise_for_status(self) -> None:
+        if self.status >= 400:
+            info = aiohttp.RequestInfo(URL(self.url), self.method, CIMultiDictProxy(CIMultiDict()))
+            raise aiohttp.ClientResponseError(info, (), status=self.status, message="replay")
+
+    def release(self) -> None:
+        pass
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+
+class ReplaySession:
+    """
+    Drop-in for aiohttp.ClientSession that answers from capture archives.
+    Repeated identical requests get the recorded responses in order (the last one repeats).
+    """
+
+    def __init__(self, *archive_paths: str, latency_scale: float = 0.0):
+        self.latency_scale = latency_scale  # 0 = full speed, 1 = recorded latency
+        self._exact: Dict[Tuple, List[Dict[str, Any]]] = defaultdict(list)
+        self._by_url: Dict[Tuple[str, str], List[Dict[str, Any]]] = defaultdict(list)
+        self._cursor: Dict[Tuple, int] = defaultdict(int)
+        for path in archive_paths:
+            for rec in iter_archive(path):
+                key = (rec["method"], rec["url"], tuple(tuple(p) for p in rec.get("params") or ()))
+                self._exact[key].append(rec)
+                self._by_url[(rec["method"], rec["url"])].append(rec)
+        self.calls = 0
+        self.exact_hits = 0
+        self.fallback_hits = 0
+        self.misses = 0
+        self.closed = False
+
+    def _lookup(self, key: Tuple) -> Optional[Dict[str, Any]]:
+        for table, k in ((self._exact, key), (self._by_url, key[:2])):
+            records = table.get(k)
+            if records:
+                i = self._cursor[k]
+                self._cursor[k] = i + 1
+                if table is self._exact:
+                    self.exact_hits += 1
+                else:
+                    self.fallback_hits += 1
+                return records[min(i, len(records) - 1)]
+        self.misses += 1
+        return None
+
+    def request(self, method: str, url, **kwargs) -> "_ReplayRequest":
+        return _ReplayRequest(self, method, url, kwargs.get("params"))
+
+    def get(self, url, **kwargs) -> "_ReplayRequest":
+        return self.request("GET", url, **kwargs)
+
+    def post(self, url, **kwargs) -> "_ReplayRequest":
+        return self.request("POST", url, **kwargs)
+
+    async def close(self) -> None:
+        self.closed = True
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.close()
+
+    def stats(self) -> Dict[str, int]:
+        return {"calls": self.calls, "exact_hits": self.exact_hits,
+                "fallback_hits": self.fallback_hits, "misses": self.misses}
+
+
+class _ReplayRequest:
+    def __init__(self, session: ReplaySession, method: str, url, params: Any):
+        self._session = session
+        self._key = request_key(method, url, params)
+
+    async def __aenter__(self) -> ReplayResponse:
+        session = self._session
+        session.calls += 1
+        rec = session._lookup(self._key)
+        method, base, _ = self._key
+        if rec is None:
+            record_api_call(endpoint_label(base), 0.0, error=True)
+            return ReplayResponse(method, base, 404, "")
+        if session.latency_scale > 0:
+            await asyncio.sleep(rec.get("latency_ms", 0) / 1000.0 * session.latency_scale)
+        record_api_call(endpoint_label(base), rec.get("latency_ms", 0) / 1000.0, error=rec["status"] >= 400)
+        return ReplayResponse(method, base, rec["status"], rec.get("body", ""))
+
+    async def __aexit__(self, *exc):
+        return False
+
+
+_ENGINE_SESSION: Optional[Any] = None
+_ENGINE_SESSION_LOOP: Optional[asyncio.AbstractEventLoop] = None
+
+
+def engine_session():
+    """
+    Process-wide session for engine code without a session of its own (resolver, Gamma
+    fallbacks): shared_session() normally, but under ENGINE_REPLAY / ENGINE_CAPTURE one
+    ReplaySession / RecordingSession per event loop, so that traffic is served or recorded too.
+    """
+    global _ENGINE_SESSION, _ENGINE_SESSION_LOOP
+    if not (ENGINE_REPLAY or ENGINE_CAPTURE):
+        return shared_session()
+    loop = asyncio.get_running_loop()
+    if _ENGINE_SESSION is None or _ENGINE_SESSION.closed or _ENGINE_SESSION_LOOP is not loop:
+        if ENGINE_REPLAY:
+            _ENGINE_SESSION = ReplaySession(*ENGINE_REPLAY.split(os.pathsep))
+        else:
+            _ENGINE_SESSION = RecordingSession(shared_session(), ENGINE_CAPTURE)
+        _ENGINE_SESSION_LOOP = loop
+    return _ENGINE_SESSION
+
+
+def open_session(**session_kwargs):
+    """
+    Session for the engine's scan loop: engine_session() (ReplaySession when ENGINE_REPLAY
+    is set, otherwise the shared HTTP client session, wrapped in a RecordingSession when
+    ENGINE_CAPTURE is set). With session_kwargs a new client session is created instead.
+    """
+    if not session_kwargs:
+        return engine_session()
+    if ENGINE_REPLAY:
+        return ReplaySession(*ENGINE_REPLAY.split(os.pathsep))
+    session = create_session(**session_kwargs)
+    if ENGINE_CAPTURE:
+        return RecordingSession(session, ENGINE_CAPTURE)
+    return session
+
+
+# ---- benchmark ----
+def captured_trades(*archive_paths: str) -> List[Dict[str, Any]]:
+    """Unique trades from every recorded data-api trades response, oldest first."""
+    from src.polymarket.engine import trade_key
+
+    seen = set()
+    trades = []
+    for path in archive_paths:
+        for rec in iter_archive(path):
+            if not rec["url"].rstrip("/").endswith("/trades") or rec["status"] != 200:
+                continue
+            try:
+                body = json.loads(rec["body"])
+            except (TypeError, ValueError):
+                continue
+            for trade in body if isinstance(body, list) else body.get("data", []) if isinstance(body, dict) else []:
+                if isinstance(trade, dict):
+                    k = trade_key(trade)
+                    if k not in seen:
+                        seen.add(k)
+                        trades.append(trade)
+    trades.sort(key=lambda t: float(t.get("timestamp") or 0))
+    return trades
+
+
+async def run_benchmark(archive_paths: List[str], limit: Optional[int] = None) -> Dict[str, Any]:
+    """Replay every captured trade through engine.process_trade with no network and report throughput."""
+    import resource
+    import shutil
+    import tempfile
+    import tracemalloc
+
+    from src.polymarket import engine, telegram
+
+    telegram.TOKEN = ""  # never message Telegram from a benchmark
+    engine.MIDPOINT_RETRY_BACKOFF_SEC = 0.0  # a replay miss never succeeds on retry
+    # Replayed (possibly days-old) trades must not land in the production daily logs
+    # that backtest/analyze read; the sinks still flush, into a throwaway dir
+    sink_dir = tempfile.mkdtemp(prefix="engine-bench-")
+    bench_sinks = (engine.activity_sink, engine.signal_sink, engine.status_sink)
+    for sink in bench_sinks:
+        sink.log_dir = sink_dir
+    trades = captured_trades(*archive_paths)
+    if limit:
+        trades = trades[:limit]
+    session = ReplaySession(*archive_paths)
+
+    tracemalloc.start()
+    signals = errors = 0
+    started = time.perf_counter()
+    for trade in trades:
+        try:
+            if await engine.process_trade(session, trade):
+                signals += 1
+        except Exception:
+            errors += 1
+    elapsed = time.perf_counter() - started
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    for sink in bench_sinks:
+        sink.close()
+    shutil.rmtree(sink_dir, ignore_errors=True)
+
+    return {
+        "trades": len(trades),
+        "signals": signals,
+        "errors": errors,
+        "elapsed_s": round(elapsed, 3),
+        "trades_per_sec": round(len(trades) / elapsed, 1) if elapsed > 0 else None,
+        "api_calls": session.calls,
+        "api_calls_per_signal": round(session.calls / signals, 2) if signals else None,
+        "api_calls_per_trade": round(session.calls / len(trades), 3) if trades else None,
+        "replay": session.stats(),
+        "peak_traced_mb": round(peak / 1e6, 1),
+        "max_rss_mb": round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1),
+    }
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Offline engine benchmark over captured API traffic")
+    sub = parser.add_subparsers(dest="command", required=True)
+    bench = sub.add_parser("bench", help="drive process_trade over captured trades at full speed")
+    bench.add_argument("archives", nargs="+", help="capture archive(s) (.jsonl.gz)")
+    bench.add_argument("--limit", type=int, default=None, help="only the first N trades")
+    info = sub.add_parser("info", help="summarize an archive")
+    info.add_argument("archives", nargs="+")
+    args = parser.parse_args(argv)
+
+    if args.command == "info":
+        by_endpoint: Dict[str, int] = defaultdict(int)
+        for path in args.archives:
+            for rec in iter_archive(path):
+                by_endpoint[endpoint_label(rec["url"])] += 1
+        print(json.dumps({"records": sum(by_endpoint.values()), "by_endpoint": dict(by_endpoint)}, indent=2))
+        return
+
+    result = asyncio.run(run_benchmark(args.archives, args.limit))
+    print(json.dumps(result, indent=2))
+
+
+if __name__ == "__main__":
+    main()
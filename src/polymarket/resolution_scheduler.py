@@ -0,0 +1,142 @@
+# src/polymarket/resolution_scheduler.py
+"""
+Adaptive scheduling of market resolution checks.
+
+Open paper trades are keyed by condition_id with the market's expected end time.
+A min-heap of (next_check_ts, condition_id) decides which markets the resolver
+looks at each tick:
+  - long before expiry: rarely (wake up at the start of the expiry window, capped
+    by RESOLUTION_MAX_PRE_EXPIRY_INTERVAL in case a market resolves early)
+  - around expiry: every RESOLUTION_NEAR_INTERVAL seconds
+  - after expiry without a result: exponential backoff up to RESOLUTION_MAX_POST_INTERVAL
+  - unknown end time: the resolver's base interval (old behaviour)
+"""
+import heapq
+import os
+import time
+from datetime import datetime, timezone
+from typing import Dict, Iterable, List, Optional, Tuple
+
+NEAR_EXPIRY_WINDOW_SEC = int(os.getenv("RESOLUTION_NEAR_EXPIRY_WINDOW_SEC", "7200"))  # +/- window around end time polled often
+NEAR_INTERVAL_SEC = int(os.getenv("RESOLUTION_NEAR_INTERVAL_SEC", "120"))  # Poll interval inside the window
+MAX_PRE_EXPIRY_INTERVAL_SEC = int(os.getenv("RESOLUTION_MAX_PRE_EXPIRY_INTERVAL_SEC", "21600"))  # At least every 6h before expiry
+MAX_POST_INTERVAL_SEC = int(os.getenv("RESOLUTION_MAX_POST_INTERVAL_SEC", "3600"))  # Backoff cap after expiry
+
+
+def parse_end_ts(value) -> Optional[float]:
+    """Parse an ISO timestamp / epoch value to epoch seconds (UTC), None if unparseable."""
+    if value is None or value == "":
+        return None
+    if isinstance(value, (int, float)):
+        return float(value) / (1000.0 if value > 1e12 else 1.0)
+    try:
+        dt = datetime.fromisoformat(str(value).strip().replace("Z", "+00:00"))
+    except ValueError:
+        return None
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=timezone.utc)
+    return dt.timestamp()
+
+
+class ResolutionScheduler:
+    """Priority queue of markets to check, ordered by next due time."""
+
+    def __init__(self, base_interval_sec: float):
+        self.base_interval_sec = float(base_interval_sec)
+        self._heap: List[Tuple[float, str]] = []
+        self._due_at: Dict[str, float] = {}  # condition_id -> current due time (heap entries with other times are stale)
+        self._end_ts: Dict[str, Optional[float]] = {}
+        self._post_misses: Dict[str, int] = {}
+        self.checks = 0
+        self.skipped = 0
+
+    # ---- membership ----
+    def sync(self, end_times: Dict[str, Optional[float]], now: Optional[float] = None) -> None:
+        """
+        Align with the current set of open markets: new ones are due immediately,
+        closed ones are dropped, known end times are refreshed (None never overwrites a known end).
+        """
+        now = now or time.time()
+        for cid in list(self._due_at):
+            if cid not in end_times:
+                self._forget(cid)
+        for cid, end_ts in end_times.items():
+            if end_ts is not None or cid not in self._end_ts:
+                self._end_ts[cid] = end_ts if end_ts is not None else self._end_ts.get(cid)
+            if cid not in self._due_at:
+                self._push(cid, now)
+
+    def _forget(self, cid: str) -> None:
+        self._due_at.pop(cid, None)
+        self._end_ts.pop(cid, None)
+        self._post_misses.pop(cid, None)
+
+    def _push(self, cid: str, due: float) -> None:
+        self._due_at[cid] = due
+        heapq.heappush(self._heap, (due, cid))
+
+    # ---- scheduling ----
+    def pop_due(self, now: Optional[float] = None) -> List[str]:
+        """Remove and return every market whose check is due."""
+        now = now or time.time()
+        due: List[str] = []
+        while self._heap and self._heap[0][0] <= now:
+            ts, cid = heapq.heappop(self._heap)
+            if self._due_at.get(cid) != ts:
+                continue  # stale entry (rescheduled or forgotten)
+            del self._due_at[cid]
+            due.append(cid)
+        self.checks += len(due)
+        self.skipped += len(self._due_at)
+        return due
+
+    def next_delay(self, cid: str, now: float) -> float:
+        """Seconds until the next check of a market that was just checked and is still unresolved."""
+        end_ts = self._end_ts.get(cid)
+        if end_ts is None:
+            return self.base_interval_sec
+        if now < end_ts - NEAR_EXPIRY_WINDOW_SEC:
+            # Before the window: sleep until it opens, but never longer than the pre-expiry cap
+            return max(self.base_interval_sec, min(end_ts - NEAR_EXPIRY_WINDOW_SEC - now, MAX_PRE_EXPIRY_INTERVAL_SEC))
+        if now <= end_ts + NEAR_EXPIRY_WINDOW_SEC:
+            return NEAR_INTERVAL_SEC
+        misses = self._post_misses.get(cid, 0)
+        self._post_misses[cid] = misses + 1
+        return min(NEAR_INTERVAL_SEC * (2 ** misses), MAX_POST_INTERVAL_SEC)
+
+    def reschedule(self, cid: str, now: Optional[float] = None, end_ts: Optional[float] = None,
+                   retry_soon: bool = False) -> None:
+        """Queue the next check for an unresolved market (retry_soon after fetch errors)."""
+        now = now or time.time()
+        if end_ts is not None:
+            self._end_ts[cid] = end_ts
+        delay = min(self.base_interval_sec, NEAR_INTERVAL_SEC) if retry_soon else self.next_delay(cid, now)
+        self._push(cid, now + delay)
+
+    def resolved(self, cid: str) -> None:
+        self._forget(cid)
+
+    def seconds_until_next(self, now: Optional[float] = None) -> Optional[float]:
+        now = now or time.time()
+        while self._heap and self._due_at.get(self._heap[0][1]) != self._heap[0][0]:
+            heapq.heappop(self._heap)
+        if not self._heap:
+            return None
+        return max(0.0, self._heap[0][0] - now)
+
+    def stats(self) -> Dict[str, float]:
+        return {
+            "markets_scheduled": len(self._due_at),
+            "checks": self.checks,
+            "skipped": self.skipped,
+            "next_check_in_sec": round(self.seconds_until_next() or 0.0, 1),
+        }
+
+
+def group_end_times(groups: Dict[str, Iterable[Dict]]) -> Dict[str, Optional[float]]:
+    """Earliest known expected_end_at per condition_id from open trade rows."""
+    out: Dict[str, Optional[float]] = {}
+    for cid, trades in groups.items():
+        ends = [e for e in (parse_end_ts(t.get("expected_end_at")) for t in trades) if e is not None]
+        out[cid] = min(ends) if ends else None
+    return out
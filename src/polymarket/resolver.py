@@ -6,12 +6,24 @@ Uses existing scraper functions to fetch market state.
 """
 import aiohttp
 import asyncio
+import os
 import structlog
-from typing import Optional, Dict, Tuple
-from datetime import datetime
+from typing import Optional, Dict, List, Set, Tuple
+from datetime import datetime, timezone
+
+from src.polymarket.replay import engine_session
+from src.polymarket.resolution_scheduler import ResolutionScheduler, group_end_times, parse_end_ts
 
 logger = structlog.get_logger()
 
+RESOLVER_CONCURRENCY = int(os.getenv("RESOLVER_CONCURRENCY", "8"))  # Distinct markets checked in parallel
+OPEN_TRADES_PAGE_SIZE = int(os.getenv("RESOLVER_PAGE_SIZE", "500"))  # Open trades read per DB page
+RESOLVER_MIN_TICK_SECONDS = int(os.getenv("RESOLVER_MIN_TICK_SECONDS", "30"))  # Shortest sleep between scheduler ticks
+
+# Open trades already flagged for a missing event_id by this process: they can never
+# resolve, so they are logged and written once instead of on every resolver tick
+_FLAGGED_MISSING: Set = set()
+
 
 async def fetch_outcome(session: aiohttp.ClientSession, event_id: str, market_id: str = None) -> Optional[Dict]:
     """
@@ -28,6 +40,7 @@ async def fetch_outcome(session: aiohttp.ClientSession, event_id: str, market_id
         - resolved: bool
         - resolved_outcome_index: int or None
         - resolved_outcome_name: str or None
+        - end_ts: market end time (epoch seconds) or None
         Or None on error
     """
     try:
@@ -103,14 +116,16 @@ async def fetch_outcome(session: aiohttp.ClientSession, event_id: str, market_id
             return {
                 "resolved": True,
                 "resolved_outcome_index": winning_outcome_index,
-                "resolved_outcome_name": winning_outcome_name or ""
+                "resolved_outcome_name": winning_outcome_name or "",
+                "end_ts": _market_end_ts(market),
             }
         
         # Market is still active
         return {
             "resolved": False,
             "resolved_outcome_index": None,
-            "resolved_outcome_name": None
+            "resolved_outcome_name": None,
+            "end_ts": _market_end_ts(market),
         }
         
     except Exception as e:
@@ -120,168 +135,267 @@ async def fetch_outcome(session: aiohttp.ClientSession, event_id: str, market_id
         return None
 
 
-async def resolve_once(storage, fetch_outcome_fn) -> Tuple[int, int]:
+def _market_end_ts(market: Optional[Dict]) -> Optional[float]:
+    """End time (epoch seconds) from a raw Gamma market, if present."""
+    if not isinstance(market, dict):
+        return None
+    for key in ("endDate", "endDateIso", "end_date_iso", "closeTime", "close_time"):
+        ts = parse_end_ts(market.get(key))
+        if ts is not None:
+            return ts
+    return None
+
+
+def _newly_missing(missing: List[Dict]) -> List[Dict]:
+    """Trades without an event_id that have not been flagged yet (and mark them flagged)."""
+    fresh = [t for t in missing if t.get("id") not in _FLAGGED_MISSING]
+    _FLAGGED_MISSING.update(t.get("id") for t in fresh)
+    return fresh
+
+
+def _group_open_trades(storage, page_size: int = OPEN_TRADES_PAGE_SIZE) -> Tuple[Dict[str, List[Dict]], List[Dict]]:
+    """
+    Page through ALL open paper trades and group them by condition_id (event_id).
+    Returns (groups, trades_missing_event_id).
+    """
+    groups: Dict[str, List[Dict]] = {}
+    missing: List[Dict] = []
+    if hasattr(storage, "iter_open_paper_trades"):
+        pages = storage.iter_open_paper_trades(page_size=page_size)
+    else:
+        pages = [storage.get_open_paper_trades(limit=0)]
+    for page in pages:
+        for trade in page:
+            event_id = trade.get("event_id") or trade.get("condition_id")
+            if event_id:
+                groups.setdefault(event_id, []).append(trade)
+            else:
+                missing.append(trade)
+    return groups, missing
+
+
+async def _check_markets(keys: List[str], check_fn, concurrency: int = RESOLVER_CONCURRENCY) -> Dict[str, object]:
+    """
+    Run check_fn(key) once per distinct market with at most `concurrency` in flight.
+    Returns {key: result or Exception}.
+    """
+    sem = asyncio.Semaphore(max(1, concurrency))
+
+    async def _one(key: str):
+        async with sem:
+            try:
+                return key, await check_fn(key)
+            except Exception as e:
+                return key, e
+
+    return dict(await asyncio.gather(*(_one(k) for k in keys)))
+
+
+async def _apply_group_resolutions(storage, groups: Dict[str, List[Dict]], results: Dict[str, object],
+                                   *, log_prefix: str, pending_status: str,
+                                   scheduler: Optional[ResolutionScheduler] = None) -> Tuple[int, int]:
+    """
+    Apply one normalized market result to every trade in its group.
+    Result dicts: {"resolved", "winning_outcome_index", "resolved_price", "outcome_name", "end_ts"}.
+    Resolved markets are written with one transaction per market; status rows are batched.
+    With a scheduler, each market's next check is queued according to the outcome.
+    """
+    resolved_count = 0
+    error_count = 0
+    status_rows: List[Tuple[int, str, str]] = []
+
+    for event_id, trades in groups.items():
+        result = results.get(event_id)
+        market_name = (trades[0].get("market") or "Unknown")[:50]
+
+        if isinstance(result, Exception):
+            logger.error(f"{log_prefix}_check_exception",
+                         event_id=event_id[:20],
+                         market=market_name,
+                         trades=len(trades),
+                         error=str(result))
+            error_count += len(trades)
+            status_rows.extend((t.get("id"), "ERROR", f"Exception: {str(result)[:100]}") for t in trades)
+            if scheduler:
+                scheduler.reschedule(event_id, retry_soon=True)
+            continue
+
+        if result is None:
+            logger.warning(f"{log_prefix}_fetch_failed",
+                           event_id=event_id[:20],
+                           market=market_name,
+                           trades=len(trades))
+            error_count += len(trades)
+            status_rows.extend((t.get("id"), "ERROR", "Failed to fetch market data") for t in trades)
+            if scheduler:
+                scheduler.reschedule(event_id, retry_soon=True)
+            continue
+
+        end_ts = result.get("end_ts")
+        if end_ts is not None and not any(t.get("expected_end_at") for t in trades):
+            # Learned the end time from the API - persist it so restarts schedule correctly
+            storage.set_expected_end(event_id, datetime.fromtimestamp(end_ts, timezone.utc).replace(tzinfo=None).isoformat())
+
+        if not result.get("resolved"):
+            status_rows.extend((t.get("id"), pending_status, "Market still active") for t in trades)
+            if scheduler:
+                scheduler.reschedule(event_id, end_ts=end_ts)
+            continue
+
+        winning_outcome_index = result.get("winning_outcome_index")
+        resolved_price = result.get("resolved_price")
+        if resolved_price is None:
+            resolved_price = 1.0 if winning_outcome_index is not None else 0.0
+
+        # Determine if we won (outcome indices match) for every trade on this market
+        outcomes_by_trade = {}
+        for t in trades:
+            trade_outcome_index = t.get("outcome_index")
+            outcomes_by_trade[t.get("id")] = (winning_outcome_index is not None and
+                                              trade_outcome_index is not None and
+                                              winning_outcome_index == trade_outcome_index)
+
+        logger.info(f"{log_prefix}_market_resolved",
+                    event_id=event_id[:20],
+                    market=market_name,
+                    winning_outcome_index=winning_outcome_index,
+                    resolved_price=resolved_price,
+                    trades=len(trades))
+
+        updated = await storage.resolve_trades_async(
+            list(outcomes_by_trade.items()),
+            -1 if winning_outcome_index is None else winning_outcome_index,
+            resolved_price,
+        )
+        updated_ids = set(updated)
+        if len(updated_ids) < len(trades):
+            logger.error("mark_trade_resolved_failed",
+                         event_id=event_id[:20],
+                         market=market_name,
+                         failed=len(trades) - len(updated_ids))
+            error_count += len(trades) - len(updated_ids)
+            if scheduler:
+                scheduler.reschedule(event_id, retry_soon=True)
+        elif scheduler:
+            scheduler.resolved(event_id)
+
+        for t in trades:
+            trade_id = t.get("id")
+            if trade_id not in updated_ids:
+                continue
+            resolved_count += 1
+            won = outcomes_by_trade[trade_id]
+
+            # Binary payout: +stake * (resolved_price - entry) / entry on a win, -stake on a loss
+            stake_usd = t.get("stake_usd") or 0.0
+            entry_price = t.get("entry_price") or 0.0
+            if won and entry_price > 0:
+                pnl_usd = stake_usd * (resolved_price - entry_price) / entry_price
+            else:
+                pnl_usd = -stake_usd if not won else stake_usd
+
+            logger.info(f"{log_prefix}_resolved_success",
+                        trade_id=trade_id,
+                        market=market_name,
+                        won=won,
+                        winning_outcome_index=winning_outcome_index,
+                        trade_outcome_index=t.get("outcome_index"),
+                        pnl_usd=pnl_usd)
+
+            # Notify via Telegram
+            try:
+                from src.polymarket.telegram import send_telegram
+                outcome_name = result.get("outcome_name") or t.get("outcome_name", "N/A")
+                pnl_emoji = "✅" if won else "❌"
+
+                send_telegram(
+                    f"{pnl_emoji} Paper trade resolved\n"
+                    f"Market: {market_name}\n"
+                    f"Outcome: {outcome_name}\n"
+                    f"Result: {'WON' if won else 'LOST'}\n"
+                    f"PnL: ${pnl_usd:.2f} USD"
+                )
+            except Exception as e:
+                logger.warning("telegram_notification_failed", trade_id=trade_id, error=str(e))
+
+    if status_rows:
+        storage.write_resolutions(status_rows)
+    return resolved_count, error_count
+
+
+def _select_due(groups: Dict[str, List[Dict]], scheduler: Optional[ResolutionScheduler]) -> Dict[str, List[Dict]]:
+    """Restrict groups to the markets the scheduler says are due (all of them without a scheduler)."""
+    if scheduler is None:
+        return groups
+    scheduler.sync(group_end_times(groups))
+    return {cid: groups[cid] for cid in scheduler.pop_due() if cid in groups}
+
+
+async def resolve_once(storage, fetch_outcome_fn, scheduler: Optional[ResolutionScheduler] = None) -> Tuple[int, int]:
     """
     Resolve open paper trades once.
+    All open trades are paged in and grouped by condition_id; each distinct market is
+    fetched once (RESOLVER_CONCURRENCY in flight) and its outcome applied to the whole group.
     
     Args:
         storage: SignalStore instance
         fetch_outcome_fn: Function that takes (session, event_id, market_id) and returns outcome dict
+        scheduler: Optional ResolutionScheduler; only markets it reports as due are checked
         
     Returns:
         Tuple of (resolved_count, error_count)
     """
     try:
-        open_trades = storage.get_open_paper_trades(limit=100)
+        groups, missing = _group_open_trades(storage)
         
-        if not open_trades:
+        if not groups and not missing:
             return (0, 0)
         
-        resolved_count = 0
-        error_count = 0
+        missing = _newly_missing(missing)
+        error_count = len(missing)
+        for trade in missing:
+            logger.warning("resolve_once_missing_event_id",
+                         trade_id=trade.get("id"),
+                         market=(trade.get("market") or "Unknown")[:50])
+        if missing:
+            storage.write_resolutions([(t.get("id"), "ERROR", "Missing event_id") for t in missing])
         
-        logger.info("resolve_once_started", open_trades_count=len(open_trades))
+        groups = _select_due(groups, scheduler)
+        if not groups:
+            return (0, error_count)
         
-        # Create session for API calls
-        async with aiohttp.ClientSession() as session:
-            for trade in open_trades:
-                event_id = trade.get("event_id") or trade.get("condition_id")
-                market_id = trade.get("market_id")
-                trade_id = trade.get("id")
-                market_name = trade.get("market", "Unknown")[:50]
-                
-                if not event_id:
-                    logger.warning("resolve_once_missing_event_id",
-                                 trade_id=trade_id,
-                                 market=market_name)
-                    error_count += 1
-                    try:
-                        storage.write_resolution(trade_id, "ERROR", "Missing event_id")
-                    except Exception as e:
-                        logger.error("write_resolution_failed", trade_id=trade_id, error=str(e))
-                    continue
-                
-                # Fetch outcome using provided function
-                try:
-                    outcome = await fetch_outcome_fn(session, event_id, market_id)
-                except Exception as e:
-                    logger.error("fetch_outcome_exception",
-                               trade_id=trade_id,
-                               event_id=event_id[:20] if event_id else "none",
-                               market=market_name,
-                               error=str(e))
-                    error_count += 1
-                    try:
-                        storage.write_resolution(trade_id, "ERROR", f"Exception: {str(e)[:100]}")
-                    except Exception:
-                        pass
-                    continue
-                
-                if outcome is None:
-                    # Error fetching - log and continue
-                    logger.warning("resolve_once_fetch_failed",
-                                 trade_id=trade_id,
-                                 event_id=event_id[:20] if event_id else "none",
-                                 market=market_name)
-                    error_count += 1
-                    try:
-                        storage.write_resolution(trade_id, "ERROR", "Failed to fetch market data")
-                    except Exception as e:
-                        logger.error("write_resolution_failed", trade_id=trade_id, error=str(e))
-                    continue
-                
-                if not outcome.get("resolved"):
-                    # Market not resolved yet - log check periodically
-                    if trade_id and trade_id % 10 == 0:  # Log every 10th check
-                        logger.debug("resolve_once_not_resolved",
-                                   trade_id=trade_id,
-                                   event_id=event_id[:20] if event_id else "none",
-                                   market=market_name)
-                    try:
-                        storage.write_resolution(trade_id, "NOT_RESOLVED", "Market still active")
-                    except Exception:
-                        pass  # Don't fail on write_resolution errors
-                    continue
-                
-                # Market is resolved - close the trade
-                resolved_outcome_index = outcome.get("resolved_outcome_index")
-                trade_outcome_index = trade.get("outcome_index")
-                
-                logger.info("resolve_once_market_resolved",
-                           trade_id=trade_id,
-                           event_id=event_id[:20] if event_id else "none",
-                           market=market_name,
-                           resolved_outcome_index=resolved_outcome_index,
-                           trade_outcome_index=trade_outcome_index)
-                
-                # Determine if we won (outcome indices match)
-                won = (resolved_outcome_index is not None and 
-                       trade_outcome_index is not None and
-                       resolved_outcome_index == trade_outcome_index)
-                
-                # Compute PnL
-                stake_usd = trade.get("stake_usd", 0.0)
-                entry_price = trade.get("entry_price", 0.0)
-                
-                if won and entry_price and entry_price > 0:
-                    # Binary payout approximation: +stake_usd * ((1/entry_price) - 1)
-                    pnl_usd = stake_usd * ((1.0 / entry_price) - 1.0)
-                else:
-                    # Lost - lose the stake
-                    pnl_usd = -stake_usd
-                
-                # Mark trade as resolved
-                try:
-                    success = storage.mark_trade_resolved(
-                        trade_id,
-                        resolved_outcome_index or -1,
-                        won,
-                        1.0 if won else 0.0  # resolved_price for binary markets
-                    )
-                except Exception as e:
-                    logger.error("mark_trade_resolved_exception",
-                               trade_id=trade_id,
-                               event_id=event_id[:20] if event_id else "none",
-                               market=market_name,
-                               error=str(e))
-                    error_count += 1
-                    continue
-                
-                if success:
-                    resolved_count += 1
-                    
-                    logger.info("resolve_once_resolved_success",
-                               trade_id=trade_id,
-                               market=market_name,
-                               won=won,
-                               pnl_usd=pnl_usd)
-                    
-                    # Notify via Telegram
-                    try:
-                        from src.polymarket.telegram import send_telegram
-                        outcome_name = outcome.get("resolved_outcome_name") or trade.get("outcome_name", "N/A")
-                        pnl_emoji = "✅" if won else "❌"
-                        
-                        send_telegram(
-                            f"{pnl_emoji} Paper trade resolved\n"
-                            f"Market: {market_name}\n"
-                            f"Outcome: {outcome_name}\n"
-                            f"Result: {'WON' if won else 'LOST'}\n"
-                            f"PnL: ${pnl_usd:.2f} USD"
-                        )
-                    except Exception as e:
-                        logger.warning("telegram_notification_failed", trade_id=trade_id, error=str(e))
-                else:
-                    logger.error("mark_trade_resolved_failed",
-                               trade_id=trade_id,
-                               event_id=event_id[:20] if event_id else "none",
-                               market=market_name)
-                    error_count += 1
+        logger.info("resolve_once_started",
+                   open_trades_count=sum(len(t) for t in groups.values()) + len(missing),
+                   markets=len(groups))
+        
+        # Shared HTTP client: pooled connections, Gamma rate limit and 429 retries (http_client.py);
+        # recorded / served from the archive under ENGINE_CAPTURE / ENGINE_REPLAY (replay.py)
+        session = engine_session()
+        
+        async def _check(event_id: str):
+            outcome = await fetch_outcome_fn(session, event_id, groups[event_id][0].get("market_id"))
+            if outcome is None:
+                return None
+            return {
+                "resolved": outcome.get("resolved"),
+                "winning_outcome_index": outcome.get("resolved_outcome_index"),
+                "resolved_price": None,
+                "outcome_name": outcome.get("resolved_outcome_name"),
+                "end_ts": outcome.get("end_ts"),
+            }
+        
+        results = await _check_markets(list(groups), _check)
+        
+        resolved_count, errors = await _apply_group_resolutions(
+            storage, groups, results, log_prefix="resolve_once", pending_status="NOT_RESOLVED",
+            scheduler=scheduler)
+        error_count += errors
         
         logger.info("resolve_once_complete",
                    resolved_count=resolved_count,
                    error_count=error_count,
-                   total_checked=len(open_trades))
+                   total_checked=sum(len(t) for t in groups.values()),
+                   markets_checked=len(groups))
         return (resolved_count, error_count)
         
     except Exception as e:
@@ -296,9 +410,20 @@ async def resolve_once(storage, fetch_outcome_fn) -> Tuple[int, int]:
         return (0, 1)
 
 
+def _next_tick_seconds(scheduler: ResolutionScheduler, interval_seconds: int) -> float:
+    """Sleep until the next market is due, bounded by [RESOLVER_MIN_TICK_SECONDS, interval_seconds]."""
+    until_next = scheduler.seconds_until_next()
+    if until_next is None:
+        return interval_seconds
+    return max(min(RESOLVER_MIN_TICK_SECONDS, interval_seconds), min(until_next, interval_seconds))
+
+
 async def run_resolver_loop(storage, fetch_outcome_fn, interval_seconds: int):
     """
     Run resolver loop periodically.
+    Markets are checked when the ResolutionScheduler says they are due (rarely before
+    expiry, often around it, with backoff afterwards); interval_seconds is the cadence
+    for markets with unknown end time and the longest the loop ever sleeps.
     
     Args:
         storage: SignalStore instance
@@ -306,10 +431,11 @@ async def run_resolver_loop(storage, fetch_outcome_fn, interval_seconds: int):
         interval_seconds: How often to check for resolutions
     """
     logger.info("resolver_loop_started", interval_seconds=interval_seconds)
+    scheduler = ResolutionScheduler(interval_seconds)
     
     while True:
         try:
-            resolved, errors = await resolve_once(storage, fetch_outcome_fn)
+            resolved, errors = await resolve_once(storage, fetch_outcome_fn, scheduler=scheduler)
             if resolved > 0 or errors > 0:
                 logger.info("resolver_cycle_complete", 
                           resolved=resolved, 
@@ -321,7 +447,8 @@ async def run_resolver_loop(storage, fetch_outcome_fn, interval_seconds: int):
                 if cycle_count % 12 == 0:
                     logger.info("resolver_cycle_no_resolutions",
                               cycle_count=cycle_count,
-                              interval_seconds=interval_seconds)
+                              interval_seconds=interval_seconds,
+                              **scheduler.stats())
         except Exception as e:
             logger.error(
                 "resolver_loop_error",
@@ -332,7 +459,7 @@ async def run_resolver_loop(storage, fetch_outcome_fn, interval_seconds: int):
                 exc_info=True
             )
         
-        await asyncio.sleep(interval_seconds)
+        await asyncio.sleep(_next_tick_seconds(scheduler, interval_seconds))
 
 
 async def check_market_resolution(session: aiohttp.ClientSession, condition_id: str) -> Optional[Dict]:
@@ -452,7 +579,6 @@ async def check_market_resolution(session: aiohttp.ClientSession, condition_id:
             # Validate we got the right market - check if title/slug matches expected
             # If API returns wrong market (e.g., all return same 2020 Biden market), log warning
             market_title = market.get("title", "").lower()
-            market_slug = market.get("slug", "").lower()
             if "biden" in market_title or "coronavirus" in market_title or "2020" in str(market.get("endDate", "")):
                 # This looks like the wrong market - API may have returned default
                 logger.warning("resolver_wrong_market_returned",
@@ -621,186 +747,72 @@ async def check_market_resolution(session: aiohttp.ClientSession, condition_id:
         return None
 
 
-async def resolve_paper_trades(session: aiohttp.ClientSession, signal_store, limit: int = 100):
+async def resolve_paper_trades(session: aiohttp.ClientSession, signal_store, limit: Optional[int] = None,
+                               scheduler: Optional[ResolutionScheduler] = None):
     """
     Check and resolve open paper trades.
+    Every open trade is paged in and grouped by condition_id; check_market_resolution runs
+    once per distinct market with bounded concurrency.
     
     Args:
         session: aiohttp session
         signal_store: SignalStore instance
-        limit: Maximum number of trades to check
+        limit: Optional cap on number of markets checked this call (None = all)
+        scheduler: Optional ResolutionScheduler; only markets it reports as due are checked
         
     Returns:
         Tuple of (resolved_count, error_count)
     """
     try:
-        open_trades = signal_store.get_open_paper_trades(limit=limit)
+        groups, missing = _group_open_trades(signal_store)
         
-        if not open_trades:
+        if not groups and not missing:
             logger.debug("resolve_paper_trades_no_open_trades", count=0)
             return (0, 0)
         
-        resolved_count = 0
-        error_count = 0
+        missing = _newly_missing(missing)
+        error_count = len(missing)
+        for trade in missing:
+            logger.warning("resolve_paper_trades_missing_event_id",
+                         trade_id=trade.get("id"),
+                         market=(trade.get("market") or "Unknown")[:50],
+                         trade_keys=list(trade.keys()))
+        if missing:
+            signal_store.write_resolutions([(t.get("id"), "ERROR", "Missing event_id/condition_id") for t in missing])
+        
+        groups = _select_due(groups, scheduler)
+        if limit:
+            groups = dict(list(groups.items())[:limit])
+        if not groups:
+            return (0, error_count)
         
         logger.info("resolve_paper_trades_started", 
-                   open_trades_count=len(open_trades),
-                   limit=limit)
+                   open_trades_count=sum(len(t) for t in groups.values()),
+                   markets=len(groups))
         
-        for trade in open_trades:
-            event_id = trade.get("event_id") or trade.get("condition_id")
-            trade_id = trade.get("id")
-            market_name = trade.get("market", "Unknown")[:50]
-            
-            if not event_id:
-                logger.warning("resolve_paper_trades_missing_event_id",
-                             trade_id=trade_id,
-                             market=market_name,
-                             trade_keys=list(trade.keys()))
-                error_count += 1
-                try:
-                    signal_store.write_resolution(
-                        trade_id, 
-                        "ERROR", 
-                        "Missing event_id/condition_id"
-                    )
-                except Exception as e:
-                    logger.error("write_resolution_failed", trade_id=trade_id, error=str(e))
-                continue
-            
-            # Check market resolution
-            try:
-                resolution = await check_market_resolution(session, event_id)
-            except Exception as e:
-                logger.error("check_market_resolution_exception",
-                           trade_id=trade_id,
-                           event_id=event_id[:20] if event_id else "none",
-                           market=market_name,
-                           error=str(e))
-                error_count += 1
-                try:
-                    signal_store.write_resolution(
-                        trade_id, 
-                        "ERROR", 
-                        f"Exception checking resolution: {str(e)[:100]}"
-                    )
-                except Exception:
-                    pass
-                continue
-            
+        async def _check(condition_id: str):
+            resolution = await check_market_resolution(session, condition_id)
             if resolution is None:
-                # Error checking - log and continue
-                logger.warning("resolve_paper_trades_api_failed",
-                             trade_id=trade_id,
-                             event_id=event_id[:20] if event_id else "none",
-                             market=market_name)
-                error_count += 1
-                try:
-                    signal_store.write_resolution(
-                        trade_id, 
-                        "ERROR", 
-                        "Failed to fetch market data from API"
-                    )
-                except Exception as e:
-                    logger.error("write_resolution_failed", trade_id=trade_id, error=str(e))
-                continue
-            
-            if not resolution.get("resolved"):
-                # Market not resolved yet - log check periodically (every 10th check to avoid spam)
-                if trade_id % 10 == 0:  # Log every 10th check
-                    logger.debug("resolve_paper_trades_not_resolved",
-                               trade_id=trade_id,
-                               event_id=event_id[:20] if event_id else "none",
-                               market=market_name)
-                try:
-                    signal_store.write_resolution(
-                        trade_id,
-                        "PENDING",
-                        "Market still active"
-                    )
-                except Exception:
-                    pass  # Don't fail on write_resolution errors
-                continue
-            
-            # Market is resolved - close the trade
-            winning_outcome_index = resolution.get("winning_outcome_index")
-            resolved_price = resolution.get("resolved_price", 0.0)
-            trade_outcome_index = trade.get("outcome_index")
-            
-            logger.info("resolve_paper_trades_market_resolved",
-                       trade_id=trade_id,
-                       event_id=event_id[:20] if event_id else "none",
-                       market=market_name,
-                       winning_outcome_index=winning_outcome_index,
-                       trade_outcome_index=trade_outcome_index,
-                       resolved_price=resolved_price)
-            
-            # Determine if we won
-            # We win if the winning outcome matches our trade outcome
-            won = (winning_outcome_index is not None and 
-                   trade_outcome_index is not None and
-                   winning_outcome_index == trade_outcome_index)
-            
-            # Mark trade as resolved
-            try:
-                success = signal_store.mark_trade_resolved(
-                    trade_id,
-                    winning_outcome_index or -1,
-                    won,
-                    resolved_price
-                )
-            except Exception as e:
-                logger.error("mark_trade_resolved_exception",
-                           trade_id=trade_id,
-                           event_id=event_id[:20] if event_id else "none",
-                           market=market_name,
-                           error=str(e))
-                error_count += 1
-                continue
-            
-            if success:
-                resolved_count += 1
-                
-                logger.info("resolve_paper_trades_resolved_success",
-                           trade_id=trade_id,
-                           market=market_name,
-                           won=won,
-                           winning_outcome_index=winning_outcome_index,
-                           trade_outcome_index=trade_outcome_index)
-                
-                # Notify via Telegram
-                try:
-                    from src.polymarket.telegram import send_telegram
-                    pnl_emoji = "✅" if won else "❌"
-                    
-                    # Compute PnL for notification
-                    stake_usd = trade.get("stake_usd", 0.0)
-                    entry_price = trade.get("entry_price", 0.0)
-                    if won and entry_price and entry_price > 0:
-                        pnl_usd = stake_usd * (resolved_price - entry_price) / entry_price
-                    else:
-                        pnl_usd = -stake_usd if not won else (stake_usd * (1.0 - entry_price) if entry_price else stake_usd)
-                    
-                    send_telegram(
-                        f"{pnl_emoji} Paper trade resolved\n"
-                        f"Market: {market_name}\n"
-                        f"Outcome: {trade.get('outcome_name', 'N/A')}\n"
-                        f"Result: {'WON' if won else 'LOST'}\n"
-                        f"PnL: ${pnl_usd:.2f} USD"
-                    )
-                except Exception as e:
-                    logger.warning("telegram_notification_failed", trade_id=trade_id, error=str(e))
-            else:
-                logger.error("mark_trade_resolved_failed",
-                           trade_id=trade_id,
-                           event_id=event_id[:20] if event_id else "none",
-                           market=market_name)
-                error_count += 1
+                return None
+            return {
+                "resolved": resolution.get("resolved"),
+                "winning_outcome_index": resolution.get("winning_outcome_index"),
+                "resolved_price": resolution.get("resolved_price", 0.0) if resolution.get("resolved") else None,
+                "outcome_name": None,
+                "end_ts": _market_end_ts(resolution.get("market_data")),
+            }
+        
+        results = await _check_markets(list(groups), _check)
+        resolved_count, errors = await _apply_group_resolutions(
+            signal_store, groups, results, log_prefix="resolve_paper_trades", pending_status="PENDING",
+            scheduler=scheduler)
+        error_count += errors
         
         logger.info("resolve_paper_trades_complete",
                    resolved_count=resolved_count,
                    error_count=error_count,
-                   total_checked=len(open_trades))
+                   total_checked=sum(len(t) for t in groups.values()),
+                   markets_checked=len(groups))
         return (resolved_count, error_count)
         
     except Exception as e:
@@ -817,7 +829,7 @@ async def resolve_paper_trades(session: aiohttp.ClientSession, signal_store, lim
 
 async def resolver_loop(session: aiohttp.ClientSession, signal_store, interval_seconds: int):
     """
-    Main resolver loop that runs periodically.
+    Main resolver loop that runs periodically (market checks paced by ResolutionScheduler).
     
     Args:
         session: aiohttp session
@@ -825,11 +837,12 @@ async def resolver_loop(session: aiohttp.ClientSession, signal_store, interval_s
         interval_seconds: How often to check for resolutions
     """
     logger.info("resolver_loop_started", interval_seconds=interval_seconds)
+    scheduler = ResolutionScheduler(interval_seconds)
     
     cycle_count = 0
     while True:
         try:
-            resolved, errors = await resolve_paper_trades(session, signal_store)
+            resolved, errors = await resolve_paper_trades(session, signal_store, scheduler=scheduler)
             cycle_count += 1
             if resolved > 0 or errors > 0:
                 logger.info("resolver_cycle_complete", 
@@ -841,7 +854,8 @@ async def resolver_loop(session: aiohttp.ClientSession, signal_store, interval_s
                 if cycle_count % 12 == 0:
                     logger.info("resolver_cycle_no_resolutions",
                               cycle_count=cycle_count,
-                              interval_seconds=interval_seconds)
+                              interval_seconds=interval_seconds,
+                              **scheduler.stats())
         except Exception as e:
             logger.error(
                 "resolver_loop_error",
@@ -852,5 +866,5 @@ async def resolver_loop(session: aiohttp.ClientSession, signal_store, interval_s
                 exc_info=True
             )
         
-        await asyncio.sleep(interval_seconds)
+        await asyncio.sleep(_next_tick_seconds(scheduler, interval_seconds))
 
@@ -1,6 +1,11 @@
-import aiohttp, asyncio, os, structlog, csv, time
+import aiohttp, asyncio, os, structlog, csv, json
 from datetime import datetime
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, Iterable, List
+
+from src.polymarket.cache import MISSING, TTLCache
+from src.polymarket.http_client import create_session
+from src.polymarket.singleflight import single_flight
+from src.polymarket.trade_cursors import TradeCursorStore
 
 # Exclude categories (comma-separated from env, e.g., "sports,crypto")
 EXCLUDE_CATEGORIES = {
@@ -19,17 +24,25 @@ HEADERS = {
 
 logger = structlog.get_logger()
 
-# Orderbook cache: key -> (timestamp, mid_price)
-_ORDERBOOK_CACHE = {}
+# Midpoint cache: "midpoint_{token_id}" -> mid_price (None cached briefly as a negative result)
 _ORDERBOOK_TTL_SECONDS = 10
+_ORDERBOOK_CACHE = TTLCache("clob_midpoint", ttl=_ORDERBOOK_TTL_SECONDS, max_entries=5000, negative_ttl=5)
 
-# Cache for conditionId → clobTokenIds mapping
-_CONDITION_TOKEN_CACHE = {}
+# Cache for conditionId → {"token_ids": [...], "outcomes": [...]}
 _CONDITION_TOKEN_CACHE_TTL = 3600  # 1 hour
+_CONDITION_TOKEN_CACHE = TTLCache("condition_tokens", ttl=_CONDITION_TOKEN_CACHE_TTL, max_entries=20000)
 
-# Cache conditionId -> {"bestBid": float|None, "bestAsk": float|None, "ts": float}
-_MARKET_QUOTE_CACHE: Dict[str, Dict[str, Any]] = {}
+# Cache conditionId -> {"bestBid": float|None, "bestAsk": float|None}
 _MARKET_QUOTE_TTL_SECONDS = 10
+_MARKET_QUOTE_CACHE = TTLCache("gamma_quote", ttl=_MARKET_QUOTE_TTL_SECONDS, max_entries=5000, negative_ttl=5)
+
+# Cache conditionId -> market metadata (title/slug/category/expiry fields)
+_MARKET_META_TTL_SECONDS = int(os.getenv("MARKET_META_TTL_SECONDS", "900"))  # Metadata rarely changes; 15 min
+_MARKET_META_CACHE = TTLCache("market_meta", ttl=_MARKET_META_TTL_SECONDS, max_entries=20000, negative_ttl=60)
+GAMMA_BATCH_SIZE = int(os.getenv("GAMMA_BATCH_SIZE", "50"))  # condition_ids per multi-ID Gamma request
+
+# conditionId -> newest trade already returned by fetch_trades_scanned (incremental paging)
+TRADE_CURSORS = TradeCursorStore()
 
 def _to_float(x) -> Optional[float]:
     """Convert value to float, return None if conversion fails."""
@@ -50,11 +63,146 @@ def _mid_from_bid_ask(bid: Optional[float], ask: Optional[float]) -> Optional[fl
         return bid
     return (bid + ask) / 2.0
 
+def _parse_str_list(raw) -> List[str]:
+    """Parse a Gamma list field (JSON array string, comma-separated string or list) to a list of strings."""
+    if isinstance(raw, str):
+        raw = raw.strip()
+        if not raw:
+            return []
+        if raw.startswith("["):
+            try:
+                raw = json.loads(raw)
+            except json.JSONDecodeError:
+                return []
+        else:
+            raw = [part.strip().strip('"').strip("'") for part in raw.split(",")]
+    if not isinstance(raw, list):
+        return []
+    return [str(x).strip() for x in raw if x is not None and str(x).strip()]
+
+def _market_condition_id(market: Dict) -> str:
+    """Extract conditionId from a raw Gamma market object (field names vary)."""
+    condition_obj = market.get("condition") if isinstance(market.get("condition"), dict) else {}
+    return (
+        market.get("conditionId")
+        or market.get("condition_id")
+        or condition_obj.get("id")
+        or condition_obj.get("conditionId")
+        or ""
+    )
+
+def _market_meta_from_raw(market: Dict, condition_id: str) -> Dict[str, Any]:
+    """Normalized metadata dict as returned by fetch_market_metadata_by_condition()."""
+    return {
+        "title": market.get("title", ""),
+        "slug": market.get("slug", ""),
+        "category": (market.get("category") or market.get("marketCategory") or "").lower().strip(),
+        "conditionId": condition_id,
+        # include common expiry fields for engine _days_to_expiry()
+        "endDate": market.get("endDate"),
+        "endDateIso": market.get("endDateIso") or market.get("end_date_iso"),
+        "closeTime": market.get("closeTime") or market.get("close_time"),
+        "resolutionTime": market.get("resolutionTime") or market.get("resolution_time"),
+    }
+
+def cache_market(market: Dict) -> Optional[str]:
+    """
+    Fill metadata, quote and token caches from ONE raw Gamma market object.
+    Returns the conditionId that was cached, or None if the market has none.
+    """
+    cid = _market_condition_id(market)
+    if not cid:
+        return None
+    _MARKET_META_CACHE[cid] = _market_meta_from_raw(market, cid)
+    if "bestBid" in market or "bestAsk" in market:
+        _MARKET_QUOTE_CACHE[cid] = {
+            "bestBid": _to_float(market.get("bestBid")),
+            "bestAsk": _to_float(market.get("bestAsk")),
+        }
+    token_ids = _parse_str_list(market.get("clobTokenIds"))
+    if token_ids:
+        _CONDITION_TOKEN_CACHE[cid] = {
+            "token_ids": token_ids,
+            "outcomes": _parse_str_list(market.get("outcomes")),
+        }
+    return cid
+
+def get_cached_market_meta(condition_id: str) -> Optional[Dict[str, Any]]:
+    """Fresh cached metadata for conditionId, or None."""
+    cached = _MARKET_META_CACHE.get(condition_id)
+    return None if cached is MISSING else cached
+
+def get_cached_market_quote(condition_id: str) -> Optional[Dict[str, Optional[float]]]:
+    """Fresh cached bestBid/bestAsk for conditionId, or None."""
+    cached = _MARKET_QUOTE_CACHE.get(condition_id)
+    return None if cached is MISSING else cached
+
+def get_cached_market_tokens(condition_id: str) -> Optional[Dict[str, List[str]]]:
+    """Cached {"token_ids": [...], "outcomes": [...]} for conditionId, or None."""
+    cached = _CONDITION_TOKEN_CACHE.get(condition_id)
+    return None if cached is MISSING else cached
+
+async def fetch_markets_by_condition_ids(session: aiohttp.ClientSession, condition_ids: Iterable[str]) -> Dict[str, Dict]:
+    """
+    Resolve many conditionIds with multi-ID Gamma requests (condition_ids=a&condition_ids=b...),
+    GAMMA_BATCH_SIZE ids per request. Every returned market is written to the metadata, quote
+    and token caches. Returns {conditionId: raw_market}; ids Gamma doesn't know are absent
+    (and negatively cached for a short while).
+    """
+    ids = list(dict.fromkeys(cid for cid in condition_ids if cid))
+    found: Dict[str, Dict] = {}
+    for i in range(0, len(ids), GAMMA_BATCH_SIZE):
+        chunk = ids[i:i + GAMMA_BATCH_SIZE]
+        params = [("condition_ids", cid) for cid in chunk] + [("limit", str(len(chunk)))]
+        try:
+            async with session.get(f"{GAMMA_BASE}/markets", headers=HEADERS, params=params,
+                                   timeout=aiohttp.ClientTimeout(total=15)) as r:
+                if r.status != 200:
+                    logger.warning("gamma_batch_fetch_failed", status=r.status, batch_size=len(chunk))
+                    continue
+                data = await r.json()
+        except Exception as e:
+            logger.warning("gamma_batch_fetch_failed", error=str(e)[:100], batch_size=len(chunk))
+            continue
+
+        if isinstance(data, dict):
+            data = data.get("markets") if isinstance(data.get("markets"), list) else [data]
+        for market in data or []:
+            if isinstance(market, dict):
+                cid = cache_market(market)
+                if cid:
+                    found[cid] = market
+        for cid in chunk:
+            if cid not in found:
+                _MARKET_META_CACHE.set_negative(cid)  # unknown to Gamma; don't re-ask for every trade
+    return found
+
+async def prefetch_market_metadata(session: aiohttp.ClientSession, condition_ids: Iterable[str]) -> int:
+    """
+    Batch-warm the market caches for all conditionIds seen in a cycle so the per-trade
+    lookups (metadata, quote, token ids) are served from memory.
+    Only ids without fresh metadata are requested. Returns number of ids fetched from Gamma.
+    """
+    missing = [cid for cid in dict.fromkeys(condition_ids) if cid and _MARKET_META_CACHE.get(cid) is MISSING]
+    if not missing:
+        return 0
+    found = await fetch_markets_by_condition_ids(session, missing)
+    logger.info("market_metadata_prefetched",
+                requested=len(missing),
+                resolved=len(found),
+                requests=(len(missing) + GAMMA_BATCH_SIZE - 1) // GAMMA_BATCH_SIZE)
+    return len(found)
+
 async def fetch_market_metadata_by_condition(session: aiohttp.ClientSession, condition_id: str) -> Optional[Dict]:
     """
     Fetch a single market by conditionId from Gamma and return full market metadata including category.
     Returns dict with: title, slug, category, etc.
+    Served from the batch metadata cache when prefetch_market_metadata() already saw this id.
     """
+    cached = _MARKET_META_CACHE.get(condition_id)
+    if cached is not MISSING:
+        return cached
+
     url = f"https://gamma-api.polymarket.com/markets?conditionId={condition_id}"
     try:
         async with session.get(url, headers=HEADERS, timeout=aiohttp.ClientTimeout(total=10)) as r:
@@ -74,18 +222,10 @@ async def fetch_market_metadata_by_condition(session: aiohttp.ClientSession, con
         if not isinstance(market, dict):
             return None
 
+        # One response fills metadata, quote and token caches
+        cache_market(market)
         # Return full market metadata
-        return {
-            "title": market.get("title", ""),
-            "slug": market.get("slug", ""),
-            "category": (market.get("category") or market.get("marketCategory") or "").lower().strip(),
-            "conditionId": condition_id,
-            # include common expiry fields for engine _days_to_expiry()
-            "endDate": market.get("endDate"),
-            "endDateIso": market.get("endDateIso") or market.get("end_date_iso"),
-            "closeTime": market.get("closeTime") or market.get("close_time"),
-            "resolutionTime": market.get("resolutionTime") or market.get("resolution_time"),
-        }
+        return _market_meta_from_raw(market, condition_id)
     except Exception:
         return None
 
@@ -93,6 +233,10 @@ async def fetch_market_quote_by_condition(session: aiohttp.ClientSession, condit
     """
     Fetch a single market by conditionId from Gamma and return bestBid/bestAsk.
     """
+    cached = get_cached_market_quote(condition_id)
+    if cached is not None:
+        return cached
+
     url = f"https://gamma-api.polymarket.com/markets?conditionId={condition_id}"
     try:
         async with session.get(url, headers=HEADERS, timeout=aiohttp.ClientTimeout(total=10)) as r:
@@ -112,6 +256,7 @@ async def fetch_market_quote_by_condition(session: aiohttp.ClientSession, condit
         if not isinstance(market, dict):
             return None
 
+        cache_market(market)
         bid = _to_float(market.get("bestBid"))
         ask = _to_float(market.get("bestAsk"))
         return {"bestBid": bid, "bestAsk": ask}
@@ -123,18 +268,20 @@ async def get_market_midpoint_cached(session: aiohttp.ClientSession, condition_i
     Cached midpoint from Gamma bestBid/bestAsk, keyed by conditionId.
     Uses provided session for efficiency.
     """
-    now = time.time()
     cached = _MARKET_QUOTE_CACHE.get(condition_id)
-    if cached and (now - cached.get("ts", 0)) < _MARKET_QUOTE_TTL_SECONDS:
+    if cached is not MISSING:
         return _mid_from_bid_ask(cached.get("bestBid"), cached.get("bestAsk"))
 
-    q = await fetch_market_quote_by_condition(session, condition_id)
-    if not q:
-        _MARKET_QUOTE_CACHE[condition_id] = {"bestBid": None, "bestAsk": None, "ts": now}
-        return None
+    async def _load() -> Optional[float]:
+        q = await fetch_market_quote_by_condition(session, condition_id)
+        if not q:
+            _MARKET_QUOTE_CACHE.set_negative(condition_id, {"bestBid": None, "bestAsk": None})
+            return None
+        _MARKET_QUOTE_CACHE[condition_id] = {"bestBid": q["bestBid"], "bestAsk": q["bestAsk"]}
+        return _mid_from_bid_ask(q["bestBid"], q["bestAsk"])
 
-    _MARKET_QUOTE_CACHE[condition_id] = {"bestBid": q["bestBid"], "bestAsk": q["bestAsk"], "ts": now}
-    return _mid_from_bid_ask(q["bestBid"], q["bestAsk"])
+    # Concurrent misses for the same market share one Gamma request
+    return await single_flight("gamma_quote", condition_id, _load)
 
 
 def build_orderbook_url(market_id: str, token_id: Optional[str] = None) -> Optional[str]:
@@ -261,6 +408,11 @@ def filter_trades_for_market(trades: list[dict], requested_market_id: str, reque
     return kept, mismatched, missing_ids
 
 
+def trade_cursor(condition_id: str):
+    """TRADE_CURSORS entry (newest trade seen, trade rate) for a market, None if never polled."""
+    return TRADE_CURSORS.get(_normalize_condition_id(condition_id))
+
+
 async def fetch_trades_scanned(
     session,
     *,
@@ -269,6 +421,7 @@ async def fetch_trades_scanned(
     api_min_size_usd: float = 1000.0,
     pages: int = 3,
     limit: int = 100,
+    use_cursor: bool = True,
 ):
     """
     Fetch trades for ONE market using Data-API /trades endpoint.
@@ -278,6 +431,10 @@ async def fetch_trades_scanned(
     - OR eventId = integer event IDs (mutually exclusive with market)
     
     We use the `market` parameter with the condition_id to scope trades.
+    
+    With use_cursor (and a condition_id), only trades newer than the market's
+    TRADE_CURSORS high-water mark are returned; paging stops at the first page that
+    reaches it, and busy markets may page past `pages` (see trade_cursors.py).
     """
     kept = []
     scanned = 0
@@ -290,7 +447,13 @@ async def fetch_trades_scanned(
     
     url = f"{BASE}/trades"
     
-    for offset in range(0, pages * limit, limit):
+    cursor_key = requested_condition if use_cursor else None
+    page_budget = TRADE_CURSORS.page_budget(cursor_key, pages, limit) if cursor_key else pages
+    new_trades = []
+    pages_fetched = 0
+    reached_cursor = False
+    
+    for offset in range(0, page_budget * limit, limit):
         # Build params - market must be a STRING (comma-separated if multiple), not a list
         params = {
             "limit": limit,
@@ -310,7 +473,7 @@ async def fetch_trades_scanned(
                        market_param_tail=requested_condition[-10:],
                        market_param_len=len(requested_condition),
                        api_min_size_usd=api_min_size_usd,
-                       pages=pages,
+                       pages=page_budget,
                        limit=limit,
                        offset=offset)
         
@@ -324,16 +487,29 @@ async def fetch_trades_scanned(
             
             trades = await resp.json()
             scanned += len(trades)
+            pages_fetched += 1
             
-            for t in trades:
+            fresh = trades
+            if cursor_key:
+                fresh = TRADE_CURSORS.new_trades(cursor_key, trades)
+                new_trades.extend(fresh)
+            
+            for t in fresh:
                 size = float(t.get("size") or 0.0)
                 price = float(t.get("price") or 0.0)
                 usd = size * price
                 if usd >= api_min_size_usd:
                     kept.append(t)
             
-            if not trades:
+            if len(trades) < limit:
+                reached_cursor = True
                 break  # no more pages
+            if len(fresh) < len(trades):
+                reached_cursor = True
+                break  # rest of the history was returned by an earlier poll
+    
+    if cursor_key:
+        TRADE_CURSORS.advance(cursor_key, new_trades, pages_fetched, pages, reached_cursor)
     
     # Safety net: filter trades by market_id OR condition_id to prevent leaks
     # (should be redundant if API scoping works, but keeps us safe)
@@ -387,7 +563,9 @@ async def fetch_trades_scanned(
                scanned=scanned,
                kept=len(kept),
                api_min_size_usd=api_min_size_usd,
-               pages=pages)
+               pages=pages_fetched,
+               page_budget=page_budget,
+               new_since_cursor=len(new_trades) if cursor_key else None)
     
     return kept
 
@@ -453,17 +631,21 @@ async def get_midpoint_price_cached(session: aiohttp.ClientSession, token_id: st
     Fetch midpoint price with caching. Uses token_id as cache key.
     """
     cache_key = f"midpoint_{token_id}"
-    now = time.time()
-    hit = _ORDERBOOK_CACHE.get(cache_key)
-    if hit:
-        ts, mid = hit
-        if (now - ts) <= _ORDERBOOK_TTL_SECONDS:
-            logger.debug("midpoint_cache_hit", token_id=token_id[:20])
-            return mid
+    mid = _ORDERBOOK_CACHE.get(cache_key)
+    if mid is not MISSING:
+        logger.debug("midpoint_cache_hit", token_id=token_id[:20])
+        return mid
+
+    async def _load() -> Optional[float]:
+        mid = await fetch_midpoint_price(session, token_id)
+        if mid is None:
+            _ORDERBOOK_CACHE.set_negative(cache_key)
+        else:
+            _ORDERBOOK_CACHE[cache_key] = mid
+        return mid
 
-    mid = await fetch_midpoint_price(session, token_id)
-    _ORDERBOOK_CACHE[cache_key] = (now, mid)
-    return mid
+    # Concurrent misses for the same token share one CLOB request
+    return await single_flight("clob_midpoint", token_id, _load)
 
 
 async def get_mid_price_cached(session: aiohttp.ClientSession, cache_key: str, orderbook_url: str) -> Optional[float]:
@@ -588,23 +770,8 @@ async def fetch_top_markets(session, limit=200, offset=0, order="volume", pages=
         )
         
         if cid:
-            # Extract clobTokenIds (array of token IDs for YES/NO outcomes)
-            clob_token_ids = m.get("clobTokenIds")
-            if isinstance(clob_token_ids, str):
-                # Parse JSON string if it's a string
-                import json
-                try:
-                    clob_token_ids = json.loads(clob_token_ids)
-                except:
-                    clob_token_ids = []
-            elif not isinstance(clob_token_ids, list):
-                clob_token_ids = []
-            
-            # Cache conditionId → clobTokenIds mapping
-            _CONDITION_TOKEN_CACHE[cid] = {
-                "token_ids": clob_token_ids,
-                "timestamp": time.time()
-            }
+            # Cache conditionId → metadata / quote / clobTokenIds from the listing itself
+            cache_market(m)
             
             # Build market dict: keep full raw market object + normalized fields
             market_dict = dict(m)  # Keep everything from raw market object
@@ -638,7 +805,7 @@ def get_token_id_for_condition(condition_id: str, side: str = "BUY") -> Optional
     Returns:
         Token ID string or None if not found
     """
-    cached = _CONDITION_TOKEN_CACHE.get(condition_id)
+    cached = get_cached_market_tokens(condition_id)
     if cached:
         token_ids = cached.get("token_ids", [])
         if len(token_ids) >= 2:
@@ -679,7 +846,7 @@ async def fetch_recent_trades(session, min_size_usd=10000, limit=100):
         return trades
 
 async def main():
-    async with aiohttp.ClientSession() as session:
+    async with create_session() as session:
         # Test fetch_active_events
         events = await fetch_active_events(session, limit=5, offset=0)
         for e in events:
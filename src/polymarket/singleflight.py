@@ -0,0 +1,42 @@
+"""
+Single-flight request coalescing.
+
+When a burst of trades for the same hot market/wallet misses the cache at once,
+only the first caller performs the HTTP lookup; concurrent callers with the same
+(endpoint, key) await that one in-flight task instead of firing duplicates.
+"""
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, Hashable, Tuple
+
+# (endpoint, key) -> in-flight task
+_INFLIGHT: Dict[Tuple[str, Hashable], "asyncio.Task"] = {}
+
+# endpoint -> {"calls": n, "coalesced": n}
+_STATS: Dict[str, Dict[str, int]] = {}
+
+
+async def single_flight(endpoint: str, key: Hashable, fn: Callable[[], Awaitable[Any]]) -> Any:
+    """
+    Run fn() once per (endpoint, key) at a time and share its result (or exception)
+    with every concurrent caller. Cancelling one waiter does not cancel the shared lookup.
+    """
+    flight_key = (endpoint, key)
+    stats = _STATS.setdefault(endpoint, {"calls": 0, "coalesced": 0})
+    task = _INFLIGHT.get(flight_key)
+    if task is None:
+        stats["calls"] += 1
+        task = asyncio.ensure_future(fn())
+        _INFLIGHT[flight_key] = task
+        task.add_done_callback(lambda _t: _INFLIGHT.pop(flight_key, None))
+    else:
+        stats["coalesced"] += 1
+    return await asyncio.shield(task)
+
+
+def inflight_count() -> int:
+    return len(_INFLIGHT)
+
+
+def single_flight_stats() -> Dict[str, Dict[str, int]]:
+    """Per-endpoint counts of real calls vs. callers that joined an in-flight call."""
+    return {endpoint: dict(s) for endpoint, s in _STATS.items()}
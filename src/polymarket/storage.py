@@ -2,18 +2,111 @@
 """
 Persistent signal storage in SQLite database with paper trading and resolver.
 Keeps CSV logging intact, adds database for querying, analysis, and paper trading.
+
+Connections are long-lived: one reader connection (guarded by a lock) and one
+writer connection owned by a background thread. Writes are queued and the writer
+groups whatever is pending into a single transaction, so engine coroutines never
+wait on fsync or lock retries (use the *_async methods from async code).
 """
+import asyncio
+import atexit
+import concurrent.futures
+import queue
 import sqlite3
 import os
 from pathlib import Path
-from typing import Dict, Optional, List
-from datetime import datetime
+from typing import Any, Callable, Dict, Optional, List
+from datetime import datetime, timedelta
 import logging
 import threading
 import time
 
 logger = logging.getLogger(__name__)
 
+WRITE_BATCH_MAX = int(os.getenv("SIGNAL_STORE_WRITE_BATCH_MAX", "200"))  # Max queued writes per transaction
+WRITE_BATCH_WINDOW_SEC = float(os.getenv("SIGNAL_STORE_WRITE_BATCH_WINDOW_SEC", "0.05"))  # Wait this long for more writes to group
+
+# Statements are module constants so sqlite3's per-connection statement cache reuses the prepared form
+_SQL_INSERT_SIGNAL = """
+    INSERT INTO signals(
+        ts, event_id, market_id, condition_id, slug, market,
+        category, category_inferred, wallet, wallet_prefix10,
+        side, outcome_index, outcome_name, token_id,
+        whale_score, confidence, discount, trade_value_usd,
+        size, entry_price, current_price, midpoint,
+        cluster_trades_count, days_to_expiry, tx_hash
+    ) VALUES (
+        :ts, :event_id, :market_id, :condition_id, :slug, :market,
+        :category, :category_inferred, :wallet, :wallet_prefix10,
+        :side, :outcome_index, :outcome_name, :token_id,
+        :whale_score, :confidence, :discount, :trade_value_usd,
+        :size, :entry_price, :current_price, :midpoint,
+        :cluster_trades_count, :days_to_expiry, :tx_hash
+    )
+"""
+_SQL_SELECT_SIGNAL_ID = """
+    SELECT id FROM signals 
+    WHERE event_id = :event_id 
+    AND outcome_index = :outcome_index 
+    AND side = :side 
+    AND wallet_prefix10 = :wallet_prefix10
+"""
+_SQL_INSERT_PAPER_TRADE = """
+    INSERT INTO paper_trades(
+        signal_id, opened_at, status, stake_eur, stake_usd,
+        entry_price, outcome_index, outcome_name, side,
+        event_id, market_id, token_id, confidence, market_question, expected_end_at
+    ) VALUES (
+        :signal_id, :opened_at, 'OPEN', :stake_eur, :stake_usd,
+        :entry_price, :outcome_index, :outcome_name, :side,
+        :event_id, :market_id, :token_id, :confidence, :market_question, :expected_end_at
+    )
+"""
+_SQL_HAS_OPEN_TRADE = "SELECT 1 FROM paper_trades WHERE event_id = ? AND status = 'OPEN' LIMIT 1"
+_SQL_OPEN_TRADES = """
+    SELECT pt.*, s.market, s.category, s.confidence
+    FROM paper_trades pt
+    LEFT JOIN signals s ON pt.signal_id = s.id
+    WHERE pt.status = 'OPEN'
+    ORDER BY pt.opened_at ASC
+    LIMIT ?
+"""
+_SQL_OPEN_TRADES_PAGE = """
+    SELECT pt.*, s.market, s.category, s.confidence
+    FROM paper_trades pt
+    LEFT JOIN signals s ON pt.signal_id = s.id
+    WHERE pt.status = 'OPEN' AND pt.id > ?
+    ORDER BY pt.id ASC
+    LIMIT ?
+"""
+_SQL_TRADE_FOR_RESOLVE = """
+    SELECT stake_usd, entry_price, outcome_index FROM paper_trades
+    WHERE id = ?
+"""
+_SQL_MARK_RESOLVED = """
+    UPDATE paper_trades
+    SET status = 'RESOLVED',
+        resolved_at = :resolved_at,
+        resolved_outcome_index = :resolved_outcome_index,
+        won = :won,
+        pnl_usd = :pnl_usd
+    WHERE id = :trade_id
+"""
+_SQL_SET_EXPECTED_END = """
+    UPDATE paper_trades SET expected_end_at = ?
+    WHERE event_id = ? AND status = 'OPEN' AND expected_end_at IS NULL
+"""
+_SQL_INSERT_RESOLUTION = """
+    INSERT INTO resolutions(paper_trade_id, checked_at, status, details)
+    VALUES (?, ?, ?, ?)
+"""
+_SQL_INSERT_EQUITY = """
+    INSERT INTO equity_curve(
+        snapshot_at, total_trades, open_trades, resolved_trades,
+        total_pnl_usd, win_rate, equity_usd
+    ) VALUES (?, ?, ?, ?, ?, ?, ?)
+"""
+
 
 class SignalStore:
     """
@@ -34,23 +127,44 @@ class SignalStore:
             os.makedirs(db_dir, exist_ok=True)
         
         self.db_path = db_path
-        self._db_lock = threading.Lock()
+        self._db_lock = threading.Lock()  # guards the shared reader connection
         self.init_db()
+        
+        self._read_conn = self._connect()
+        self._write_queue: "queue.Queue" = queue.Queue()
+        self._writer = threading.Thread(target=self._writer_loop, name="signal-store-writer", daemon=True)
+        self._closed = False
+        self.writes_committed = 0
+        self.write_batches = 0
+        self._writer.start()
+        atexit.register(self.close)
     
-    def _get_connection(self):
-        """
-        Get SQLite connection with proper settings for concurrent access.
-        Uses WAL mode and busy_timeout to handle file locks gracefully.
-        """
-        conn = sqlite3.connect(self.db_path, timeout=30, check_same_thread=False)
+    def _connect(self, autocommit: bool = False) -> sqlite3.Connection:
+        """Open a long-lived connection (WAL, busy_timeout, statement cache)."""
+        conn = sqlite3.connect(
+            self.db_path,
+            timeout=30,
+            check_same_thread=False,
+            cached_statements=128,
+            isolation_level=None if autocommit else "",
+        )
         conn.execute("PRAGMA journal_mode=WAL;")
         conn.execute("PRAGMA synchronous=NORMAL;")
         conn.execute("PRAGMA busy_timeout=30000;")  # 30 seconds
         return conn
     
+    def _get_connection(self):
+        """
+        Get a fresh SQLite connection with proper settings for concurrent access.
+        Uses WAL mode and busy_timeout to handle file locks gracefully.
+        Kept for scripts doing ad-hoc queries; the store itself uses its persistent connections.
+        """
+        return self._connect()
+    
     def _retry_db(self, fn, *, tries=20, delay=0.2, backoff=1.2):
         """
         Retry a database operation with exponential backoff on lock errors.
+        Only called from the writer thread / init, never from the event loop.
         
         Args:
             fn: Callable that performs the database operation
@@ -77,6 +191,110 @@ class SignalStore:
                 delay *= backoff
         raise last
     
+    # ---- background writer ----
+    def _submit(self, job: Callable[[sqlite3.Connection], Any]) -> concurrent.futures.Future:
+        """Queue a write job (fn(conn) -> result) for the writer thread."""
+        fut: concurrent.futures.Future = concurrent.futures.Future()
+        if self._closed:
+            fut.set_exception(RuntimeError("SignalStore is closed"))
+            return fut
+        self._write_queue.put((job, fut))
+        return fut
+    
+    def _writer_loop(self):
+        conn = self._connect(autocommit=True)
+        stopping = False
+        while not stopping:
+            item = self._write_queue.get()
+            if item is None:
+                break
+            batch = [item]
+            # Group whatever else arrives within the window into the same transaction
+            deadline = time.monotonic() + WRITE_BATCH_WINDOW_SEC
+            while len(batch) < WRITE_BATCH_MAX:
+                remaining = deadline - time.monotonic()
+                try:
+                    nxt = self._write_queue.get(timeout=max(0.0, remaining)) if remaining > 0 else self._write_queue.get_nowait()
+                except queue.Empty:
+                    break
+                if nxt is None:
+                    stopping = True
+                    break
+                batch.append(nxt)
+            self._run_batch(conn, batch)
+        conn.close()
+    
+    def _run_batch(self, conn: sqlite3.Connection, batch: List) -> None:
+        """Run queued jobs in ONE transaction; each job gets a savepoint so a failing job doesn't undo the rest."""
+        def _do():
+            results = []
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                for job, fut in batch:
+                    conn.execute("SAVEPOINT job")
+                    try:
+                        results.append((fut, job(conn), None))
+                        conn.execute("RELEASE job")
+                    except sqlite3.OperationalError as e:
+                        if "database is locked" in str(e).lower():
+                            raise
+                        conn.execute("ROLLBACK TO job")
+                        conn.execute("RELEASE job")
+                        results.append((fut, None, e))
+                    except Exception as e:
+                        conn.execute("ROLLBACK TO job")
+                        conn.execute("RELEASE job")
+                        results.append((fut, None, e))
+                conn.execute("COMMIT")
+            except BaseException:
+                if conn.in_transaction:
+                    conn.execute("ROLLBACK")
+                raise
+            return results
+        
+        try:
+            results = self._retry_db(_do)
+        except Exception as e:
+            logger.exception(
+                "signal_store_batch_failed",
+                extra={"event": "signal_store_batch_failed", "batch_size": len(batch)}
+            )
+            for _, fut in batch:
+                fut.set_exception(e)
+            return
+        
+        self.write_batches += 1
+        self.writes_committed += len(batch)
+        for fut, result, err in results:
+            if err is not None:
+                fut.set_exception(err)
+            else:
+                fut.set_result(result)
+    
+    def pending_writes(self) -> int:
+        """Number of writes queued but not yet committed."""
+        return self._write_queue.qsize()
+    
+    def flush(self, timeout: Optional[float] = None) -> None:
+        """Block until every write queued so far is committed."""
+        if self._closed:
+            return
+        self._submit(lambda conn: None).result(timeout=timeout)
+    
+    def close(self) -> None:
+        """Flush pending writes and stop the writer thread."""
+        if self._closed:
+            return
+        self._closed = True
+        self._write_queue.put(None)
+        self._writer.join(timeout=30)
+        with self._db_lock:
+            self._read_conn.close()
+    
+    @staticmethod
+    async def _await(fut: concurrent.futures.Future):
+        return await asyncio.wrap_future(fut)
+    
     def init_db(self):
         """Create database table if it doesn't exist."""
         with self._db_lock:
@@ -142,6 +360,7 @@ class SignalStore:
                             token_id TEXT,
                             confidence INTEGER,
                             market_question TEXT NULL,
+                            expected_end_at TEXT NULL,
                             resolved_at TEXT NULL,
                             resolved_outcome_index INTEGER NULL,
                             won INTEGER NULL,
@@ -156,6 +375,12 @@ class SignalStore:
                     except sqlite3.OperationalError:
                         pass  # Column already exists
                     
+                    # Expected market end (ISO, UTC) drives adaptive resolution scheduling
+                    try:
+                        cursor.execute("ALTER TABLE paper_trades ADD COLUMN expected_end_at TEXT NULL")
+                    except sqlite3.OperationalError:
+                        pass  # Column already exists
+                    
                     # Create resolutions table
                     cursor.execute("""
                         CREATE TABLE IF NOT EXISTS resolutions(
@@ -198,7 +423,7 @@ class SignalStore:
             
             try:
                 self._retry_db(_do)
-            except Exception as e:
+            except Exception:
                 logger.exception(
                     "storage_init_failed",
                     extra={
@@ -207,7 +432,98 @@ class SignalStore:
                     }
                 )
     
-    def insert_signal(self, signal_row: Dict) -> bool:
+    # ---- job plumbing ----
+    def _run_sync(self, make_job: Callable[[], Callable], event: str, default: Any, **fields):
+        """Submit a write job and wait for its result (scripts / sync callers)."""
+        try:
+            return self._submit(make_job()).result()
+        except Exception:
+            logger.exception(event, extra={"event": event, **fields})
+            return default
+    
+    async def _run_async(self, make_job: Callable[[], Callable], event: str, default: Any, **fields):
+        """Submit a write job and await its result without blocking the event loop."""
+        try:
+            return await self._await(self._submit(make_job()))
+        except Exception:
+            logger.exception(event, extra={"event": event, **fields})
+            return default
+    
+    def _run_background(self, make_job: Callable[[], Callable], event: str, **fields) -> None:
+        """Fire-and-forget write: queued now, committed with the next batch; failures are logged."""
+        def _log_failure(fut: concurrent.futures.Future):
+            if fut.exception() is not None:
+                logger.error(event, extra={"event": event, "error": str(fut.exception()), **fields})
+        try:
+            self._submit(make_job()).add_done_callback(_log_failure)
+        except Exception:
+            logger.exception(event, extra={"event": event, **fields})
+    
+    # ---- signals ----
+    def _signal_job(self, signal_row: Dict) -> Callable[[sqlite3.Connection], Optional[int]]:
+        # Extract fields from signal dict
+        wallet = signal_row.get("wallet", "")
+        wallet_prefix10 = wallet[:10] if wallet else ""
+        
+        # Compute confidence from whale_score if not provided
+        whale_score = signal_row.get("whale_score")
+        if whale_score is not None:
+            try:
+                confidence = int(round(float(whale_score) * 100))
+            except Exception:
+                confidence = None
+        else:
+            confidence = signal_row.get("confidence")
+        
+        # Prepare data for insertion
+        data = {
+            "ts": signal_row.get("timestamp", datetime.utcnow().isoformat()),
+            "event_id": signal_row.get("event_id") or signal_row.get("condition_id", ""),
+            "market_id": signal_row.get("market_id", ""),
+            "condition_id": signal_row.get("condition_id", ""),
+            "slug": signal_row.get("slug", ""),
+            "market": signal_row.get("market", ""),
+            "category": signal_row.get("category", ""),
+            "category_inferred": 1 if signal_row.get("category_inferred") else 0,
+            "wallet": wallet,
+            "wallet_prefix10": wallet_prefix10,
+            "side": signal_row.get("side", ""),
+            "outcome_index": signal_row.get("outcome_index"),
+            "outcome_name": signal_row.get("outcome_name") or signal_row.get("outcome", ""),
+            "token_id": signal_row.get("token_id", ""),
+            "whale_score": whale_score,
+            "confidence": confidence,
+            "discount": signal_row.get("discount_pct"),
+            "trade_value_usd": signal_row.get("trade_value_usd"),
+            "size": signal_row.get("size"),
+            "entry_price": signal_row.get("whale_entry_price") or signal_row.get("entry_price"),
+            "current_price": signal_row.get("current_price"),
+            "midpoint": signal_row.get("midpoint"),
+            "cluster_trades_count": signal_row.get("cluster_trades_count", 1),
+            "days_to_expiry": signal_row.get("days_to_expiry"),
+            "tx_hash": signal_row.get("transaction_hash") or signal_row.get("tx_hash", "")
+        }
+        
+        def _job(conn: sqlite3.Connection) -> Optional[int]:
+            try:
+                return conn.execute(_SQL_INSERT_SIGNAL, data).lastrowid
+            except sqlite3.IntegrityError:
+                # Duplicate signal (unique constraint violation) - return existing ID
+                row = conn.execute(_SQL_SELECT_SIGNAL_ID, {
+                    "event_id": data.get("event_id", ""),
+                    "outcome_index": data.get("outcome_index"),
+                    "side": data.get("side", ""),
+                    "wallet_prefix10": data.get("wallet_prefix10", "")
+                }).fetchone()
+                if row:
+                    logger.debug("signal_duplicate_skipped", 
+                                extra={"event_id": data.get("event_id", "")[:20],
+                                       "wallet_prefix10": data.get("wallet_prefix10", "")})
+                    return row[0]
+                return None
+        return _job
+    
+    def insert_signal(self, signal_row: Dict) -> Optional[int]:
         """
         Insert signal into database.
         
@@ -215,123 +531,50 @@ class SignalStore:
             signal_row: Signal dictionary with all signal fields
             
         Returns:
-            True if inserted, False if duplicate or error
+            Signal id (existing id for duplicates), None on error
         """
-        try:
-            # Extract fields from signal dict
-            wallet = signal_row.get("wallet", "")
-            wallet_prefix10 = wallet[:10] if wallet else ""
-            
-            # Compute confidence from whale_score if not provided
-            whale_score = signal_row.get("whale_score")
-            if whale_score is not None:
-                try:
-                    confidence = int(round(float(whale_score) * 100))
-                except Exception:
-                    confidence = None
-            else:
-                confidence = signal_row.get("confidence")
-            
-            # Prepare data for insertion
-            data = {
-                "ts": signal_row.get("timestamp", datetime.utcnow().isoformat()),
-                "event_id": signal_row.get("event_id") or signal_row.get("condition_id", ""),
-                "market_id": signal_row.get("market_id", ""),
-                "condition_id": signal_row.get("condition_id", ""),
-                "slug": signal_row.get("slug", ""),
-                "market": signal_row.get("market", ""),
-                "category": signal_row.get("category", ""),
-                "category_inferred": 1 if signal_row.get("category_inferred") else 0,
-                "wallet": wallet,
-                "wallet_prefix10": wallet_prefix10,
-                "side": signal_row.get("side", ""),
-                "outcome_index": signal_row.get("outcome_index"),
-                "outcome_name": signal_row.get("outcome_name") or signal_row.get("outcome", ""),
-                "token_id": signal_row.get("token_id", ""),
-                "whale_score": whale_score,
-                "confidence": confidence,
-                "discount": signal_row.get("discount_pct"),
-                "trade_value_usd": signal_row.get("trade_value_usd"),
-                "size": signal_row.get("size"),
-                "entry_price": signal_row.get("whale_entry_price") or signal_row.get("entry_price"),
-                "current_price": signal_row.get("current_price"),
-                "midpoint": signal_row.get("midpoint"),
-                "cluster_trades_count": signal_row.get("cluster_trades_count", 1),
-                "days_to_expiry": signal_row.get("days_to_expiry"),
-                "tx_hash": signal_row.get("transaction_hash") or signal_row.get("tx_hash", "")
-            }
-            
-            with self._db_lock:
-                def _do():
-                    conn = self._get_connection()
-                    try:
-                        cursor = conn.cursor()
-                        cursor.execute("""
-                            INSERT INTO signals(
-                                ts, event_id, market_id, condition_id, slug, market,
-                                category, category_inferred, wallet, wallet_prefix10,
-                                side, outcome_index, outcome_name, token_id,
-                                whale_score, confidence, discount, trade_value_usd,
-                                size, entry_price, current_price, midpoint,
-                                cluster_trades_count, days_to_expiry, tx_hash
-                            ) VALUES (
-                                :ts, :event_id, :market_id, :condition_id, :slug, :market,
-                                :category, :category_inferred, :wallet, :wallet_prefix10,
-                                :side, :outcome_index, :outcome_name, :token_id,
-                                :whale_score, :confidence, :discount, :trade_value_usd,
-                                :size, :entry_price, :current_price, :midpoint,
-                                :cluster_trades_count, :days_to_expiry, :tx_hash
-                            )
-                        """, data)
-                        signal_id = cursor.lastrowid
-                        conn.commit()
-                        return signal_id
-                    finally:
-                        conn.close()
-                
-                return self._retry_db(_do)
-            
-        except sqlite3.IntegrityError:
-            # Duplicate signal (unique constraint violation) - return existing ID
-            with self._db_lock:
-                def _do():
-                    conn = self._get_connection()
-                    try:
-                        cursor = conn.cursor()
-                        cursor.execute("""
-                            SELECT id FROM signals 
-                            WHERE event_id = :event_id 
-                            AND outcome_index = :outcome_index 
-                            AND side = :side 
-                            AND wallet_prefix10 = :wallet_prefix10
-                        """, {
-                            "event_id": data.get("event_id", ""),
-                            "outcome_index": data.get("outcome_index"),
-                            "side": data.get("side", ""),
-                            "wallet_prefix10": data.get("wallet_prefix10", "")
-                        })
-                        result = cursor.fetchone()
-                        return result[0] if result else None
-                    finally:
-                        conn.close()
-                
-                result = self._retry_db(_do)
-                if result:
-                    logger.debug("signal_duplicate_skipped", 
-                                event_id=data.get("event_id", "")[:20] if 'data' in locals() else "",
-                                wallet_prefix10=data.get("wallet_prefix10", "") if 'data' in locals() else "")
-                    return result
-                return None
-        except Exception as e:
-            # Database error - log but don't crash engine
-            logger.exception(
-                "signal_db_insert_failed",
-                extra={
-                    "event": "signal_db_insert_failed",
-                    "event_id": signal_row.get("event_id", "")[:20] if signal_row else "",
-                }
-            )
-            return None
+        return self._run_sync(lambda: self._signal_job(signal_row), "signal_db_insert_failed", None,
+                              event_id=str(signal_row.get("event_id", ""))[:20] if signal_row else "")
+    
+    async def insert_signal_async(self, signal_row: Dict) -> Optional[int]:
+        """insert_signal() for coroutines: awaits the writer thread instead of blocking."""
+        return await self._run_async(lambda: self._signal_job(signal_row), "signal_db_insert_failed", None,
+                                     event_id=str(signal_row.get("event_id", ""))[:20] if signal_row else "")
+    
+    # ---- paper trades ----
+    def _paper_trade_job(self, signal_id: int, signal_dict: Dict, stake_eur: float, fx_eur_usd: float) -> Callable:
+        stake_usd = stake_eur * fx_eur_usd
+        entry_price = signal_dict.get("whale_entry_price") or signal_dict.get("entry_price") or signal_dict.get("current_price")
+        
+        # Extract outcome fields explicitly (ensure they're never None)
+        outcome_index = signal_dict.get("outcome_index")
+        outcome_name = signal_dict.get("outcome_name") or signal_dict.get("outcome", "")
+        confidence = signal_dict.get("confidence")
+        
+        # Expected end: explicit field, else now + days_to_expiry from the signal
+        expected_end_at = signal_dict.get("expected_end_at")
+        if not expected_end_at and signal_dict.get("days_to_expiry") is not None:
+            try:
+                expected_end_at = (datetime.utcnow() + timedelta(days=float(signal_dict["days_to_expiry"]))).isoformat()
+            except (TypeError, ValueError):
+                expected_end_at = None
+        params = {
+            "signal_id": signal_id,
+            "opened_at": datetime.utcnow().isoformat(),
+            "stake_eur": stake_eur,
+            "stake_usd": stake_usd,
+            "entry_price": entry_price,
+            "outcome_index": outcome_index,
+            "outcome_name": outcome_name,
+            "side": signal_dict.get("side", ""),
+            "event_id": signal_dict.get("event_id") or signal_dict.get("condition_id", ""),
+            "market_id": signal_dict.get("market_id", ""),
+            "token_id": signal_dict.get("token_id", ""),
+            "confidence": confidence,
+            "market_question": signal_dict.get("market_question") or signal_dict.get("question") or None,
+            "expected_end_at": expected_end_at
+        }
+        return lambda conn: conn.execute(_SQL_INSERT_PAPER_TRADE, params).lastrowid
     
     def insert_paper_trade(self, signal_id: int, signal_dict: Dict, stake_eur: float, fx_eur_usd: float) -> Optional[int]:
         """
@@ -346,67 +589,19 @@ class SignalStore:
         Returns:
             Paper trade ID if created, None on error
         """
-        try:
-            stake_usd = stake_eur * fx_eur_usd
-            entry_price = signal_dict.get("whale_entry_price") or signal_dict.get("entry_price") or signal_dict.get("current_price")
-            
-            # Extract outcome fields explicitly (ensure they're never None)
-            outcome_index = signal_dict.get("outcome_index")
-            outcome_name = signal_dict.get("outcome_name") or signal_dict.get("outcome", "")
-            confidence = signal_dict.get("confidence")
-            
-            with self._db_lock:
-                def _do():
-                    conn = self._get_connection()
-                    try:
-                        cursor = conn.cursor()
-                        cursor.execute("""
-                            INSERT INTO paper_trades(
-                                signal_id, opened_at, status, stake_eur, stake_usd,
-                                entry_price, outcome_index, outcome_name, side,
-                                event_id, market_id, token_id, confidence, market_question
-                            ) VALUES (
-                                :signal_id, :opened_at, 'OPEN', :stake_eur, :stake_usd,
-                                :entry_price, :outcome_index, :outcome_name, :side,
-                                :event_id, :market_id, :token_id, :confidence, :market_question
-                            )
-                        """, {
-                            "signal_id": signal_id,
-                            "opened_at": datetime.utcnow().isoformat(),
-                            "stake_eur": stake_eur,
-                            "stake_usd": stake_usd,
-                            "entry_price": entry_price,
-                            "outcome_index": outcome_index,
-                            "outcome_name": outcome_name,
-                            "side": signal_dict.get("side", ""),
-                            "event_id": signal_dict.get("event_id") or signal_dict.get("condition_id", ""),
-                            "market_id": signal_dict.get("market_id", ""),
-                            "token_id": signal_dict.get("token_id", ""),
-                            "confidence": confidence,
-                            "market_question": signal_dict.get("market_question") or signal_dict.get("question") or None
-                        })
-                        trade_id = cursor.lastrowid
-                        conn.commit()
-                        return trade_id
-                    finally:
-                        conn.close()
-                
-                return self._retry_db(_do)
-            
-        except Exception as e:
-            logger.exception(
-                "paper_trade_insert_failed",
-                extra={
-                    "event": "paper_trade_insert_failed",
-                    "signal_id": signal_id,
-                }
-            )
-            return None
+        return self._run_sync(lambda: self._paper_trade_job(signal_id, signal_dict, stake_eur, fx_eur_usd),
+                              "paper_trade_insert_failed", None, signal_id=signal_id)
+    
+    async def insert_paper_trade_async(self, signal_id: int, signal_dict: Dict, stake_eur: float, fx_eur_usd: float) -> Optional[int]:
+        """insert_paper_trade() for coroutines."""
+        return await self._run_async(lambda: self._paper_trade_job(signal_id, signal_dict, stake_eur, fx_eur_usd),
+                                     "paper_trade_insert_failed", None, signal_id=signal_id)
     
     def has_open_paper_trade(self, condition_id: str) -> bool:
         """
         Check if there's already an open paper trade for this condition_id.
         Checks both event_id and condition_id fields for compatibility.
+        Indexed point lookup on the persistent reader connection (WAL readers never wait on the writer).
         
         Args:
             condition_id: Market condition ID (event_id)
@@ -418,17 +613,10 @@ class SignalStore:
             return False
         
         try:
-            conn = self._get_connection()
-            cursor = conn.cursor()
-            # Check event_id field (which stores condition_id)
-            cursor.execute(
-                "SELECT 1 FROM paper_trades WHERE event_id = ? AND status = 'OPEN' LIMIT 1",
-                (condition_id,)
-            )
-            result = cursor.fetchone() is not None
-            conn.close()
-            return result
-        except Exception as e:
+            with self._db_lock:
+                # Check event_id field (which stores condition_id)
+                return self._read_conn.execute(_SQL_HAS_OPEN_TRADE, (condition_id,)).fetchone() is not None
+        except Exception:
             logger.exception(
                 "has_open_paper_trade_failed",
                 extra={
@@ -443,32 +631,22 @@ class SignalStore:
         Get all open paper trades.
         
         Args:
-            limit: Maximum number of trades to return
+            limit: Maximum number of trades to return (None/<=0 = all)
             
         Returns:
             List of trade dictionaries
         """
+        if limit is None or limit <= 0:
+            limit = -1  # SQLite: no limit
         try:
-            conn = self._get_connection()
-            conn.row_factory = sqlite3.Row
-            cursor = conn.cursor()
-            
-            cursor.execute("""
-                SELECT pt.*, s.market, s.category, s.confidence
-                FROM paper_trades pt
-                LEFT JOIN signals s ON pt.signal_id = s.id
-                WHERE pt.status = 'OPEN'
-                ORDER BY pt.opened_at ASC
-                LIMIT ?
-            """, (limit,))
-            # Note: market_question is already in pt.*, no need to join
-            
-            rows = cursor.fetchall()
-            conn.close()
-            
+            with self._db_lock:
+                cursor = self._read_conn.cursor()
+                cursor.row_factory = sqlite3.Row
+                # Note: market_question is already in pt.*, no need to join
+                rows = cursor.execute(_SQL_OPEN_TRADES, (limit,)).fetchall()
             return [dict(row) for row in rows]
             
-        except Exception as e:
+        except Exception:
             logger.exception(
                 "get_open_trades_failed",
                 extra={
@@ -477,6 +655,66 @@ class SignalStore:
             )
             return []
     
+    def iter_open_paper_trades(self, page_size: int = 500):
+        """
+        Yield pages (lists of dicts) covering ALL open paper trades, keyset-paginated by id
+        so the reader lock is only held for one page at a time.
+        """
+        last_id = 0
+        while True:
+            try:
+                with self._db_lock:
+                    cursor = self._read_conn.cursor()
+                    cursor.row_factory = sqlite3.Row
+                    rows = cursor.execute(_SQL_OPEN_TRADES_PAGE, (last_id, page_size)).fetchall()
+            except Exception:
+                logger.exception("get_open_trades_failed", extra={"event": "get_open_trades_failed", "after_id": last_id})
+                return
+            if not rows:
+                return
+            page = [dict(row) for row in rows]
+            yield page
+            if len(page) < page_size:
+                return
+            last_id = page[-1]["id"]
+    
+    # ---- resolution ----
+    @staticmethod
+    def _mark_resolved_job(paper_trade_id: int, resolved_outcome_index: int, won: bool, resolved_price: float) -> Callable:
+        def _job(conn: sqlite3.Connection) -> bool:
+            # Get trade details
+            trade = conn.execute(_SQL_TRADE_FOR_RESOLVE, (paper_trade_id,)).fetchone()
+            if not trade:
+                return False
+            
+            stake_usd, entry_price, trade_outcome_index = trade
+            
+            # Compute PnL
+            # If we bet on outcome_index and resolved_outcome_index matches, we win
+            # PnL = stake_usd * (resolved_price - entry_price) / entry_price
+            # Simplified: if won, PnL = stake_usd * (1.0 - entry_price) / entry_price
+            # If lost, PnL = -stake_usd
+            
+            if won:
+                # We won - profit based on price difference
+                if entry_price and entry_price > 0:
+                    pnl_usd = stake_usd * (resolved_price - entry_price) / entry_price
+                else:
+                    pnl_usd = stake_usd * (1.0 - entry_price) if entry_price else stake_usd
+            else:
+                # We lost - lose the stake
+                pnl_usd = -stake_usd
+            
+            conn.execute(_SQL_MARK_RESOLVED, {
+                "resolved_at": datetime.utcnow().isoformat(),
+                "resolved_outcome_index": resolved_outcome_index,
+                "won": 1 if won else 0,
+                "pnl_usd": pnl_usd,
+                "trade_id": paper_trade_id
+            })
+            return True
+        return _job
+    
     def mark_trade_resolved(self, paper_trade_id: int, resolved_outcome_index: int, 
                            won: bool, resolved_price: float) -> bool:
         """
@@ -491,145 +729,87 @@ class SignalStore:
         Returns:
             True if updated successfully
         """
-        try:
-            with self._db_lock:
-                def _do():
-                    conn = self._get_connection()
-                    try:
-                        cursor = conn.cursor()
-                        
-                        # Get trade details
-                        cursor.execute("""
-                            SELECT stake_usd, entry_price, outcome_index FROM paper_trades
-                            WHERE id = ?
-                        """, (paper_trade_id,))
-                        
-                        trade = cursor.fetchone()
-                        if not trade:
-                            return False
-                        
-                        stake_usd, entry_price, trade_outcome_index = trade
-                        
-                        # Compute PnL
-                        # If we bet on outcome_index and resolved_outcome_index matches, we win
-                        # PnL = stake_usd * (resolved_price - entry_price) / entry_price
-                        # Simplified: if won, PnL = stake_usd * (1.0 - entry_price) / entry_price
-                        # If lost, PnL = -stake_usd
-                        
-                        if won:
-                            # We won - profit based on price difference
-                            if entry_price and entry_price > 0:
-                                pnl_usd = stake_usd * (resolved_price - entry_price) / entry_price
-                            else:
-                                pnl_usd = stake_usd * (1.0 - entry_price) if entry_price else stake_usd
-                        else:
-                            # We lost - lose the stake
-                            pnl_usd = -stake_usd
-                        
-                        # Update trade
-                        cursor.execute("""
-                            UPDATE paper_trades
-                            SET status = 'RESOLVED',
-                                resolved_at = :resolved_at,
-                                resolved_outcome_index = :resolved_outcome_index,
-                                won = :won,
-                                pnl_usd = :pnl_usd
-                            WHERE id = :trade_id
-                        """, {
-                            "resolved_at": datetime.utcnow().isoformat(),
-                            "resolved_outcome_index": resolved_outcome_index,
-                            "won": 1 if won else 0,
-                            "pnl_usd": pnl_usd,
-                            "trade_id": paper_trade_id
-                        })
-                        
-                        conn.commit()
-                        return True
-                    finally:
-                        conn.close()
-                
-                return self._retry_db(_do)
+        return self._run_sync(
+            lambda: self._mark_resolved_job(paper_trade_id, resolved_outcome_index, won, resolved_price),
+            "mark_trade_resolved_failed", False, trade_id=paper_trade_id)
+    
+    async def mark_trade_resolved_async(self, paper_trade_id: int, resolved_outcome_index: int,
+                                        won: bool, resolved_price: float) -> bool:
+        """mark_trade_resolved() for coroutines."""
+        return await self._run_async(
+            lambda: self._mark_resolved_job(paper_trade_id, resolved_outcome_index, won, resolved_price),
+            "mark_trade_resolved_failed", False, trade_id=paper_trade_id)
+    
+    def _resolve_group_job(self, trade_results: List, resolved_outcome_index: int, resolved_price: float) -> Callable:
+        jobs = [(trade_id, self._mark_resolved_job(trade_id, resolved_outcome_index, won, resolved_price))
+                for trade_id, won in trade_results]
+        # One job = one savepoint: every trade of the market is resolved, or none is
+        return lambda conn: [trade_id for trade_id, job in jobs if job(conn)]
+    
+    def resolve_trades(self, trade_results: List, resolved_outcome_index: int, resolved_price: float) -> List[int]:
+        """
+        Resolve all paper trades of one market in a single transaction.
+        
+        Args:
+            trade_results: [(paper_trade_id, won), ...]
+            resolved_outcome_index: Outcome index that won
+            resolved_price: Final resolved price
             
-        except Exception as e:
-            logger.exception(
-                "mark_trade_resolved_failed",
-                extra={
-                    "event": "mark_trade_resolved_failed",
-                    "trade_id": paper_trade_id,
-                }
-            )
-            return False
+        Returns:
+            IDs of trades that were updated ([] on error)
+        """
+        return self._run_sync(lambda: self._resolve_group_job(trade_results, resolved_outcome_index, resolved_price),
+                              "resolve_trades_failed", [], trade_count=len(trade_results))
+    
+    async def resolve_trades_async(self, trade_results: List, resolved_outcome_index: int, resolved_price: float) -> List[int]:
+        """resolve_trades() for coroutines."""
+        return await self._run_async(lambda: self._resolve_group_job(trade_results, resolved_outcome_index, resolved_price),
+                                     "resolve_trades_failed", [], trade_count=len(trade_results))
+    
+    def set_expected_end(self, condition_id: str, expected_end_at: str):
+        """Backfill expected_end_at for open trades of a market that didn't have one (queued)."""
+        params = (expected_end_at, condition_id)
+        self._run_background(lambda: (lambda conn: conn.execute(_SQL_SET_EXPECTED_END, params)),
+                             "set_expected_end_failed", condition_id=condition_id[:20])
+    
+    def write_resolutions(self, rows: List):
+        """
+        Write many resolution records [(paper_trade_id, status, details), ...] in one queued job.
+        """
+        checked_at = datetime.utcnow().isoformat()
+        params = [(trade_id, checked_at, status, details) for trade_id, status, details in rows]
+        if params:
+            self._run_background(lambda: (lambda conn: conn.executemany(_SQL_INSERT_RESOLUTION, params)),
+                                 "write_resolution_failed", rows=len(params))
     
     def write_resolution(self, paper_trade_id: int, status: str, details: str):
         """
-        Write a resolution record.
+        Write a resolution record. Queued for the writer thread (does not wait for the commit).
         
         Args:
             paper_trade_id: ID of the paper trade
             status: Resolution status
             details: Additional details
         """
-        try:
-            with self._db_lock:
-                def _do():
-                    conn = self._get_connection()
-                    try:
-                        cursor = conn.cursor()
-                        cursor.execute("""
-                            INSERT INTO resolutions(paper_trade_id, checked_at, status, details)
-                            VALUES (?, ?, ?, ?)
-                        """, (paper_trade_id, datetime.utcnow().isoformat(), status, details))
-                        conn.commit()
-                    finally:
-                        conn.close()
-                
-                self._retry_db(_do)
-        except Exception as e:
-            logger.exception(
-                "write_resolution_failed",
-                extra={
-                    "event": "write_resolution_failed",
-                    "paper_trade_id": paper_trade_id,
-                }
-            )
+        params = (paper_trade_id, datetime.utcnow().isoformat(), status, details)
+        self._run_background(lambda: (lambda conn: conn.execute(_SQL_INSERT_RESOLUTION, params)),
+                             "write_resolution_failed", paper_trade_id=paper_trade_id)
     
     def write_equity_snapshot(self, snapshot: Dict):
         """
-        Write an equity curve snapshot (optional).
+        Write an equity curve snapshot (optional). Queued for the writer thread.
         
         Args:
             snapshot: Dictionary with equity metrics
         """
-        try:
-            with self._db_lock:
-                def _do():
-                    conn = self._get_connection()
-                    try:
-                        cursor = conn.cursor()
-                        cursor.execute("""
-                            INSERT INTO equity_curve(
-                                snapshot_at, total_trades, open_trades, resolved_trades,
-                                total_pnl_usd, win_rate, equity_usd
-                            ) VALUES (?, ?, ?, ?, ?, ?, ?)
-                        """, (
-                            snapshot.get("snapshot_at", datetime.utcnow().isoformat()),
-                            snapshot.get("total_trades", 0),
-                            snapshot.get("open_trades", 0),
-                            snapshot.get("resolved_trades", 0),
-                            snapshot.get("total_pnl_usd", 0.0),
-                            snapshot.get("win_rate", 0.0),
-                            snapshot.get("equity_usd", 0.0)
-                        ))
-                        conn.commit()
-                    finally:
-                        conn.close()
-                
-                self._retry_db(_do)
-        except Exception as e:
-            logger.exception(
-                "write_equity_snapshot_failed",
-                extra={
-                    "event": "write_equity_snapshot_failed",
-                }
-            )
-
+        params = (
+            snapshot.get("snapshot_at", datetime.utcnow().isoformat()),
+            snapshot.get("total_trades", 0),
+            snapshot.get("open_trades", 0),
+            snapshot.get("resolved_trades", 0),
+            snapshot.get("total_pnl_usd", 0.0),
+            snapshot.get("win_rate", 0.0),
+            snapshot.get("equity_usd", 0.0)
+        )
+        self._run_background(lambda: (lambda conn: conn.execute(_SQL_INSERT_EQUITY, params)),
+                             "write_equity_snapshot_failed")
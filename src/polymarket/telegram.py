@@ -58,13 +58,26 @@ def confidence_tier(confidence: int) -> tuple[str, str]:
         return "🟠", "Weak"
     return "🔴", "Skip"
 
+def _enqueue_outbox(text: str, chat_id: str) -> bool:
+    """Hand the message to the async outbox if one is running (engine process). Never blocks."""
+    try:
+        from src.polymarket.telegram_outbox import get_outbox
+    except ImportError:
+        return False
+    outbox = get_outbox()
+    return bool(outbox and outbox.token == TOKEN and outbox.enqueue(text, chat_id=chat_id))
+
 def send_telegram(text: str) -> bool:
     """
-    Send Telegram message. Returns True if successful, False otherwise.
+    Send Telegram message. Returns True if successful (or queued), False otherwise.
+    Inside the engine the message is queued on the async outbox; standalone scripts
+    without a running outbox fall back to a direct blocking POST.
     NEVER crashes the engine - swallows all exceptions.
     """
     if not TOKEN or not CHAT_ID:
         return False
+    if _enqueue_outbox(text, CHAT_ID):
+        return True
     try:
         url = f"https://api.telegram.org/bot{TOKEN}/sendMessage"
         payload = {"chat_id": CHAT_ID, "text": text, "disable_web_page_preview": True}
@@ -390,6 +403,8 @@ def send_message_to_chat(chat_id: str, text: str) -> bool:
     """
     if not TOKEN:
         return False
+    if _enqueue_outbox(text, chat_id):
+        return True
     try:
         url = f"https://api.telegram.org/bot{TOKEN}/sendMessage"
         payload = {"chat_id": chat_id, "text": text, "disable_web_page_preview": True}
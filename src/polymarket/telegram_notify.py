@@ -10,6 +10,13 @@ TELEGRAM_CHAT_ID = os.getenv("TELEGRAM_CHAT_ID", "833255740")
 def send_telegram(text: str) -> None:
     if not TELEGRAM_BOT_TOKEN or not TELEGRAM_CHAT_ID:
         return
+    try:
+        from src.polymarket.telegram_outbox import get_outbox
+        outbox = get_outbox()
+        if outbox and outbox.token == TELEGRAM_BOT_TOKEN and outbox.enqueue(text, chat_id=TELEGRAM_CHAT_ID):
+            return
+    except ImportError:
+        pass
     url = f"https://api.telegram.org/bot{TELEGRAM_BOT_TOKEN}/sendMessage"
     try:
         requests.post(
@@ -0,0 +1,278 @@
+# src/polymarket/telegram_outbox.py
+"""
+Async Telegram outbox.
+
+Producers call enqueue() (non-blocking, safe from any thread); a background task
+drains the queue on aiohttp, coalesces bursts for the same chat into one message,
+respects Telegram's per-chat / global rate limits and retries with backoff
+(honouring 429 retry_after). send_telegram() in telegram.py routes through the
+outbox whenever one is running, so the event loop never waits on Telegram.
+"""
+import asyncio
+import os
+import threading
+import time
+from collections import deque
+from typing import Deque, Dict, List, Optional, Tuple
+
+import aiohttp
+import structlog
+
+from src.polymarket.http_client import HttpSession, create_session
+
+logger = structlog.get_logger()
+
+OUTBOX_MAX_QUEUE = int(os.getenv("TELEGRAM_OUTBOX_MAX_QUEUE", "500"))  # Oldest alerts dropped beyond this
+CHAT_MIN_INTERVAL_SEC = float(os.getenv("TELEGRAM_CHAT_MIN_INTERVAL_SEC", "1.0"))  # Telegram: ~1 msg/sec per chat
+GLOBAL_MIN_INTERVAL_SEC = float(os.getenv("TELEGRAM_GLOBAL_MIN_INTERVAL_SEC", "0.04"))  # Telegram: ~30 msg/sec per bot
+COALESCE_WINDOW_SEC = float(os.getenv("TELEGRAM_COALESCE_WINDOW_SEC", "1.5"))  # Merge alerts arriving within this window
+MAX_SEND_ATTEMPTS = int(os.getenv("TELEGRAM_MAX_SEND_ATTEMPTS", "5"))
+TELEGRAM_MAX_MESSAGE_LEN = 4096
+COALESCE_SEPARATOR = "\n\n— — —\n\n"
+
+# (chat_id, text, enqueued_at)
+_Item = Tuple[str, str, float]
+
+
+class TelegramOutbox:
+    """Queue + background sender for Telegram sendMessage."""
+
+    def __init__(self, token: str, default_chat_id: str = "", max_queue: int = OUTBOX_MAX_QUEUE):
+        self.token = token
+        self.default_chat_id = default_chat_id
+        self.max_queue = max_queue
+        self._queue: Optional[asyncio.Queue] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._task: Optional[asyncio.Task] = None
+        self._session: Optional[HttpSession] = None
+        self._next_chat_slot: Dict[str, float] = {}
+        self._next_global_slot = 0.0
+        self._latencies_ms: Deque[float] = deque(maxlen=200)
+        self.enqueued = 0
+        self.sent = 0
+        self.failed = 0
+        self.dropped = 0
+        self.coalesced = 0
+        self.retries = 0
+
+    # ---- lifecycle ----
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    async def start(self) -> None:
+        if self.running:
+            return
+        self._loop = asyncio.get_running_loop()
+        self._queue = asyncio.Queue()
+        # Host rate limit from http_client; retries stay here (Telegram's retry_after is in the body)
+        self._session = create_session(max_retries=0, timeout=aiohttp.ClientTimeout(total=15))
+        self._task = asyncio.create_task(self._run())
+        logger.info("telegram_outbox_started", max_queue=self.max_queue,
+                    chat_min_interval_sec=CHAT_MIN_INTERVAL_SEC, coalesce_window_sec=COALESCE_WINDOW_SEC)
+
+    async def stop(self, flush_timeout: float = 10.0) -> None:
+        """Drain what is queued (bounded by flush_timeout), then stop the sender."""
+        if self._queue is not None and self.running:
+            try:
+                await asyncio.wait_for(self._queue.join(), timeout=flush_timeout)
+            except asyncio.TimeoutError:
+                logger.warning("telegram_outbox_flush_timeout", queue_depth=self._queue.qsize())
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+        if self._session:
+            await self._session.close()
+        self._task = None
+        self._session = None
+        logger.info("telegram_outbox_stopped", **self.stats())
+
+    # ---- producer API ----
+    def enqueue(self, text: str, chat_id: Optional[str] = None) -> bool:
+        """
+        Queue a message without blocking. Safe from the loop thread or any other thread.
+        Returns False if the outbox is not running or there is no chat to send to.
+        """
+        chat = str(chat_id or self.default_chat_id or "")
+        if not self.running or not chat or not text:
+            return False
+        item: _Item = (chat, text, time.time())
+        try:
+            in_loop_thread = asyncio.get_running_loop() is self._loop
+        except RuntimeError:
+            in_loop_thread = False
+        if in_loop_thread:
+            self._put(item)
+        else:
+            self._loop.call_soon_threadsafe(self._put, item)
+        return True
+
+    def _put(self, item: _Item) -> None:
+        if self._queue.qsize() >= self.max_queue:
+            # Keep the newest alerts; the oldest is the least useful by now
+            try:
+                self._queue.get_nowait()
+                self._queue.task_done()
+                self.dropped += 1
+            except asyncio.QueueEmpty:
+                pass
+        self._queue.put_nowait(item)
+        self.enqueued += 1
+
+    # ---- stats ----
+    def stats(self) -> Dict[str, float]:
+        lat = sorted(self._latencies_ms)
+        return {
+            "queue_depth": self._queue.qsize() if self._queue is not None else 0,
+            "enqueued": self.enqueued,
+            "sent": self.sent,
+            "failed": self.failed,
+            "dropped": self.dropped,
+            "coalesced": self.coalesced,
+            "retries": self.retries,
+            "send_latency_ms_avg": round(sum(lat) / len(lat), 1) if lat else 0.0,
+            "send_latency_ms_p95": round(lat[min(len(lat) - 1, int(len(lat) * 0.95))], 1) if lat else 0.0,
+        }
+
+    # ---- sender ----
+    async def _run(self) -> None:
+        while True:
+            first = await self._queue.get()
+            batch: List[_Item] = [first]
+            # Gather the rest of a burst so several alerts become one message
+            window_end = time.monotonic() + COALESCE_WINDOW_SEC
+            while True:
+                remaining = window_end - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._queue.get(), timeout=remaining))
+                except asyncio.TimeoutError:
+                    break
+
+            try:
+                by_chat: Dict[str, List[_Item]] = {}
+                for item in batch:
+                    by_chat.setdefault(item[0], []).append(item)
+                for chat, items in by_chat.items():
+                    for text, enqueued_at, merged in _coalesce(items):
+                        self.coalesced += merged - 1
+                        await self._send_with_retry(chat, text, enqueued_at)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning("telegram_outbox_error", error=str(e)[:200])
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+
+    async def _wait_for_slot(self, chat: str) -> None:
+        now = time.monotonic()
+        ready_at = max(self._next_chat_slot.get(chat, 0.0), self._next_global_slot)
+        if ready_at > now:
+            await asyncio.sleep(ready_at - now)
+        now = time.monotonic()
+        self._next_chat_slot[chat] = now + CHAT_MIN_INTERVAL_SEC
+        self._next_global_slot = now + GLOBAL_MIN_INTERVAL_SEC
+
+    async def _send_with_retry(self, chat: str, text: str, enqueued_at: float) -> bool:
+        url = f"https://api.telegram.org/bot{self.token}/sendMessage"
+        payload = {"chat_id": chat, "text": text, "disable_web_page_preview": True}
+        delay = 1.0
+        for attempt in range(1, MAX_SEND_ATTEMPTS + 1):
+            await self._wait_for_slot(chat)
+            retry_after = None
+            try:
+                async with self._session.post(url, json=payload) as r:
+                    if r.status == 200:
+                        self.sent += 1
+                        self._latencies_ms.append((time.time() - enqueued_at) * 1000.0)
+                        return True
+                    if r.status == 429:
+                        try:
+                            body = await r.json(content_type=None)
+                            retry_after = float((body.get("parameters") or {}).get("retry_after") or 0) or None
+                        except Exception:
+                            retry_after = None
+                    elif r.status < 500:
+                        # 400/403 etc. will not succeed on retry (bad chat, blocked bot, malformed text)
+                        logger.warning("telegram_send_rejected", status=r.status, chat_id=chat)
+                        self.failed += 1
+                        return False
+                    status = r.status
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                status = type(e).__name__
+
+            if attempt == MAX_SEND_ATTEMPTS:
+                break
+            self.retries += 1
+            wait = retry_after if retry_after is not None else delay
+            if retry_after is not None:
+                # Whole chat is throttled, not just this message
+                self._next_chat_slot[chat] = time.monotonic() + retry_after
+            logger.debug("telegram_send_retry", attempt=attempt, status=status, wait_seconds=wait)
+            await asyncio.sleep(wait)
+            delay = min(delay * 2, 30.0)
+
+        self.failed += 1
+        logger.warning("telegram_send_failed", chat_id=chat, attempts=MAX_SEND_ATTEMPTS)
+        return False
+
+
+def _coalesce(items: List[_Item]) -> List[Tuple[str, float, int]]:
+    """Join queued texts for one chat into as few messages as fit Telegram's length limit.
+    Returns [(text, earliest_enqueued_at, n_merged)]."""
+    out: List[Tuple[str, float, int]] = []
+    cur: List[str] = []
+    cur_len = 0
+    cur_ts = 0.0
+    for _, text, ts in items:
+        text = text[:TELEGRAM_MAX_MESSAGE_LEN]
+        extra = len(text) + (len(COALESCE_SEPARATOR) if cur else 0)
+        if cur and cur_len + extra > TELEGRAM_MAX_MESSAGE_LEN:
+            out.append((COALESCE_SEPARATOR.join(cur), cur_ts, len(cur)))
+            cur, cur_len = [], 0
+            extra = len(text)
+        if not cur:
+            cur_ts = ts
+        cur.append(text)
+        cur_len += extra
+    if cur:
+        out.append((COALESCE_SEPARATOR.join(cur), cur_ts, len(cur)))
+    return out
+
+
+# Process-wide outbox (one bot token per engine process)
+_OUTBOX: Optional[TelegramOutbox] = None
+_OUTBOX_LOCK = threading.Lock()
+
+
+def get_outbox() -> Optional[TelegramOutbox]:
+    """The running outbox, or None (callers then fall back to a blocking send)."""
+    outbox = _OUTBOX
+    return outbox if outbox is not None and outbox.running else None
+
+
+async def start_outbox(token: str, default_chat_id: str = "") -> Optional[TelegramOutbox]:
+    global _OUTBOX
+    if not token:
+        return None
+    with _OUTBOX_LOCK:
+        if _OUTBOX is None:
+            _OUTBOX = TelegramOutbox(token, default_chat_id)
+    await _OUTBOX.start()
+    return _OUTBOX
+
+
+async def stop_outbox(flush_timeout: float = 10.0) -> None:
+    if _OUTBOX is not None:
+        await _OUTBOX.stop(flush_timeout=flush_timeout)
+
+
+def outbox_stats() -> Dict[str, float]:
+    return _OUTBOX.stats() if _OUTBOX is not None else {}
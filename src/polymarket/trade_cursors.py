@@ -0,0 +1,194 @@
+"""
+Per-market high-water marks for incremental /trades polling.
+
+fetch_trades_scanned() used to pull pages * limit trades for every market on
+every cycle, although nearly all of them were already processed the cycle
+before. A MarketCursor remembers the newest trade time seen per market (plus
+the identities of the trades within TRADE_CURSOR_OVERLAP_SEC of it, since
+several fills share a second and the data-api sometimes indexes a fill late,
+with a timestamp just below trades already returned), so paging stops at the
+first page that reaches already-seen trades. Late fills inside the overlap
+window are still returned and counted as late_fills.
+
+The page budget adapts to each market's trade rate: an EWMA of new trades per
+second predicts how many pages the next poll needs. Quiet markets stop after
+one page because the first page already reaches the cursor; busy ones may go
+past the caller's page count, up to TRADE_CURSOR_MAX_PAGES, so they do not fall
+behind. A poll that uses up its budget without reaching the cursor is counted
+as a gap and widens the next budget.
+
+Cursors are persisted next to the cache snapshot (save()/load()) so a
+restarted engine resumes where it left off.
+"""
+import json
+import math
+import os
+import time
+from typing import Any, Dict, Iterable, List, Optional
+
+from src.polymarket.dedup import event_time
+
+TRADE_CURSOR_MAX_PAGES = int(os.getenv("TRADE_CURSOR_MAX_PAGES", "10"))  # Page budget ceiling for busy markets
+TRADE_CURSOR_RATE_ALPHA = float(os.getenv("TRADE_CURSOR_RATE_ALPHA", "0.3"))  # EWMA weight of the latest poll
+TRADE_CURSOR_TTL_SEC = int(os.getenv("TRADE_CURSOR_TTL_SEC", str(7 * 86400)))  # Forget markets not polled for this long
+TRADE_CURSOR_OVERLAP_SEC = float(os.getenv("TRADE_CURSOR_OVERLAP_SEC", "30"))  # Re-check this much below the high-water mark
+
+CURSOR_VERSION = 2
+
+
+def cursor_trade_id(trade: Dict[str, Any]) -> str:
+    """Identity of one fill within a timestamp."""
+    return "|".join(str(trade.get(k) or "") for k in
+                    ("transactionHash", "asset", "side", "proxyWallet", "size", "price"))
+
+
+class MarketCursor:
+    __slots__ = ("last_ts", "recent_ids", "rate", "polled_at")
+
+    def __init__(self, last_ts: Optional[float] = None, recent_ids: Optional[Dict[str, float]] = None,
+                 rate: Optional[float] = None, polled_at: Optional[float] = None):
+        self.last_ts = last_ts
+        self.recent_ids = recent_ids or {}  # cursor_trade_id -> ts, for trades in the overlap window
+        self.rate = rate  # New trades per second (EWMA), None until two polls
+        self.polled_at = polled_at
+
+    def is_seen(self, trade: Dict[str, Any], overlap_sec: float = TRADE_CURSOR_OVERLAP_SEC) -> bool:
+        ts = event_time(trade.get("timestamp") or trade.get("createdAt"))
+        if ts is None or self.last_ts is None:
+            return False
+        return ts < self.last_ts - overlap_sec or cursor_trade_id(trade) in self.recent_ids
+
+    def remember(self, trade_id: str, ts: float, overlap_sec: float = TRADE_CURSOR_OVERLAP_SEC) -> None:
+        """Record one returned trade and drop ids that fell out of the overlap window."""
+        if self.last_ts is not None and ts < self.last_ts - overlap_sec:
+            return  # is_seen() already treats it as old
+        self.recent_ids[trade_id] = ts
+        if self.last_ts is None or ts > self.last_ts:
+            self.last_ts = ts
+            floor = ts - overlap_sec
+            self.recent_ids = {i: t for i, t in self.recent_ids.items() if t >= floor}
+
+
+class TradeCursorStore:
+    """MarketCursor per condition_id with adaptive page budgets."""
+
+    def __init__(self, max_pages: int = TRADE_CURSOR_MAX_PAGES, rate_alpha: float = TRADE_CURSOR_RATE_ALPHA,
+                 ttl_sec: float = TRADE_CURSOR_TTL_SEC, overlap_sec: float = TRADE_CURSOR_OVERLAP_SEC):
+        self.max_pages = max(1, max_pages)
+        self.rate_alpha = rate_alpha
+        self.ttl_sec = ttl_sec
+        self.overlap_sec = max(0.0, overlap_sec)
+        self._cursors: Dict[str, MarketCursor] = {}
+        self.polls = 0
+        self.pages_fetched = 0
+        self.pages_saved = 0  # Pages of the caller's default budget not fetched thanks to the cursor
+        self.early_stops = 0
+        self.gaps = 0
+        self.late_fills = 0  # Trades returned below the high-water mark (indexed late by the data-api)
+
+    def __len__(self) -> int:
+        return len(self._cursors)
+
+    def get(self, market: str) -> Optional[MarketCursor]:
+        return self._cursors.get(market)
+
+    def page_budget(self, market: str, default_pages: int, limit: int, now: Optional[float] = None) -> int:
+        """Pages to allow for this poll: at least default_pages, more when the trade rate predicts it."""
+        cursor = self._cursors.get(market)
+        if cursor is None or cursor.rate is None or cursor.polled_at is None:
+            return max(1, default_pages)
+        now = time.time() if now is None else now
+        expected = cursor.rate * max(0.0, now - cursor.polled_at) * 1.5
+        return max(1, default_pages, min(self.max_pages, math.ceil(expected / max(1, limit)) + 1))
+
+    def new_trades(self, market: str, page: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Trades of `page` not returned before (all of them if the market has no cursor)."""
+        cursor = self._cursors.get(market)
+        if cursor is None or cursor.last_ts is None:
+            return list(page)
+        fresh = [t for t in page if not cursor.is_seen(t, self.overlap_sec)]
+        for t in fresh:
+            ts = event_time(t.get("timestamp") or t.get("createdAt"))
+            if ts is not None and ts < cursor.last_ts:
+                self.late_fills += 1
+        return fresh
+
+    def advance(self, market: str, new: Iterable[Dict[str, Any]], pages_fetched: int, default_pages: int,
+                reached_cursor: bool, now: Optional[float] = None) -> None:
+        """Move the high-water mark past `new` and update the rate estimate (call after a complete poll)."""
+        now = time.time() if now is None else now
+        cursor = self._cursors.get(market)
+        had_cursor = cursor is not None and cursor.last_ts is not None
+        if cursor is None:
+            cursor = self._cursors[market] = MarketCursor()
+        count = 0
+        for t in new:
+            count += 1
+            ts = event_time(t.get("timestamp") or t.get("createdAt"))
+            if ts is None:
+                continue
+            cursor.remember(cursor_trade_id(t), ts, self.overlap_sec)
+        if had_cursor and cursor.polled_at is not None and now > cursor.polled_at:
+            observed = count / (now - cursor.polled_at)
+            cursor.rate = observed if cursor.rate is None else (
+                self.rate_alpha * observed + (1 - self.rate_alpha) * cursor.rate)
+            if not reached_cursor:
+                self.gaps += 1
+                # Budget ran out before the cursor: the true rate is higher than observed
+                cursor.rate *= 2
+        cursor.polled_at = now
+        self.polls += 1
+        self.pages_fetched += pages_fetched
+        self.pages_saved += max(0, default_pages - pages_fetched)
+        if had_cursor and reached_cursor:
+            self.early_stops += 1
+
+    def prune(self, now: Optional[float] = None) -> int:
+        now = time.time() if now is None else now
+        stale = [m for m, c in self._cursors.items() if c.polled_at is None or now - c.polled_at > self.ttl_sec]
+        for m in stale:
+            del self._cursors[m]
+        return len(stale)
+
+    def save(self, path: str) -> int:
+        """Write cursors to `path` atomically. Returns cursors written."""
+        self.prune()
+        payload = {
+            "version": CURSOR_VERSION,
+            "saved_at": time.time(),
+            "cursors": {m: [c.last_ts, c.recent_ids, c.rate, c.polled_at]
+                        for m, c in self._cursors.items()},
+        }
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        tmp = f"{path}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(payload, f, separators=(",", ":"))
+        os.replace(tmp, path)
+        return len(payload["cursors"])
+
+    def load(self, path: str) -> int:
+        """Restore cursors saved by save(). Returns cursors loaded."""
+        if not os.path.exists(path):
+            return 0
+        with open(path, "r", encoding="utf-8") as f:
+            payload = json.load(f)
+        version = payload.get("version")
+        if version not in (1, CURSOR_VERSION):
+            return 0
+        for market, (last_ts, ids, rate, polled_at) in payload.get("cursors", {}).items():
+            if version == 1:
+                ids = {i: last_ts for i in ids}  # v1 kept only the ids at exactly last_ts
+            self._cursors[market] = MarketCursor(last_ts, ids, rate, polled_at)
+        self.prune()
+        return len(self._cursors)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "markets": len(self._cursors),
+            "polls": self.polls,
+            "pages_fetched": self.pages_fetched,
+            "pages_saved": self.pages_saved,
+            "early_stops": self.early_stops,
+            "gaps": self.gaps,
+            "late_fills": self.late_fills,
+        }
@@ -0,0 +1,265 @@
+# src/polymarket/trade_stream.py
+"""
+Websocket trade ingestion for the engine (ENGINE_INGEST_MODE=stream).
+
+A reader task subscribes to the activity/trades topic on the live-data
+websocket (same feed as scripts/realtime_whale_watcher.py) and pushes trades
+at or above min_size_usd into a bounded asyncio.Queue. The engine loop pulls
+them with next_batch(), so a trade reaches process_trade() within about
+TRADE_STREAM_LINGER_MS instead of one SCAN_INTERVAL_SECONDS poll later.
+
+- Backpressure: with TRADE_STREAM_OVERFLOW=block (default) a full queue stalls
+  the reader, which stops reading the socket; if that lasts long enough for the
+  keepalive to fail, the reconnect + gap-fill below recovers the trades.
+  drop_oldest keeps the reader moving and counts what was discarded.
+- Reconnect: exponential backoff, reset once a connection delivers messages.
+- Resume/gap-fill: the feed has no replay, so after every reconnect the
+  gap_fill callback (a REST poll of recent trades) is queued too; everything
+  since the last streamed trade is re-enqueued and the engine's SEEN_TRADE_KEYS
+  drops the overlap.
+"""
+import asyncio
+import json
+import os
+import random
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+import structlog
+
+from src.polymarket.dedup import event_time
+
+logger = structlog.get_logger()
+
+TRADE_STREAM_URL = os.getenv("TRADE_STREAM_URL", "wss://ws-live-data.polymarket.com")
+TRADE_STREAM_QUEUE_MAX = int(os.getenv("TRADE_STREAM_QUEUE_MAX", "5000"))  # Trades buffered between socket and engine
+TRADE_STREAM_OVERFLOW = os.getenv("TRADE_STREAM_OVERFLOW", "block").strip().lower()  # block | drop_oldest
+TRADE_STREAM_LINGER_MS = int(os.getenv("TRADE_STREAM_LINGER_MS", "250"))  # Batch window after the first trade arrives
+TRADE_STREAM_BATCH_MAX = int(os.getenv("TRADE_STREAM_BATCH_MAX", "500"))  # Max trades handed to the engine per batch
+TRADE_STREAM_GAP_SLACK_SEC = int(os.getenv("TRADE_STREAM_GAP_SLACK_SEC", "30"))  # Gap-fill also re-checks this much before the last trade
+
+SUBSCRIBE_MESSAGE = {"action": "subscribe", "subscriptions": [{"topic": "activity", "type": "trades"}]}
+
+GapFill = Callable[[], Awaitable[List[Dict[str, Any]]]]
+
+
+def _trade_usd(trade: Dict[str, Any]) -> float:
+    try:
+        return float(trade.get("size") or 0) * float(trade.get("price") or 0)
+    except (TypeError, ValueError):
+        return 0.0
+
+
+class TradeStream:
+    """
+    Websocket -> bounded queue -> engine batches
+
+    Usage:
+        stream = TradeStream(gap_fill=lambda: fetch_recent_trades(session, ...), min_size_usd=150)
+        await stream.start()
+        trades = await stream.next_batch(max_wait=60)
+        ...
+        await stream.stop()
+    """
+
+    def __init__(self, gap_fill: Optional[GapFill] = None, min_size_usd: float = 0.0,
+                 url: str = TRADE_STREAM_URL, queue_max: int = TRADE_STREAM_QUEUE_MAX,
+                 overflow: str = TRADE_STREAM_OVERFLOW, linger_ms: int = TRADE_STREAM_LINGER_MS,
+                 batch_max: int = TRADE_STREAM_BATCH_MAX, gap_slack_sec: float = TRADE_STREAM_GAP_SLACK_SEC,
+                 reconnect_min_sec: float = 1.0, reconnect_max_sec: float = 60.0):
+        self.url = url
+        self.gap_fill = gap_fill
+        self.min_size_usd = min_size_usd
+        self.overflow = overflow if overflow in ("block", "drop_oldest") else "block"
+        self.linger_sec = max(0, linger_ms) / 1000.0
+        self.batch_max = max(1, batch_max)
+        self.gap_slack_sec = gap_slack_sec
+        self.reconnect_min_sec = reconnect_min_sec
+        self.reconnect_max_sec = reconnect_max_sec
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=max(1, queue_max))
+        self._reader: Optional[asyncio.Task] = None
+        self._gap_task: Optional[asyncio.Task] = None
+        self.connected = False
+        self.last_event_ts: Optional[float] = None  # Newest trade time seen on the socket (resume point)
+        self.last_message_at: Optional[float] = None
+        self.connects = 0
+        self.disconnects = 0
+        self.received = 0
+        self.enqueued = 0
+        self.batches = 0  # next_batch() results handed to the engine (one engine cycle each)
+        self.batched_trades = 0
+        self.filtered = 0
+        self.dropped = 0
+        self.blocked_sec = 0.0
+        self.gap_fills = 0
+        self.gap_fill_trades = 0
+        self.gap_fill_truncated = 0
+        self.gap_fill_errors = 0
+
+    @property
+    def running(self) -> bool:
+        return self._reader is not None and not self._reader.done()
+
+    async def start(self) -> None:
+        if not self.running:
+            self._reader = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        for task in (self._gap_task, self._reader):
+            if task and not task.done():
+                task.cancel()
+                try:
+                    await task
+                except asyncio.CancelledError:
+                    pass
+        self._reader = self._gap_task = None
+        self.connected = False
+
+    async def next_batch(self, max_wait: float) -> List[Dict[str, Any]]:
+        """Wait up to max_wait for a trade, then collect what arrives within the linger window."""
+        try:
+            first = await asyncio.wait_for(self.queue.get(), timeout=max_wait)
+        except asyncio.TimeoutError:
+            return []
+        batch = [first]
+        deadline = time.monotonic() + self.linger_sec
+        while len(batch) < self.batch_max:
+            if not self.queue.empty():
+                batch.append(self.queue.get_nowait())
+                continue
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self.queue.get(), timeout=remaining))
+            except asyncio.TimeoutError:
+                break
+        self.batches += 1
+        self.batched_trades += len(batch)
+        return batch
+
+    async def _put(self, trade: Dict[str, Any]) -> None:
+        if self.overflow == "drop_oldest":
+            while self.queue.full():
+                self.queue.get_nowait()
+                self.dropped += 1
+            self.queue.put_nowait(trade)
+        elif self.queue.full():
+            started = time.monotonic()
+            await self.queue.put(trade)
+            self.blocked_sec += time.monotonic() - started
+        else:
+            self.queue.put_nowait(trade)
+        self.enqueued += 1
+
+    async def _offer(self, trade: Dict[str, Any]) -> None:
+        if _trade_usd(trade) < self.min_size_usd:
+            self.filtered += 1
+            return
+        await self._put(trade)
+
+    async def _handle_message(self, message: Any) -> None:
+        try:
+            data = json.loads(message)
+        except (TypeError, ValueError):
+            return  # Pings / non-JSON frames
+        if not isinstance(data, dict) or data.get("topic") != "activity" or data.get("type") != "trades":
+            return
+        payload = data.get("payload")
+        for trade in (payload if isinstance(payload, list) else [payload]):
+            if not isinstance(trade, dict):
+                continue
+            self.received += 1
+            ts = event_time(trade.get("timestamp") or trade.get("createdAt"))
+            if ts is not None and (self.last_event_ts is None or ts > self.last_event_ts):
+                self.last_event_ts = ts
+            await self._offer(trade)
+
+    async def _gap_fill(self, since: Optional[float]) -> None:
+        """REST poll after a reconnect: enqueue trades newer than the resume point."""
+        if self.gap_fill is None:
+            return
+        try:
+            trades = await self.gap_fill() or []
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            self.gap_fill_errors += 1
+            logger.warning("trade_stream_gap_fill_failed", error=str(e)[:100])
+            return
+        cutoff = since - self.gap_slack_sec if since is not None else None
+        added = 0
+        oldest = None
+        for trade in trades:
+            ts = event_time(trade.get("timestamp") or trade.get("createdAt"))
+            if ts is not None:
+                oldest = ts if oldest is None else min(oldest, ts)
+            if cutoff is not None and ts is not None and ts < cutoff:
+                continue
+            await self._offer(trade)
+            added += 1
+        self.gap_fills += 1
+        self.gap_fill_trades += added
+        # The poll returns a fixed number of trades; if even its oldest is newer than the
+        # resume point, part of the outage is not covered
+        truncated = since is not None and oldest is not None and oldest > since
+        if truncated:
+            self.gap_fill_truncated += 1
+        logger.info("trade_stream_gap_fill", fetched=len(trades), enqueued=added,
+                    gap_sec=round(time.time() - since, 1) if since is not None else None,
+                    truncated=truncated)
+
+    async def _run(self) -> None:
+        import websockets
+
+        delay = self.reconnect_min_sec
+        while True:
+            delivered = False
+            try:
+                async with websockets.connect(self.url, ping_interval=20, ping_timeout=10,
+                                              close_timeout=10, max_size=2 ** 22) as ws:
+                    await ws.send(json.dumps(SUBSCRIBE_MESSAGE))
+                    self.connected = True
+                    self.connects += 1
+                    logger.info("trade_stream_connected", url=self.url, connects=self.connects,
+                                queue_size=self.queue.qsize())
+                    if self.connects > 1 or self.last_event_ts is not None:
+                        if self._gap_task is None or self._gap_task.done():
+                            self._gap_task = asyncio.create_task(self._gap_fill(self.last_event_ts))
+                    async for message in ws:
+                        self.last_message_at = time.time()
+                        if not delivered:
+                            delivered = True
+                            delay = self.reconnect_min_sec
+                        await self._handle_message(message)
+                    raise ConnectionError("stream closed by server")
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self.disconnects += 1
+                logger.warning("trade_stream_disconnected", error=str(e)[:100],
+                               reconnect_in_sec=round(delay, 1), **self.stats())
+            finally:
+                self.connected = False
+            await asyncio.sleep(delay * random.uniform(0.8, 1.2))
+            delay = min(delay * 2, self.reconnect_max_sec)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "connected": self.connected,
+            "connects": self.connects,
+            "disconnects": self.disconnects,
+            "received": self.received,
+            "filtered": self.filtered,
+            "enqueued": self.enqueued,
+            "batches": self.batches,
+            "avg_batch_size": round(self.batched_trades / self.batches, 1) if self.batches else None,
+            "queue_size": self.queue.qsize(),
+            "dropped": self.dropped,
+            "blocked_sec": round(self.blocked_sec, 1),
+            "gap_fills": self.gap_fills,
+            "gap_fill_trades": self.gap_fill_trades,
+            "gap_fill_truncated": self.gap_fill_truncated,
+            "gap_fill_errors": self.gap_fill_errors,
+            "lag_sec": round(time.time() - self.last_event_ts, 1) if self.last_event_ts else None,
+        }
@@ -0,0 +1,137 @@
+"""
+Wallet-centric trade polling for a set of tracked wallets.
+
+Instead of pulling the global trade feed and discarding everything that is not
+from a handful of whales, WalletWatcher asks data-api /trades?user=<wallet>
+for each tracked wallet. Requests run with bounded concurrency. Each wallet
+has a high-water-mark cursor (trade_cursors.TradeCursorStore), so one request
+per wallet per poll is the usual cost; a wallet that traded heavily since the
+last poll pages until its cursor is reached. Cost scales with the number of
+tracked wallets, not with global volume.
+
+The first poll of a wallet only sets its cursor (history is not replayed as
+new trades). poll() returns the new trades (buys and sells, taker and maker
+fills) oldest first, in the data-api trade format used by
+engine.process_trade(); WhaleBot keeps the buys and converts them for
+process_whale_trade().
+"""
+import asyncio
+import os
+import time
+from typing import Any, Dict, Iterable, List, Optional
+
+import structlog
+
+from src.polymarket.dedup import event_time
+from src.polymarket.scraper import BASE, HEADERS
+from src.polymarket.trade_cursors import TradeCursorStore
+
+logger = structlog.get_logger()
+
+WALLET_WATCH_CONCURRENCY = int(os.getenv("WALLET_WATCH_CONCURRENCY", "8"))  # Wallet requests in flight
+WALLET_WATCH_PAGE_LIMIT = int(os.getenv("WALLET_WATCH_PAGE_LIMIT", "50"))  # Trades per /trades?user= page
+WALLET_WATCH_CURSOR_PATH = os.getenv("WALLET_WATCH_CURSOR_PATH", "data/wallet_cursors.json")
+
+
+def parse_wallets(raw: str) -> List[str]:
+    """Comma/whitespace separated 0x addresses, lowercased and de-duplicated in order."""
+    wallets: List[str] = []
+    for part in raw.replace("\n", ",").replace(" ", ",").split(","):
+        w = part.strip().lower()
+        if w.startswith("0x") and w not in wallets:
+            wallets.append(w)
+    return wallets
+
+
+def _trade_usd(trade: Dict[str, Any]) -> float:
+    try:
+        return float(trade.get("size") or 0) * float(trade.get("price") or 0)
+    except (TypeError, ValueError):
+        return 0.0
+
+
+class WalletWatcher:
+    """
+    Usage:
+        watcher = WalletWatcher(["0xabc...", ...], min_size_usd=150)
+        new_trades = await watcher.poll(session)   # every few seconds
+    """
+
+    def __init__(self, wallets: Iterable[str], min_size_usd: float = 0.0,
+                 concurrency: int = WALLET_WATCH_CONCURRENCY, limit: int = WALLET_WATCH_PAGE_LIMIT,
+                 cursors: Optional[TradeCursorStore] = None):
+        self.wallets: List[str] = []
+        self.set_wallets(wallets)
+        self.min_size_usd = min_size_usd
+        self.concurrency = max(1, concurrency)
+        self.limit = max(1, limit)
+        self.cursors = cursors or TradeCursorStore()
+        self.polls = 0
+        self.requests = 0
+        self.new_trades = 0
+        self.errors = 0
+        self.last_poll_sec = 0.0
+
+    def set_wallets(self, wallets: Iterable[str]) -> None:
+        self.wallets = parse_wallets(",".join(wallets))
+
+    async def _poll_wallet(self, session, wallet: str) -> List[Dict[str, Any]]:
+        primed = self.cursors.get(wallet) is not None
+        budget = self.cursors.page_budget(wallet, 1, self.limit)
+        new: List[Dict[str, Any]] = []
+        pages = 0
+        reached_cursor = False
+        for page in range(budget):
+            # Maker fills included (resting orders are the whale's own trades too); both sides are
+            # returned, callers drop SELLs (engine: INCLUDE_SELL_TRADES, WhaleBot: is_whale_buy)
+            params = {"user": wallet, "limit": self.limit, "offset": page * self.limit, "takerOnly": "false"}
+            self.requests += 1
+            async with session.get(f"{BASE}/trades", params=params, headers=HEADERS) as resp:
+                if resp.status != 200:
+                    self.errors += 1
+                    logger.warning("wallet_trades_fetch_failed", wallet=wallet[:10], status=resp.status)
+                    return []  # Cursor untouched: the next poll retries the same range
+                trades = await resp.json()
+            pages += 1
+            fresh = self.cursors.new_trades(wallet, trades)
+            new.extend(fresh)
+            if len(trades) < self.limit or len(fresh) < len(trades):
+                reached_cursor = True
+                break
+        self.cursors.advance(wallet, new, pages, 1, reached_cursor)
+        return new if primed else []
+
+    async def poll(self, session) -> List[Dict[str, Any]]:
+        """New trades of every tracked wallet since the previous poll, oldest first."""
+        started = time.monotonic()
+        semaphore = asyncio.Semaphore(self.concurrency)
+
+        async def one(wallet: str) -> List[Dict[str, Any]]:
+            async with semaphore:
+                try:
+                    return await self._poll_wallet(session, wallet)
+                except asyncio.CancelledError:
+                    raise
+                except Exception as e:
+                    self.errors += 1
+                    logger.warning("wallet_poll_failed", wallet=wallet[:10], error=str(e)[:100])
+                    return []
+
+        results = await asyncio.gather(*(one(w) for w in self.wallets))
+        trades = [t for batch in results for t in batch if _trade_usd(t) >= self.min_size_usd]
+        trades.sort(key=lambda t: event_time(t.get("timestamp") or t.get("createdAt")) or 0.0)
+        self.polls += 1
+        self.new_trades += len(trades)
+        self.last_poll_sec = time.monotonic() - started
+        return trades
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "wallets": len(self.wallets),
+            "polls": self.polls,
+            "requests": self.requests,
+            "new_trades": self.new_trades,
+            "errors": self.errors,
+            "last_poll_sec": round(self.last_poll_sec, 2),
+            **{f"cursor_{k}": v for k, v in self.cursors.stats().items() if k in ("gaps", "early_stops", "late_fills")},
+        }
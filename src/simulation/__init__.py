@@ -14,10 +14,12 @@ from .trade_simulator import TradeSimulator
 from .slippage_calculator import SlippageCalculator
 from .market_state_tracker import MarketStateTracker
 from .whale_evaluator import WhaleEvaluator
+from .simulation_store import SimulationStore
 
 __all__ = [
     'TradeSimulator',
     'SlippageCalculator',
     'MarketStateTracker',
-    'WhaleEvaluator'
+    'WhaleEvaluator',
+    'SimulationStore'
 ]
@@ -0,0 +1,144 @@
+"""
+Delay Check Scheduler - Phase 2
+===============================
+One task and one min-heap for every scheduled simulation delay check
+
+Instead of one sleeping asyncio task per delay per simulation:
+- schedule() pushes (due_time, sim_id, delay) onto a heap and persists it
+- a single runner task sleeps until the earliest due time (or until woken by
+  a new, earlier check), then fires everything due in one batch
+- pending checks are kept in the simulation store, so on restart they are
+  reloaded; checks that came due while the process was down run immediately
+"""
+
+import asyncio
+import heapq
+import itertools
+import time
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple
+
+from .simulation_store import SimulationStore
+
+# (due_at_epoch, seq, sim_id, delay_seconds, trade_data)
+_Entry = Tuple[float, int, str, int, Dict]
+
+CheckCallback = Callable[[str, Dict, int, float], Awaitable[None]]
+
+
+class DelayCheckScheduler:
+    """
+    Heap-based scheduler for delay checks
+
+    Usage:
+        scheduler = DelayCheckScheduler(store, run_check)
+        await scheduler.start()            # reloads persisted checks
+        scheduler.schedule(sim_id, trade_data, [60, 180, 300])
+    """
+
+    def __init__(self, store: SimulationStore, run_check: CheckCallback, max_batch_concurrency: int = 20):
+        self.store = store
+        self.run_check = run_check  # (sim_id, trade_data, delay_seconds, late_by_seconds)
+        self.max_batch_concurrency = max_batch_concurrency
+        self._heap: List[_Entry] = []
+        self._seq = itertools.count()
+        self._wake: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+        self.fired = 0
+        self.failed = 0
+        self.restored = 0
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    async def start(self):
+        """Reload persisted checks and start the runner task (idempotent)"""
+        if self.running:
+            return
+        self._wake = asyncio.Event()
+        queued = {(e[2], e[3]) for e in self._heap}
+        for sim_id, delay, due_at, trade_data in self.store.load_pending_checks():
+            if (sim_id, delay) not in queued:
+                heapq.heappush(self._heap, (due_at, next(self._seq), sim_id, delay, trade_data))
+                self.restored += 1
+        if self.restored:
+            print(f"✅ Restored {self.restored} pending delay checks")
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        """Stop the runner; unfired checks stay persisted for the next start"""
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+        self._task = None
+
+    def schedule(self, sim_id: str, trade_data: Dict, delays: List[int], start_time: Optional[float] = None):
+        """Queue one check per delay, due at start_time + delay (persisted first)"""
+        start_time = start_time or time.time()
+        checks = [(sim_id, int(d), start_time + d, trade_data) for d in delays]
+        self.store.add_pending_checks(checks)
+        was_next = self._heap[0][0] if self._heap else None
+        for sid, delay, due_at, data in checks:
+            heapq.heappush(self._heap, (due_at, next(self._seq), sid, delay, data))
+        if not self.running:
+            try:
+                asyncio.get_running_loop()
+                asyncio.ensure_future(self.start())
+            except RuntimeError:
+                pass  # No loop yet; start() will pick the checks up from the store
+        elif self._wake is not None and (was_next is None or self._heap[0][0] < was_next):
+            self._wake.set()
+
+    def backlog(self) -> int:
+        """Checks scheduled but not yet fired"""
+        return len(self._heap)
+
+    def stats(self) -> Dict:
+        next_due = max(0.0, self._heap[0][0] - time.time()) if self._heap else None
+        return {
+            'backlog': len(self._heap),
+            'fired': self.fired,
+            'failed': self.failed,
+            'restored': self.restored,
+            'next_due_in_sec': round(next_due, 1) if next_due is not None else None,
+        }
+
+    async def _run(self):
+        while True:
+            now = time.time()
+            due: List[_Entry] = []
+            while self._heap and self._heap[0][0] <= now:
+                due.append(heapq.heappop(self._heap))
+            if due:
+                await self._fire_batch(due, now)
+                continue
+
+            timeout = (self._heap[0][0] - now) if self._heap else None
+            self._wake.clear()
+            try:
+                await asyncio.wait_for(self._wake.wait(), timeout=timeout)
+            except asyncio.TimeoutError:
+                pass
+
+    async def _fire_batch(self, due: List[_Entry], now: float):
+        semaphore = asyncio.Semaphore(self.max_batch_concurrency)
+
+        async def fire(entry: _Entry):
+            due_at, _, sim_id, delay, trade_data = entry
+            async with semaphore:
+                try:
+                    await self.run_check(sim_id, trade_data, delay, max(0.0, now - due_at))
+                    self.fired += 1
+                except Exception as e:
+                    self.failed += 1
+                    print(f"⚠️ Delay check failed for {sim_id} (+{delay}s): {e}")
+                # Done either way: a failing check would otherwise be retried forever
+                try:
+                    self.store.remove_pending_check(sim_id, delay)
+                except Exception as e:
+                    print(f"⚠️ Could not clear pending check {sim_id} (+{delay}s): {e}")
+
+        await asyncio.gather(*(fire(e) for e in due))
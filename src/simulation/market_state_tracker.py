@@ -10,11 +10,13 @@ Records:
 """
 
 import asyncio
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone
 from typing import Dict, Optional, List
 from collections import defaultdict
 import aiohttp
 
+from .price_history import PriceHistoryStore, to_epoch
+
 
 class MarketStateTracker:
     """
@@ -23,9 +25,12 @@ class MarketStateTracker:
     Used to simulate: "What was the price 3 minutes after detection?"
     """
     
-    def __init__(self):
-        # In-memory cache: market_slug -> list of (timestamp, price) tuples
-        self.price_history = defaultdict(list)
+    def __init__(self, price_history: Optional[PriceHistoryStore] = None):
+        # Per-market price series (shared with the watcher when passed in; own store keeps 24 hours)
+        self.price_history = price_history or PriceHistoryStore(max_points=10000, max_age_sec=24 * 3600)
+        
+        # additional_data by market -> {epoch_ts: data}, only for states recorded with extra data
+        self.state_data: Dict[str, Dict[float, Dict]] = defaultdict(dict)
         
         # API client for fetching historical prices
         self.api_base = "https://gamma-api.polymarket.com"
@@ -46,23 +51,25 @@ class MarketStateTracker:
             price: Market price at this time
             additional_data: Additional market data (optional)
         """
-        state = {
-            'timestamp': timestamp,
+        self.price_history.record(market_slug, timestamp, price)
+        
+        if additional_data:
+            data = self.state_data[market_slug]
+            data[to_epoch(timestamp)] = additional_data
+            # Drop data for points that fell out of the series' retention
+            series = self.price_history.series(market_slug)
+            if len(data) > len(series):
+                oldest = series.oldest()[0]
+                for ts in [t for t in data if t < oldest]:
+                    del data[ts]
+    
+    def _state(self, market_slug: str, point) -> Dict:
+        ts, price = point
+        return {
             'price': price,
-            'data': additional_data or {}
+            'timestamp': datetime.fromtimestamp(ts, timezone.utc).replace(tzinfo=None),
+            'data': self.state_data.get(market_slug, {}).get(ts, {})
         }
-        
-        self.price_history[market_slug].append(state)
-        
-        # Keep only recent history (last 24 hours)
-        cutoff = datetime.now() - timedelta(hours=24)
-        self.price_history[market_slug] = [
-            s for s in self.price_history[market_slug]
-            if s['timestamp'] > cutoff
-        ]
-        
-        # Sort by timestamp
-        self.price_history[market_slug].sort(key=lambda x: x['timestamp'])
     
     async def get_state_at_time(
         self,
@@ -79,44 +86,18 @@ class MarketStateTracker:
         Returns:
             Dict: Market state at that time, or None if not found
         """
-        history = self.price_history.get(market_slug, [])
-        
-        if not history:
-            # Try to fetch from API
-            return await self._fetch_state_from_api(market_slug, timestamp)
-        
-        # Find closest recorded state
-        closest = None
-        min_diff = timedelta.max
-        
-        for state in history:
-            diff = abs(state['timestamp'] - timestamp)
-            if diff < min_diff:
-                min_diff = diff
-                closest = state
-        
-        # If within 30 seconds, return it
-        if closest and min_diff < timedelta(seconds=30):
-            return {
-                'price': closest['price'],
-                'timestamp': closest['timestamp'],
-                'data': closest.get('data', {})
-            }
+        # Closest recorded state, if within 30 seconds
+        closest = self.price_history.nearest(market_slug, timestamp, max_gap=30)
+        if closest:
+            return self._state(market_slug, closest)
         
         # Otherwise try API
         return await self._fetch_state_from_api(market_slug, timestamp)
     
     async def get_latest_state(self, market_slug: str) -> Optional[Dict]:
         """Get most recent recorded state for a market"""
-        history = self.price_history.get(market_slug, [])
-        if history:
-            latest = history[-1]
-            return {
-                'price': latest['price'],
-                'timestamp': latest['timestamp'],
-                'data': latest.get('data', {})
-            }
-        return None
+        latest = self.price_history.latest(market_slug)
+        return self._state(market_slug, latest) if latest else None
     
     async def _fetch_state_from_api(
         self,
@@ -0,0 +1,177 @@
+"""
+Price History
+=============
+Compact per-market price history with O(log n) time lookups
+
+Each market keeps two parallel array('d') buffers (epoch-second timestamps
+and prices) kept in time order, so lookups are a bisect instead of a scan
+that parses every timestamp. Retention is bounded by point count and age;
+old points are dropped by advancing a start offset and the arrays are
+compacted once the dead prefix is larger than the live part (amortized O(1)
+per insert, same effect as a ring buffer but bisect-able).
+
+Queries:
+- nearest(slug, t, max_gap)     closest point in time
+- as_of(slug, t, max_age)       last point at or before t
+- interpolated(slug, t)         linear between the surrounding points
+
+Shared by RealtimeWhaleWatcher (get_price_at_time) and MarketStateTracker.
+"""
+
+from array import array
+from bisect import bisect_left, bisect_right
+from datetime import datetime, timezone
+from typing import Dict, Optional, Tuple, Union
+
+TimeLike = Union[float, int, str, datetime]
+
+
+def to_epoch(t: TimeLike) -> float:
+    """Epoch seconds from epoch/ISO string/datetime (naive and 'Z' times are treated as UTC)"""
+    if isinstance(t, (int, float)):
+        return float(t) / 1000.0 if t > 1e12 else float(t)
+    if isinstance(t, str):
+        t = datetime.fromisoformat(t.strip().replace('Z', '+00:00'))
+    if t.tzinfo is None:
+        t = t.replace(tzinfo=timezone.utc)
+    return t.timestamp()
+
+
+class PriceSeries:
+    """Time-ordered (timestamp, price) buffer for one market"""
+
+    __slots__ = ('max_points', 'max_age_sec', '_ts', '_px', '_lo')
+
+    def __init__(self, max_points: int = 1000, max_age_sec: Optional[float] = None):
+        self.max_points = max_points
+        self.max_age_sec = max_age_sec
+        self._ts = array('d')
+        self._px = array('d')
+        self._lo = 0  # index of the oldest live point
+
+    def __len__(self) -> int:
+        return len(self._ts) - self._lo
+
+    def append(self, ts: float, price: float) -> None:
+        if len(self._ts) == self._lo or ts >= self._ts[-1]:
+            self._ts.append(ts)
+            self._px.append(price)
+        else:
+            # Out-of-order point (rare): keep the buffers sorted
+            i = bisect_right(self._ts, ts, self._lo)
+            self._ts.insert(i, ts)
+            self._px.insert(i, price)
+        self._trim(self._ts[-1])
+
+    def _trim(self, newest: float) -> None:
+        lo = max(self._lo, len(self._ts) - self.max_points)
+        if self.max_age_sec is not None:
+            lo = max(lo, bisect_left(self._ts, newest - self.max_age_sec, lo))
+        self._lo = lo
+        if lo > 64 and lo * 2 > len(self._ts):
+            del self._ts[:lo]
+            del self._px[:lo]
+            self._lo = 0
+
+    def latest(self) -> Optional[Tuple[float, float]]:
+        if not len(self):
+            return None
+        return self._ts[-1], self._px[-1]
+
+    def oldest(self) -> Optional[Tuple[float, float]]:
+        if not len(self):
+            return None
+        return self._ts[self._lo], self._px[self._lo]
+
+    def nearest(self, ts: float, max_gap: Optional[float] = None) -> Optional[Tuple[float, float]]:
+        """(timestamp, price) of the point closest to ts, None if empty or farther than max_gap"""
+        n = len(self._ts)
+        if n == self._lo:
+            return None
+        i = bisect_left(self._ts, ts, self._lo)
+        best = None
+        for j in (i - 1, i):
+            if self._lo <= j < n and (best is None or abs(self._ts[j] - ts) < abs(self._ts[best] - ts)):
+                best = j
+        if max_gap is not None and abs(self._ts[best] - ts) > max_gap:
+            return None
+        return self._ts[best], self._px[best]
+
+    def as_of(self, ts: float, max_age: Optional[float] = None) -> Optional[Tuple[float, float]]:
+        """Last (timestamp, price) at or before ts"""
+        i = bisect_right(self._ts, ts, self._lo) - 1
+        if i < self._lo:
+            return None
+        if max_age is not None and ts - self._ts[i] > max_age:
+            return None
+        return self._ts[i], self._px[i]
+
+    def interpolated(self, ts: float, max_gap: Optional[float] = None) -> Optional[float]:
+        """Linear interpolation between the points around ts (edge point outside the range)"""
+        n = len(self._ts)
+        if n == self._lo:
+            return None
+        i = bisect_left(self._ts, ts, self._lo)
+        if i < n and self._ts[i] == ts:
+            return self._px[i]
+        if i == self._lo or i == n:
+            edge = self.nearest(ts, max_gap)
+            return edge[1] if edge else None
+        t0, t1 = self._ts[i - 1], self._ts[i]
+        if max_gap is not None and min(ts - t0, t1 - ts) > max_gap:
+            return None
+        p0, p1 = self._px[i - 1], self._px[i]
+        return p0 + (p1 - p0) * (ts - t0) / (t1 - t0)
+
+
+class PriceHistoryStore:
+    """PriceSeries per market, with shared retention settings"""
+
+    def __init__(self, max_points: int = 1000, max_age_sec: Optional[float] = None):
+        self.max_points = max_points
+        self.max_age_sec = max_age_sec
+        self._series: Dict[str, PriceSeries] = {}
+
+    def __contains__(self, market: str) -> bool:
+        return market in self._series
+
+    def __len__(self) -> int:
+        return len(self._series)
+
+    def series(self, market: str) -> Optional[PriceSeries]:
+        return self._series.get(market)
+
+    def record(self, market: str, t: TimeLike, price: float) -> None:
+        series = self._series.get(market)
+        if series is None:
+            series = self._series[market] = PriceSeries(self.max_points, self.max_age_sec)
+        series.append(to_epoch(t), float(price))
+
+    def latest(self, market: str) -> Optional[Tuple[float, float]]:
+        series = self._series.get(market)
+        return series.latest() if series else None
+
+    def nearest(self, market: str, t: TimeLike, max_gap: Optional[float] = None) -> Optional[Tuple[float, float]]:
+        series = self._series.get(market)
+        return series.nearest(to_epoch(t), max_gap) if series else None
+
+    def as_of(self, market: str, t: TimeLike, max_age: Optional[float] = None) -> Optional[Tuple[float, float]]:
+        series = self._series.get(market)
+        return series.as_of(to_epoch(t), max_age) if series else None
+
+    def interpolated(self, market: str, t: TimeLike, max_gap: Optional[float] = None) -> Optional[float]:
+        series = self._series.get(market)
+        return series.interpolated(to_epoch(t), max_gap) if series else None
+
+    def prune(self, now: Optional[TimeLike] = None) -> int:
+        """Drop markets whose newest point is older than max_age_sec. Returns markets removed."""
+        if self.max_age_sec is None:
+            return 0
+        cutoff = (to_epoch(now) if now is not None else datetime.now(timezone.utc).timestamp()) - self.max_age_sec
+        stale = [m for m, s in self._series.items() if not len(s) or s.latest()[0] < cutoff]
+        for m in stale:
+            del self._series[m]
+        return len(stale)
+
+    def stats(self) -> Dict[str, int]:
+        return {'markets': len(self._series), 'points': sum(len(s) for s in self._series.values())}
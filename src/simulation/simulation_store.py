@@ -0,0 +1,350 @@
+"""
+Simulation Store - Phase 2
+==========================
+Single SQLite database for trade simulations (replaces one sim_*.json per simulation)
+
+Tables:
+- simulations: one row per simulation (indexed by whale, market, detection time, status)
+- simulation_results: one row per (simulation, delay), updated in place
+- pending_checks: delay checks scheduled but not yet run (survive restarts)
+
+Readers get simulations back in the same dict shape the JSON files had
+(simulation_id, whale_address, market_slug, detection{...}, results[...], status, ...)
+plus 'updated_at', so analysis scripts keep their logic.
+
+Import the legacy files once with:
+    python scripts/migrate_simulations.py
+"""
+
+import json
+import sqlite3
+import threading
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple
+
+DEFAULT_DB_PATH = Path(__file__).parent.parent.parent / "data" / "simulations.db"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS simulations (
+    sim_id TEXT PRIMARY KEY,
+    whale_address TEXT,
+    market_slug TEXT,
+    is_elite INTEGER NOT NULL DEFAULT 0,
+    confidence REAL,
+    detection_time TEXT,
+    detection_price REAL,
+    detection_size REAL,
+    status TEXT,
+    delays_scheduled TEXT,
+    created_at TEXT,
+    completed_at TEXT,
+    updated_at TEXT NOT NULL,
+    extra TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_sim_whale ON simulations(whale_address, detection_time);
+CREATE INDEX IF NOT EXISTS idx_sim_market ON simulations(market_slug, detection_time);
+CREATE INDEX IF NOT EXISTS idx_sim_detection ON simulations(detection_time);
+CREATE INDEX IF NOT EXISTS idx_sim_status ON simulations(status);
+CREATE INDEX IF NOT EXISTS idx_sim_updated ON simulations(updated_at);
+
+CREATE TABLE IF NOT EXISTS simulation_results (
+    sim_id TEXT NOT NULL,
+    delay_seconds INTEGER NOT NULL,
+    execution_time TEXT,
+    checked_at TEXT,
+    price REAL,
+    price_source TEXT,
+    entry_price REAL,
+    slippage_percent REAL,
+    pnl REAL,
+    pnl_pct REAL,
+    resolved INTEGER NOT NULL DEFAULT 0,
+    data TEXT NOT NULL,
+    PRIMARY KEY (sim_id, delay_seconds)
+);
+
+CREATE TABLE IF NOT EXISTS pending_checks (
+    sim_id TEXT NOT NULL,
+    delay_seconds INTEGER NOT NULL,
+    due_at REAL NOT NULL,
+    trade_data TEXT NOT NULL,
+    PRIMARY KEY (sim_id, delay_seconds)
+);
+"""
+
+# Keys stored in dedicated columns; anything else in a simulation dict goes to `extra`
+_SIM_KEYS = {'simulation_id', 'whale_address', 'market_slug', 'is_elite', 'confidence', 'detection',
+             'results', 'status', 'delays_scheduled', 'created_at', 'completed_at', 'updated_at'}
+
+
+def _result_row(sim_id: str, result: Dict) -> Tuple:
+    """Column values for one delay result (current and dataclass-era field names)"""
+    state = result.get('market_state_at_entry') or {}
+    entry_price = result.get('simulated_entry_price', result.get('entry_price'))
+    slippage = result.get('slippage_percent')
+    if slippage is None and result.get('slippage_pct') is not None:
+        slippage = float(result['slippage_pct']) * 100
+    return (
+        sim_id,
+        int(result.get('delay_seconds') or 0),
+        result.get('execution_time'),
+        result.get('checked_at'),
+        state.get('price'),
+        state.get('source'),
+        entry_price,
+        slippage,
+        result.get('pnl'),
+        result.get('pnl_pct'),
+        1 if result.get('resolved') else 0,
+        json.dumps(result, default=str),
+    )
+
+
+class SimulationStore:
+    """SQLite-backed store for simulations and their per-delay results"""
+
+    def __init__(self, db_path: Optional[str] = None):
+        self.db_path = Path(db_path) if db_path else DEFAULT_DB_PATH
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.db_path), check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(_SCHEMA)
+        self._conn.commit()
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+    # ---- writes ----
+    def save_simulation(self, simulation: Dict, replace: bool = True, updated_at: Optional[str] = None) -> bool:
+        """
+        Insert a simulation (and any results it already has). With replace=False an
+        existing sim_id is left untouched (used by the migration). Returns True if written.
+        """
+        sim_id = simulation.get('simulation_id')
+        if not sim_id:
+            raise ValueError("simulation has no simulation_id")
+        detection = simulation.get('detection') or {}
+        extra = {k: v for k, v in simulation.items() if k not in _SIM_KEYS}
+        row = (
+            sim_id,
+            (simulation.get('whale_address') or detection.get('wallet') or '').lower() or None,
+            simulation.get('market_slug') or detection.get('market'),
+            1 if simulation.get('is_elite') else 0,
+            simulation.get('confidence'),
+            detection.get('timestamp') or simulation.get('detection_time'),
+            detection.get('price', simulation.get('whale_entry_price')),
+            detection.get('size', simulation.get('whale_trade_size')),
+            simulation.get('status'),
+            json.dumps(simulation['delays_scheduled']) if 'delays_scheduled' in simulation else None,
+            simulation.get('created_at'),
+            simulation.get('completed_at'),
+            updated_at or datetime.now().isoformat(),
+            json.dumps(extra, default=str) if extra else None,
+        )
+        verb = "INSERT OR REPLACE" if replace else "INSERT OR IGNORE"
+        with self._lock, self._conn:
+            cur = self._conn.execute(f"{verb} INTO simulations VALUES ({','.join('?' * len(row))})", row)
+            if cur.rowcount == 0:
+                return False
+            self._conn.execute("DELETE FROM simulation_results WHERE sim_id = ?", (sim_id,))
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO simulation_results VALUES (?,?,?,?,?,?,?,?,?,?,?,?)",
+                [_result_row(sim_id, r) for r in simulation.get('results') or [] if isinstance(r, dict)],
+            )
+        return True
+
+    def add_result(self, sim_id: str, result: Dict) -> Optional[Tuple[int, int, str]]:
+        """
+        Store one delay result in place and mark the simulation completed once every
+        scheduled delay has a result. Returns (results_count, expected_results, status),
+        or None if the simulation does not exist.
+        """
+        now = datetime.now().isoformat()
+        with self._lock, self._conn:
+            sim = self._conn.execute(
+                "SELECT delays_scheduled, status FROM simulations WHERE sim_id = ?", (sim_id,)).fetchone()
+            if sim is None:
+                return None
+            self._conn.execute(
+                "INSERT OR REPLACE INTO simulation_results VALUES (?,?,?,?,?,?,?,?,?,?,?,?)",
+                _result_row(sim_id, result))
+            count = self._conn.execute(
+                "SELECT COUNT(*) FROM simulation_results WHERE sim_id = ?", (sim_id,)).fetchone()[0]
+            expected = len(json.loads(sim['delays_scheduled'] or '[]'))
+            status = sim['status']
+            if count >= expected and status != 'completed':
+                status = 'completed'
+                self._conn.execute(
+                    "UPDATE simulations SET status = ?, completed_at = ?, updated_at = ? WHERE sim_id = ?",
+                    (status, now, now, sim_id))
+            else:
+                self._conn.execute("UPDATE simulations SET updated_at = ? WHERE sim_id = ?", (now, sim_id))
+        return count, expected, status
+
+    # ---- pending delay checks ----
+    def add_pending_checks(self, checks: List[Tuple[str, int, float, Dict]]) -> None:
+        """Persist scheduled checks as (sim_id, delay_seconds, due_at_epoch, trade_data)"""
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO pending_checks VALUES (?,?,?,?)",
+                [(sid, int(delay), float(due), json.dumps(data, default=str)) for sid, delay, due, data in checks])
+
+    def remove_pending_check(self, sim_id: str, delay_seconds: int) -> None:
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM pending_checks WHERE sim_id = ? AND delay_seconds = ?",
+                               (sim_id, int(delay_seconds)))
+
+    def load_pending_checks(self) -> List[Tuple[str, int, float, Dict]]:
+        """All persisted checks, earliest due first"""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT sim_id, delay_seconds, due_at, trade_data FROM pending_checks ORDER BY due_at").fetchall()
+        return [(r['sim_id'], r['delay_seconds'], r['due_at'], json.loads(r['trade_data'])) for r in rows]
+
+    # ---- reads ----
+    def _to_dict(self, row: sqlite3.Row, results: List[Dict]) -> Dict:
+        sim = json.loads(row['extra']) if row['extra'] else {}
+        sim.update({
+            'simulation_id': row['sim_id'],
+            'whale_address': row['whale_address'],
+            'market_slug': row['market_slug'],
+            'is_elite': bool(row['is_elite']),
+            'detection': {
+                'timestamp': row['detection_time'],
+                'market': row['market_slug'],
+                'price': row['detection_price'],
+                'size': row['detection_size'],
+            },
+            'results': results,
+            'updated_at': row['updated_at'],
+        })
+        # Absent (not None) when unknown, like the legacy files
+        if row['confidence'] is not None:
+            sim['confidence'] = row['confidence']
+        if row['created_at'] is not None:
+            sim['created_at'] = row['created_at']
+        if row['status'] is not None:
+            sim['status'] = row['status']
+        if row['delays_scheduled'] is not None:
+            sim['delays_scheduled'] = json.loads(row['delays_scheduled'])
+        if row['completed_at'] is not None:
+            sim['completed_at'] = row['completed_at']
+        return sim
+
+    def _results_for(self, sim_ids: List[str]) -> Dict[str, List[Dict]]:
+        out: Dict[str, List[Dict]] = {sid: [] for sid in sim_ids}
+        for i in range(0, len(sim_ids), 500):
+            chunk = sim_ids[i:i + 500]
+            rows = self._conn.execute(
+                f"SELECT sim_id, data FROM simulation_results WHERE sim_id IN ({','.join('?' * len(chunk))}) "
+                "ORDER BY sim_id, delay_seconds", chunk).fetchall()
+            for r in rows:
+                out[r['sim_id']].append(json.loads(r['data']))
+        return out
+
+    def get_simulation(self, sim_id: str) -> Optional[Dict]:
+        with self._lock:
+            row = self._conn.execute("SELECT * FROM simulations WHERE sim_id = ?", (sim_id,)).fetchone()
+            if row is None:
+                return None
+            return self._to_dict(row, self._results_for([sim_id])[sim_id])
+
+    def iter_simulations(self, whale: Optional[str] = None, market: Optional[str] = None,
+                         since: Optional[str] = None, until: Optional[str] = None,
+                         status: Optional[str] = None, is_elite: Optional[bool] = None,
+                         order_by: str = "detection_time", descending: bool = False,
+                         limit: Optional[int] = None, page_size: int = 1000) -> Iterator[Dict]:
+        """
+        Yield simulations matching the filters (all indexed columns), results included.
+        since/until bound the detection time (ISO strings).
+        """
+        if order_by not in ("detection_time", "updated_at", "created_at", "sim_id"):
+            raise ValueError(f"unsupported order_by: {order_by}")
+        where, params = [], []
+        if whale:
+            where.append("whale_address = ?")
+            params.append(whale.lower())
+        if market:
+            where.append("market_slug = ?")
+            params.append(market)
+        if since:
+            where.append("detection_time >= ?")
+            params.append(since)
+        if until:
+            where.append("detection_time <= ?")
+            params.append(until)
+        if status:
+            where.append("status = ?")
+            params.append(status)
+        if is_elite is not None:
+            where.append("is_elite = ?")
+            params.append(1 if is_elite else 0)
+        sql = "SELECT * FROM simulations"
+        if where:
+            sql += " WHERE " + " AND ".join(where)
+        sql += f" ORDER BY {order_by} {'DESC' if descending else 'ASC'}, sim_id"
+        if limit:
+            sql += f" LIMIT {int(limit)}"
+
+        offset = 0
+        while True:
+            with self._lock:
+                rows = self._conn.execute(f"{sql} " + ("" if limit else f"LIMIT {page_size} OFFSET {offset}"),
+                                          params).fetchall()
+                results = self._results_for([r['sim_id'] for r in rows])
+            for r in rows:
+                yield self._to_dict(r, results[r['sim_id']])
+            if limit or len(rows) < page_size:
+                return
+            offset += page_size
+
+    def load_simulations(self, **filters) -> List[Dict]:
+        return list(self.iter_simulations(**filters))
+
+    def latest(self, n: int = 1) -> List[Dict]:
+        """Most recently updated simulations"""
+        return self.load_simulations(order_by="updated_at", descending=True, limit=n)
+
+    def count(self, status: Optional[str] = None) -> int:
+        with self._lock:
+            if status:
+                return self._conn.execute("SELECT COUNT(*) FROM simulations WHERE status = ?", (status,)).fetchone()[0]
+            return self._conn.execute("SELECT COUNT(*) FROM simulations").fetchone()[0]
+
+    def time_span(self) -> Tuple[Optional[str], Optional[str]]:
+        """(oldest, newest) updated_at over all simulations"""
+        with self._lock:
+            row = self._conn.execute("SELECT MIN(updated_at), MAX(updated_at) FROM simulations").fetchone()
+        return row[0], row[1]
+
+    def first_created_at(self) -> Optional[str]:
+        with self._lock:
+            return self._conn.execute(
+                "SELECT MIN(COALESCE(created_at, updated_at)) FROM simulations").fetchone()[0]
+
+
+def migrate_json_files(sim_dir: Path, store: SimulationStore) -> Tuple[int, int, int]:
+    """
+    Import legacy sim_*.json files (idempotent: existing sim_ids are skipped).
+    The file mtime becomes updated_at. Returns (imported, skipped, failed).
+    """
+    imported = skipped = failed = 0
+    for sim_file in sorted(Path(sim_dir).glob("sim_*.json")):
+        try:
+            with open(sim_file, 'r') as f:
+                sim = json.load(f)
+            sim.setdefault('simulation_id', sim_file.stem)
+            mtime = datetime.fromtimestamp(sim_file.stat().st_mtime).isoformat()
+            if store.save_simulation(sim, replace=False, updated_at=mtime):
+                imported += 1
+            else:
+                skipped += 1
+        except Exception as e:
+            print(f"⚠️ Could not import {sim_file.name}: {e}")
+            failed += 1
+    return imported, skipped, failed
@@ -11,15 +11,16 @@ For each detected whale trade:
 5. Return simulation results
 """
 
-import asyncio
-import json
 from datetime import datetime, timedelta
 from typing import Dict, List, Optional
 from dataclasses import dataclass, asdict
 from pathlib import Path
 
 from .market_state_tracker import MarketStateTracker
+from .price_history import PriceHistoryStore
 from .slippage_calculator import SlippageCalculator
+from .simulation_store import SimulationStore
+from .delay_scheduler import DelayCheckScheduler
 
 
 @dataclass
@@ -68,8 +69,9 @@ class TradeSimulator:
         result = await simulator.simulate_trade(whale_trade_data)
     """
     
-    def __init__(self, elite_whales: Optional[set] = None, storage_path: Optional[str] = None, price_lookup_func=None):
-        self.market_tracker = MarketStateTracker()
+    def __init__(self, elite_whales: Optional[set] = None, storage_path: Optional[str] = None, price_lookup_func=None,
+                 store: Optional[SimulationStore] = None, price_history: Optional[PriceHistoryStore] = None):
+        self.market_tracker = MarketStateTracker(price_history)
         self.slippage_calc = SlippageCalculator()
         
         # Default delays: 1min, 3min, 5min
@@ -83,21 +85,21 @@ class TradeSimulator:
         # Function signature: (market_slug: str, target_time: str) -> Optional[float]
         self.price_lookup_func = price_lookup_func
         
-        # Storage for simulation results
-        if storage_path:
-            self.storage_path = Path(storage_path)
+        # Storage for simulation results (SQLite store, default data/simulations.db;
+        # a storage_path directory gets its own simulations.db)
+        if store is not None:
+            self.store = store
+        elif storage_path:
+            self.store = SimulationStore(Path(storage_path) / "simulations.db")
         else:
-            # Default: data/simulations/
-            project_root = Path(__file__).parent.parent.parent
-            self.storage_path = project_root / "data" / "simulations"
-        
-        self.storage_path.mkdir(parents=True, exist_ok=True)
+            self.store = SimulationStore()
+        self.storage_path = self.store.db_path
         
         # Track simulations in memory (for quick access)
         self.simulations: List[TradeSimulation] = []
         
-        # Track active scheduled tasks for delay checks
-        self.active_tasks: List[asyncio.Task] = []
+        # Single scheduler for all delay checks (persisted in the store, survives restarts)
+        self.scheduler = DelayCheckScheduler(self.store, self._run_delay_check)
         
         # Telegram callback for notifications (set by watcher)
         self.telegram_callback = None
@@ -116,10 +118,10 @@ class TradeSimulator:
         """
         Start simulation with scheduled delay price checks
         
-        NEW APPROACH: Schedule async tasks to check prices at actual execution times
-        - Creates initial simulation file immediately
-        - Schedules tasks to check prices at T+60s, T+180s, T+300s
-        - Each task updates simulation file when delay time arrives
+        NEW APPROACH: Schedule price checks at actual execution times
+        - Creates initial simulation record immediately
+        - Schedules checks at T+60s, T+180s, T+300s on the shared DelayCheckScheduler
+        - Each check stores its delay result when delay time arrives
         
         Args:
             whale_trade: Detected trade data with keys:
@@ -195,10 +197,11 @@ class TradeSimulator:
             'delays_scheduled': delays
         }
         
-        # Save initial simulation file
-        sim_file = self.storage_path / f"{sim_id}.json"
-        with open(sim_file, 'w') as f:
-            json.dump(simulation_data, f, indent=2, default=str)
+        # Save initial simulation record
+        try:
+            self.store.save_simulation(simulation_data)
+        except Exception as e:
+            print(f"⚠️ Failed to save simulation {sim_id}: {e}")
         
         # Send Telegram notification
         if self.telegram_callback:
@@ -222,41 +225,45 @@ class TradeSimulator:
         print(f"🔬 Simulation started: {sim_id}")
         print(f"   Delay checks scheduled: {', '.join([f'+{d//60}min' for d in delays])}")
         
-        # Schedule async tasks to check prices at each delay
-        for delay_seconds in delays:
-            task = asyncio.create_task(
-                self._check_price_at_delay(
-                    sim_id=sim_id,
-                    trade_data={
-                        'wallet': whale_address,
-                        'market': market_slug,
-                        'price': whale_price,
-                        'size': whale_size,
-                        'timestamp': detection_time.isoformat(),
-                        'confidence': confidence
-                    },
-                    delay_seconds=delay_seconds
-                )
-            )
-            self.active_tasks.append(task)
+        # Schedule price checks at each delay (one shared scheduler task, not one task per delay)
+        self.scheduler.schedule(
+            sim_id,
+            trade_data={
+                'wallet': whale_address,
+                'market': market_slug,
+                'price': whale_price,
+                'size': whale_size,
+                'timestamp': detection_time.isoformat(),
+                'confidence': confidence
+            },
+            delays=delays
+        )
         
         return sim_id
     
+    async def start(self):
+        """Start the delay check scheduler (resumes checks persisted before a restart)"""
+        await self.scheduler.start()
+    
+    async def stop(self):
+        await self.scheduler.stop()
+    
+    def pending_checks(self) -> int:
+        """Delay checks scheduled but not yet run"""
+        return self.scheduler.backlog()
+    
     async def _save_simulation(self, simulation: TradeSimulation):
-        """Save simulation result to disk"""
+        """Save simulation result to the store"""
         try:
-            # Create filename based on timestamp and whale address
+            # Simulation ID based on timestamp and whale address
             timestamp_str = simulation.detection_time.strftime('%Y%m%d_%H%M%S')
             whale_short = simulation.whale_address[:8]
-            filename = f"sim_{timestamp_str}_{whale_short}.json"
-            filepath = self.storage_path / filename
             
             # Convert dataclass to dict for JSON serialization
             sim_dict = self._simulation_to_dict(simulation)
+            sim_dict['simulation_id'] = f"sim_{timestamp_str}_{whale_short}"
             
-            # Save to file
-            with open(filepath, 'w') as f:
-                json.dump(sim_dict, f, indent=2, default=str)
+            self.store.save_simulation(sim_dict)
             
         except Exception as e:
             # Don't let save errors break simulation
@@ -282,26 +289,26 @@ class TradeSimulator:
         
         return result
     
-    async def _check_price_at_delay(
+    async def _run_delay_check(
         self,
         sim_id: str,
         trade_data: Dict,
-        delay_seconds: int
+        delay_seconds: int,
+        late_by_seconds: float = 0.0
     ):
         """
-        Wait for delay, then check actual price and update simulation
+        Check actual price once a delay has elapsed and update simulation
         
-        This is the CRITICAL FIX: Waits for actual delay time, then checks
-        real market price at that moment (which will exist in price history).
+        This is the CRITICAL FIX: runs at the actual delay time (fired by the
+        scheduler), then checks real market price at that moment (which will
+        exist in price history).
         
         Args:
             sim_id: Simulation ID
             trade_data: Trade data dict
             delay_seconds: Delay in seconds
+            late_by_seconds: How far past its due time the check fired (e.g. after a restart)
         """
-        # Wait for the delay (this is the key!)
-        await asyncio.sleep(delay_seconds)
-        
         # Now we're at T+delay, so prices should exist in history
         detection_time = self._parse_timestamp(trade_data['timestamp'])
         execution_time = detection_time + timedelta(seconds=delay_seconds)
@@ -357,32 +364,20 @@ class TradeSimulator:
             'pnl_pct': None,
             'resolved': False
         }
+        if late_by_seconds >= 30:
+            # Fired late (restart / overload): the price is from checked_at, not execution_time
+            result['late_by_seconds'] = round(late_by_seconds, 1)
         
-        # Load simulation file
-        sim_file = self.storage_path / f"{sim_id}.json"
-        try:
-            with open(sim_file, 'r') as f:
-                simulation = json.load(f)
-        except Exception as e:
-            print(f"⚠️ Failed to load simulation {sim_id}: {e}")
-            return
-        
-        # Add result
-        simulation['results'].append(result)
-        
-        # Update status
-        expected_results = len(simulation.get('delays_scheduled', []))
-        if len(simulation['results']) >= expected_results:
-            simulation['status'] = 'completed'
-            simulation['completed_at'] = datetime.now().isoformat()
-        
-        # Save updated simulation
+        # Store this delay's result in place (marks the simulation completed after the last delay)
         try:
-            with open(sim_file, 'w') as f:
-                json.dump(simulation, f, indent=2, default=str)
+            updated = self.store.add_result(sim_id, result)
         except Exception as e:
             print(f"⚠️ Failed to save simulation {sim_id}: {e}")
             return
+        if updated is None:
+            print(f"⚠️ Failed to load simulation {sim_id}: not in store")
+            return
+        results_count, expected_results, status = updated
         
         # Log completion
         delay_min = delay_seconds // 60
@@ -392,7 +387,7 @@ class TradeSimulator:
         
         # Send Telegram notification
         if self.telegram_callback:
-            status_icon = "✅" if simulation['status'] == 'completed' else "⏳"
+            status_icon = "✅" if status == 'completed' else "⏳"
             msg = (
                 f"{status_icon} <b>Delay Check Complete</b>\n\n"
                 f"🔬 Simulation: <code>{sim_id}</code>\n"
@@ -401,10 +396,10 @@ class TradeSimulator:
                 f"💰 Entry: {entry_price:.6f}\n"
                 f"📊 Source: {price_source}\n\n"
             )
-            if simulation['status'] == 'completed':
+            if status == 'completed':
                 msg += f"🎉 <b>All delay checks complete!</b>"
             else:
-                remaining = expected_results - len(simulation['results'])
+                remaining = expected_results - results_count
                 msg += f"⏳ {remaining} check(s) remaining"
             
             try:
@@ -0,0 +1,117 @@
+"""ColumnarSink flushing, segment files and load_frame."""
+import csv
+import glob
+import os
+from datetime import datetime
+
+import pytest
+
+from src.polymarket import activity_sink
+from src.polymarket.activity_sink import ACTIVITY_SCHEMA, ColumnarSink, load_frame
+
+pytest.importorskip("pyarrow")
+
+
+def row(wallet: str, size: float = 100.0):
+    return {"timestamp": "2026-01-02T03:04:05", "market_id": "m1", "wallet": wallet,
+            "score": 0.8, "discount_pct": 2.5, "size_usd": size, "ignored": "x"}
+
+
+def today() -> str:
+    return datetime.now().strftime("%Y-%m-%d")
+
+
+def test_add_buffers_until_flush(tmp_path):
+    sink = ColumnarSink("activity", ACTIVITY_SCHEMA, log_dir=str(tmp_path))
+    sink.add(row("0xa"))
+    assert sink.pending() == 1
+    assert not os.listdir(tmp_path)
+    assert sink.flush() == 1
+    assert sink.pending() == 0
+    sink.close()
+    assert sink.stats()["rows_written"] == 1
+
+
+def test_csv_export_matches_schema(tmp_path):
+    sink = ColumnarSink("activity", ACTIVITY_SCHEMA, log_dir=str(tmp_path), csv_export=True)
+    sink.add(row("0xa"))
+    sink.add({**row("0xb"), "market_id": "line\nbreak"})
+    sink.close()
+    with open(tmp_path / f"activity_{today()}.csv", newline="", encoding="utf-8") as f:
+        rows = list(csv.reader(f))
+    assert rows[0] == [col for col, _ in ACTIVITY_SCHEMA]
+    assert [r[2] for r in rows[1:]] == ["0xa", "0xb"]
+    assert rows[2][1] == "line break"
+
+
+def test_row_is_snapshotted_at_add(tmp_path):
+    sink = ColumnarSink("activity", ACTIVITY_SCHEMA, log_dir=str(tmp_path), csv_export=False)
+    data = row("0xa")
+    sink.add(data)
+    data["wallet"] = "0xchanged"
+    sink.close()
+    assert load_frame("activity", today(), log_dir=str(tmp_path))["wallet"].tolist() == ["0xa"]
+
+
+def test_load_frame_typed_columns(tmp_path):
+    sink = ColumnarSink("activity", ACTIVITY_SCHEMA, log_dir=str(tmp_path), csv_export=False)
+    sink.add(row("0xa", size=250.0))
+    sink.add({**row("0xb"), "score": "not a number"})
+    sink.close()
+    df = load_frame("activity", today(), log_dir=str(tmp_path))
+    assert df["size_usd"].tolist() == [250.0, 100.0]
+    assert df["score"].isna().tolist() == [False, True]
+    assert df["timestamp"].iloc[0] == datetime(2026, 1, 2, 3, 4, 5)
+
+
+def test_rows_after_close_go_to_a_new_segment(tmp_path):
+    sink = ColumnarSink("activity", ACTIVITY_SCHEMA, log_dir=str(tmp_path), csv_export=False)
+    sink.add(row("0xa"))
+    sink.close()
+    sink.add(row("0xb"))
+    sink.close()
+    assert len(glob.glob(str(tmp_path / "activity_*.arrows"))) == 2
+    df = load_frame("activity", today(), log_dir=str(tmp_path))
+    assert sorted(df["wallet"]) == ["0xa", "0xb"]
+
+
+def test_load_frame_merges_csv_only_rows_without_duplicates(tmp_path):
+    day = today()
+    # Legacy row written before the sink existed
+    with open(tmp_path / f"activity_{day}.csv", "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow([col for col, _ in ACTIVITY_SCHEMA])
+        writer.writerow(["2026-01-01T00:00:00", "m0", "0xlegacy", "0.5", "1.0", "50"])
+    sink = ColumnarSink("activity", ACTIVITY_SCHEMA, log_dir=str(tmp_path), csv_export=True)
+    sink.add(row("0xa"))
+    sink.add(row("0xa"))  # identical rows are counted, not collapsed
+    sink.close()
+    df = load_frame("activity", day, log_dir=str(tmp_path))
+    assert sorted(df["wallet"]) == ["0xa", "0xa", "0xlegacy"]
+
+
+def test_load_frame_without_arrow_files(tmp_path):
+    assert load_frame("activity", today(), log_dir=str(tmp_path)) is None
+
+
+def test_failing_format_does_not_lose_rows(tmp_path, monkeypatch):
+    sink = ColumnarSink("activity", ACTIVITY_SCHEMA, log_dir=str(tmp_path), csv_export=True)
+
+    def broken(day, rows):
+        raise OSError("disk full")
+
+    monkeypatch.setattr(sink, "_write_arrow", broken)
+    sink.add(row("0xa"))
+    assert sink.flush() == 1
+    assert sink.stats()["errors"] == 1
+    assert os.path.exists(tmp_path / f"activity_{today()}.csv")
+
+
+def test_flush_all_sinks_covers_registered_sinks(tmp_path, monkeypatch):
+    monkeypatch.setattr(activity_sink, "_SINKS", {})
+    monkeypatch.setattr(activity_sink, "_FLUSHER", object())  # don't start the background thread
+    sink = activity_sink.register_sink(ColumnarSink("activity", ACTIVITY_SCHEMA, log_dir=str(tmp_path)))
+    sink.add(row("0xa"))
+    assert activity_sink.flush_all_sinks() == 1
+    assert activity_sink.sink_stats()["activity"]["rows_written"] == 1
+    sink.close()
@@ -0,0 +1,71 @@
+"""TimeBucketedDedup generations, eviction and stale suppression."""
+from src.polymarket.dedup import TimeBucketedDedup, event_time
+
+
+class FakeClock:
+    def __init__(self, now: float = 1_000_800.0):  # on a 600s bucket boundary
+        self.now = now
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def test_event_time_formats():
+    assert event_time(1_700_000_000) == 1_700_000_000.0
+    assert event_time(1_700_000_000_000) == 1_700_000_000.0  # milliseconds
+    assert event_time("1700000000") == 1_700_000_000.0
+    assert event_time("2023-11-14T22:13:20Z") == 1_700_000_000.0
+    assert event_time(None) is None
+    assert event_time("not a time") is None
+
+
+def test_duplicate_within_ttl():
+    clock = FakeClock()
+    dedup = TimeBucketedDedup(ttl_sec=3600, bucket_sec=600, clock=clock)
+    assert dedup.seen("a") is False
+    clock.now += 1200  # two buckets later, still inside the TTL
+    assert dedup.seen("a") is True
+    assert dedup.stats()["duplicates"] == 1
+
+
+def test_expired_generation_is_forgotten():
+    clock = FakeClock()
+    dedup = TimeBucketedDedup(ttl_sec=3600, bucket_sec=600, clock=clock)
+    dedup.seen("a")
+    clock.now += 600
+    dedup.seen("b")  # next generation: "a"'s generation ends here
+    clock.now += 3599
+    assert dedup.seen("a") is True  # its generation ended just under ttl_sec ago
+    clock.now += 1
+    dedup.seen("c")
+    assert "a" not in dedup and "b" in dedup
+    assert dedup.stats()["expired_evictions"] == 1
+
+
+def test_capacity_evicts_oldest_generation_only():
+    clock = FakeClock(0.0)
+    dedup = TimeBucketedDedup(ttl_sec=10**6, bucket_sec=100, max_keys=16, clock=clock)
+    for i in range(16):
+        dedup.seen(f"old-{i}")
+    clock.now += 100
+    dedup.seen("new")  # 17 keys: oldest generation (2 keys, cap max_keys/8) goes
+    stats = dedup.stats()
+    assert stats["capacity_evictions"] == 2
+    assert len(dedup) == 15
+    assert "old-0" not in dedup and "old-2" in dedup and "new" in dedup
+
+
+def test_stale_trade_after_eviction_is_suppressed():
+    clock = FakeClock()
+    dedup = TimeBucketedDedup(ttl_sec=3600, bucket_sec=600, clock=clock)
+    dedup.seen("a", event_ts=clock.now)
+    old_event = clock.now
+    clock.now += 1800
+    dedup.seen("b", event_ts=clock.now)
+    clock.now += 3600
+    dedup.seen("c", event_ts=clock.now)  # evicts "a"'s generation, sets the horizon
+    # The same old trade comes back from the API: unknown key, but older than the horizon
+    assert dedup.seen("a", event_ts=old_event) is True
+    # A fresh trade is never suppressed
+    assert dedup.seen("d", event_ts=clock.now) is False
+    assert dedup.stats()["stale_suppressed"] == 1
@@ -0,0 +1,114 @@
+"""DelayCheckScheduler ordering, persistence and restart recovery."""
+import asyncio
+import time
+
+from src.simulation.delay_scheduler import DelayCheckScheduler
+from src.simulation.simulation_store import SimulationStore
+
+
+class Recorder:
+    def __init__(self, fail_for=()):
+        self.calls = []
+        self.fail_for = set(fail_for)
+
+    async def __call__(self, sim_id, trade_data, delay, late_by):
+        self.calls.append((sim_id, delay, late_by))
+        if (sim_id, delay) in self.fail_for:
+            raise RuntimeError("boom")
+
+
+async def wait_for(predicate, timeout: float = 2.0):
+    deadline = time.monotonic() + timeout
+    while not predicate():
+        if time.monotonic() > deadline:
+            raise AssertionError("condition not reached")
+        await asyncio.sleep(0.01)
+
+
+def test_checks_fire_in_due_order_and_are_cleared(tmp_path):
+    store = SimulationStore(str(tmp_path / "sims.db"))
+    recorder = Recorder()
+
+    async def main():
+        scheduler = DelayCheckScheduler(store, recorder)
+        await scheduler.start()
+        now = time.time()
+        scheduler.schedule("late", {"x": 1}, [0.2], start_time=now)
+        scheduler.schedule("early", {"x": 2}, [0.05], start_time=now)  # earlier: wakes the runner
+        await wait_for(lambda: scheduler.fired == 2)
+        await scheduler.stop()
+        return scheduler
+
+    scheduler = asyncio.run(main())
+    assert [c[0] for c in recorder.calls] == ["early", "late"]
+    assert scheduler.backlog() == 0
+    assert store.load_pending_checks() == []
+    store.close()
+
+
+def test_pending_checks_survive_restart(tmp_path):
+    db = str(tmp_path / "sims.db")
+    store = SimulationStore(db)
+    # Scheduled without a running loop (e.g. at import time): persisted, not lost
+    DelayCheckScheduler(store, Recorder()).schedule("sim1", {"side": "BUY"}, [60, 120],
+                                                    start_time=time.time() - 90)
+    store.close()
+
+    store = SimulationStore(db)
+    recorder = Recorder()
+
+    async def main():
+        scheduler = DelayCheckScheduler(store, recorder)
+        await scheduler.start()
+        await wait_for(lambda: scheduler.fired == 1)  # +60s came due while "down"
+        stats = scheduler.stats()
+        await scheduler.stop()
+        return scheduler, stats
+
+    scheduler, stats = asyncio.run(main())
+    assert scheduler.restored == 2
+    assert [(c[0], c[1]) for c in recorder.calls] == [("sim1", 60)]
+    assert recorder.calls[0][2] >= 29  # reported as late
+    assert stats["backlog"] == 1 and 0 < stats["next_due_in_sec"] <= 30
+    assert [(sim_id, delay) for sim_id, delay, _, _ in store.load_pending_checks()] == [("sim1", 120)]
+    assert store.load_pending_checks()[0][3] == {"side": "BUY"}
+    store.close()
+
+
+def test_failed_check_is_not_retried(tmp_path):
+    store = SimulationStore(str(tmp_path / "sims.db"))
+    recorder = Recorder(fail_for={("bad", 0)})
+
+    async def main():
+        scheduler = DelayCheckScheduler(store, recorder)
+        await scheduler.start()
+        scheduler.schedule("bad", {}, [0])
+        scheduler.schedule("good", {}, [0])
+        await wait_for(lambda: scheduler.fired + scheduler.failed == 2)
+        await asyncio.sleep(0.05)
+        await scheduler.stop()
+        return scheduler
+
+    scheduler = asyncio.run(main())
+    assert (scheduler.fired, scheduler.failed) == (1, 1)
+    assert len(recorder.calls) == 2
+    assert store.load_pending_checks() == []
+    store.close()
+
+
+def test_start_is_idempotent_and_does_not_duplicate_queued_checks(tmp_path):
+    store = SimulationStore(str(tmp_path / "sims.db"))
+
+    async def main():
+        scheduler = DelayCheckScheduler(store, Recorder())
+        scheduler.schedule("sim1", {}, [3600])
+        await scheduler.start()
+        await scheduler.start()
+        backlog = scheduler.backlog()
+        await scheduler.stop()
+        return scheduler, backlog
+
+    scheduler, backlog = asyncio.run(main())
+    assert backlog == 1
+    assert scheduler.restored == 0
+    store.close()
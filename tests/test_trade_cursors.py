@@ -0,0 +1,98 @@
+"""TradeCursorStore high-water marks, overlap window and persistence."""
+import json
+
+from src.polymarket.trade_cursors import TradeCursorStore, cursor_trade_id
+
+MARKET = "0xmarket"
+
+
+def trade(ts: float, tx: str, size: float = 100.0):
+    return {"timestamp": ts, "transactionHash": tx, "asset": "1", "side": "BUY",
+            "proxyWallet": "0xw", "size": size, "price": 0.5}
+
+
+def test_first_poll_returns_everything():
+    store = TradeCursorStore()
+    page = [trade(1000, "a"), trade(999, "b")]
+    assert store.new_trades(MARKET, page) == page
+
+
+def test_second_poll_skips_seen_trades_and_keeps_same_second_fills():
+    store = TradeCursorStore(overlap_sec=30)
+    store.advance(MARKET, [trade(1000, "a"), trade(990, "b")], pages_fetched=1, default_pages=3,
+                  reached_cursor=False, now=2000)
+    # Another fill in the same second as the high-water mark is new; the old ones are not
+    page = [trade(1000, "c"), trade(1000, "a"), trade(990, "b"), trade(900, "z")]
+    assert [t["transactionHash"] for t in store.new_trades(MARKET, page)] == ["c"]
+    assert store.late_fills == 0
+
+
+def test_late_fill_inside_overlap_window_is_returned():
+    store = TradeCursorStore(overlap_sec=30)
+    store.advance(MARKET, [trade(1000, "a")], pages_fetched=1, default_pages=1,
+                  reached_cursor=False, now=2000)
+    # Indexed late with a timestamp below the high-water mark: inside the window -> new
+    fresh = store.new_trades(MARKET, [trade(1000, "a"), trade(985, "late"), trade(960, "too-old")])
+    assert [t["transactionHash"] for t in fresh] == ["late"]
+    assert store.late_fills == 1
+
+
+def test_advance_drops_ids_that_leave_the_overlap_window():
+    store = TradeCursorStore(overlap_sec=30)
+    store.advance(MARKET, [trade(1000, "a")], 1, 1, reached_cursor=False, now=2000)
+    store.advance(MARKET, [trade(1100, "b")], 1, 1, reached_cursor=True, now=2100)
+    cursor = store.get(MARKET)
+    assert cursor.last_ts == 1100
+    assert list(cursor.recent_ids) == [cursor_trade_id(trade(1100, "b"))]
+    assert store.early_stops == 1
+
+
+def test_page_budget_grows_with_trade_rate():
+    store = TradeCursorStore(max_pages=10)
+    assert store.page_budget(MARKET, default_pages=2, limit=100, now=0) == 2
+    store.advance(MARKET, [trade(100, "a")], 1, 2, reached_cursor=False, now=100)
+    store.advance(MARKET, [trade(101 + i, str(i)) for i in range(500)], 5, 2, reached_cursor=True, now=200)
+    # 5 trades/s over the next 100s (x1.5 headroom) -> 750 trades -> 8 pages + 1, capped at 10
+    assert store.page_budget(MARKET, default_pages=2, limit=100, now=300) == 9
+    assert store.page_budget(MARKET, default_pages=2, limit=100, now=1000) == 10
+
+
+def test_gap_doubles_rate_estimate():
+    store = TradeCursorStore()
+    store.advance(MARKET, [trade(100, "a")], 1, 1, reached_cursor=False, now=100)
+    store.advance(MARKET, [trade(101 + i, str(i)) for i in range(100)], 1, 1, reached_cursor=False, now=200)
+    assert store.gaps == 1
+    assert store.get(MARKET).rate == 2.0
+
+
+def test_save_and_load_round_trip(tmp_path, monkeypatch):
+    monkeypatch.setattr("src.polymarket.trade_cursors.time.time", lambda: 2500.0)
+    path = str(tmp_path / "cursors.json")
+    store = TradeCursorStore(overlap_sec=30)
+    store.advance(MARKET, [trade(1000, "a"), trade(995, "b")], 1, 1, reached_cursor=False, now=2000)
+    assert store.save(path) == 1
+
+    restored = TradeCursorStore(overlap_sec=30)
+    assert restored.load(path) == 1
+    cursor = restored.get(MARKET)
+    assert cursor.last_ts == 1000
+    assert restored.new_trades(MARKET, [trade(1000, "a"), trade(995, "b"), trade(1001, "c")]) == [trade(1001, "c")]
+
+
+def test_load_v1_file(tmp_path, monkeypatch):
+    monkeypatch.setattr("src.polymarket.trade_cursors.time.time", lambda: 2500.0)
+    path = tmp_path / "cursors.json"
+    tid = cursor_trade_id(trade(1000, "a"))
+    path.write_text(json.dumps({"version": 1, "cursors": {MARKET: [1000, [tid], None, 2000]}}))
+    store = TradeCursorStore()
+    assert store.load(str(path)) == 1
+    assert store.get(MARKET).recent_ids == {tid: 1000}
+
+
+def test_load_ignores_unknown_version_and_prunes_stale(tmp_path, monkeypatch):
+    monkeypatch.setattr("src.polymarket.trade_cursors.time.time", lambda: 10_000.0)
+    path = tmp_path / "cursors.json"
+    path.write_text(json.dumps({"version": 99, "cursors": {MARKET: [1000, {}, None, 2000]}}))
+    assert TradeCursorStore().load(str(path)) == 0
+    path.write_text(json.dumps({"version": 2, "cursors": {MARKET: [1000, {}, None, 2000]}}))
+    assert TradeCursorStore(ttl_sec=3600).load(str(path)) == 0